@@ -41,7 +41,8 @@ try:
     from app.api.v1.routers import employee_address, employee_education
     from app.api.v1.routers import employee_emergency_contact, employee_employment
     from app.api.v1.routers import employee_salary_structure, employee_document
-    from app.api.v1.routers import employee_salary, monthly_salary
+    from app.api.v1.routers import employee_salary, monthly_salary, payroll_analytics
+    from app.api.v1.routers import reporting_manager
     
     # Project Management
     from app.api.v1.routers import project, taskcode,user_profile_image, leavetype,attendence
@@ -82,6 +83,8 @@ except ImportError as e:
     backblaze_upload = DummyRouter()
     employee_salary = DummyRouter()
     monthly_salary = DummyRouter()
+    payroll_analytics = DummyRouter()
+    reporting_manager = DummyRouter()
     project = DummyRouter()
     taskitem = DummyRouter()
     taskcode =DummyRouter()
@@ -167,6 +170,12 @@ if HAS_AUTH:
     monthly_salary_protected = APIRouter(dependencies=[Depends(get_current_user)])
     monthly_salary_protected.include_router(monthly_salary.router)
 
+    payroll_analytics_protected = APIRouter(dependencies=[Depends(get_current_user)])
+    payroll_analytics_protected.include_router(payroll_analytics.router)
+
+    reporting_manager_protected = APIRouter(dependencies=[Depends(get_current_user)])
+    reporting_manager_protected.include_router(reporting_manager.router)
+
     project_protected = APIRouter(dependencies=[Depends(get_current_user)])
     project_protected.include_router(project.router)
 
@@ -215,7 +224,9 @@ if HAS_AUTH:
     api_router.include_router(employee_documents_protected, prefix="/employeedocuments", tags=["employeedocuments"])
     api_router.include_router(backblaze_upload_protected, prefix="/backblaze", tags=["backblaze"])
     api_router.include_router(monthly_salary_protected, prefix="/monthlysalary", tags=["monthlysalary"])
+    api_router.include_router(payroll_analytics_protected, prefix="/payrollanalytics", tags=["payrollanalytics"])
     api_router.include_router(employee_salary_protected, prefix="/employeesalary", tags=["employeesalary"])
+    api_router.include_router(reporting_manager_protected, prefix="/reportingmanager", tags=["reportingmanager"])
     api_router.include_router(project_protected, prefix="/project", tags=["project"])
     api_router.include_router(taskcode_protected, prefix="/taskcode", tags=["taskcode"])
     api_router.include_router(user_profile_image_protected, prefix="/userprofileimage", tags=["userprofileimage"])
@@ -247,6 +258,8 @@ else:
     api_router.include_router(backblaze_upload.router, prefix="/backblaze", tags=["backblaze"])
     api_router.include_router(employee_salary.router, prefix="/employeesalary", tags=["employeesalary"])
     api_router.include_router(monthly_salary.router, prefix="/monthlysalary", tags=["monthlysalary"])
+    api_router.include_router(payroll_analytics.router, prefix="/payrollanalytics", tags=["payrollanalytics"])
+    api_router.include_router(reporting_manager.router, prefix="/reportingmanager", tags=["reportingmanager"])
     api_router.include_router(project.router, prefix="/project", tags=["project"])
     api_router.include_router(taskcode.router, prefix="/taskcode", tags=["taskcode"])
     api_router.include_router(user_profile_image.router, prefix="/userprofileimage", tags=["userprofileimage"])
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
+import json
 
 from app.schemas.attendence_schemas import (
     AttendenceResponse,
     AttendenceListResponse,
     AttendenceExistsResponse,
     AttendenceDeleteResponse,
-    AttendenceOperationResponse
+    AttendenceOperationResponse,
+    AttendenceUpsert,
+    AttendenceBulkIngestResponse,
+    AttendenceMonthlySummaryResponse,
+    TeamCalendarResponse
 )
+from app.schemas.batch_review_schemas import BatchReviewRequest, BatchReviewResponse
 from app.core.database import get_db
 from app.services.attendence_service import AttendenceService
+from app.services.attendence_ingest_service import AttendenceIngestService
+from app.services.attendence_summary_service import AttendenceSummaryService
+from app.services.reporting_hierarchy_service import ReportingHierarchyService
+from app.services.team_calendar_service import TeamCalendarService
 
 router = APIRouter()
 
@@ -113,7 +124,7 @@ def get_attendence_with_pagination(
 # Insert or Update Attendence
 @router.post("/insert_or_update_attendence", response_model=AttendenceOperationResponse)
 def insert_or_update_attendence(
-    attendence: dict,
+    attendence: AttendenceUpsert,
     db: Session = Depends(get_db)
 ):
     try:
@@ -143,6 +154,172 @@ def insert_or_update_attendence(
         )
 
 
+# Check In (today, one atomic upsert)
+@router.post("/check_in/{employee_id}", response_model=AttendenceOperationResponse)
+def check_in(
+    employee_id: int,
+    work_type: str = Query("Office", description="WorkType of a newly created day"),
+    user_id: Optional[int] = Query(None, description="Recorded as CreatedBy/ModifiedBy"),
+    db: Session = Depends(get_db)
+):
+    try:
+        result = AttendenceService.check_in(db, employee_id, user_id=user_id, work_type=work_type)
+        result["data"] = AttendenceResponse.model_validate(result["data"])
+        return AttendenceOperationResponse(**result)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking in: {str(e)}"
+        )
+
+
+# Check Out (today, CheckOutTime and WorkHours in one UPDATE)
+@router.post("/check_out/{employee_id}", response_model=AttendenceOperationResponse)
+def check_out(
+    employee_id: int,
+    user_id: Optional[int] = Query(None, description="Recorded as ModifiedBy"),
+    db: Session = Depends(get_db)
+):
+    try:
+        result = AttendenceService.check_out(db, employee_id, user_id=user_id)
+
+        if not result.get("success"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=result.get("message")
+            )
+
+        result["data"] = AttendenceResponse.model_validate(result["data"])
+        return AttendenceOperationResponse(**result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking out: {str(e)}"
+        )
+
+
+def _ingest_body(db: Session, body: bytes, content_type: str, on_duplicate: str,
+                 user_id: Optional[int]) -> Dict[str, Any]:
+    """Parse a JSON or CSV request body and ingest its rows"""
+    if "csv" in content_type.lower():
+        rows = AttendenceIngestService.read_csv(body.decode("utf-8-sig"))
+    else:
+        rows = json.loads(body or b"[]")
+        if isinstance(rows, dict):
+            rows = rows.get("rows", [])
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array of attendence rows")
+
+    return AttendenceIngestService.ingest(db, rows, on_duplicate=on_duplicate, user_id=user_id)
+
+
+# Bulk Ingest Attendence (device exports / CSV dumps)
+@router.post("/bulk_ingest", response_model=AttendenceBulkIngestResponse)
+async def bulk_ingest_attendence(
+    request: Request,
+    on_duplicate: str = Query("merge", description="merge (widen check-in/out) or skip existing days"),
+    user_id: Optional[int] = Query(None, description="Recorded as CreatedBy/ModifiedBy"),
+    db: Session = Depends(get_db)
+):
+    """
+    Load many attendance rows at once. Send a JSON array, or CSV with
+    Content-Type text/csv. Each row needs EmployeeId and either PunchTime
+    or AttendenceDate (with optional CheckInTime/CheckOutTime).
+    """
+    try:
+        body = await request.body()
+        # Parsing and the ingest transaction are blocking - keep them off the event loop
+        return await run_in_threadpool(
+            _ingest_body, db, body, request.headers.get("content-type", ""), on_duplicate, user_id
+        )
+
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error ingesting attendence: {str(e)}"
+        )
+
+
+# Monthly Summaries (present / absent / WFH / leave days and work hours)
+@router.get("/monthly_summary", response_model=AttendenceMonthlySummaryResponse)
+def get_monthly_summary(
+    employee_ids: Optional[List[int]] = Query(None, description="Employees to include (all when omitted)"),
+    from_period: Optional[int] = Query(None, description="First month as YYYYMM"),
+    to_period: Optional[int] = Query(None, description="Last month as YYYYMM"),
+    db: Session = Depends(get_db)
+):
+    try:
+        items = AttendenceSummaryService.fetch(
+            db, employee_ids=employee_ids, from_period=from_period, to_period=to_period
+        )
+        return AttendenceMonthlySummaryResponse(total=len(items), items=items)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching attendence summaries: {str(e)}"
+        )
+
+
+# Team Calendar (one status code per employee per day)
+@router.get("/team_calendar", response_model=TeamCalendarResponse)
+def get_team_calendar(
+    employee_ids: Optional[List[int]] = Query(None, description="Employees of the team"),
+    manager_id: Optional[int] = Query(None, description="Or: everyone reporting to this manager"),
+    depth: Optional[int] = Query(None, ge=1, description="Levels below manager_id (1 = direct reports)"),
+    from_date: date = Query(..., description="First day (YYYY-MM-DD)"),
+    to_date: date = Query(..., description="Last day (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    try:
+        if manager_id is not None:
+            employee_ids = list(employee_ids or []) + ReportingHierarchyService.descendants(db, manager_id, depth)
+        return TeamCalendarService.get_calendar(db, employee_ids or [], from_date, to_date)
+
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error building team calendar: {str(e)}"
+        )
+
+
+# Batch Approve / Reject
+@router.post("/batch_review", response_model=BatchReviewResponse)
+def batch_review_attendence(
+    request: BatchReviewRequest,
+    db: Session = Depends(get_db)
+):
+    try:
+        return AttendenceService.batch_review(
+            db, request.ids, request.action, user_id=request.user_id, comment=request.comment
+        )
+
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reviewing attendence: {str(e)}"
+        )
+
+
 # Check if Attendence Exists
 @router.get("/check_attendence_exists/{attendence_id}", response_model=AttendenceExistsResponse)
 def check_attendence_exists(attendence_id: int, db: Session = Depends(get_db)):
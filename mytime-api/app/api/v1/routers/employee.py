@@ -5,7 +5,8 @@ from datetime import datetime
 
 from app.schemas.employee_schemas import (
     EmployeeResponse,
-    EmployeeDeleteResponse
+    EmployeeDeleteResponse,
+    EmployeeUpsert
 )
 from app.core.database import get_db
 from app.services.employee_service import EmployeeService
@@ -62,8 +63,19 @@ async def fetch_all_employees(db: Session = Depends(get_db)):
             detail=f"Error fetching employees: {str(e)}"
         )
 
+@router.get("/statistics")
+async def get_employee_statistics(db: Session = Depends(get_db)):
+    """Employee headcount overall and by department"""
+    try:
+        return EmployeeService.get_employee_statistics(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching employee statistics: {str(e)}"
+        )
+
 @router.post("/InsertOrUpdateEmployee")
-async def insert_or_update_employee(employee: dict, db: Session = Depends(get_db)):
+async def insert_or_update_employee(employee: EmployeeUpsert, db: Session = Depends(get_db)):
     """Insert or update employee"""
     try:
         response = EmployeeService.insert_or_update_employee(db, employee)
@@ -5,7 +5,8 @@ from datetime import datetime
 
 from app.schemas.employee_education_schemas import (
      EmployeeEducationResponse,
-        EmployeeEducationDeleteResponse
+        EmployeeEducationDeleteResponse,
+        EmployeeEducationUpsert
         )
 from app.core.database import get_db
 from app.services.employee_education_service import EmployeeEducationService
@@ -47,7 +48,7 @@ async def fetch_educations_by_employee(employee_id: int, db: Session = Depends(g
 
 
 @router.post("/InsertOrUpdateEmployeeEducation")
-async def insert_or_update_employee_education(education: dict, db: Session = Depends(get_db)):
+async def insert_or_update_employee_education(education: EmployeeEducationUpsert, db: Session = Depends(get_db)):
     """Insert or update employee education record"""
     try:
         response = EmployeeEducationService.insert_or_update_employee_education(db, education)
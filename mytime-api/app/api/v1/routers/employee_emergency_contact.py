@@ -58,6 +58,18 @@ async def fetch_all_employee_emergency_contacts(db: Session = Depends(get_db)):
             detail=f"Error fetching all employee emergency contacts: {str(e)}"
         )
 
+
+@router.get("/statistics")
+async def get_emergency_contact_statistics(db: Session = Depends(get_db)):
+    """Emergency contact counts overall and by relation"""
+    try:
+        return EmployeeEmergencyContactService.get_emergency_contact_statistics(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching emergency contact statistics: {str(e)}"
+        )
+
 @router.post("/InsertOrUpdateEmployeeEmergencyContact")
 async def insert_or_update_employee_emergency_contact(contact: dict, db: Session = Depends(get_db)):
     """Insert or update employee emergency contact"""
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.models.employee_salary import EmployeeSalary
 from app.services.employee_salary_service import EmployeeSalaryService
-from app.schemas.employee_salary_schemas import EmployeeSalaryInDB,EmployeeSalaryBulkCreate
+from app.services.tax_statement_service import TaxStatementService
+from app.schemas.employee_salary_schemas import EmployeeSalaryInDB,EmployeeSalaryBulkCreate,TaxStatement
 
 router = APIRouter()
 
@@ -42,6 +44,91 @@ async def fetch_employee_salaries_by_employee(employeeId: int, db: Session = Dep
             detail=str(e)
         )
 
+@router.get("/fetchEmployeeSalariesByFinancialYear/{financialYear}", response_model=List[EmployeeSalaryInDB])
+async def fetch_employee_salaries_by_financial_year(
+    financialYear: int,
+    employeeId: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get employee salaries of a financial year (e.g. 2024 = April 2024 - March 2025)"""
+    try:
+        return EmployeeSalaryService.fetch_employee_salaries_by_financial_year(db, financialYear, employeeId)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/fetchEmployeeSalariesByPeriod", response_model=List[EmployeeSalaryInDB])
+async def fetch_employee_salaries_by_period(
+    fromPeriod: int = Query(..., description="Start period as YYYYMM"),
+    toPeriod: int = Query(..., description="End period as YYYYMM (inclusive)"),
+    employeeId: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Get employee salaries between two YYYYMM periods"""
+    try:
+        return EmployeeSalaryService.fetch_employee_salaries_by_period_range(db, fromPeriod, toPeriod, employeeId)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/fetchTaxStatements/{financialYear}", response_model=List[TaxStatement])
+async def fetch_tax_statements(
+    financialYear: int,
+    employeeId: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Annual earnings and deduction totals of every employee for an April-March financial year"""
+    try:
+        return TaxStatementService.compute_statements(db, financialYear, employee_id=employeeId)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/downloadTaxStatement/{financialYear}/{employeeId}")
+async def download_tax_statement(financialYear: int, employeeId: int, db: Session = Depends(get_db)):
+    """Annual salary statement PDF of one employee"""
+    try:
+        statement = TaxStatementService.get_statement_pdf(db, financialYear, employeeId)
+        if not statement:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No salaries found for the employee in this financial year"
+            )
+        file_name, content = statement
+        return Response(
+            content=content,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/downloadTaxStatements/{financialYear}")
+async def download_tax_statements(financialYear: int, db: Session = Depends(get_db)):
+    """ZIP of every employee's annual salary statement"""
+    file_name = f"SalaryStatements_FY{financialYear}-{str(financialYear + 1)[-2:]}.zip"
+    return StreamingResponse(
+        TaxStatementService.stream_statements_zip(db, financialYear),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+    )
+
 @router.get("/fetchEmployeeSalaries", response_model=List[EmployeeSalaryInDB])
 async def fetch_all_employee_salaries(db: Session = Depends(get_db)):
     """Get all employee salaries - matches C# fetchEmployeeSalaries endpoint"""
@@ -6,10 +6,16 @@ from decimal import Decimal
 from app.models.employee_salary_structure import EmployeeSalaryStructure
 from app.schemas.employee_salary_structure_schemas import (
     EmployeeSalaryStructureResponse,
-    EmployeeSalaryStructureDeleteResponse
+    EmployeeSalaryStructureDeleteResponse,
+    SalaryStatisticsResponse,
+    SalaryComparisonReportResponse,
+    SalaryRevisionRequest,
+    SalaryRevisionResponse
 )
+from app.models.salary_hike import SalaryHikeModel
 from app.core.database import get_db
 from app.services.employee_salary_structure_service import EmployeeSalaryStructureService
+from app.services.salary_revision_service import SalaryRevisionService
 
 router = APIRouter()
 
@@ -58,6 +64,74 @@ async def fetch_all_employee_salary_structures(db: Session = Depends(get_db)):
             detail=f"Error fetching all employee salary structures: {str(e)}"
         )
 
+@router.get("/salaryStatistics", response_model=SalaryStatisticsResponse)
+async def get_salary_statistics(db: Session = Depends(get_db)):
+    """Salary statistics across active salary structures"""
+    try:
+        return EmployeeSalaryStructureService.get_salary_statistics(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching salary statistics: {str(e)}"
+        )
+
+@router.get("/salaryComparisonReport", response_model=SalaryComparisonReportResponse)
+async def get_salary_comparison_report(
+    department_id: Optional[int] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Salary comparison by designation with paginated employee detail"""
+    try:
+        return EmployeeSalaryStructureService.get_salary_comparison_report(
+            db, department_id=department_id, page=page, page_size=page_size
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching salary comparison report: {str(e)}"
+        )
+
+@router.post("/salaryRevision/preview", response_model=SalaryRevisionResponse)
+async def preview_salary_revision(request: SalaryRevisionRequest, db: Session = Depends(get_db)):
+    """Resulting structures and cost delta of a bulk salary revision, nothing is saved"""
+    try:
+        return SalaryRevisionService.preview(db, request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error previewing salary revision: {str(e)}"
+        )
+
+@router.post("/salaryRevision/apply", response_model=SalaryRevisionResponse)
+async def apply_salary_revision(request: SalaryRevisionRequest, db: Session = Depends(get_db)):
+    """Apply a bulk salary revision as new structure versions in one transaction"""
+    try:
+        return SalaryRevisionService.apply(db, request)
+    except ValueError as e:
+        # The structures changed since the revision was planned
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error applying salary revision: {str(e)}"
+        )
+
+@router.get("/salaryHikes/{employee_id}", response_model=List[SalaryHikeModel])
+async def fetch_salary_hikes(employee_id: int, db: Session = Depends(get_db)):
+    """Salary revision history of an employee"""
+    try:
+        return SalaryRevisionService.fetch_salary_hikes(db, employee_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching salary hikes: {str(e)}"
+        )
+
 @router.post("/InsertOrUpdateEmployeeSalaryStructure")
 async def insert_or_update_employee_salary_structure(salary: dict, db: Session = Depends(get_db)):
     """Insert or update employee salary structure"""
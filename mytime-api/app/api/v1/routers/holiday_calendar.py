@@ -6,10 +6,11 @@ from datetime import date, datetime
 from app.schemas.holiday_calendar_schemas import (
     HolidayCalendarCreate, HolidayCalendarUpdate, HolidayCalendarResponse, 
     HolidayCalendarListResponse, HolidayCalendarExistsResponse, 
-    HolidayCalendarDeleteResponse, HolidayByYearResponse
+    HolidayCalendarDeleteResponse, HolidayByYearResponse, WorkingDaysResponse
 )
 from app.core.database import get_db
 from app.services.holiday_calendar_service import HolidayCalendarService
+from app.services.business_calendar_service import BusinessCalendarService
 
 router = APIRouter()
 
@@ -84,4 +85,33 @@ async def delete_holiday_calendar(holiday_id: int, db: Session = Depends(get_db)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting holiday: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/workingDays", response_model=WorkingDaysResponse)
+async def get_working_days(
+    from_date: date = Query(..., description="First day (YYYY-MM-DD)"),
+    to_date: date = Query(..., description="Last day (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """Working days between two dates, from the cached business-day calendar"""
+    try:
+        if from_date > to_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="from_date cannot be after to_date"
+            )
+        return WorkingDaysResponse(
+            from_date=from_date,
+            to_date=to_date,
+            calendar_days=(to_date - from_date).days + 1,
+            working_days=BusinessCalendarService.working_days(db, from_date, to_date),
+            holidays=sorted(BusinessCalendarService.holidays(db, from_date, to_date))
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error counting working days: {str(e)}"
+        )
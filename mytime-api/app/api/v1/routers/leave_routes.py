@@ -7,6 +7,7 @@ from app.schemas.leave_schema import (
     LeaveApply, LeaveApprove, LeaveReject, LeaveCancel,
     LeaveResponse, LeaveListResponse
 )
+from app.schemas.batch_review_schemas import BatchReviewRequest, BatchReviewResponse
 from app.services.leave_service import LeaveService
 
 router = APIRouter()
@@ -125,6 +126,22 @@ async def reject_leave(
             detail=f"Error rejecting leave: {str(e)}"
         )
 
+@router.post("/batchreviewleaves", response_model=BatchReviewResponse)
+async def batch_review_leaves(
+    data: BatchReviewRequest,
+    db: Session = Depends(get_db)
+):
+    """Approve or reject many pending leave requests at once"""
+    try:
+        return LeaveService.batch_review(data, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reviewing leaves: {str(e)}"
+        )
+
 @router.put("/cancelleave/{id}")
 async def cancel_leave(
     id: int,
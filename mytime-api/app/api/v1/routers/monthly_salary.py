@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -9,11 +10,21 @@ from app.schemas.monthly_salary_schemas import (
     MonthlySalaryDeleteResponse,
     MonthlySalaryUpdate,
     MonthlySalaryPublishResponse,
+    MonthlySalaryDiffResponse,
+    MonthlyAttendanceSummaryResponse,
+    PayslipRenderResponse,
+    YtdVerificationResponse,
     MonthlySalaryWithEmployees,  # ← new
     MonthlySalaryWithEmployeesListResponse,  # ← new
 )
+from app.core.config import settings
 from app.core.database import get_db
 from app.services.monthly_salary_service import MonthlySalaryService
+from app.services.payroll_attendance_service import PayrollAttendanceService
+from app.services.payslip_service import PayslipService
+from app.services.bank_file_service import BankFileService
+from app.services.ytd_verifier_service import YtdVerifierService
+from app.utils.period import Period
 
 router = APIRouter()
 
@@ -207,27 +218,26 @@ async def publish_monthly_salary(
 
 
 @router.post("/publish-multiple", response_model=MonthlySalaryPublishResponse)
-async def publish_monthly_salary(
+def publish_monthly_multiple_salary(
     salary_data: MonthlySalaryMultiCreate, db: Session = Depends(get_db)
 ):
-    """Publish monthly salary for all active employees"""
+    """Publish monthly salary for the selected employees across multiple months"""
     try:
-        monthly_salary = MonthlySalaryService.create_monthly_salary(db, salary_data)
-        success = MonthlySalaryService.publish_monthly_multiple_salary(
-            db, monthly_salary
+        success, processed = MonthlySalaryService.publish_monthly_multiple_salary(
+            db, salary_data
         )
 
         if success:
             return MonthlySalaryPublishResponse(
                 success=True,
-                message="Monthly salary published successfully for all active employees",
-                monthly_salary_id=monthly_salary.MonthlySalaryId,
+                message="Monthly salary published successfully for the selected employees",
+                employees_processed=processed,
             )
         else:
             return MonthlySalaryPublishResponse(
                 success=False,
                 message="No active employees found to publish salary",
-                monthly_salary_id=monthly_salary.MonthlySalaryId,
+                employees_processed=processed,
             )
     except Exception as e:
         raise HTTPException(
@@ -274,6 +284,178 @@ async def publish_existing_monthly_salary(
         )
 
 
+@router.post("/publish-diff/{salary_id}", response_model=MonthlySalaryDiffResponse)
+async def publish_monthly_salary_diff(
+    salary_id: int,
+    dry_run: bool = Query(
+        True, description="Only report the changes without writing them"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Republish an existing monthly salary, writing only rows that changed"""
+    try:
+        monthly_salary = MonthlySalaryService.fetch_monthly_salary(db, salary_id)
+        if not monthly_salary:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Monthly salary with ID {salary_id} not found",
+            )
+
+        summary = MonthlySalaryService.publish_monthly_salary_diff(
+            db, monthly_salary, dry_run=dry_run
+        )
+        return MonthlySalaryDiffResponse(**summary)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error diffing monthly salary: {str(e)}",
+        )
+
+
+@router.get("/attendance-summary", response_model=MonthlyAttendanceSummaryResponse)
+async def fetch_monthly_attendance_summary(
+    month: str = Query(..., description="Salary month name, e.g. April"),
+    year: int = Query(..., description="Salary year, e.g. 2025"),
+    db: Session = Depends(get_db),
+):
+    """Working, present and LOP days of all active employees for a payroll month"""
+    try:
+        period = Period.from_month_name(month, year)
+        summary = PayrollAttendanceService.calculate_month(db, period)
+        return MonthlyAttendanceSummaryResponse(**summary)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating attendance summary: {str(e)}",
+        )
+
+
+@router.post("/ytd/verify/{financial_year}", response_model=YtdVerificationResponse)
+def verify_ytd(
+    financial_year: int,
+    repair: bool = Query(False, description="Correct mismatching YTD values"),
+    mismatch_limit: int = Query(1000, ge=0, le=100000, description="Max mismatches listed"),
+    db: Session = Depends(get_db),
+):
+    """Recompute a financial year's YTD columns from monthly values and report (or repair) mismatches"""
+    try:
+        return YtdVerifierService.verify_financial_year(
+            db, financial_year, repair=repair, mismatch_limit=mismatch_limit
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error verifying YTD values: {str(e)}",
+        )
+
+
+@router.post("/payslips/{salary_id}/render", response_model=PayslipRenderResponse)
+def render_monthly_payslips(
+    salary_id: int,
+    force: bool = Query(False, description="Re-render payslips even if unchanged"),
+    db: Session = Depends(get_db),
+):
+    """Render and store PDF payslips of a monthly salary, skipping unchanged ones"""
+    try:
+        summary = PayslipService.render_monthly_salary(db, salary_id, force=force)
+        return PayslipRenderResponse(**summary)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rendering payslips: {str(e)}",
+        )
+
+
+@router.get("/payslips/{salary_id}/zip")
+async def download_monthly_payslips_zip(salary_id: int, db: Session = Depends(get_db)):
+    """Stream all payslips of a monthly salary as one ZIP"""
+    monthly_salary = MonthlySalaryService.fetch_monthly_salary(db, salary_id)
+    if not monthly_salary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Monthly salary with ID {salary_id} not found",
+        )
+
+    file_name = f"Payslips_{monthly_salary.SalaryMonth}_{monthly_salary.SalaryYear}.zip"
+    return StreamingResponse(
+        PayslipService.stream_monthly_zip(db, salary_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+
+@router.get("/bank-file/{salary_id}")
+async def download_bank_file(
+    salary_id: int,
+    file_format: Optional[str] = Query(None, description="csv or fixed, defaults to BANK_FILE_FORMAT"),
+    db: Session = Depends(get_db),
+):
+    """Stream the bank bulk-payment file (net transfer per employee) of a monthly salary;
+    refused with 400 listing the employees if any payable one cannot be transferred"""
+    monthly_salary = MonthlySalaryService.fetch_monthly_salary(db, salary_id)
+    if not monthly_salary:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Monthly salary with ID {salary_id} not found",
+        )
+
+    try:
+        content = BankFileService.stream_bank_file(db, monthly_salary, file_format=file_format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    extension = "txt" if (file_format or settings.BANK_FILE_FORMAT).lower() == "fixed" else "csv"
+    file_name = f"BankTransfer_{monthly_salary.SalaryMonth}_{monthly_salary.SalaryYear}.{extension}"
+    return StreamingResponse(
+        content,
+        media_type="text/plain" if extension == "txt" else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    )
+
+
+@router.get("/payslip/{employee_salary_id}")
+async def download_payslip(employee_salary_id: int, db: Session = Depends(get_db)):
+    """Download one PDF payslip"""
+    try:
+        file_name, content = PayslipService.get_payslip(db, employee_salary_id)
+        return Response(
+            content=content,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating payslip: {str(e)}",
+        )
+
+
 @router.delete("/delete/{salary_id}", response_model=MonthlySalaryDeleteResponse)
 async def delete_monthly_salary(salary_id: int, db: Session = Depends(get_db)):
     """Delete monthly salary by ID"""
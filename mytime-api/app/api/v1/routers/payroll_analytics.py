@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.schemas.payroll_analytics_schemas import (
+    PayrollRollupResponse,
+    PayrollRollupRefreshResponse,
+    PayrollForecastRequest,
+    PayrollForecastResponse,
+)
+from app.core.database import get_db
+from app.services.payroll_rollup_service import PayrollRollupService
+from app.services.payroll_forecast_service import PayrollForecastService
+
+router = APIRouter()
+
+
+@router.get("/rollup", response_model=PayrollRollupResponse)
+async def fetch_payroll_rollup(
+    group_by: str = Query(
+        "period",
+        description="Comma separated dimensions: period, financial_year, department, designation",
+    ),
+    from_period: Optional[int] = Query(None, description="Start period as YYYYMM"),
+    to_period: Optional[int] = Query(None, description="End period as YYYYMM (inclusive)"),
+    financial_year: Optional[int] = Query(None, description="Financial year by start year, e.g. 2024"),
+    department_id: Optional[int] = Query(None),
+    designation_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Payroll cost by period and org unit, e.g. group_by=period,department then drill into one department"""
+    try:
+        dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+        return PayrollRollupService.query(
+            db,
+            dimensions,
+            from_period=from_period,
+            to_period=to_period,
+            financial_year=financial_year,
+            department_id=department_id,
+            designation_id=designation_id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching payroll rollup: {str(e)}",
+        )
+
+
+@router.post("/rollup/rebuild", response_model=PayrollRollupRefreshResponse)
+async def rebuild_payroll_rollup(
+    from_period: Optional[int] = Query(None, description="Start period as YYYYMM"),
+    to_period: Optional[int] = Query(None, description="End period as YYYYMM (inclusive)"),
+    db: Session = Depends(get_db),
+):
+    """Recompute the rollup from EmployeeSalary (publishes and salary edits refresh it automatically)"""
+    try:
+        rows_written = PayrollRollupService.rebuild(db, from_period, to_period)
+        return PayrollRollupRefreshResponse(success=True, rows_written=rows_written)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rebuilding payroll rollup: {str(e)}",
+        )
+
+
+@router.post("/forecast", response_model=PayrollForecastResponse)
+async def forecast_payroll(request: PayrollForecastRequest, db: Session = Depends(get_db)):
+    """Project monthly payroll cost under hike, joiner and attrition scenarios"""
+    try:
+        return PayrollForecastService.forecast(
+            db,
+            request.scenarios,
+            months=request.months,
+            start_period=request.start_period,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error forecasting payroll: {str(e)}",
+        )
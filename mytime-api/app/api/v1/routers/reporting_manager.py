@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import Optional, List
+
+from app.schemas.reporting_manager_schemas import (
+    ReportingManagerAssign,
+    ReportingManagerResponse,
+    HierarchyMembersResponse,
+    IsManagerResponse,
+    OrgChartResponse
+)
+from app.core.database import get_db
+from app.services.reporting_hierarchy_service import ReportingHierarchyService
+
+router = APIRouter()
+
+
+@router.get("/fetchReportingLines", response_model=List[ReportingManagerResponse])
+def fetch_reporting_lines(
+    employee_id: Optional[int] = Query(None, description="Only this employee's line"),
+    manager_id: Optional[int] = Query(None, description="Only this manager's direct reports"),
+    db: Session = Depends(get_db)
+):
+    """Get active reporting lines"""
+    try:
+        return ReportingHierarchyService.fetch_reporting_lines(db, employee_id=employee_id, manager_id=manager_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching reporting lines: {str(e)}"
+        )
+
+
+@router.post("/AssignReportingManager")
+def assign_reporting_manager(request: ReportingManagerAssign, db: Session = Depends(get_db)):
+    """Set an employee's reporting manager (rejects self-reporting and cycles)"""
+    try:
+        response = ReportingHierarchyService.assign_manager(
+            db, request.EmployeeId, request.ManagerId, user_id=request.ModifiedBy
+        )
+        if not response["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=response["message"]
+            )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error assigning reporting manager: {str(e)}"
+        )
+
+
+@router.delete("/RemoveReportingManager/{employee_id}")
+def remove_reporting_manager(
+    employee_id: int,
+    modified_by: Optional[int] = Query(None, description="User ID making the change"),
+    db: Session = Depends(get_db)
+):
+    """Deactivate an employee's reporting line"""
+    try:
+        response = ReportingHierarchyService.remove_manager(db, employee_id, user_id=modified_by)
+        if not response["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=response["message"]
+            )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error removing reporting manager: {str(e)}"
+        )
+
+
+@router.get("/descendants/{manager_id}", response_model=HierarchyMembersResponse)
+def get_descendants(
+    manager_id: int,
+    depth: Optional[int] = Query(None, ge=1, description="Levels below the manager (1 = direct reports)"),
+    db: Session = Depends(get_db)
+):
+    """Everyone reporting to a manager, directly or indirectly"""
+    try:
+        employee_ids = ReportingHierarchyService.descendants(db, manager_id, depth)
+        return HierarchyMembersResponse(
+            employee_id=manager_id, depth=depth, total=len(employee_ids), employee_ids=employee_ids
+        )
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(ve)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching reports: {str(e)}"
+        )
+
+
+@router.get("/ancestors/{employee_id}", response_model=HierarchyMembersResponse)
+def get_ancestors(employee_id: int, db: Session = Depends(get_db)):
+    """An employee's managers, nearest first"""
+    try:
+        employee_ids = ReportingHierarchyService.ancestors(db, employee_id)
+        return HierarchyMembersResponse(employee_id=employee_id, total=len(employee_ids), employee_ids=employee_ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching managers: {str(e)}"
+        )
+
+
+@router.get("/isManagerOf", response_model=IsManagerResponse)
+def is_manager_of(
+    manager_id: int = Query(..., description="Manager"),
+    employee_id: int = Query(..., description="Employee"),
+    db: Session = Depends(get_db)
+):
+    """Whether an employee is in a manager's org"""
+    try:
+        return IsManagerResponse(
+            manager_id=manager_id, employee_id=employee_id,
+            is_manager=ReportingHierarchyService.is_manager_of(db, manager_id, employee_id)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking reporting line: {str(e)}"
+        )
+
+
+@router.get("/orgChart", response_model=OrgChartResponse)
+def get_org_chart(
+    root_id: Optional[int] = Query(None, description="Only the subtree under this employee"),
+    db: Session = Depends(get_db)
+):
+    """The reporting tree in one payload, cached (already encoded) until a reporting line changes"""
+    try:
+        return Response(
+            content=ReportingHierarchyService.org_chart_json(db, root_id),
+            media_type="application/json"
+        )
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(ve)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error building org chart: {str(e)}"
+        )
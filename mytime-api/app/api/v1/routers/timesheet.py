@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from datetime import date
 
 from app.schemas.timesheet_schemas import (
     TimesheetResponse,
     TimesheetListResponse,
     TimesheetDeleteResponse,
-    TimesheetTaskResponse
+    TimesheetTaskResponse,
+    TimesheetUpsert,
+    TimesheetTaskInput,
+    TimesheetUtilizationResponse
 )
 from app.core.database import get_db
+from app.schemas.batch_review_schemas import BatchReviewRequest, BatchReviewResponse
 from app.services.timesheet_service import TimesheetService
+from app.services.timesheet_hours_service import TimesheetHoursService
 
 router = APIRouter()
 
@@ -45,7 +51,7 @@ async def get_timesheets_by_employee(employee_id: int, db: Session = Depends(get
 
 
 @router.post("/InsertOrUpdateTimesheet")
-async def insert_or_update_timesheet(timesheet: dict, db: Session = Depends(get_db)):
+async def insert_or_update_timesheet(timesheet: TimesheetUpsert, db: Session = Depends(get_db)):
     response = TimesheetService.insert_or_update_timesheet(db, timesheet)
     if not response["success"]:
         raise HTTPException(
@@ -75,7 +81,7 @@ async def delete_timesheet_task(task_id: int, db: Session = Depends(get_db)):
     return response
 
 @router.post("/AddTimesheetTask/{timesheet_id}", response_model=TimesheetTaskResponse)
-async def add_timesheet_task(timesheet_id: int, task_data: dict, db: Session = Depends(get_db)):
+async def add_timesheet_task(timesheet_id: int, task_data: TimesheetTaskInput, db: Session = Depends(get_db)):
     task = TimesheetService.add_timesheet_task(db, timesheet_id, task_data)
     if not task:
         raise HTTPException(
@@ -85,11 +91,46 @@ async def add_timesheet_task(timesheet_id: int, task_data: dict, db: Session = D
     return task
 
 @router.put("/UpdateTimesheetTask/{task_id}", response_model=TimesheetTaskResponse)
-async def update_timesheet_task(task_id: int, task_data: dict, db: Session = Depends(get_db)):
+async def update_timesheet_task(task_id: int, task_data: TimesheetTaskInput, db: Session = Depends(get_db)):
     task = TimesheetService.update_timesheet_task(db, task_id, task_data)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
-    return task
\ No newline at end of file
+    return task
+
+@router.post("/BatchReviewTimesheets", response_model=BatchReviewResponse)
+async def batch_review_timesheets(request: BatchReviewRequest, db: Session = Depends(get_db)):
+    return TimesheetService.batch_review(
+        db, request.ids, request.action, user_id=request.user_id, comment=request.comment
+    )
+
+
+# Utilization and project burn (served from the weekly hours table)
+@router.get("/TimesheetUtilization", response_model=TimesheetUtilizationResponse)
+def get_timesheet_utilization(
+    from_date: date = Query(..., description="First day of the range"),
+    to_date: date = Query(..., description="Last day of the range"),
+    group_by: List[str] = Query(["project"], description="Any of week, employee, project, task_item, task_code"),
+    department_id: Optional[int] = Query(None, description="Only employees of this department"),
+    employee_ids: Optional[List[int]] = Query(None, description="Only these employees"),
+    project_id: Optional[int] = Query(None, description="Only this project"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return TimesheetHoursService.utilization(
+            db, from_date, to_date, group_by,
+            department_id=department_id, employee_ids=employee_ids, project_id=project_id
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching timesheet utilization: {str(e)}"
+        )
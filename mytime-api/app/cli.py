@@ -0,0 +1,126 @@
+"""
+Maintenance commands that run against the configured database.
+
+Usage:
+    python -m app.cli verify-ytd --financial-year 2025 [--repair]
+    python -m app.cli rebuild-attendence-summary [--from-period 202504] [--to-period 202603]
+    python -m app.cli rebuild-timesheet-hours [--from-date 2025-04-01] [--to-date 2026-03-31]
+    python -m app.cli rollover-leave-balances --year 2026
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import date
+
+from app.core import database
+
+logger = logging.getLogger(__name__)
+
+
+def _open_session():
+    if database.SessionLocal is None:
+        raise SystemExit("Database not configured")
+    return database.SessionLocal()
+
+
+def _print_json(result) -> None:
+    print(json.dumps(result, indent=2, default=str))
+
+
+def verify_ytd(args: argparse.Namespace) -> int:
+    from app.services.ytd_verifier_service import YtdVerifierService
+
+    db = _open_session()
+    try:
+        result = YtdVerifierService.verify_financial_year(
+            db, args.financial_year, repair=args.repair, mismatch_limit=args.limit
+        )
+    finally:
+        db.close()
+
+    _print_json(result)
+    # Non-zero exit when mismatches remain, so the command can gate a scheduled job
+    return 1 if result["mismatch_count"] and not result["repaired"] else 0
+
+
+def rebuild_attendence_summary(args: argparse.Namespace) -> int:
+    from app.services.attendence_summary_service import AttendenceSummaryService
+
+    db = _open_session()
+    try:
+        written = AttendenceSummaryService.rebuild(db, from_period=args.from_period, to_period=args.to_period)
+    finally:
+        db.close()
+
+    _print_json({"rows_written": written})
+    return 0
+
+
+def rebuild_timesheet_hours(args: argparse.Namespace) -> int:
+    from app.services.timesheet_hours_service import TimesheetHoursService
+
+    db = _open_session()
+    try:
+        written = TimesheetHoursService.rebuild(db, from_date=args.from_date, to_date=args.to_date)
+    finally:
+        db.close()
+
+    _print_json({"rows_written": written})
+    return 0
+
+
+def rollover_leave_balances(args: argparse.Namespace) -> int:
+    from app.services.leave_balance_service import LeaveBalanceService
+
+    db = _open_session()
+    try:
+        result = LeaveBalanceService.rollover(db, args.year)
+    finally:
+        db.close()
+
+    _print_json(result)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="MyTime maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ytd = subparsers.add_parser("verify-ytd", help="Verify (and optionally repair) a financial year's YTD chain")
+    ytd.add_argument("--financial-year", type=int, required=True, help="Financial year start, e.g. 2025 for FY 2025-26")
+    ytd.add_argument("--repair", action="store_true", help="Correct mismatching YTD values")
+    ytd.add_argument("--limit", type=int, default=1000, help="Max mismatches listed in the output")
+    ytd.set_defaults(handler=verify_ytd)
+
+    summary = subparsers.add_parser(
+        "rebuild-attendence-summary", help="Recompute the monthly attendence summaries from Attendence"
+    )
+    summary.add_argument("--from-period", type=int, help="First month as YYYYMM (default: all history)")
+    summary.add_argument("--to-period", type=int, help="Last month as YYYYMM")
+    summary.set_defaults(handler=rebuild_attendence_summary)
+
+    hours = subparsers.add_parser(
+        "rebuild-timesheet-hours", help="Recompute the weekly timesheet hours from the timesheet tasks"
+    )
+    hours.add_argument("--from-date", type=date.fromisoformat, help="First day as YYYY-MM-DD (default: all history)")
+    hours.add_argument("--to-date", type=date.fromisoformat, help="Last day as YYYY-MM-DD")
+    hours.set_defaults(handler=rebuild_timesheet_hours)
+
+    rollover = subparsers.add_parser(
+        "rollover-leave-balances", help="Create next year's leave balances with capped carry-forward (idempotent)"
+    )
+    rollover.add_argument("--year", type=int, required=True, help="Year being closed, e.g. 2026 creates 2027 balances")
+    rollover.set_defaults(handler=rollover_leave_balances)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
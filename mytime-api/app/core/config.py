@@ -63,11 +63,32 @@ class Settings(BaseSettings):
     # ============ RSS FEEDS ============
     BUSINESS_RSS_FEEDS: Union[str, Dict[str, str]] = '{"economictimes":"https://economictimes.indiatimes.com/rssfeedsdefault.cms","mint":"https://www.livemint.com/rss/companies","business_standard":"https://www.business-standard.com/rss/home_page_top_stories.rss"}'
     
+    # ============ PAYROLL ============
+    PAYROLL_MAX_WORKERS: int = 0  # 0 = one worker process per CPU core
+    PAYROLL_SHARD_SIZE: int = 250  # Employees per partition in multi-month runs
+    PAYROLL_WEEKEND_DAYS: str = "5,6"  # Weekday numbers (Monday = 0) that are not working days
+    PAYROLL_UNPAID_LEAVE_TYPES: str = "LOP,Loss of Pay,Unpaid Leave,Leave Without Pay"  # LeaveType names counted as LOP
+    PAYROLL_ABSENT_ATTENDANCE_STATUSES: str = "Absent"  # Attendence statuses that do not count as present
+    PAYROLL_LOP_FOR_UNMARKED_DAYS: bool = False  # Treat working days with nothing recorded as LOP (recorded absences always are)
+    ATTENDANCE_LEAVE_STATUSES: str = "Leave,On Leave"  # Attendence statuses counted as leave in monthly summaries
+    ATTENDANCE_WFH_WORK_TYPES: str = "WFH,Work From Home,Remote"  # WorkType values counted as work from home
+    TIMESHEET_WEEKLY_CAPACITY_HOURS: float = 40  # Bookable hours per employee per week, the utilization denominator
+    TIMESHEET_EXCLUDED_STATUSES: str = "Rejected,Cancelled"  # Timesheet statuses whose hours are not counted
+    PAYSLIP_COMPANY_NAME: str = "MyTime"
+    PAYSLIP_STORAGE_PREFIX: str = "payslips"
+    PAYSLIP_UPLOAD_THREADS: int = 16  # Concurrent B2 uploads per render batch
+    BANK_FILE_FORMAT: str = "csv"  # csv | fixed
+    BANK_FILE_LAYOUT: str = "EmployeeCode:12,EmployeeName:40,BankAccount:20,IFSC:11,BankName:30,Amount:15"  # field:width (widths used by fixed)
+    BANK_FILE_DEBIT_ACCOUNT: str = ""  # Company account debited, written in the header record
+    BANK_FILE_FETCH_SIZE: int = 1000  # Rows per server-side cursor fetch
+    
     # ============ FEATURE FLAGS ============
     ENABLE_AI_ANALYSIS: bool = True
     ENABLE_RSS_FEEDS: bool = True
-    ENABLE_CACHE: bool = False  # Disable cache on free tier (no Redis)
+    ENABLE_CACHE: bool = False  # Disable cache on free tier (no Redis); the cache is per process, so other workers see writes only after CACHE_TTL
     CACHE_TTL: int = 300
+    CACHE_MAX_ENTRIES: int = 10000  # entries with a TTL beyond this are evicted least recently used first
+    STATISTICS_CACHE_TTL: int = 30  # dashboards poll statistics; seconds a result is reused
     
     # ============ RENDER SPECIFIC ============
     RENDER: bool = True
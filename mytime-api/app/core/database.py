@@ -18,6 +18,8 @@ if settings.DATABASE_URL:
             max_overflow=settings.DATABASE_MAX_OVERFLOW,
             pool_pre_ping=True,
             echo=settings.DATABASE_ECHO_SQL,
+            # Send bulk inserts/updates as one batched round trip on SQL Server
+            **({"fast_executemany": True} if settings.DATABASE_URL.startswith("mssql+pyodbc") else {}),
         )
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         logger.info("✅ Database engine created successfully")
@@ -0,0 +1,31 @@
+# app/models/attendence_summary.py
+
+from sqlalchemy import Column, BigInteger, Integer, Numeric, DateTime, Index
+from app.core.database import Base
+
+
+class AttendenceSummary(Base):
+    """Attendence day counts and work hours per employee per month"""
+    __tablename__ = "AttendenceMonthlySummary"
+
+    AttendenceSummaryId = Column(BigInteger, primary_key=True, index=True)
+    EmployeeId     = Column(BigInteger, nullable=False)
+    Period         = Column(Integer, nullable=False)  # YYYYMM
+    PresentDays    = Column(Integer, nullable=False, default=0)
+    AbsentDays     = Column(Integer, nullable=False, default=0)
+    WfhDays        = Column(Integer, nullable=False, default=0)
+    LeaveDays      = Column(Integer, nullable=False, default=0)
+    PendingDays    = Column(Integer, nullable=False, default=0)
+    WorkSeconds    = Column(Integer, nullable=False, default=0)  # Exact sum; TotalWorkHours is it rounded once
+    TotalWorkHours = Column(Numeric(9, 2), nullable=False, default=0)
+    RefreshedOn    = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("IX_AttendenceMonthlySummary_Employee_Period", "EmployeeId", "Period", unique=True),
+    )
+
+    def __repr__(self):
+        return (
+            f"<AttendenceSummary(EmployeeId={self.EmployeeId}, Period={self.Period}, "
+            f"PresentDays={self.PresentDays}, TotalWorkHours={self.TotalWorkHours})>"
+        )
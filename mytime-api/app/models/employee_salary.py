@@ -1,7 +1,7 @@
 # app/models/employee_salary.py
 
 from sqlalchemy import (
-    Column, Integer, Boolean, DateTime, Text,
+    Column, Integer, Boolean, DateTime, Text, String,
     BigInteger, Numeric, ForeignKey              # ← add ForeignKey
 )
 from sqlalchemy.orm import relationship
@@ -26,6 +26,9 @@ class EmployeeSalary(Base):
     WRKDAYS     = Column(Integer, nullable=True)
     LOPDAYS     = Column(Integer, nullable=True)
 
+    SalaryPeriod  = Column(Integer, nullable=True, index=True)  # YYYYMM
+    FinancialYear = Column(Integer, nullable=True, index=True)  # April-March, by start year
+
     Earning_Monthly_Basic               = Column(Numeric(18, 2), nullable=True)
     Earning_YTD_Basic                   = Column(Numeric(18, 2), nullable=True)
     Earning_Montly_HRA                  = Column(Numeric(18, 2), nullable=True)
@@ -58,6 +61,13 @@ class EmployeeSalary(Base):
     NETTRANSFER                         = Column(Numeric(18, 2), nullable=True)
     INWords                             = Column(Text, nullable=True)
 
+    # SHA-256 of the row's payroll content, used to skip no-op republishes
+    RowHash                             = Column(String(64), nullable=True)
+
+    # Content hash and storage key of the last rendered PDF payslip
+    PayslipHash                         = Column(String(64), nullable=True)
+    PayslipFileId                       = Column(String(255), nullable=True)
+
     CreatedOn  = Column(DateTime, nullable=True)
     CreatedBy  = Column(BigInteger, nullable=True)
     ModifiedOn = Column(DateTime, nullable=True)
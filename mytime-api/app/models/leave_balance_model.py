@@ -15,6 +15,8 @@ class LeaveBalance(Base):
     TotalLeaves = Column(Integer, nullable=False)
     UsedLeaves = Column(Integer, default=0)
     RemainingLeaves = Column(Integer, nullable=False)
+    # Days carried in from the previous year; NULL until the year-end rollover has run
+    CarriedForwardLeaves = Column(Integer, nullable=True)
 
     CreatedOn = Column(DateTime(timezone=True), server_default=func.now())
     CreatedBy = Column(BigInteger, nullable=True)
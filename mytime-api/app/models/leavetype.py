@@ -12,6 +12,9 @@ class LeaveType(Base):
 
     MaxDaysPerYear = Column(Integer, nullable=True)
 
+    # Unused days carried into the next year at rollover (NULL/0 = reset)
+    CarryForwardDays = Column(Integer, nullable=True)
+
     Description = Column(Text, nullable=True)
 
     CreatedBy = Column(Integer, nullable=True)
@@ -16,6 +16,8 @@ class MonthlySalary(Base):
     StdDays         = Column(Integer, nullable=True)
     WrkDays         = Column(Integer, nullable=True)
     LopDays         = Column(Integer, nullable=True)
+    SalaryPeriod    = Column(Integer, nullable=True, index=True)  # YYYYMM
+    FinancialYear   = Column(Integer, nullable=True, index=True)  # April-March, by start year
     CreatedOn       = Column(DateTime, nullable=True)
     CreatedBy       = Column(BigInteger, nullable=True)
     ModifiedOn      = Column(DateTime, nullable=True)
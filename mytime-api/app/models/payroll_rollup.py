@@ -0,0 +1,32 @@
+# app/models/payroll_rollup.py
+
+from sqlalchemy import Column, BigInteger, Integer, Numeric, DateTime, Index
+from app.core.database import Base
+
+
+class PayrollRollup(Base):
+    """Payroll totals per salary period x department x designation"""
+    __tablename__ = "PayrollRollup"
+
+    PayrollRollupId = Column(BigInteger, primary_key=True, index=True)
+    SalaryPeriod    = Column(Integer, nullable=False)  # YYYYMM
+    FinancialYear   = Column(Integer, nullable=True)
+    DepartmentId    = Column(BigInteger, nullable=True)
+    DesignationId   = Column(BigInteger, nullable=True)
+    Headcount       = Column(Integer, nullable=False, default=0)
+    GrossEarnings   = Column(Numeric(18, 2), nullable=False, default=0)
+    GrossDeductions = Column(Numeric(18, 2), nullable=False, default=0)
+    NetPay          = Column(Numeric(18, 2), nullable=False, default=0)
+    LopDays         = Column(Integer, nullable=False, default=0)
+    RefreshedOn     = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("IX_PayrollRollup_Period_Org", "SalaryPeriod", "DepartmentId", "DesignationId", unique=True),
+    )
+
+    def __repr__(self):
+        return (
+            f"<PayrollRollup(SalaryPeriod={self.SalaryPeriod}, "
+            f"DepartmentId={self.DepartmentId}, DesignationId={self.DesignationId}, "
+            f"Headcount={self.Headcount})>"
+        )
@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
+from sqlalchemy import Column, BigInteger, Numeric, DateTime, String, Index
+
+from app.core.database import Base
 
 
 class SalaryHikeModel(BaseModel):
@@ -11,5 +14,31 @@ class SalaryHikeModel(BaseModel):
     modified_by: Optional[int] = None
     modified_on: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SalaryHike(Base):
+    """Salary revision history - one row per employee per revision"""
+    __tablename__ = "SalaryHike"
+
+    SalaryHikeId        = Column(BigInteger, primary_key=True, index=True)
+    EmployeeId          = Column(BigInteger, nullable=False)
+    RevisionId          = Column(String(36), nullable=False)
+    PreviousStructureId = Column(BigInteger, nullable=True)
+    NewStructureId      = Column(BigInteger, nullable=True)
+    OriginalSalary      = Column(Numeric(18, 2), nullable=True)  # monthly gross before
+    LatestSalary        = Column(Numeric(18, 2), nullable=True)  # monthly gross after
+    EffectiveFrom       = Column(DateTime, nullable=True)
+    ModifiedBy          = Column(BigInteger, nullable=True)
+    ModifiedOn          = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("IX_SalaryHike_Employee", "EmployeeId", "ModifiedOn"),
+        Index("IX_SalaryHike_Revision", "RevisionId"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<SalaryHike(EmployeeId={self.EmployeeId}, RevisionId='{self.RevisionId}', "
+            f"OriginalSalary={self.OriginalSalary}, LatestSalary={self.LatestSalary})>"
+        )
@@ -0,0 +1,31 @@
+# app/models/timesheet_hours_summary.py
+
+from sqlalchemy import Column, BigInteger, Numeric, Date, DateTime, Index
+from app.core.database import Base
+
+
+class TimesheetHoursSummary(Base):
+    """Timesheet hours per employee, week and task (project / task item / task code)"""
+    __tablename__ = "TimesheetWeeklyHours"
+
+    TimesheetHoursId = Column(BigInteger, primary_key=True, index=True)
+    EmployeeId    = Column(BigInteger, nullable=False)
+    WeekStart     = Column(Date, nullable=False)  # Monday of the timesheet week
+    ProjectId     = Column(BigInteger, nullable=True)
+    TaskItemId    = Column(BigInteger, nullable=True)
+    TaskCodeId    = Column(BigInteger, nullable=True)
+    Hours         = Column(Numeric(12, 2), nullable=False, default=0)  # Every counted status
+    ApprovedHours = Column(Numeric(12, 2), nullable=False, default=0)
+    RefreshedOn   = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("UX_TimesheetWeeklyHours_Key", "EmployeeId", "WeekStart", "ProjectId", "TaskItemId", "TaskCodeId",
+              unique=True),
+        Index("IX_TimesheetWeeklyHours_Week_Project", "WeekStart", "ProjectId"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<TimesheetHoursSummary(EmployeeId={self.EmployeeId}, WeekStart={self.WeekStart}, "
+            f"ProjectId={self.ProjectId}, Hours={self.Hours})>"
+        )
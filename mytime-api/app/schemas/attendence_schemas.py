@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, date, time
+from decimal import Decimal
+
+from app.schemas.input_types import InputDate, InputDateTime, InputTime, InputInt, InputStr
 
 # Base Schema
 class AttendenceBase(BaseModel):
@@ -47,6 +50,30 @@ class AttendenceUpdate(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# Insert / Update request body
+class AttendenceUpsert(BaseModel):
+    """Body of insert_or_update_attendence - AttendenceId 0 or missing creates a new record"""
+    AttendenceId: InputInt = Field(None, description="Attendence ID (0 or empty for new records)")
+    EmployeeId: InputInt = Field(None, description="Employee ID")
+    AttendenceDate: InputDate = Field(None, description="Attendence date")
+    CheckInTime: InputTime = Field(None, description="Check-in time")
+    CheckOutTime: InputTime = Field(None, description="Check-out time")
+    Status: InputStr = Field(None, max_length=20, description="Attendence status")
+    WorkHours: InputTime = Field(None, description="Total work hours")
+    Description: InputStr = Field(None, max_length=255, description="Remarks / description")
+    WorkType: InputStr = Field(None, max_length=50, description="Work type (Office/WFH/Hybrid)")
+    ApprovalStatus: InputStr = Field(None, max_length=20, description="Approval status")
+    ApprovedBy: InputInt = Field(None, description="Approved by user ID")
+    ApprovedOn: InputDateTime = Field(None, description="Approved date")
+    RejectedBy: InputInt = Field(None, description="Rejected by user ID")
+    RejectedOn: InputDateTime = Field(None, description="Rejected date")
+    RejectionReason: InputStr = Field(None, max_length=255, description="Reason for rejection")
+    CreatedOn: InputDateTime = Field(None, description="Creation timestamp")
+    CreatedBy: InputInt = Field(None, description="User ID who created the record")
+    ModifiedOn: InputDateTime = Field(None, description="Last modification timestamp")
+    ModifiedBy: InputInt = Field(None, description="User ID who modified the record")
+
+
 # Response Schema
 class AttendenceResponse(AttendenceBase):
     """Response schema for Attendence"""
@@ -100,4 +127,61 @@ class AttendenceOperationResponse(BaseModel):
     message: str
     data: Optional[AttendenceResponse] = None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+# Bulk Ingestion
+class AttendenceBulkRowResult(BaseModel):
+    """Outcome of one input row of a bulk ingestion"""
+    row: int
+    EmployeeId: Optional[int] = None
+    AttendenceDate: Optional[date] = None
+    result: str  # inserted | updated | merged | skipped | error
+    message: Optional[str] = None
+
+
+class AttendenceBulkIngestResponse(BaseModel):
+    """Summary and per-row results of a bulk ingestion"""
+    success: bool
+    total_rows: int = Field(0, ge=0)
+    inserted: int = Field(0, ge=0)
+    updated: int = Field(0, ge=0)
+    skipped: int = Field(0, ge=0)
+    errors: int = Field(0, ge=0)
+    results: List[AttendenceBulkRowResult] = []
+
+
+# Monthly Summaries
+class AttendenceMonthlySummary(BaseModel):
+    """Attendence counts and work hours of one employee in one month"""
+    employee_id: int
+    period: int  # YYYYMM
+    present_days: int
+    absent_days: int
+    wfh_days: int
+    leave_days: int
+    pending_days: int
+    total_work_hours: Decimal
+    refreshed_on: Optional[datetime] = None
+
+
+class AttendenceMonthlySummaryResponse(BaseModel):
+    """Summaries for a set of employees and months"""
+    total: int
+    items: List[AttendenceMonthlySummary]
+
+
+# Team Calendar
+class TeamCalendarEmployee(BaseModel):
+    """Day codes of one employee, one character per day from from_date"""
+    employee_id: int
+    codes: str
+
+
+class TeamCalendarResponse(BaseModel):
+    """Compact team grid - see legend for the meaning of each code"""
+    from_date: date
+    to_date: date
+    days: int
+    legend: Dict[str, str]
+    holidays: List[date]
+    employees: List[TeamCalendarEmployee]
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+
+
+class BatchReviewRequest(BaseModel):
+    """Approve or reject many attendence / leave / timesheet items at once"""
+    ids: List[int] = Field(..., min_length=1, max_length=1000, description="Ids of the items to review")
+    action: Literal["approve", "reject"]
+    user_id: Optional[int] = Field(None, description="Reviewer, recorded as ApprovedBy/RejectedBy")
+    comment: Optional[str] = Field(None, max_length=500, description="Approval comment or rejection reason")
+
+
+class BatchReviewItemResult(BaseModel):
+    """Outcome for one id of a batch review"""
+    id: int
+    success: bool
+    status: Optional[str] = None  # status after the review (current status when it failed)
+    message: Optional[str] = None
+
+
+class BatchReviewResponse(BaseModel):
+    """Summary and per-item results of a batch review"""
+    action: str
+    requested: int
+    succeeded: int
+    failed: int
+    results: List[BatchReviewItemResult]
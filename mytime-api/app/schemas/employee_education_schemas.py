@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import Dict, Optional, List, Any
 from datetime import datetime
 
+from app.schemas.input_types import InputDateTime, InputInt, InputBool, InputStr
+
 
 class EmployeeEducationBase(BaseModel):
     """Base schema for EmployeeEducation data"""
@@ -143,6 +145,25 @@ class EmployeeEducationUpdate(BaseModel):
     )
 
 
+class EmployeeEducationUpsert(BaseModel):
+    """Body of InsertOrUpdateEmployeeEducation - EmployeeEducationId 0 or missing creates a new record"""
+    EmployeeEducationId: InputInt = Field(None, description="Education ID (0 for new records)")
+    EmployeeId: InputInt = Field(None, description="Foreign key to Employee table")
+    Degree: InputStr = Field(None, max_length=255, description="Degree/Qualification")
+    FeildOfStudy: InputStr = Field(None, max_length=255, description="Field of study/Specialization")
+    Institution: InputStr = Field(None, max_length=500, description="Educational institution")
+    YearOfCompletion: InputDateTime = Field(None, description="Year of completion")
+    PercentageMarks: InputStr = Field(None, max_length=50, description="Percentage/CGPA/Marks")
+    Year: InputStr = Field(None, max_length=10, description="Year of completion")
+    CreatedBy: InputInt = Field(None, description="User ID who created the record")
+    CreatedOn: InputDateTime = Field(None, description="Creation timestamp")
+    ModifiedBy: InputInt = Field(None, description="User ID who modified the record")
+    IsActive: InputBool = Field(None, description="Whether the education record is active")
+
+    # Year and PercentageMarks may arrive as JSON numbers (2016, 8.4)
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
 class EmployeeEducationResponse(BaseModel):
     """Schema for EmployeeEducation response (read operations)"""
     EmployeeEducationId: int
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+from decimal import Decimal
 
 class EmployeeSalaryBase(BaseModel):
     EmployeeId: Optional[int] = None
@@ -69,6 +70,8 @@ class EmployeeSalaryInDB(BaseModel):
     Title: Optional[str] = None
     SalaryMonth: Optional[str] = None
     SalaryYear: Optional[str] = None
+    SalaryPeriod: Optional[int] = None
+    FinancialYear: Optional[int] = None
     LOCATION: Optional[str] = None
     STDDAYS: Optional[int] = None
     WRKDAYS: Optional[int] = None
@@ -119,6 +122,8 @@ class MonthlySalaryWithEmployees(BaseModel):
     Title: Optional[str] = None
     SalaryMonth: Optional[str] = None
     SalaryYear: Optional[str] = None
+    SalaryPeriod: Optional[int] = None
+    FinancialYear: Optional[int] = None
     Location: Optional[str] = None
     StdDays: Optional[int] = None
     WrkDays: Optional[int] = None
@@ -152,4 +157,21 @@ class EmployeeSalaryBulkResponse(BaseModel):
     total_created: int
     salaries: List[EmployeeSalaryInDB]
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TaxStatement(BaseModel):
+    """Annual earnings/deduction totals of one employee for a financial year"""
+    EmployeeId: int
+    EmployeeCode: Optional[str] = None
+    EmployeeName: Optional[str] = None
+    PAN: Optional[str] = None
+    FinancialYear: int
+    FinancialYearLabel: str
+    MonthsPaid: int = 0
+    FromPeriod: Optional[int] = None
+    ToPeriod: Optional[int] = None
+    LopDays: int = 0
+    Components: Dict[str, Decimal] = Field(default_factory=dict)
+    GrossEarnings: Decimal = Decimal("0")
+    GrossDeductions: Decimal = Decimal("0")
+    NetPay: Decimal = Decimal("0")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict, condecimal
+from pydantic import BaseModel, Field, ConfigDict, condecimal, model_validator
 from typing import Dict, Optional, List, Annotated
 from datetime import datetime
 from decimal import Decimal
@@ -199,4 +199,104 @@ class SalaryStatisticsResponse(BaseModel):
     average_net_takehome: Decimal
     highest_salary: Decimal
     lowest_salary: Decimal
-    salary_distribution: Dict[str, int]  # Salary ranges and count
\ No newline at end of file
+    salary_distribution: Dict[str, int]  # Salary ranges and count
+
+
+class DesignationSalarySummary(BaseModel):
+    """Salary totals of one designation"""
+    count: int
+    total_basic: Decimal
+    total_gross: Decimal
+    avg_basic: Decimal
+    avg_gross: Decimal
+
+
+class SalaryComparisonEmployee(BaseModel):
+    """One employee row of the comparison report"""
+    designation: str
+    employee_id: int
+    employee_name: str
+    basic: Decimal
+    gross: Decimal
+    net: Decimal
+
+
+class SalaryComparisonEmployeePage(BaseModel):
+    """One page of the comparison report's employee detail"""
+    items: List[SalaryComparisonEmployee] = Field(default_factory=list)
+    total: int
+    page: int
+    page_size: int
+
+
+class SalaryComparisonReportResponse(BaseModel):
+    """Salary comparison by designation with paginated employee detail"""
+    total_employees: int
+    by_designation: Dict[str, DesignationSalarySummary]
+    employees: SalaryComparisonEmployeePage
+
+
+SALARY_REVISION_COMPONENTS = (
+    "BASIC", "HRA", "CONVEYANCE", "MEDICALALLOWANCE", "SPECIALALLOWANCE",
+    "SPECIALBONUS", "STATUTORYBONUS", "OTHERS",
+    "PF", "ESIC", "PROFESSIONALTAX", "GroupHealthInsurance",
+)
+
+
+class SalaryRevisionRule(BaseModel):
+    """
+    One revision rule. Employees are matched by department, designation and
+    current gross band (all optional); the change is a percentage or a flat
+    amount on one component, or a percentage on every earning component when
+    no component is given.
+    """
+    department_id: Optional[int] = None
+    designation_id: Optional[int] = None
+    min_gross: Optional[Decimal] = Field(None, ge=0, description="Band lower bound on current monthly gross")
+    max_gross: Optional[Decimal] = Field(None, ge=0, description="Band upper bound on current monthly gross")
+    component: Optional[str] = Field(None, description="Structure column, e.g. BASIC; all earnings when empty")
+    percentage: Optional[Decimal] = Field(None, gt=-100, le=500)
+    flat_amount: Optional[Decimal] = None
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if (self.percentage is None) == (self.flat_amount is None):
+            raise ValueError("Specify exactly one of percentage or flat_amount")
+        if self.component is not None and self.component not in SALARY_REVISION_COMPONENTS:
+            raise ValueError(f"Unknown component {self.component}. Allowed: {', '.join(SALARY_REVISION_COMPONENTS)}")
+        if self.flat_amount is not None and self.component is None:
+            raise ValueError("flat_amount needs a component")
+        return self
+
+
+class SalaryRevisionRequest(BaseModel):
+    """Bulk salary revision - rules are applied in order and compound"""
+    rules: List[SalaryRevisionRule] = Field(..., min_length=1)
+    employee_ids: Optional[List[int]] = Field(None, description="Limit the revision to these employees")
+    effective_from: Optional[datetime] = None
+    modified_by: Optional[int] = None
+    preview_limit: int = Field(100, ge=0, le=10000, description="Max employee rows returned")
+
+
+class SalaryRevisionEmployee(BaseModel):
+    """Before/after of one revised structure"""
+    employee_id: int
+    employee_salary_structure_id: int
+    original_salary: Decimal
+    latest_salary: Decimal
+    original_deductions: Decimal
+    latest_deductions: Decimal
+    changes: Dict[str, Decimal] = Field(default_factory=dict)
+
+
+class SalaryRevisionResponse(BaseModel):
+    """Preview or result of a bulk salary revision"""
+    applied: bool
+    revision_id: Optional[str] = None
+    employees_matched: int
+    employees_revised: int
+    current_monthly_gross: Decimal
+    revised_monthly_gross: Decimal
+    monthly_cost_delta: Decimal
+    annual_cost_delta: Decimal
+    employees: List[SalaryRevisionEmployee] = Field(default_factory=list)
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from typing import Optional, List, Annotated
 from datetime import datetime
 from decimal import Decimal
 
+from app.schemas.input_types import InputDateTime, InputInt, InputDecimal, InputBool, InputStr
+
 
 class EmployeeBase(BaseModel):
     """Base schema for Employee data"""
@@ -68,6 +70,46 @@ class EmployeeUpdate(BaseModel):
     IsActive: Optional[bool] = Field(None, description="Whether the employee is active")
 
 
+class EmployeeUpsert(BaseModel):
+    """Body of InsertOrUpdateEmployee - an EmployeeId updates, no EmployeeId creates"""
+    EmployeeId: InputInt = Field(None, description="Employee ID (empty for new employees)")
+    EmployeeCode: InputStr = Field(None, max_length=100, description="Unique employee code")
+    FirstName: InputStr = Field(None, max_length=255, description="Employee's first name")
+    LastName: InputStr = Field(None, max_length=255, description="Employee's last name")
+    FatherName: InputStr = Field(None, max_length=255, description="Father's name")
+    MotherName: InputStr = Field(None, max_length=255, description="Mother's name")
+    Gender: InputStr = Field(None, max_length=50, description="Gender (Male/Female/Other)")
+    DateOfBirth: InputDateTime = Field(None, description="Date of birth")
+    Email: InputStr = Field(None, max_length=255, description="Email address")
+    Phone: InputStr = Field(None, max_length=50, description="Phone number")
+    UserId: InputInt = Field(None, description="Associated user ID")
+    RoleId: InputInt = Field(None, description="Role ID")
+    DepartmentId: InputInt = Field(None, description="Department ID")
+    DesignationId: InputInt = Field(None, description="Designation ID")
+    StartedOn: InputDateTime = Field(None, description="Employment start date")
+    EndedOn: InputDateTime = Field(None, description="Employment end date")
+    ResignedOn: InputDateTime = Field(None, description="Resignation date")
+    LastWorkingDay: InputDateTime = Field(None, description="Last working day")
+    # The column keeps its typo; the correct spelling is accepted as well
+    OfferRelesedOn: InputDateTime = Field(
+        None,
+        validation_alias=AliasChoices("OfferRelesedOn", "OfferReleasedOn"),
+        description="Date when offer was released"
+    )
+    OfferAcceptedOn: InputDateTime = Field(None, description="Date when offer was accepted")
+    OfferPrice: InputDecimal = Field(None, description="Offer price/salary")
+    CurrentPrice: InputDecimal = Field(None, description="Current salary")
+    JoiningBonus: InputDecimal = Field(None, description="Joining bonus amount")
+    CreatedBy: InputInt = Field(None, description="User ID who created the record")
+    CreatedOn: InputDateTime = Field(None, description="Creation timestamp")
+    ModifiedBy: InputInt = Field(None, description="User ID who last modified the record")
+    ModifiedOn: InputDateTime = Field(None, description="Last modification timestamp")
+    IsActive: InputBool = Field(None, description="Whether the employee is active")
+
+    # Phone and EmployeeCode may arrive as JSON numbers
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+
 class EmployeeResponse(BaseModel):
     """Schema for Employee response (read operations)"""
     EmployeeId: int
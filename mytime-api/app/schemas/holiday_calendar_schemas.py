@@ -63,4 +63,13 @@ class HolidayCalendarDeleteResponse(BaseModel):
 class HolidayByYearResponse(BaseModel):
     """Response for holidays grouped by year"""
     year: int
-    holidays: List[HolidayCalendarResponse]
\ No newline at end of file
+    holidays: List[HolidayCalendarResponse]
+
+
+class WorkingDaysResponse(BaseModel):
+    """Working days between two dates (weekly offs and active holidays excluded)"""
+    from_date: date
+    to_date: date
+    calendar_days: int
+    working_days: int
+    holidays: List[date]
@@ -0,0 +1,109 @@
+"""
+Field types for request bodies sent by the web client.
+
+Each type tries the native pydantic-core validator first (ISO dates,
+"HH:MM" times, numeric strings, "true"/"false"...), so well-formed input
+never runs Python code. Only what pydantic-core rejects falls through to
+a small legacy parser: blank strings become None, and the older client
+formats ("Thu Mar 26 2026", "9:05", "2026-03-24T10:00:00Z" for a date)
+keep working. Anything else is a 422 instead of being silently dropped.
+"""
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Any, Dict, Iterable, Optional, Union
+from datetime import datetime, date, time
+from decimal import Decimal, InvalidOperation
+
+_MONTHS = {name: number for number, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+
+
+def _strip(value: str) -> Optional[str]:
+    value = value.strip()
+    return value or None
+
+
+def _legacy_datetime(value: str) -> Optional[datetime]:
+    value = _strip(value)
+    if value is None:
+        return None
+    # "Thu Mar 26 2026" (JavaScript Date.toDateString) - split by hand,
+    # strptime costs several microseconds per call
+    parts = value.split()
+    if len(parts) == 4 and parts[1][:3].lower() in _MONTHS and parts[2].isdigit() and parts[3].isdigit():
+        return datetime(int(parts[3]), _MONTHS[parts[1][:3].lower()], int(parts[2]))
+    raise ValueError(f"Invalid datetime: {value}")
+
+
+def _legacy_date(value: str) -> Optional[date]:
+    value = _strip(value)
+    if value is None:
+        return None
+    try:
+        # Any time part of an ISO timestamp is dropped
+        return date.fromisoformat(value.split('T')[0])
+    except ValueError:
+        return _legacy_datetime(value).date()
+
+
+def _legacy_time(value: str) -> Optional[time]:
+    value = _strip(value)
+    if value is None:
+        return None
+    parts = value.split(':')
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid time: {value}")
+    return time(*(int(part) for part in parts))
+
+
+def _legacy_int(value: str) -> Optional[int]:
+    value = _strip(value)
+    return None if value is None else int(value)
+
+
+def _legacy_decimal(value: str) -> Optional[Decimal]:
+    value = _strip(value)
+    if value is None:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value}")
+
+
+def _legacy_bool(value: str) -> Optional[bool]:
+    value = _strip(value)
+    if value is None:
+        return None
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def _blank_to_none(value: Optional[str]) -> Optional[str]:
+    return None if value == "" else value
+
+
+def _lenient(native, legacy):
+    return Annotated[
+        Union[native, Annotated[str, AfterValidator(legacy)], None],
+        Field(union_mode="left_to_right")
+    ]
+
+
+InputDateTime = _lenient(datetime, _legacy_datetime)
+InputDate = _lenient(date, _legacy_date)
+InputTime = _lenient(time, _legacy_time)
+InputInt = _lenient(int, _legacy_int)
+InputDecimal = _lenient(Decimal, _legacy_decimal)
+InputBool = _lenient(bool, _legacy_bool)
+# Blank strings are treated as "not given", like the other input types
+InputStr = Annotated[Optional[str], AfterValidator(_blank_to_none)]
+
+
+def provided_values(model: BaseModel, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Fields of an upsert body that carry a value, as a dict for the ORM.
+    Same result as model_dump(exclude_none=True) for flat fields, several
+    times cheaper because values are not re-serialised; nested models
+    (e.g. timesheet tasks) are returned as they are.
+    """
+    return {key: value for key, value in model.__dict__.items() if value is not None and key not in exclude}
@@ -1,5 +1,6 @@
 
 from pydantic import BaseModel
+from typing import Optional
 
 class LeaveBalanceResponse(BaseModel):
     Id: int
@@ -9,6 +10,7 @@ class LeaveBalanceResponse(BaseModel):
     TotalLeaves: int
     UsedLeaves: int
     RemainingLeaves: int
+    CarriedForwardLeaves: Optional[int] = None
 
     class Config:
         orm_mode = True
\ No newline at end of file
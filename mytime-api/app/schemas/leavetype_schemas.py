@@ -6,6 +6,7 @@ class LeaveTypeBase(BaseModel):
     Name: Optional[str] = Field(None, max_length=255)
     # MaxDaysPerYear: Optional[int] = Field(None, max_length=100)
     MaxDaysPerYear: Optional[int] = None
+    CarryForwardDays: Optional[int] = Field(None, ge=0, description="Unused days carried into the next year")
     Description: Optional[str] = Field(None, description="LeaveType description")
     IsActive: Optional[bool] = True
 
@@ -16,6 +17,7 @@ class LeaveTypeUpdate(BaseModel):
     Name: Optional[str] = Field(None, max_length=255)
     #MaxDaysPerYear: Optional[int] = Field(None, max_length=100)
     MaxDaysPerYear: Optional[int] = None
+    CarryForwardDays: Optional[int] = Field(None, ge=0, description="Unused days carried into the next year")
     Description: Optional[str] = Field(None, description="LeaveType description")
     ModifiedBy: Optional[int] = None
     IsActive: Optional[bool] = None
@@ -25,6 +27,7 @@ class LeaveTypeResponse(LeaveTypeBase):
     Id: int
     Name: Optional[str] = None
     MaxDaysPerYear: Optional[int] = None
+    CarryForwardDays: Optional[int] = None
     Description: Optional[str] = None
     CreatedBy: Optional[int] = None
     CreatedOn: Optional[datetime] = None
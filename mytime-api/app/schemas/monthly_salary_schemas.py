@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
+from decimal import Decimal
 
 
 class MonthlySalaryBase(BaseModel):
@@ -52,6 +53,8 @@ class MonthlySalaryResponse(MonthlySalaryBase):
     Title: Optional[str] = None
     SalaryMonth: Optional[str] = None
     SalaryYear: Optional[str] = None
+    SalaryPeriod: Optional[int] = None
+    FinancialYear: Optional[int] = None
     Location: Optional[str] = None
     StdDays: Optional[int] = None
     WrkDays: Optional[int] = None
@@ -102,6 +105,72 @@ class MonthlySalaryPublishResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MonthlySalaryDiffChange(BaseModel):
+    """A single employee salary row that differs from its target state"""
+    employee_id: int
+    employee_salary_id: int
+    changed_fields: List[str] = []
+
+
+class MonthlySalaryDiffResponse(BaseModel):
+    """Response for diff-based (re)publish"""
+    success: bool
+    dry_run: bool
+    monthly_salary_id: Optional[int] = None
+    created: int = Field(0, ge=0)
+    updated: int = Field(0, ge=0)
+    unchanged: int = Field(0, ge=0)
+    created_employee_ids: List[int] = []
+    changes: List[MonthlySalaryDiffChange] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PayslipRenderResponse(BaseModel):
+    """Response for batch payslip rendering"""
+    success: bool
+    monthly_salary_id: int
+    total: int = Field(0, ge=0)
+    rendered: int = Field(0, ge=0)
+    cached: int = Field(0, ge=0)
+
+
+class MonthlyAttendanceSummaryResponse(BaseModel):
+    """Working/LOP days of a payroll month; per-employee lists align with employee_ids"""
+    period: int
+    standard_days: int
+    working_days: int
+    holidays: List[str] = []
+    employee_ids: List[int] = []
+    present_days: List[int] = []
+    paid_leave_days: List[int] = []
+    unpaid_leave_days: List[int] = []
+    absent_days: List[int] = []
+    lop_days: List[int] = []
+
+
+class YtdMismatch(BaseModel):
+    """A stored YTD value that differs from the running sum of monthly values"""
+    employee_salary_id: int
+    employee_id: int
+    salary_period: int
+    column: str
+    stored: Optional[Decimal] = None
+    expected: Decimal
+
+
+class YtdVerificationResponse(BaseModel):
+    """Result of verifying (and optionally repairing) a financial year's YTD chain"""
+    financial_year: int
+    employees_checked: int = Field(0, ge=0)
+    rows_checked: int = Field(0, ge=0)
+    rows_mismatched: int = Field(0, ge=0)
+    mismatch_count: int = Field(0, ge=0)
+    mismatches: List[YtdMismatch] = []
+    repaired: bool = False
+    rows_repaired: int = Field(0, ge=0)
+
+
 # ──────────────────────────────────────────────────────────────────────
 # NEW — Employee salary nested inside monthly salary responses
 # ──────────────────────────────────────────────────────────────────────
@@ -113,6 +182,8 @@ class EmployeeSalaryNestedResponse(BaseModel):
     Title: Optional[str] = None
     SalaryMonth: Optional[str] = None
     SalaryYear: Optional[str] = None
+    SalaryPeriod: Optional[int] = None
+    FinancialYear: Optional[int] = None
     LOCATION: Optional[str] = None
     STDDAYS: Optional[int] = None
     WRKDAYS: Optional[int] = None
@@ -166,6 +237,8 @@ class MonthlySalaryWithEmployees(BaseModel):
     Title: Optional[str] = None
     SalaryMonth: Optional[str] = None
     SalaryYear: Optional[str] = None
+    SalaryPeriod: Optional[int] = None
+    FinancialYear: Optional[int] = None
     Location: Optional[str] = None
     StdDays: Optional[int] = None
     WrkDays: Optional[int] = None
@@ -0,0 +1,94 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from decimal import Decimal
+
+from app.models.salary_hike import SalaryHikeModel
+
+
+class PayrollRollupRow(BaseModel):
+    """One slice of the payroll rollup - only the grouped dimensions are set"""
+    period: Optional[int] = None
+    financial_year: Optional[int] = None
+    department: Optional[int] = None
+    department_name: Optional[str] = None
+    designation: Optional[int] = None
+    designation_name: Optional[str] = None
+    employee_months: int = Field(0, ge=0)
+    average_headcount: float = Field(0, ge=0)
+    gross_earnings: Decimal = Decimal("0")
+    gross_deductions: Decimal = Decimal("0")
+    net_pay: Decimal = Decimal("0")
+    lop_days: int = Field(0, ge=0)
+
+
+class PayrollRollupResponse(BaseModel):
+    """Payroll rollup sliced by the requested dimensions"""
+    group_by: List[str] = []
+    rows: List[PayrollRollupRow] = []
+
+
+class PayrollRollupRefreshResponse(BaseModel):
+    """Response for a rollup rebuild"""
+    success: bool
+    rows_written: int = Field(0, ge=0)
+
+
+class ForecastHike(BaseModel):
+    """Percentage hike for a department and/or designation (org-wide when both are empty)"""
+    percentage: float = Field(..., gt=-100, le=500)
+    department_id: Optional[int] = None
+    designation_id: Optional[int] = None
+    effective_period: Optional[int] = Field(None, description="YYYYMM, defaults to the first forecast month")
+
+
+class ForecastJoiners(BaseModel):
+    """Planned hires joining a department and/or designation from a period (group hikes and attrition apply)"""
+    count: int = Field(..., ge=1)
+    monthly_gross: Decimal = Field(..., ge=0)
+    monthly_deductions: Decimal = Field(Decimal("0"), ge=0)
+    start_period: Optional[int] = Field(None, description="YYYYMM, defaults to the first forecast month")
+    department_id: Optional[int] = None
+    designation_id: Optional[int] = None
+
+
+class ForecastScenario(BaseModel):
+    """One what-if scenario applied on top of the current salary structures"""
+    name: str = "baseline"
+    hikes: List[ForecastHike] = []
+    employee_hikes: List[SalaryHikeModel] = []
+    joiners: List[ForecastJoiners] = []
+    include_known_exits: bool = True
+    monthly_attrition_rate: float = Field(0, ge=0, lt=1, description="Expected share of staff leaving each month")
+
+
+class PayrollForecastRequest(BaseModel):
+    """Forecast horizon and the scenarios to project"""
+    start_period: Optional[int] = Field(None, description="YYYYMM, defaults to next month")
+    months: int = Field(12, ge=1, le=60)
+    scenarios: List[ForecastScenario] = [ForecastScenario()]
+
+
+class ForecastPeriod(BaseModel):
+    """Projected payroll cost of one month"""
+    period: int
+    headcount: float = 0
+    gross_earnings: float = 0
+    gross_deductions: float = 0
+    net_pay: float = 0
+
+
+class ForecastScenarioResult(BaseModel):
+    """Month by month projection of a scenario"""
+    name: str
+    periods: List[ForecastPeriod] = []
+    total_gross_earnings: float = 0
+    total_gross_deductions: float = 0
+    total_net_pay: float = 0
+
+
+class PayrollForecastResponse(BaseModel):
+    """Payroll cost projection for every requested scenario"""
+    start_period: int
+    months: int
+    employees: int = Field(0, ge=0)
+    scenarios: List[ForecastScenarioResult] = []
@@ -0,0 +1,57 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+
+
+class ReportingManagerAssign(BaseModel):
+    """Make ManagerId the reporting manager of EmployeeId (replaces the current one)"""
+    EmployeeId: int = Field(..., description="Employee who reports")
+    ManagerId: int = Field(..., description="Employee they report to")
+    ModifiedBy: Optional[int] = Field(None, description="User ID making the change")
+
+
+class ReportingManagerResponse(BaseModel):
+    """One reporting line"""
+    RepotingManagerId: int
+    EmployeeId: Optional[int] = None
+    ManagerId: Optional[int] = None
+    IsActive: Optional[bool] = None
+    CreatedBy: Optional[int] = None
+    CreatedOn: Optional[datetime] = None
+    ModifiedBy: Optional[int] = None
+    ModifiedOn: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class HierarchyMembersResponse(BaseModel):
+    """Employees below (descendants) or above (ancestors) one employee"""
+    employee_id: int
+    depth: Optional[int] = None
+    total: int
+    employee_ids: List[int]
+
+
+class IsManagerResponse(BaseModel):
+    """Whether employee_id reports to manager_id, directly or indirectly"""
+    manager_id: int
+    employee_id: int
+    is_manager: bool
+
+
+class OrgChartNode(BaseModel):
+    """One employee of the org chart and everyone reporting to them"""
+    employee_id: int
+    employee_code: Optional[str] = None
+    name: Optional[str] = None
+    designation_id: Optional[int] = None
+    department_id: Optional[int] = None
+    depth: int
+    reports: List["OrgChartNode"] = []
+
+
+class OrgChartResponse(BaseModel):
+    """The whole organisation (root_id empty) or the subtree under root_id"""
+    root_id: Optional[int] = None
+    total: int
+    roots: List[OrgChartNode]
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, AliasChoices
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
+from decimal import Decimal
+
+from app.schemas.input_types import InputDateTime, InputInt, InputDecimal, InputBool, InputStr
 
 class TimesheetTaskBase(BaseModel):
     TaskItemId: Optional[int] = None
@@ -100,6 +103,55 @@ class TimesheetUpdate(BaseModel):
     ModifiedBy: Optional[int] = None
     IsActive: Optional[bool] = None
 
+class TimesheetTaskInput(BaseModel):
+    """Task in an InsertOrUpdateTimesheet / AddTimesheetTask / UpdateTimesheetTask body"""
+    Id: InputInt = None
+    TaskItemId: InputInt = None
+    TaskCodeId: InputInt = None
+    MondayHours: InputInt = None
+    TuesdayHours: InputInt = None
+    WednesdayHours: InputInt = None
+    ThursdayHours: InputInt = None
+    FridayHours: InputInt = None
+    SaturdayHours: InputInt = None
+    SundayHours: InputInt = None
+    TotalHrs: InputDecimal = None
+    CreatedBy: InputInt = None
+    CreatedOn: InputDateTime = None
+    ModifiedBy: InputInt = None
+    ModifiedOn: InputDateTime = None
+    IsActive: InputBool = None
+
+class TimesheetUpsert(BaseModel):
+    """InsertOrUpdateTimesheet body - an Id updates, no Id creates"""
+    Id: InputInt = None
+    FromDate: InputDateTime = None
+    ToDate: InputDateTime = None
+    Description: InputStr = None
+    EmployeeId: InputInt = None
+    UserId: InputInt = None
+    Status: InputStr = None
+    AssignedOn: InputDateTime = None
+    AssignedTo: InputInt = None
+    ApprovedOn: InputDateTime = None
+    ApprovedBy: InputInt = None
+    ApprovedComments: InputStr = None
+    CancelledOn: InputDateTime = None
+    CancelledBy: InputInt = None
+    CancelledComments: InputStr = None
+    RejectedOn: InputDateTime = None
+    RejectedBy: InputInt = None
+    RejectedComments: InputStr = None
+    CreatedBy: InputInt = None
+    CreatedOn: InputDateTime = None
+    ModifiedBy: InputInt = None
+    ModifiedOn: InputDateTime = None
+    IsActive: InputBool = None
+    TotalHrs: InputDecimal = None
+    tasks: Optional[List[TimesheetTaskInput]] = None
+    # Task lines of this timesheet to remove
+    deleted_task_ids: Optional[List[int]] = None
+
 class TimesheetResponse(BaseModel):
     Id: int
     FromDate: Optional[datetime] = None
@@ -125,7 +177,8 @@ class TimesheetResponse(BaseModel):
     ModifiedOn: Optional[datetime] = None
     IsActive: Optional[bool] = None
     TotalHrs: Optional[float] = None
-    tasks: List[TimesheetTaskResponse] = []
+    # Read from the timesheet_tasks relationship (eager-loaded by the service)
+    tasks: List[TimesheetTaskResponse] = Field([], validation_alias=AliasChoices("tasks", "timesheet_tasks"))
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -138,4 +191,33 @@ class TimesheetListResponse(BaseModel):
 
 class TimesheetDeleteResponse(BaseModel):
     success: bool
-    message: str = "Timesheet deleted successfully"
\ No newline at end of file
+    message: str = "Timesheet deleted successfully"
+class TimesheetUtilizationItem(BaseModel):
+    """Hours and utilization of one group; only the group_by columns are set"""
+    week_start: Optional[date] = None
+    employee_id: Optional[int] = None
+    employee_name: Optional[str] = None
+    project_id: Optional[int] = None
+    project_name: Optional[str] = None
+    task_item_id: Optional[int] = None
+    task_item_name: Optional[str] = None
+    task_code_id: Optional[int] = None
+    task_code_name: Optional[str] = None
+    hours: Decimal
+    approved_hours: Decimal
+    employee_count: int
+    capacity_hours: Decimal
+    utilization_pct: Optional[Decimal] = None
+
+class TimesheetUtilizationResponse(BaseModel):
+    """Utilization and project burn between two dates, from the weekly hours table"""
+    from_date: date
+    to_date: date
+    first_week: date
+    last_week: date
+    group_by: List[str]
+    weekly_capacity_hours: Decimal
+    active_employee_count: int
+    total_hours: Decimal
+    total_approved_hours: Decimal
+    items: List[TimesheetUtilizationItem]
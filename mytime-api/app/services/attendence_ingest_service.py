@@ -0,0 +1,321 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime, date, time
+import csv
+import io
+import logging
+
+from app.models.attendence import Attendence
+from app.models.employee import Employee
+from app.services.attendence_service import AttendenceService
+from app.services.attendence_summary_service import AttendenceSummaryService
+from app.services.team_calendar_service import TeamCalendarService
+from app.utils.helpers import batches
+
+logger = logging.getLogger(__name__)
+
+# Normalised input header -> Attendence field
+FIELD_ALIASES = {
+    "employeeid": "EmployeeId", "empid": "EmployeeId",
+    "attendencedate": "AttendenceDate", "attendancedate": "AttendenceDate", "date": "AttendenceDate",
+    "checkintime": "CheckInTime", "checkin": "CheckInTime",
+    "checkouttime": "CheckOutTime", "checkout": "CheckOutTime",
+    "punchtime": "PunchTime", "punch": "PunchTime", "timestamp": "PunchTime",
+    "status": "Status",
+    "worktype": "WorkType",
+    "description": "Description",
+}
+
+DUPLICATE_POLICIES = ("merge", "skip")
+
+_MERGE_STAGE_DDL = """
+CREATE TABLE #AttendenceStage (
+    EmployeeId     BIGINT        NOT NULL,
+    AttendenceDate DATE          NOT NULL,
+    CheckInTime    TIME          NULL,
+    CheckOutTime   TIME          NULL,
+    WorkHours      TIME          NULL,
+    Status         NVARCHAR(20)  NOT NULL,
+    WorkType       NVARCHAR(50)  NOT NULL,
+    Description    NVARCHAR(255) NULL,
+    UserId         BIGINT        NULL
+)
+"""
+
+_MERGE_STAGE_INSERT = """
+INSERT INTO #AttendenceStage
+    (EmployeeId, AttendenceDate, CheckInTime, CheckOutTime, WorkHours, Status, WorkType, Description, UserId)
+VALUES
+    (:EmployeeId, :AttendenceDate, :CheckInTime, :CheckOutTime, :WorkHours, :Status, :WorkType, :Description, :UserId)
+"""
+
+_MERGE = """
+MERGE dbo.Attendence WITH (HOLDLOCK) AS t
+USING #AttendenceStage AS s
+    ON t.EmployeeId = s.EmployeeId AND t.AttendenceDate = s.AttendenceDate
+WHEN MATCHED THEN UPDATE SET
+    CheckInTime = s.CheckInTime,
+    CheckOutTime = s.CheckOutTime,
+    WorkHours = s.WorkHours,
+    Status = s.Status,
+    WorkType = s.WorkType,
+    Description = s.Description,
+    ModifiedOn = GETDATE(),
+    ModifiedBy = s.UserId
+WHEN NOT MATCHED BY TARGET THEN INSERT
+    (EmployeeId, AttendenceDate, CheckInTime, CheckOutTime, WorkHours, Status, WorkType,
+     Description, ApprovalStatus, CreatedOn, CreatedBy)
+VALUES
+    (s.EmployeeId, s.AttendenceDate, s.CheckInTime, s.CheckOutTime, s.WorkHours, s.Status, s.WorkType,
+     s.Description, 'Pending', GETDATE(), s.UserId);
+"""
+
+
+class AttendenceIngestService:
+    """
+    Bulk attendance ingestion for biometric device exports and CSV dumps.
+    Rows are parsed in one pass, punches of the same employee and day are
+    collapsed into first-in / last-out, existing records are found with one
+    query per batch of employees, and everything is written in a single
+    transaction (a set-based MERGE on SQL Server).
+    """
+
+    @staticmethod
+    def _normalise_key(key: str) -> str:
+        return "".join(c for c in str(key).lower() if c.isalnum())
+
+    @staticmethod
+    def read_csv(content: str) -> List[Dict[str, Any]]:
+        return list(csv.DictReader(io.StringIO(content)))
+
+    @staticmethod
+    def _to_date(value) -> Optional[date]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value).strip()[:10])
+        except ValueError:
+            parsed = AttendenceService._parse_datetime(str(value).strip())
+            return parsed.date() if parsed else None
+
+    @staticmethod
+    def _to_datetime(value) -> Optional[datetime]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            return AttendenceService._parse_datetime(str(value).strip())
+
+    @staticmethod
+    def _to_time(value) -> Optional[time]:
+        if value is None or value == "":
+            return None
+        if isinstance(value, time):
+            return value
+        try:
+            return time.fromisoformat(str(value).strip())
+        except ValueError:
+            return AttendenceService._convert_time(str(value).strip())
+
+    @staticmethod
+    def _parse_rows(rows: Iterable[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[Tuple[int, date], Dict[str, Any]]:
+        """Parse input rows and collapse them per (EmployeeId, AttendenceDate)"""
+        normalise = AttendenceIngestService._normalise_key
+        to_date = AttendenceIngestService._to_date
+        to_time = AttendenceIngestService._to_time
+        to_datetime = AttendenceIngestService._to_datetime
+        header_cache: Dict[str, Optional[str]] = {}
+        records: Dict[Tuple[int, date], Dict[str, Any]] = {}
+
+        for row_number, raw in enumerate(rows, start=1):
+            result = {"row": row_number, "EmployeeId": None, "AttendenceDate": None, "result": "error", "message": None}
+            results.append(result)
+            if not isinstance(raw, dict):
+                result["message"] = "Row is not an object"
+                continue
+
+            row: Dict[str, Any] = {}
+            for key, value in raw.items():
+                field = header_cache.get(key)
+                if field is None and key not in header_cache:
+                    field = header_cache[key] = FIELD_ALIASES.get(normalise(key))
+                if field and value not in (None, ""):
+                    row[field] = value
+
+            try:
+                employee_id = int(row["EmployeeId"])
+            except (KeyError, TypeError, ValueError):
+                result["message"] = "EmployeeId is missing or invalid"
+                continue
+            result["EmployeeId"] = employee_id
+
+            check_in = check_out = None
+            if "PunchTime" in row:
+                punch = to_datetime(row["PunchTime"])
+                if punch is None:
+                    result["message"] = f"Invalid PunchTime {row['PunchTime']}"
+                    continue
+                day = punch.date()
+                check_in = check_out = punch.time().replace(microsecond=0)
+            else:
+                day = to_date(row.get("AttendenceDate"))
+                if day is None:
+                    result["message"] = "AttendenceDate is missing or invalid"
+                    continue
+                result["AttendenceDate"] = day
+                check_in = to_time(row.get("CheckInTime"))
+                check_out = to_time(row.get("CheckOutTime"))
+                invalid = [field for field, moment in (("CheckInTime", check_in), ("CheckOutTime", check_out))
+                           if field in row and moment is None]
+                if invalid:
+                    result["message"] = f"Invalid {invalid[0]} {row[invalid[0]]}"
+                    continue
+            result["AttendenceDate"] = day
+
+            record = records.get((employee_id, day))
+            if record is None:
+                record = records[(employee_id, day)] = {
+                    "EmployeeId": employee_id, "AttendenceDate": day,
+                    "CheckInTime": None, "CheckOutTime": None, "CheckOutGiven": False,
+                    "Status": None, "WorkType": None, "Description": None,
+                    "results": [],
+                }
+            record["results"].append(result)
+            # Earliest check-in, latest check-out; a punch counts as both,
+            # so the day's punches collapse into first in / last out
+            if check_in is not None and (record["CheckInTime"] is None or check_in < record["CheckInTime"]):
+                record["CheckInTime"] = check_in
+            if check_out is not None and (record["CheckOutTime"] is None or check_out > record["CheckOutTime"]):
+                record["CheckOutTime"] = check_out
+            if "PunchTime" not in row and check_out is not None:
+                record["CheckOutGiven"] = True
+            for field in ("Status", "WorkType", "Description"):
+                if field in row:
+                    record[field] = str(row[field]).strip()
+
+        return records
+
+    @staticmethod
+    def ingest(
+        db: Session,
+        rows: Iterable[Dict[str, Any]],
+        on_duplicate: str = "merge",
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Upsert attendance rows. Each row carries EmployeeId plus either a
+        PunchTime or AttendenceDate with optional CheckInTime/CheckOutTime.
+        With on_duplicate="merge" existing days widen to the earliest
+        check-in and latest check-out; with "skip" they are left untouched.
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"on_duplicate must be one of {', '.join(DUPLICATE_POLICIES)}")
+
+        results: List[Dict[str, Any]] = []
+        records = AttendenceIngestService._parse_rows(rows, results)
+        employee_ids = sorted({employee_id for employee_id, _ in records})
+
+        # Unknown employees and existing days, one query per batch of employees
+        known_employees = set()
+        existing: Dict[Tuple[int, date], Attendence] = {}
+        if records:
+            days = [day for _, day in records]
+            first_day, last_day = min(days), max(days)
+            for batch in batches(employee_ids):
+                known_employees.update(
+                    row[0] for row in db.query(Employee.EmployeeId).filter(Employee.EmployeeId.in_(batch)).all()
+                )
+                for row in db.query(
+                    Attendence.AttendenceId, Attendence.EmployeeId, Attendence.AttendenceDate,
+                    Attendence.CheckInTime, Attendence.CheckOutTime, Attendence.Status,
+                    Attendence.WorkType, Attendence.Description
+                ).filter(
+                    Attendence.EmployeeId.in_(batch),
+                    Attendence.AttendenceDate >= first_day,
+                    Attendence.AttendenceDate <= last_day
+                ).all():
+                    existing[(row.EmployeeId, row.AttendenceDate)] = row
+
+        staged: List[Dict[str, Any]] = []
+        to_insert: List[Dict[str, Any]] = []
+        to_update: List[Dict[str, Any]] = []
+        for key, record in records.items():
+            if key[0] not in known_employees:
+                outcome, message = "error", f"Employee {key[0]} not found"
+            elif key in existing and on_duplicate == "skip":
+                outcome, message = "skipped", "Attendence already exists for this employee on this date"
+            else:
+                current = existing.get(key)
+                check_in, check_out = record["CheckInTime"], record["CheckOutTime"]
+                if current is not None:
+                    if current.CheckInTime and (check_in is None or current.CheckInTime < check_in):
+                        check_in = current.CheckInTime
+                    if current.CheckOutTime and (check_out is None or current.CheckOutTime > check_out):
+                        check_out = current.CheckOutTime
+                if check_out == check_in and not record["CheckOutGiven"]:
+                    # A single punch is a check-in only
+                    check_out = current.CheckOutTime if current is not None else None
+                values = {
+                    "EmployeeId": record["EmployeeId"],
+                    "AttendenceDate": record["AttendenceDate"],
+                    "CheckInTime": check_in,
+                    "CheckOutTime": check_out,
+                    "WorkHours": AttendenceService._work_hours(check_in, check_out),
+                    "Status": record["Status"] or (current.Status if current is not None else "Present"),
+                    "WorkType": record["WorkType"] or (current.WorkType if current is not None else "Office"),
+                    "Description": record["Description"] or (current.Description if current is not None else None),
+                }
+                staged.append({**values, "UserId": user_id})
+                if current is None:
+                    outcome, message = "inserted", None
+                    to_insert.append({**values, "ApprovalStatus": "Pending", "CreatedOn": datetime.now(), "CreatedBy": user_id})
+                else:
+                    outcome, message = "updated", None
+                    to_update.append({**values, "AttendenceId": current.AttendenceId, "ModifiedOn": datetime.now(), "ModifiedBy": user_id})
+            for result in record["results"]:
+                result["result"] = outcome
+                result["message"] = message
+
+        try:
+            if staged and db.bind.dialect.name == "mssql":
+                db.execute(text(_MERGE_STAGE_DDL))
+                db.execute(text(_MERGE_STAGE_INSERT), staged)
+                db.execute(text(_MERGE))
+                db.execute(text("DROP TABLE #AttendenceStage"))
+            else:
+                if to_insert:
+                    db.execute(insert(Attendence), to_insert)
+                if to_update:
+                    db.bulk_update_mappings(Attendence, to_update)
+            AttendenceSummaryService.refresh(db, [(row["EmployeeId"], row["AttendenceDate"]) for row in staged])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        TeamCalendarService.invalidate_days(row["AttendenceDate"] for row in staged)
+
+        counts = {outcome: 0 for outcome in ("inserted", "updated", "skipped", "error")}
+        for result in results:
+            counts[result["result"]] += 1
+
+        logger.info(
+            f"Attendence bulk ingest: {len(results)} rows, {len(to_insert)} days inserted, "
+            f"{len(to_update)} days updated, {counts['skipped']} rows skipped, {counts['error']} rows failed"
+        )
+        return {
+            "success": counts["error"] == 0,
+            "total_rows": len(results),
+            "inserted": counts["inserted"],
+            "updated": counts["updated"],
+            "skipped": counts["skipped"],
+            "errors": counts["error"],
+            "results": results,
+        }
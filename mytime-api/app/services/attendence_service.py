@@ -1,11 +1,44 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, asc, desc, func
+from sqlalchemy import or_, asc, desc, func, text
 from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime, date, time
 import re
 
 from app.models.attendence import Attendence
-from app.schemas.attendence_schemas import AttendenceCreate, AttendenceUpdate
+from app.schemas.attendence_schemas import AttendenceCreate, AttendenceUpdate, AttendenceUpsert
+from app.schemas.input_types import provided_values
+from app.services.attendence_summary_service import AttendenceSummaryService
+from app.services.team_calendar_service import TeamCalendarService
+from app.utils.batch_review import REVIEW_STATUSES, lock_rows, item_result, review_response
+
+# Clock-in/out as single statements on SQL Server. HOLDLOCK makes the
+# MERGE race-free under the morning burst and OUTPUT returns the row, so
+# no follow-up SELECT or refresh is needed.
+_CHECK_IN_MERGE = text("""
+MERGE dbo.Attendence WITH (HOLDLOCK) AS t
+USING (SELECT :employee_id AS EmployeeId, :day AS AttendenceDate) AS s
+    ON t.EmployeeId = s.EmployeeId AND t.AttendenceDate = s.AttendenceDate
+WHEN MATCHED THEN UPDATE SET
+    CheckInTime = COALESCE(t.CheckInTime, :clock),
+    ModifiedOn = CASE WHEN t.CheckInTime IS NULL THEN :now ELSE t.ModifiedOn END,
+    ModifiedBy = CASE WHEN t.CheckInTime IS NULL THEN :user_id ELSE t.ModifiedBy END
+WHEN NOT MATCHED THEN INSERT
+    (EmployeeId, AttendenceDate, CheckInTime, Status, WorkType, ApprovalStatus, CreatedOn, CreatedBy)
+    VALUES (s.EmployeeId, s.AttendenceDate, :clock, 'Present', :work_type, 'Pending', :now, :user_id)
+OUTPUT inserted.*, deleted.AttendenceId AS PreviousAttendenceId, deleted.CheckInTime AS PreviousCheckInTime;
+""")
+
+_CHECK_OUT_UPDATE = text("""
+UPDATE dbo.Attendence WITH (ROWLOCK) SET
+    CheckOutTime = :clock,
+    WorkHours = CASE WHEN CheckInTime IS NOT NULL AND CheckInTime < :clock
+                     THEN CAST(DATEADD(SECOND, DATEDIFF(SECOND, CheckInTime, :clock), 0) AS TIME)
+                     ELSE NULL END,
+    ModifiedOn = :now,
+    ModifiedBy = :user_id
+OUTPUT inserted.*, deleted.WorkHours AS PreviousWorkHours
+WHERE EmployeeId = :employee_id AND AttendenceDate = :day;
+""")
 
 
 class AttendenceService:
@@ -168,42 +201,13 @@ class AttendenceService:
     @staticmethod
     def insert_or_update_attendence(
         db: Session,
-        attendence_data: dict
+        attendence_data: AttendenceUpsert
     ) -> Dict[str, Any]:
 
-        attendence_id = attendence_data.get("AttendenceId")
-        
-        # Define valid fields for Attendence model
-        valid_fields = {
-            'AttendenceId', 'EmployeeId', 'AttendenceDate', 'CheckInTime', 
-            'CheckOutTime', 'Status', 'WorkHours', 'Description', 
-            'ApprovalStatus', 'ApprovedBy', 'ApprovedOn', 'RejectedBy', 
-            'RejectedOn', 'RejectionReason', 'CreatedOn', 'CreatedBy', 
-            'ModifiedOn', 'ModifiedBy', 'WorkType'
-        }
-        
-        # Filter and process the data
-        processed_data = {}
-        for key, value in attendence_data.items():
-            if key in valid_fields and value is not None and value != "":
-                # Handle time fields
-                if key in ['CheckInTime', 'CheckOutTime', 'WorkHours']:
-                    converted = AttendenceService._convert_time(value)
-                    if converted:
-                        processed_data[key] = converted
-                # Handle date fields
-                elif key == 'AttendenceDate':
-                    converted = AttendenceService._convert_date(value)
-                    if converted:
-                        processed_data[key] = converted
-                # Handle datetime fields
-                elif key in ['CreatedOn', 'ModifiedOn', 'ApprovedOn', 'RejectedOn']:
-                    converted = AttendenceService._parse_datetime(value)
-                    if converted:
-                        processed_data[key] = converted
-                # Handle all other fields
-                else:
-                    processed_data[key] = value
+        attendence_id = attendence_data.AttendenceId
+
+        # Fields already coerced by the request model; empty ones are not written
+        processed_data = provided_values(attendence_data)
 
         # UPDATE
         if attendence_id and attendence_id != 0:
@@ -223,6 +227,8 @@ class AttendenceService:
                 if AttendenceService.check_attendence_exists(db, emp_id, att_date, attendence_id):
                     return {"success": False, "message": "Attendence already exists for this employee on this date"}
 
+            previous_key = (db_attendence.EmployeeId, db_attendence.AttendenceDate)
+
             # Update fields
             for key, value in processed_data.items():
                 if key != 'AttendenceId':
@@ -231,8 +237,13 @@ class AttendenceService:
             # Update ModifiedOn
             db_attendence.ModifiedOn = datetime.now()
 
+            db.flush()
+            AttendenceSummaryService.refresh(
+                db, [previous_key, (db_attendence.EmployeeId, db_attendence.AttendenceDate)]
+            )
             db.commit()
             db.refresh(db_attendence)
+            TeamCalendarService.invalidate_days([previous_key[1], db_attendence.AttendenceDate])
 
             return {
                 "success": True,
@@ -276,8 +287,11 @@ class AttendenceService:
             db_attendence = Attendence(**processed_data)
 
             db.add(db_attendence)
+            db.flush()
+            AttendenceSummaryService.refresh(db, [(emp_id, att_date)])
             db.commit()
             db.refresh(db_attendence)
+            TeamCalendarService.invalidate_days([db_attendence.AttendenceDate])
 
             return {
                 "success": True,
@@ -295,8 +309,12 @@ class AttendenceService:
         if not db_attendence:
             return False, "Attendence not found"
 
+        key = (db_attendence.EmployeeId, db_attendence.AttendenceDate)
         db.delete(db_attendence)
+        db.flush()
+        AttendenceSummaryService.refresh(db, [key])
         db.commit()
+        TeamCalendarService.invalidate_days([key[1]])
 
         return True, "Attendence deleted successfully"
 
@@ -310,8 +328,11 @@ class AttendenceService:
             db_attendence.ApprovalStatus = "Approved"
             db_attendence.ApprovedBy = user_id
             db_attendence.ApprovedOn = datetime.now()
+            db.flush()
+            AttendenceSummaryService.refresh(db, [(db_attendence.EmployeeId, db_attendence.AttendenceDate)])
             db.commit()
             db.refresh(db_attendence)
+            TeamCalendarService.invalidate_days([db_attendence.AttendenceDate])
 
         return db_attendence
 
@@ -326,11 +347,70 @@ class AttendenceService:
             db_attendence.RejectedBy = user_id
             db_attendence.RejectedOn = datetime.now()
             db_attendence.RejectionReason = reason
+            db.flush()
+            AttendenceSummaryService.refresh(db, [(db_attendence.EmployeeId, db_attendence.AttendenceDate)])
             db.commit()
             db.refresh(db_attendence)
+            TeamCalendarService.invalidate_days([db_attendence.AttendenceDate])
 
         return db_attendence
 
+    @staticmethod
+    def batch_review(
+        db: Session,
+        ids: List[int],
+        action: str,
+        user_id: Optional[int] = None,
+        comment: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Approve or reject many attendence records with one locked read and one UPDATE"""
+        if action not in REVIEW_STATUSES:
+            raise ValueError(f"action must be one of {', '.join(REVIEW_STATUSES)}")
+        target = REVIEW_STATUSES[action]
+        ids = list(dict.fromkeys(ids))
+        now = datetime.now()
+
+        try:
+            rows = lock_rows(db.query(
+                Attendence.AttendenceId, Attendence.EmployeeId, Attendence.AttendenceDate, Attendence.ApprovalStatus
+            ).filter(
+                Attendence.AttendenceId.in_(ids)
+            ), Attendence).all()
+            found = {row.AttendenceId: row for row in rows}
+
+            results: Dict[int, Dict[str, Any]] = {}
+            to_update: List[int] = []
+            for attendence_id in ids:
+                row = found.get(attendence_id)
+                if row is None:
+                    results[attendence_id] = item_result(attendence_id, False, message="Attendence not found")
+                elif row.ApprovalStatus == target:
+                    results[attendence_id] = item_result(
+                        attendence_id, False, row.ApprovalStatus, f"Attendence is already {target}"
+                    )
+                else:
+                    to_update.append(attendence_id)
+                    results[attendence_id] = item_result(attendence_id, True, target)
+
+            if to_update:
+                if action == "approve":
+                    values = {"ApprovalStatus": target, "ApprovedBy": user_id, "ApprovedOn": now}
+                else:
+                    values = {"ApprovalStatus": target, "RejectedBy": user_id, "RejectedOn": now, "RejectionReason": comment}
+                db.query(Attendence).filter(
+                    Attendence.AttendenceId.in_(to_update)
+                ).update({**values, "ModifiedOn": now}, synchronize_session=False)
+                AttendenceSummaryService.refresh(
+                    db, [(found[attendence_id].EmployeeId, found[attendence_id].AttendenceDate) for attendence_id in to_update]
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        TeamCalendarService.invalidate_days(found[attendence_id].AttendenceDate for attendence_id in to_update)
+
+        return review_response(action, ids, results)
+
     @staticmethod
     def get_today_attendence(db: Session, employee_id: int) -> Optional[Attendence]:
         """Get today's attendence for an employee"""
@@ -360,4 +440,110 @@ class AttendenceService:
         query = db.query(Attendence).filter(Attendence.ApprovalStatus == "Pending")
         total = query.count()
         items = query.offset(skip).limit(limit).order_by(Attendence.AttendenceDate.desc()).all()
-        return items, total
\ No newline at end of file
+        return items, total
+
+    @staticmethod
+    def _work_hours(check_in: Optional[time], check_out: Optional[time]) -> Optional[time]:
+        if not check_in or not check_out or check_out <= check_in:
+            return None
+        seconds = (check_out.hour * 3600 + check_out.minute * 60 + check_out.second) - \
+                  (check_in.hour * 3600 + check_in.minute * 60 + check_in.second)
+        return time(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+
+    @staticmethod
+    def check_in(
+        db: Session,
+        employee_id: int,
+        user_id: Optional[int] = None,
+        work_type: str = "Office"
+    ) -> Dict[str, Any]:
+        """Clock in for today - one atomic upsert; a repeated check-in keeps the first time"""
+        now = datetime.now().replace(microsecond=0)
+        params = {
+            "employee_id": employee_id, "day": now.date(), "clock": now.time(),
+            "now": now, "user_id": user_id, "work_type": work_type or "Office",
+        }
+
+        if db.bind.dialect.name == "mssql":
+            row = db.execute(_CHECK_IN_MERGE, params).mappings().first()
+            data = dict(row)
+            inserted = data.pop("PreviousAttendenceId", None) is None
+            already = data.pop("PreviousCheckInTime", None) is not None
+            if not already:
+                # A new day adds to the month; a check-in on an existing day changes no counter
+                AttendenceSummaryService.apply_change(
+                    db, employee_id, params["day"], None if inserted else data, data
+                )
+            db.commit()
+        else:
+            db_attendence = db.query(Attendence).filter(
+                Attendence.EmployeeId == employee_id,
+                Attendence.AttendenceDate == params["day"]
+            ).with_for_update().first()
+            already = db_attendence is not None and db_attendence.CheckInTime is not None
+            inserted = db_attendence is None
+            if inserted:
+                db_attendence = Attendence(
+                    EmployeeId=employee_id, AttendenceDate=params["day"], CheckInTime=params["clock"],
+                    Status="Present", WorkType=params["work_type"], ApprovalStatus="Pending",
+                    CreatedOn=now, CreatedBy=user_id
+                )
+                db.add(db_attendence)
+            elif not already:
+                db_attendence.CheckInTime = params["clock"]
+                db_attendence.ModifiedOn = now
+                db_attendence.ModifiedBy = user_id
+            db.flush()
+            data = {column.name: getattr(db_attendence, column.name) for column in Attendence.__table__.columns}
+            if not already:
+                AttendenceSummaryService.apply_change(
+                    db, employee_id, params["day"], None if inserted else data, data
+                )
+            db.commit()
+
+        if not already:
+            TeamCalendarService.invalidate_days([params["day"]])
+
+        return {
+            "success": True,
+            "message": "Already checked in today" if already else "Checked in successfully",
+            "data": data
+        }
+
+    @staticmethod
+    def check_out(db: Session, employee_id: int, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Clock out for today - sets CheckOutTime and WorkHours in one UPDATE"""
+        now = datetime.now().replace(microsecond=0)
+        params = {
+            "employee_id": employee_id, "day": now.date(), "clock": now.time(),
+            "now": now, "user_id": user_id,
+        }
+
+        if db.bind.dialect.name == "mssql":
+            row = db.execute(_CHECK_OUT_UPDATE, params).mappings().first()
+            data = dict(row) if row else None
+            if data is not None:
+                before = {**data, "WorkHours": data.pop("PreviousWorkHours", None)}
+                AttendenceSummaryService.apply_change(db, employee_id, params["day"], before, data)
+            db.commit()
+        else:
+            db_attendence = db.query(Attendence).filter(
+                Attendence.EmployeeId == employee_id,
+                Attendence.AttendenceDate == params["day"]
+            ).with_for_update().first()
+            data = None
+            if db_attendence is not None:
+                before = {column.name: getattr(db_attendence, column.name) for column in Attendence.__table__.columns}
+                db_attendence.CheckOutTime = params["clock"]
+                db_attendence.WorkHours = AttendenceService._work_hours(db_attendence.CheckInTime, params["clock"])
+                db_attendence.ModifiedOn = now
+                db_attendence.ModifiedBy = user_id
+                db.flush()
+                data = {column.name: getattr(db_attendence, column.name) for column in Attendence.__table__.columns}
+                AttendenceSummaryService.apply_change(db, employee_id, params["day"], before, data)
+            db.commit()
+
+        if data is None:
+            return {"success": False, "message": "No check-in found for today"}
+        TeamCalendarService.invalidate_days([params["day"]])
+        return {"success": True, "message": "Checked out successfully", "data": data}
@@ -0,0 +1,380 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, insert, text
+from typing import Optional, List, Dict, Any, Iterable, Mapping, Tuple, Set
+from datetime import datetime, date
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import groupby
+from types import SimpleNamespace
+import logging
+
+from app.core.config import settings
+from app.models.attendence import Attendence
+from app.models.attendence_summary import AttendenceSummary
+from app.utils.period import Period
+from app.utils.helpers import ID_BATCH_SIZE, batches, csv_set
+
+logger = logging.getLogger(__name__)
+
+_SUMMARY_COUNTERS = ("PresentDays", "AbsentDays", "WfhDays", "LeaveDays", "PendingDays")
+
+# Summary rows are written with keyed upserts rather than DELETE + INSERT,
+# so concurrent writers of the same employee-month cannot collide on the
+# unique (EmployeeId, Period) index
+_UPSERT_SUMMARY = text("""
+MERGE dbo.AttendenceMonthlySummary WITH (HOLDLOCK) AS t
+USING (SELECT :EmployeeId AS EmployeeId, :Period AS Period) AS s
+    ON t.EmployeeId = s.EmployeeId AND t.Period = s.Period
+WHEN MATCHED THEN UPDATE SET
+    PresentDays = :PresentDays,
+    AbsentDays = :AbsentDays,
+    WfhDays = :WfhDays,
+    LeaveDays = :LeaveDays,
+    PendingDays = :PendingDays,
+    WorkSeconds = :WorkSeconds,
+    TotalWorkHours = :TotalWorkHours,
+    RefreshedOn = :RefreshedOn
+WHEN NOT MATCHED THEN INSERT
+    (EmployeeId, Period, PresentDays, AbsentDays, WfhDays, LeaveDays, PendingDays, WorkSeconds, TotalWorkHours,
+     RefreshedOn)
+    VALUES (s.EmployeeId, s.Period, :PresentDays, :AbsentDays, :WfhDays, :LeaveDays, :PendingDays,
+            :WorkSeconds, :TotalWorkHours, :RefreshedOn);
+""")
+
+# Work time is added in seconds and the hours re-derived from the new total,
+# rounded once like a full recompute, so deltas never drift from it
+
+_ADD_TO_SUMMARY = text("""
+MERGE dbo.AttendenceMonthlySummary WITH (HOLDLOCK) AS t
+USING (SELECT :EmployeeId AS EmployeeId, :Period AS Period) AS s
+    ON t.EmployeeId = s.EmployeeId AND t.Period = s.Period
+WHEN MATCHED THEN UPDATE SET
+    PresentDays = t.PresentDays + :PresentDays,
+    AbsentDays = t.AbsentDays + :AbsentDays,
+    WfhDays = t.WfhDays + :WfhDays,
+    LeaveDays = t.LeaveDays + :LeaveDays,
+    PendingDays = t.PendingDays + :PendingDays,
+    WorkSeconds = t.WorkSeconds + :WorkSeconds,
+    TotalWorkHours = CAST(ROUND((t.WorkSeconds + :WorkSeconds) / 3600.0, 2) AS DECIMAL(9, 2)),
+    RefreshedOn = :RefreshedOn
+WHEN NOT MATCHED THEN INSERT
+    (EmployeeId, Period, PresentDays, AbsentDays, WfhDays, LeaveDays, PendingDays, WorkSeconds, TotalWorkHours,
+     RefreshedOn)
+    VALUES (s.EmployeeId, s.Period, :PresentDays, :AbsentDays, :WfhDays, :LeaveDays, :PendingDays,
+            :WorkSeconds, CAST(ROUND(:WorkSeconds / 3600.0, 2) AS DECIMAL(9, 2)), :RefreshedOn);
+""")
+
+
+class AttendenceSummaryService:
+    """
+    Per-employee monthly attendence summaries (AttendenceMonthlySummary).
+    Every attendence write recomputes only the employee-months it touched,
+    inside the same transaction, from the (EmployeeId, AttendenceDate)
+    index; check-in and check-out only add the difference their day makes.
+    Readers get any set of employees and months from the small summary
+    table instead of scanning Attendence.
+    """
+
+    @staticmethod
+    def period_key(value: date) -> int:
+        return value.year * 100 + value.month
+
+    @staticmethod
+    def _rules() -> Tuple[Set[str], Set[str], Set[str]]:
+        """Absent statuses, leave statuses and work-from-home work types from settings"""
+        return (
+            csv_set(settings.PAYROLL_ABSENT_ATTENDANCE_STATUSES),
+            csv_set(settings.ATTENDANCE_LEAVE_STATUSES),
+            csv_set(settings.ATTENDANCE_WFH_WORK_TYPES),
+        )
+
+    @staticmethod
+    def _day_values(row: Any, rules: Optional[Tuple[Set[str], Set[str], Set[str]]] = None) -> Dict[str, int]:
+        """What one attendence day adds to its month: counters plus work seconds (nothing if rejected)"""
+        values = {name: 0 for name in _SUMMARY_COUNTERS}
+        values["WorkSeconds"] = 0
+        if row is None or (row.ApprovalStatus or "") == "Rejected":
+            return values
+
+        absent_statuses, leave_statuses, wfh_types = rules or AttendenceSummaryService._rules()
+        day_status = (row.Status or "").strip().lower()
+        if day_status in absent_statuses:
+            values["AbsentDays"] = 1
+        elif day_status in leave_statuses:
+            values["LeaveDays"] = 1
+        else:
+            values["PresentDays"] = 1
+            if (row.WorkType or "").strip().lower() in wfh_types:
+                values["WfhDays"] = 1
+        if (row.ApprovalStatus or "Pending") == "Pending":
+            values["PendingDays"] = 1
+        if row.WorkHours:
+            values["WorkSeconds"] = row.WorkHours.hour * 3600 + row.WorkHours.minute * 60 + row.WorkHours.second
+        return values
+
+    @staticmethod
+    def _hours(seconds: int) -> Decimal:
+        return (Decimal(seconds) / 3600).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def _summarise(rows: Iterable[Any], now: datetime) -> Dict[str, Any]:
+        """Summary values of one employee-month from its attendence rows"""
+        # One record per day - the latest wins if a day was entered twice
+        days: Dict[date, Any] = {}
+        for row in rows:
+            if (row.ApprovalStatus or "") != "Rejected":
+                days[row.AttendenceDate] = row
+
+        rules = AttendenceSummaryService._rules()
+        values = {name: 0 for name in _SUMMARY_COUNTERS}
+        seconds = 0
+        for row in days.values():
+            day = AttendenceSummaryService._day_values(row, rules)
+            for name in _SUMMARY_COUNTERS:
+                values[name] += day[name]
+            seconds += day["WorkSeconds"]
+
+        values["WorkSeconds"] = seconds
+        values["TotalWorkHours"] = AttendenceSummaryService._hours(seconds)
+        values["RefreshedOn"] = now
+        return values
+
+    @staticmethod
+    def _source_query(db: Session):
+        return db.query(
+            Attendence.EmployeeId,
+            Attendence.AttendenceDate,
+            Attendence.Status,
+            Attendence.WorkType,
+            Attendence.WorkHours,
+            Attendence.ApprovalStatus
+        )
+
+    @staticmethod
+    def refresh(db: Session, keys: Iterable[Tuple[int, Any]]) -> int:
+        """
+        Recompute the summaries of the given (EmployeeId, date or YYYYMM)
+        pairs. Does not commit - call it before the attendence write commits
+        so both land together. Returns summary rows written.
+        """
+        employee_ids: Set[int] = set()
+        periods: Set[int] = set()
+        requested: Set[Tuple[int, int]] = set()
+        for employee_id, when in keys:
+            if employee_id is None or when is None:
+                continue
+            period = AttendenceSummaryService.period_key(when) if isinstance(when, date) else int(when)
+            employee_ids.add(int(employee_id))
+            periods.add(period)
+            requested.add((int(employee_id), period))
+        if not employee_ids:
+            return 0
+
+        first = Period.from_key(min(periods))
+        last = Period.from_key(max(periods))
+        first_day = date(first.year, first.month, 1)
+        last_day = date(last.year, last.month, last.days)
+
+        now = datetime.now()
+        written = 0
+        for batch in batches(sorted(employee_ids)):
+            rows = AttendenceSummaryService._source_query(db).filter(
+                Attendence.EmployeeId.in_(batch),
+                Attendence.AttendenceDate >= first_day,
+                Attendence.AttendenceDate <= last_day
+            ).order_by(Attendence.EmployeeId, Attendence.AttendenceDate, Attendence.AttendenceId).all()
+
+            summaries = []
+            for (employee_id, period), group in groupby(
+                rows, key=lambda row: (row.EmployeeId, AttendenceSummaryService.period_key(row.AttendenceDate))
+            ):
+                if period in periods:
+                    summaries.append({
+                        "EmployeeId": employee_id, "Period": period,
+                        **AttendenceSummaryService._summarise(group, now),
+                    })
+            batch_set = set(batch)
+            AttendenceSummaryService._upsert(
+                db, batch, periods, summaries, {pair for pair in requested if pair[0] in batch_set}
+            )
+            written += len(summaries)
+
+        return written
+
+    @staticmethod
+    def _upsert(
+        db: Session,
+        employee_ids: List[int],
+        periods: Set[int],
+        summaries: List[Dict[str, Any]],
+        requested: Set[Tuple[int, int]]
+    ) -> None:
+        """
+        Write the recomputed summaries of these employees and periods; the
+        requested (employee, period) pairs left without attendence lose their row.
+        """
+        if db.bind.dialect.name == "mssql":
+            if summaries:
+                db.execute(_UPSERT_SUMMARY, summaries)
+        else:
+            existing = {
+                (row.EmployeeId, row.Period): row.AttendenceSummaryId
+                for row in db.query(
+                    AttendenceSummary.AttendenceSummaryId, AttendenceSummary.EmployeeId, AttendenceSummary.Period
+                ).filter(
+                    AttendenceSummary.EmployeeId.in_(employee_ids),
+                    AttendenceSummary.Period.in_(periods)
+                ).all()
+            }
+            to_update = [
+                {**summary, "AttendenceSummaryId": existing[(summary["EmployeeId"], summary["Period"])]}
+                for summary in summaries if (summary["EmployeeId"], summary["Period"]) in existing
+            ]
+            to_insert = [
+                summary for summary in summaries if (summary["EmployeeId"], summary["Period"]) not in existing
+            ]
+            if to_update:
+                db.bulk_update_mappings(AttendenceSummary, to_update)
+            if to_insert:
+                db.execute(insert(AttendenceSummary), to_insert)
+
+        written = {(summary["EmployeeId"], summary["Period"]) for summary in summaries}
+        emptied = [
+            {"employee_id": employee_id, "period": period}
+            for employee_id, period in sorted(requested - written)
+        ]
+        if emptied:
+            db.execute(
+                AttendenceSummary.__table__.delete().where(
+                    AttendenceSummary.EmployeeId == bindparam("employee_id"),
+                    AttendenceSummary.Period == bindparam("period")
+                ),
+                emptied
+            )
+
+    @staticmethod
+    def apply_change(
+        db: Session,
+        employee_id: int,
+        day: date,
+        before: Optional[Mapping[str, Any]],
+        after: Optional[Mapping[str, Any]]
+    ) -> None:
+        """
+        Add the difference one attendence day made (before/after are the
+        row's column values, None when absent) to its month with a single
+        upsert - the check-in/check-out path, which must not re-read the
+        month. Does not commit.
+        """
+        period = AttendenceSummaryService.period_key(day)
+        old = AttendenceSummaryService._day_values(SimpleNamespace(**before) if before is not None else None)
+        new = AttendenceSummaryService._day_values(SimpleNamespace(**after) if after is not None else None)
+        delta = {name: new[name] - old[name] for name in _SUMMARY_COUNTERS}
+        delta["WorkSeconds"] = new["WorkSeconds"] - old["WorkSeconds"]
+        if not any(delta.values()):
+            return
+
+        now = datetime.now()
+        params = {"EmployeeId": employee_id, "Period": period, **delta, "RefreshedOn": now}
+        if db.bind.dialect.name == "mssql":
+            db.execute(_ADD_TO_SUMMARY, params)
+            return
+        work_seconds = AttendenceSummary.WorkSeconds + delta["WorkSeconds"]
+        updated = db.query(AttendenceSummary).filter(
+            AttendenceSummary.EmployeeId == employee_id,
+            AttendenceSummary.Period == period
+        ).update({
+            **{getattr(AttendenceSummary, name): getattr(AttendenceSummary, name) + value
+               for name, value in delta.items()},
+            AttendenceSummary.TotalWorkHours: func.round(work_seconds / 3600.0, 2),
+            AttendenceSummary.RefreshedOn: now,
+        }, synchronize_session=False)
+        if not updated:
+            db.execute(insert(AttendenceSummary), [
+                {**params, "TotalWorkHours": AttendenceSummaryService._hours(delta["WorkSeconds"])}
+            ])
+
+    @staticmethod
+    def rebuild(db: Session, from_period: Optional[int] = None, to_period: Optional[int] = None) -> int:
+        """Recompute every summary (optionally within a YYYYMM range) from Attendence"""
+        delete_query = db.query(AttendenceSummary)
+        source = AttendenceSummaryService._source_query(db)
+        if from_period:
+            start = Period.from_key(from_period)
+            delete_query = delete_query.filter(AttendenceSummary.Period >= from_period)
+            source = source.filter(Attendence.AttendenceDate >= date(start.year, start.month, 1))
+        if to_period:
+            end = Period.from_key(to_period)
+            delete_query = delete_query.filter(AttendenceSummary.Period <= to_period)
+            source = source.filter(Attendence.AttendenceDate <= date(end.year, end.month, end.days))
+
+        now = datetime.now()
+        written = 0
+        try:
+            delete_query.delete(synchronize_session=False)
+
+            rows = source.order_by(
+                Attendence.EmployeeId, Attendence.AttendenceDate, Attendence.AttendenceId
+            ).execution_options(stream_results=True, yield_per=5000)
+
+            pending: List[Dict[str, Any]] = []
+            for (employee_id, period), group in groupby(
+                rows, key=lambda row: (row.EmployeeId, AttendenceSummaryService.period_key(row.AttendenceDate))
+            ):
+                pending.append({
+                    "EmployeeId": employee_id, "Period": period,
+                    **AttendenceSummaryService._summarise(group, now),
+                })
+                if len(pending) >= ID_BATCH_SIZE:
+                    db.execute(insert(AttendenceSummary), pending)
+                    written += len(pending)
+                    pending = []
+            if pending:
+                db.execute(insert(AttendenceSummary), pending)
+                written += len(pending)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Rebuilt attendence monthly summaries: {written} rows")
+        return written
+
+    @staticmethod
+    def fetch(
+        db: Session,
+        employee_ids: Optional[List[int]] = None,
+        from_period: Optional[int] = None,
+        to_period: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Summaries of the given employees (all when None) within a YYYYMM range"""
+        def base_query():
+            query = db.query(AttendenceSummary)
+            if from_period:
+                query = query.filter(AttendenceSummary.Period >= from_period)
+            if to_period:
+                query = query.filter(AttendenceSummary.Period <= to_period)
+            return query
+
+        if employee_ids:
+            rows = []
+            for batch in batches(sorted(set(employee_ids))):
+                rows.extend(base_query().filter(AttendenceSummary.EmployeeId.in_(batch)).all())
+        else:
+            rows = base_query().all()
+        rows.sort(key=lambda row: (row.EmployeeId, row.Period))
+
+        return [
+            {
+                "employee_id": row.EmployeeId,
+                "period": row.Period,
+                "present_days": row.PresentDays,
+                "absent_days": row.AbsentDays,
+                "wfh_days": row.WfhDays,
+                "leave_days": row.LeaveDays,
+                "pending_days": row.PendingDays,
+                "total_work_hours": AttendenceSummaryService._hours(row.WorkSeconds or 0),
+                "refreshed_on": row.RefreshedOn,
+            }
+            for row in rows
+        ]
@@ -168,6 +168,32 @@ class B2StorageService:
         except Exception as e:
             raise Exception(f"Upload failed: {str(e)}")
 
+    def put_object(self, key: str, file_content: bytes, content_type: str) -> str:
+        """Store content under a caller-chosen key (overwrites), returns the key"""
+        try:
+            self.client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=file_content,
+                ContentType=content_type,
+            )
+            return key
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code", "Unknown")
+            raise Exception(f"B2 upload failed ({error_code}): {str(e)}")
+
+    def get_object_content(self, file_id: str) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket_name,
+                Key=file_id,
+            )
+            return response["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise Exception(f"File not found: {file_id}")
+            raise
+
     def get_file_info(self, file_id: str) -> Dict[str, Any]:
         try:
             response = self.client.head_object(
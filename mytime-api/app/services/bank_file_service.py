@@ -0,0 +1,266 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Iterator, List, Tuple, Optional, Dict, Any
+from datetime import datetime
+from decimal import Decimal
+import csv
+import io
+import logging
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.employee_salary import EmployeeSalary
+from app.models.employee_salary_structure import EmployeeSalaryStructure
+from app.models.monthly_salary import MonthlySalary
+
+logger = logging.getLogger(__name__)
+
+BANK_FILE_FORMATS = ("csv", "fixed")
+
+BANK_FILE_FIELDS = (
+    "EmployeeId", "EmployeeCode", "EmployeeName", "BankAccount", "BankName", "IFSC", "Amount", "Narration",
+)
+
+# Free-text fields that may be cut to their fixed-width column; any other
+# field that does not fit (account, IFSC, amount, codes) skips the row
+BANK_FILE_TRUNCATABLE_FIELDS = {"EmployeeName", "BankName", "Narration"}
+
+CENT = Decimal("0.01")
+
+# Unpayable employees named in the error before the rest are only counted
+BANK_FILE_MAX_LISTED = 50
+
+
+class BankFileService:
+    """
+    Bank bulk-payment file for a published monthly salary.
+    EmployeeSalary (NETTRANSFER) is joined with the employee's active salary
+    structure (bank details) and read through a server-side cursor, and the
+    file is yielded a few hundred rows at a time with a control-total
+    trailer, so memory use does not depend on headcount. A run with any
+    payable employee that cannot be transferred (no bank account, or an
+    account, IFSC or amount wider than the fixed-width layout) is refused
+    before streaming starts, so the file never silently under-pays.
+    """
+
+    @staticmethod
+    def parse_layout(layout: Optional[str] = None) -> List[Tuple[str, int]]:
+        """'EmployeeCode:12,Amount:15' -> [('EmployeeCode', 12), ('Amount', 15)]"""
+        columns = []
+        for item in (layout or settings.BANK_FILE_LAYOUT).split(","):
+            if not item.strip():
+                continue
+            name, _, width = item.partition(":")
+            name = name.strip()
+            if name not in BANK_FILE_FIELDS:
+                raise ValueError(f"Unknown bank file field {name}. Allowed: {', '.join(BANK_FILE_FIELDS)}")
+            columns.append((name, int(width) if width.strip() else 20))
+        if not columns:
+            raise ValueError("Bank file layout has no fields")
+        return columns
+
+    @staticmethod
+    def _fixed(value: str, width: int, right: bool = False) -> str:
+        """Pad to width, cutting longer values - only for values allowed to be truncated"""
+        value = value[:width]
+        return value.rjust(width) if right else value.ljust(width)
+
+    @staticmethod
+    def _values(row, narration: str, amount: Decimal) -> Dict[str, Any]:
+        """Field values of one detail row"""
+        return {
+            "EmployeeId": str(row.EmployeeId),
+            "EmployeeCode": row.EmployeeCode or "",
+            "EmployeeName": " ".join(part for part in (row.FirstName, row.LastName) if part),
+            "BankAccount": str(row.BankAccount or "").strip(),
+            "BankName": row.BankName or "",
+            "IFSC": (row.IFSC or "").strip().upper(),
+            "Amount": f"{amount:.2f}",
+            "Narration": narration,
+        }
+
+    @staticmethod
+    def _unpayable_reason(
+        values: Dict[str, Any],
+        file_format: str,
+        columns: List[Tuple[str, int]]
+    ) -> Optional[str]:
+        """Why a payable row cannot go into the file, None if it can"""
+        if not values["BankAccount"]:
+            return "no bank account"
+        if file_format == "fixed":
+            # Cutting an account, IFSC or amount would pay the wrong account or sum
+            too_long = [
+                name for name, width in columns
+                if name not in BANK_FILE_TRUNCATABLE_FIELDS and len(values[name]) > width
+            ]
+            if too_long:
+                return f"{', '.join(too_long)} wider than the layout"
+        return None
+
+    @staticmethod
+    def find_unpayable(
+        db: Session,
+        monthly_salary: MonthlySalary,
+        file_format: str,
+        columns: List[Tuple[str, int]]
+    ) -> List[Dict[str, Any]]:
+        """Payable employees of the run that the bank file cannot carry"""
+        narration = f"Salary {monthly_salary.SalaryMonth} {monthly_salary.SalaryYear}"
+        unpayable = []
+        for row in BankFileService._rows(db, monthly_salary.MonthlySalaryId):
+            amount = Decimal(str(row.NETTRANSFER or 0)).quantize(CENT)
+            if amount <= 0:
+                continue
+            reason = BankFileService._unpayable_reason(
+                BankFileService._values(row, narration, amount), file_format, columns
+            )
+            if reason:
+                unpayable.append({"EmployeeId": row.EmployeeId, "Amount": amount, "Reason": reason})
+        return unpayable
+
+    @staticmethod
+    def _rows(db: Session, monthly_salary_id: int):
+        """Payable rows of the run, streamed from the database"""
+        # One active structure per employee - the latest if several are active.
+        # Joined (not filtered) so employees without one still come through
+        latest_structure = db.query(
+            EmployeeSalaryStructure.EmployeeId,
+            func.max(EmployeeSalaryStructure.EmployeeSalaryStructureId).label("structure_id")
+        ).filter(
+            EmployeeSalaryStructure.IsActive == True
+        ).group_by(EmployeeSalaryStructure.EmployeeId).subquery()
+
+        return db.query(
+            EmployeeSalary.EmployeeId,
+            EmployeeSalary.NETTRANSFER,
+            Employee.EmployeeCode,
+            Employee.FirstName,
+            Employee.LastName,
+            EmployeeSalaryStructure.BankAccount,
+            EmployeeSalaryStructure.BankName,
+            EmployeeSalaryStructure.IFSC
+        ).outerjoin(
+            Employee, Employee.EmployeeId == EmployeeSalary.EmployeeId
+        ).outerjoin(
+            latest_structure, latest_structure.c.EmployeeId == EmployeeSalary.EmployeeId
+        ).outerjoin(
+            EmployeeSalaryStructure,
+            EmployeeSalaryStructure.EmployeeSalaryStructureId == latest_structure.c.structure_id
+        ).filter(
+            EmployeeSalary.MonthlySalaryId == monthly_salary_id,
+            EmployeeSalary.IsActive == True
+        ).order_by(
+            EmployeeSalary.EmployeeId
+        ).execution_options(
+            stream_results=True, yield_per=settings.BANK_FILE_FETCH_SIZE
+        )
+
+    @staticmethod
+    def stream_bank_file(
+        db: Session,
+        monthly_salary: MonthlySalary,
+        file_format: Optional[str] = None,
+        layout: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Bank file for a monthly salary (header, detail rows, control-total
+        trailer). Format and layout are validated, and the run is checked for
+        payable employees the file cannot carry, before streaming starts.
+        """
+        file_format = (file_format or settings.BANK_FILE_FORMAT).lower()
+        if file_format not in BANK_FILE_FORMATS:
+            raise ValueError(f"Unknown bank file format {file_format}. Allowed: {', '.join(BANK_FILE_FORMATS)}")
+        columns = BankFileService.parse_layout(layout)
+        if file_format == "fixed" and len(settings.BANK_FILE_DEBIT_ACCOUNT) > 20:
+            raise ValueError("BANK_FILE_DEBIT_ACCOUNT does not fit the 20-character header field")
+        unpayable = BankFileService.find_unpayable(db, monthly_salary, file_format, columns)
+        if unpayable:
+            listed = unpayable[:BANK_FILE_MAX_LISTED]
+            more = f" and {len(unpayable) - len(listed)} more" if len(unpayable) > len(listed) else ""
+            raise ValueError(
+                f"{len(unpayable)} payable employees, {sum(item['Amount'] for item in unpayable):.2f} in total, "
+                f"cannot be included in the bank file: "
+                + "; ".join(f"employee {item['EmployeeId']} ({item['Reason']})" for item in listed)
+                + more
+            )
+        return BankFileService._generate(db, monthly_salary, file_format, columns)
+
+    @staticmethod
+    def _generate(
+        db: Session,
+        monthly_salary: MonthlySalary,
+        file_format: str,
+        columns: List[Tuple[str, int]]
+    ) -> Iterator[bytes]:
+        narration = f"Salary {monthly_salary.SalaryMonth} {monthly_salary.SalaryYear}"
+        generated_on = datetime.utcnow().strftime("%Y%m%d")
+        fixed = BankFileService._fixed
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\r\n")
+
+        def drain() -> bytes:
+            data = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            return data
+
+        # Header record
+        if file_format == "csv":
+            writer.writerow([name for name, _ in columns])
+        else:
+            buffer.write(
+                "H" + fixed(settings.BANK_FILE_DEBIT_ACCOUNT, 20) + generated_on
+                + fixed(narration, 30) + "\r\n"
+            )
+
+        record_count = 0
+        total_amount = Decimal("0")
+
+        for row in BankFileService._rows(db, monthly_salary.MonthlySalaryId):
+            amount = Decimal(str(row.NETTRANSFER or 0)).quantize(CENT)
+            if amount <= 0:
+                continue
+            values = BankFileService._values(row, narration, amount)
+            reason = BankFileService._unpayable_reason(values, file_format, columns)
+            if reason:
+                # Changed since the pre-streaming check: abort so the file ends
+                # without a trailer instead of balancing without this employee
+                raise RuntimeError(
+                    f"Bank file for monthly salary {monthly_salary.MonthlySalaryId} aborted: "
+                    f"employee {row.EmployeeId} {reason}, {amount:.2f} could not be included"
+                )
+
+            if file_format == "csv":
+                writer.writerow([values[name] for name, _ in columns])
+            else:
+                buffer.write("D" + "".join(
+                    fixed(values[name], width, right=(name == "Amount")) for name, width in columns
+                ) + "\r\n")
+
+            record_count += 1
+            total_amount += amount
+            if record_count % 500 == 0:
+                yield drain()
+
+        # Control totals
+        if file_format == "csv":
+            # Same columns as the detail rows: label, record count, total under Amount
+            names = [name for name, _ in columns]
+            amount_index = names.index("Amount") if "Amount" in names else len(names) - 1
+            others = [index for index in range(len(names)) if index != amount_index]
+            trailer = [""] * len(names)
+            trailer[amount_index] = f"{total_amount:.2f}"
+            if len(others) > 1:
+                trailer[others[0]], trailer[others[1]] = "CONTROL_TOTAL", str(record_count)
+            elif others:
+                trailer[others[0]] = f"CONTROL_TOTAL {record_count}"
+            writer.writerow(trailer)
+        else:
+            buffer.write("T" + str(record_count).rjust(9, "0") + f"{total_amount:.2f}".rjust(18, "0") + "\r\n")
+        yield drain()
+
+        logger.info(
+            f"Bank file for monthly salary {monthly_salary.MonthlySalaryId}: "
+            f"{record_count} transfers, total {total_amount:.2f}"
+        )
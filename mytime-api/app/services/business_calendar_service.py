@@ -0,0 +1,101 @@
+from sqlalchemy.orm import Session
+from typing import Dict, List, Set
+from datetime import date, datetime
+
+from app.core.config import settings
+from app.services.cache_service import CacheService
+from app.utils.business_calendar import BusinessCalendar
+
+BUSINESS_CALENDAR_CACHE_VERSION_KEY = "business_calendar:version"
+
+
+class BusinessCalendarService:
+    """
+    Working-day arithmetic for leave, payroll and reports. Active holidays
+    are loaded once (HolidayCalendarService.fetch_active_holiday_calendars)
+    and each year becomes a BusinessCalendar of prefix sums, so counting the
+    working days of any range costs one subtraction per calendar year it
+    spans. Calendars are kept for the request (CacheService.remember); with
+    ENABLE_CACHE on they are shared for up to CACHE_TTL, and a holiday change
+    only invalidates them in the worker that made it.
+    """
+
+    @staticmethod
+    def weekend_days() -> Set[int]:
+        """Weekday numbers (Monday = 0) that are never working days"""
+        return {int(day) for day in (settings.PAYROLL_WEEKEND_DAYS or "").split(",") if day.strip()}
+
+    @staticmethod
+    def _cache_key(name: str) -> str:
+        """Cache key tied to the current holiday version (and the weekend setting)"""
+        version = CacheService.get(BUSINESS_CALENDAR_CACHE_VERSION_KEY) or 0
+        return f"business_calendar:{version}:{settings.PAYROLL_WEEKEND_DAYS}:{name}"
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop every cached calendar - call after holiday changes"""
+        version = CacheService.get(BUSINESS_CALENDAR_CACHE_VERSION_KEY) or 0
+        CacheService.set(BUSINESS_CALENDAR_CACHE_VERSION_KEY, version + 1)
+
+    @staticmethod
+    def _load_holidays(db: Session) -> Dict[int, List[date]]:
+        # Imported here: the holiday service invalidates this cache
+        from app.services.holiday_calendar_service import HolidayCalendarService
+
+        holidays = {}
+        for holiday in HolidayCalendarService.fetch_active_holiday_calendars(db):
+            if holiday.HolidayDate:
+                day = holiday.HolidayDate.date() if isinstance(holiday.HolidayDate, datetime) else holiday.HolidayDate
+                holidays.setdefault(day.year, []).append(day)
+        return holidays
+
+    @staticmethod
+    def _holidays_by_year(db: Session) -> Dict[int, List[date]]:
+        return CacheService.remember(
+            db, BusinessCalendarService._cache_key("holidays"),
+            lambda: BusinessCalendarService._load_holidays(db), ttl=settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def calendar(db: Session, year: int) -> BusinessCalendar:
+        """The year's working-day calendar"""
+        return CacheService.remember(
+            db, BusinessCalendarService._cache_key(str(year)),
+            lambda: BusinessCalendar(
+                year,
+                BusinessCalendarService.weekend_days(),
+                BusinessCalendarService._holidays_by_year(db).get(year, ())
+            ),
+            ttl=settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def working_days(db: Session, first: date, last: date) -> int:
+        """Working days between two dates (inclusive)"""
+        return sum(
+            BusinessCalendarService.calendar(db, year).working_days(
+                max(first, date(year, 1, 1)), min(last, date(year, 12, 31))
+            )
+            for year in range(first.year, last.year + 1)
+        )
+
+    @staticmethod
+    def working_dates(db: Session, first: date, last: date) -> List[date]:
+        """The working days between two dates (inclusive)"""
+        return [
+            day
+            for year in range(first.year, last.year + 1)
+            for day in BusinessCalendarService.calendar(db, year).working_dates(
+                max(first, date(year, 1, 1)), min(last, date(year, 12, 31))
+            )
+        ]
+
+    @staticmethod
+    def holidays(db: Session, first: date, last: date) -> Set[date]:
+        """Active holidays between two dates (inclusive)"""
+        return {
+            day
+            for year in range(first.year, last.year + 1)
+            for day in BusinessCalendarService.calendar(db, year).holidays
+            if first <= day <= last
+        }
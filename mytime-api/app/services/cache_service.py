@@ -1,38 +1,102 @@
+import threading
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+# Seconds between sweeps of expired entries
+_SWEEP_INTERVAL = 60
+
 
 class CacheService:
-    """Simple in-memory cache service"""
-    _cache = {}
-    
+    """
+    Simple in-memory cache service. Entries with a TTL are kept in
+    least-recently-used order and bounded by CACHE_MAX_ENTRIES; expired
+    entries are swept out periodically, so keys orphaned by a version
+    bump do not accumulate. Entries without a TTL (the version counters)
+    are never evicted.
+    """
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+    _last_sweep = time.time()
+
     @classmethod
     def get(cls, key: str) -> Optional[Any]:
         """Get value from cache"""
-        if key in cls._cache:
-            value, expiry = cls._cache[key]
-            if expiry is None or time.time() < expiry:
-                return value
-            else:
-                del cls._cache[key]
+        with cls._lock:
+            if key in cls._cache:
+                value, expiry = cls._cache[key]
+                if expiry is None or time.time() < expiry:
+                    cls._cache.move_to_end(key)
+                    return value
+                else:
+                    del cls._cache[key]
         return None
-    
+
     @classmethod
     def set(cls, key: str, value: Any, ttl: Optional[int] = None):
         """Set value in cache with optional TTL"""
-        expiry = time.time() + ttl if ttl else None
-        cls._cache[key] = (value, expiry)
-    
+        now = time.time()
+        expiry = now + ttl if ttl else None
+        with cls._lock:
+            cls._cache[key] = (value, expiry)
+            cls._cache.move_to_end(key)
+            if now - cls._last_sweep > _SWEEP_INTERVAL:
+                cls._sweep_expired(now)
+            if len(cls._cache) > settings.CACHE_MAX_ENTRIES:
+                cls._evict(len(cls._cache) - settings.CACHE_MAX_ENTRIES)
+
+    @classmethod
+    def _sweep_expired(cls, now: float):
+        """Drop every expired entry (lock held)"""
+        cls._last_sweep = now
+        for key in [key for key, (_, expiry) in cls._cache.items() if expiry is not None and expiry <= now]:
+            del cls._cache[key]
+
+    @classmethod
+    def _evict(cls, count: int):
+        """Drop the least recently used entries that have a TTL (lock held)"""
+        victims = []
+        for key, (_, expiry) in cls._cache.items():
+            if expiry is not None:
+                victims.append(key)
+                if len(victims) == count:
+                    break
+        for key in victims:
+            del cls._cache[key]
+
+    @classmethod
+    def remember(cls, db, key: str, build: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        Value of key, built on a miss. Shared across requests of this process
+        only when ENABLE_CACHE is on; otherwise kept on the database session
+        (db.info), so it lasts one request and never outlives a write made by
+        another worker.
+        """
+        if settings.ENABLE_CACHE:
+            value = cls.get(key)
+            if value is None:
+                value = build()
+                cls.set(key, value, ttl=ttl)
+            return value
+        store = db.info.setdefault("cache", {})
+        if key not in store:
+            store[key] = build()
+        return store[key]
+
     @classmethod
     def delete(cls, key: str):
         """Delete value from cache"""
-        if key in cls._cache:
-            del cls._cache[key]
-    
+        with cls._lock:
+            cls._cache.pop(key, None)
+
     @classmethod
     def clear(cls):
         """Clear all cache"""
-        cls._cache.clear()
-    
+        with cls._lock:
+            cls._cache.clear()
+
     @classmethod
     def size(cls) -> int:
         """Get cache size"""
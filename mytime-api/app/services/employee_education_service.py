@@ -4,6 +4,9 @@ from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime
 import logging
 
+from app.schemas.employee_education_schemas import EmployeeEducationUpsert
+from app.schemas.input_types import provided_values
+
 logger = logging.getLogger(__name__)
 
 
@@ -141,73 +144,13 @@ class EmployeeEducationService:
             return [], 0
     
     @staticmethod
-    def insert_or_update_employee_education(db: Session, education_data: dict) -> Dict[str, Any]:
+    def insert_or_update_employee_education(db: Session, education: EmployeeEducationUpsert) -> Dict[str, Any]:
         """Insert or update employee education"""
         try:
             from app.models.employee_education import EmployeeEducation
-            from datetime import datetime
-            
-            # Helper function to parse dates
-            def parse_date(date_value):
-                if date_value is None:
-                    return None
-                if isinstance(date_value, datetime):
-                    return date_value
-                if isinstance(date_value, str):
-                    try:
-                        # Handle ISO format with Z
-                        if date_value.endswith('Z'):
-                            date_value = date_value.replace('Z', '+00:00')
-                        return datetime.fromisoformat(date_value)
-                    except (ValueError, TypeError):
-                        try:
-                            # Try common formats
-                            return datetime.strptime(date_value, '%Y-%m-%dT%H:%M:%S.%fZ')
-                        except:
-                            try:
-                                return datetime.strptime(date_value, '%Y-%m-%dT%H:%M:%SZ')
-                            except:
-                                logger.warning(f"Could not parse date: {date_value}")
-                                return datetime.utcnow()
-                return datetime.utcnow()
-            
-            # Helper function to parse integer IDs
-            def parse_id(id_value, default=0):
-                if id_value is None:
-                    return default
-                if isinstance(id_value, int):
-                    return id_value
-                if isinstance(id_value, str):
-                    try:
-                        return int(id_value.strip()) if id_value.strip() else default
-                    except (ValueError, TypeError):
-                        return default
-                try:
-                    return int(id_value)
-                except:
-                    return default
-            
-            # Create a copy to avoid modifying the original
-            process_data = education_data.copy()
-            
-            # Parse ID fields
-            process_data['EmployeeEducationId'] = parse_id(process_data.get('EmployeeEducationId'), 0)
-            process_data['EmployeeId'] = parse_id(process_data.get('EmployeeId'), None)
-            process_data['CreatedBy'] = parse_id(process_data.get('CreatedBy'), None)
-            process_data['ModifiedBy'] = parse_id(process_data.get('ModifiedBy'), None)
-            
-            # Parse date fields
-            process_data['CreatedOn'] = parse_date(process_data.get('CreatedOn'))
-            process_data['ModifiedOn'] = parse_date(process_data.get('ModifiedOn'))
-            process_data['YearOfCompletion'] = parse_date(process_data.get('YearOfCompletion'))
-            
-            # Ensure IsActive is boolean
-            if 'IsActive' in process_data and process_data['IsActive'] is not None:
-                if isinstance(process_data['IsActive'], str):
-                    process_data['IsActive'] = process_data['IsActive'].lower() in ('true', '1', 'yes')
-            else:
-                process_data['IsActive'] = True
             
+            # Ids, dates and IsActive are already coerced by the request model
+            process_data = provided_values(education)
             employee_education_id = process_data.get('EmployeeEducationId', 0)
             
             if employee_education_id and employee_education_id > 0:
@@ -223,15 +166,11 @@ class EmployeeEducationService:
                         "education": None
                     }
                 
-                # Update all fields
-                db_education.Degree = process_data.get('Degree', db_education.Degree)
-                db_education.FeildOfStudy = process_data.get('FeildOfStudy', db_education.FeildOfStudy)
-                db_education.Institution = process_data.get('Institution', db_education.Institution)
-                db_education.Year = process_data.get('Year', db_education.Year)
-                db_education.PercentageMarks = process_data.get('PercentageMarks', db_education.PercentageMarks)
-                db_education.YearOfCompletion = process_data.get('YearOfCompletion', db_education.YearOfCompletion)
-                db_education.IsActive = process_data.get('IsActive', db_education.IsActive)
-                db_education.ModifiedBy = process_data.get('ModifiedBy', db_education.ModifiedBy)
+                # Update the fields that were sent
+                for key in ('Degree', 'FeildOfStudy', 'Institution', 'Year', 'PercentageMarks',
+                            'YearOfCompletion', 'IsActive', 'ModifiedBy'):
+                    if key in process_data:
+                        setattr(db_education, key, process_data[key])
                 db_education.ModifiedOn = datetime.utcnow()  # Always update to current time
                 
                 db.commit()
@@ -246,7 +185,8 @@ class EmployeeEducationService:
                 # Remove EmployeeEducationId if present in create mode
                 process_data.pop('EmployeeEducationId', None)
                 
-                # Set timestamps
+                # Set defaults and timestamps
+                process_data.setdefault('IsActive', True)
                 if not process_data.get('CreatedOn'):
                     process_data['CreatedOn'] = datetime.utcnow()
                 process_data['ModifiedOn'] = datetime.utcnow()
@@ -4,11 +4,15 @@ from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime
 
 from app.models.employee_emergency_contact import EmployeeEmergencyContact
+from app.services.statistics_service import StatisticsService
 from app.schemas.employee_emergency_contact_schemas import (
     EmployeeEmergencyContactCreate, 
     EmployeeEmergencyContactUpdate
 )
 
+EMERGENCY_CONTACT_STATISTICS = "emergency_contact"
+
+
 class EmployeeEmergencyContactService:
     """Service for EmployeeEmergencyContact operations"""
     
@@ -134,6 +138,7 @@ class EmployeeEmergencyContactService:
             db_contact.ModifiedOn = datetime.utcnow()
             
             db.commit()
+            StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
             db.refresh(db_contact)
             return {
                 "success": True, 
@@ -152,6 +157,7 @@ class EmployeeEmergencyContactService:
             db_contact = EmployeeEmergencyContact(**contact_data)
             db.add(db_contact)
             db.commit()
+            StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
             db.refresh(db_contact)
             return {
                 "success": True, 
@@ -171,6 +177,7 @@ class EmployeeEmergencyContactService:
         
         db.delete(db_contact)
         db.commit()
+        StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
         return {"success": True, "message": "Employee emergency contact deleted successfully"}
     
     @staticmethod
@@ -192,6 +199,7 @@ class EmployeeEmergencyContactService:
         db_contact.ModifiedOn = datetime.utcnow()
         
         db.commit()
+        StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
         db.refresh(db_contact)
         return {
             "success": True, 
@@ -214,6 +222,7 @@ class EmployeeEmergencyContactService:
         db_contact = EmployeeEmergencyContact(**contact_data)
         db.add(db_contact)
         db.commit()
+        StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
         db.refresh(db_contact)
         return db_contact
     
@@ -238,6 +247,7 @@ class EmployeeEmergencyContactService:
                 setattr(db_contact, key, value)
             
             db.commit()
+            StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
             db.refresh(db_contact)
         
         return db_contact
@@ -315,6 +325,7 @@ class EmployeeEmergencyContactService:
             db_contacts.append(db_contact)
         
         db.commit()
+        StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
         
         # Refresh all contacts
         for contact in db_contacts:
@@ -324,38 +335,33 @@ class EmployeeEmergencyContactService:
     
     @staticmethod
     def get_emergency_contact_statistics(db: Session) -> Dict[str, Any]:
-        """Get emergency contact statistics"""
-        # Total records
-        total_records = db.query(func.count(EmployeeEmergencyContact.EmployeeEmergencyContactId)).scalar()
-        
-        # Count by relation
-        relation_counts = db.query(
-            EmployeeEmergencyContact.Relation,
-            func.count(EmployeeEmergencyContact.EmployeeEmergencyContactId).label('count')
-        ).filter(
-            EmployeeEmergencyContact.Relation.isnot(None),
-            EmployeeEmergencyContact.IsActive == True
-        ).group_by(
-            EmployeeEmergencyContact.Relation
-        ).all()
-        
-        # Employees with emergency contacts
-        employees_with_contacts = db.query(
-            func.count(func.distinct(EmployeeEmergencyContact.EmployeeId))
-        ).filter(
-            EmployeeEmergencyContact.IsActive == True
-        ).scalar()
-        
-        return {
-            "total_records": total_records,
-            "by_relation": {relation: count for relation, count in relation_counts},
-            "employees_with_contacts": employees_with_contacts,
-            "common_relations": sorted(
-                [(relation, count) for relation, count in relation_counts],
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]  # Top 10 relations
-        }
+        """Get emergency contact statistics (one grouped query, cached briefly)"""
+        def build() -> Dict[str, Any]:
+            active = EmployeeEmergencyContact.IsActive == True
+            totals, groups = StatisticsService.grouped(db, EmployeeEmergencyContact.Relation, {
+                "total_records": func.count(EmployeeEmergencyContact.EmployeeEmergencyContactId),
+                "active_records": StatisticsService.count_if(active),
+                "employees_with_contacts": StatisticsService.count_distinct_if(
+                    EmployeeEmergencyContact.EmployeeId, active
+                ),
+            })
+            relation_counts = [
+                (relation, measures["active_records"])
+                for relation, measures in groups
+                if relation is not None and measures["active_records"]
+            ]
+            return {
+                "total_records": totals["total_records"],
+                "by_relation": {relation: count for relation, count in relation_counts},
+                "employees_with_contacts": totals["employees_with_contacts"],
+                "common_relations": sorted(
+                    relation_counts,
+                    key=lambda x: x[1],
+                    reverse=True
+                )[:10]  # Top 10 relations
+            }
+
+        return StatisticsService.cached(EMERGENCY_CONTACT_STATISTICS, {}, build)
     
     @staticmethod
     def update_contact_as_primary(
@@ -388,6 +394,7 @@ class EmployeeEmergencyContactService:
         db_contact.ModifiedOn = datetime.utcnow()
         
         db.commit()
+        StatisticsService.invalidate(EMERGENCY_CONTACT_STATISTICS)
         db.refresh(db_contact)
         return {
             "success": True, 
@@ -2,6 +2,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, asc, desc, func
 from typing import Optional, List, Tuple, Dict, Any
 from app.models.employee_salary import EmployeeSalary
+from app.services.payroll_rollup_service import PayrollRollupService
+from app.services.tax_statement_service import TaxStatementService
+from app.utils.period import Period
 
 class EmployeeSalaryService:
     """Service for EmployeeSalary operations - matching C# controller functionality"""
@@ -23,23 +26,70 @@ class EmployeeSalaryService:
         """Get employee salaries by employee ID - matches getEmployeeSalariesByEmployeeId in C#"""
         return db.query(EmployeeSalary).filter(EmployeeSalary.EmployeeId == employee_id).all()
     
+    @staticmethod
+    def fetch_employee_salaries_by_financial_year(
+        db: Session, financial_year: int, employee_id: Optional[int] = None
+    ) -> List[EmployeeSalary]:
+        """Get employee salaries of a financial year (April-March, by start year) in period order"""
+        query = db.query(EmployeeSalary).filter(EmployeeSalary.FinancialYear == financial_year)
+        if employee_id is not None:
+            query = query.filter(EmployeeSalary.EmployeeId == employee_id)
+        return query.order_by(EmployeeSalary.EmployeeId, EmployeeSalary.SalaryPeriod).all()
+    
+    @staticmethod
+    def fetch_employee_salaries_by_period_range(
+        db: Session, from_period: int, to_period: int, employee_id: Optional[int] = None
+    ) -> List[EmployeeSalary]:
+        """Get employee salaries between two YYYYMM periods (inclusive) in period order"""
+        if from_period > to_period:
+            raise ValueError(f"from_period {from_period} is after to_period {to_period}")
+        # Validates both keys
+        Period.from_key(from_period)
+        Period.from_key(to_period)
+        query = db.query(EmployeeSalary).filter(
+            EmployeeSalary.SalaryPeriod >= from_period,
+            EmployeeSalary.SalaryPeriod <= to_period
+        )
+        if employee_id is not None:
+            query = query.filter(EmployeeSalary.EmployeeId == employee_id)
+        return query.order_by(EmployeeSalary.EmployeeId, EmployeeSalary.SalaryPeriod).all()
+    
+    @staticmethod
+    def _apply_period(employee_salary: EmployeeSalary) -> None:
+        """Keep SalaryPeriod / FinancialYear in step with SalaryMonth / SalaryYear"""
+        if not employee_salary.SalaryMonth or not employee_salary.SalaryYear:
+            return
+        period = Period.from_month_name(employee_salary.SalaryMonth, employee_salary.SalaryYear)
+        employee_salary.SalaryPeriod = period.key
+        employee_salary.FinancialYear = period.financial_year
+    
     @staticmethod
     def create_employee_salaries_bulk(db: Session, salaries: List[Dict[str, Any]]) -> List[EmployeeSalary]:
         """Bulk insert employee salaries - matches createEmployeeSalariesBulk in C#"""
         employee_salaries = [EmployeeSalary(**salary) for salary in salaries]
+        for employee_salary in employee_salaries:
+            EmployeeSalaryService._apply_period(employee_salary)
         db.add_all(employee_salaries)
         db.commit()
         for salary in employee_salaries:
             db.refresh(salary)
+        PayrollRollupService.refresh_after_write(db, [salary.SalaryPeriod for salary in employee_salaries])
+        TaxStatementService.invalidate_cache(
+            salary.FinancialYear for salary in employee_salaries if salary.FinancialYear is not None
+        )
         return employee_salaries
     
     @staticmethod
     def create_employee_salary(db: Session, salary_data: Dict[str, Any]) -> EmployeeSalary:
         """Create a single employee salary - matches createEmployeeSalary in C#"""
         employee_salary = EmployeeSalary(**salary_data)
+        EmployeeSalaryService._apply_period(employee_salary)
         db.add(employee_salary)
         db.commit()
         db.refresh(employee_salary)
+        PayrollRollupService.refresh_after_write(db, [employee_salary.SalaryPeriod])
+        if employee_salary.FinancialYear is not None:
+            TaxStatementService.invalidate_cache([employee_salary.FinancialYear])
         return employee_salary
     
     @staticmethod
@@ -48,11 +98,21 @@ class EmployeeSalaryService:
         db_salary = db.query(EmployeeSalary).filter(EmployeeSalary.EmployeeSalaryId == employee_salary_id).first()
         if not db_salary:
             return None
+        previous_period = db_salary.SalaryPeriod
+        previous_financial_year = db_salary.FinancialYear
         
         for key, value in salary_data.items():
             if key != 'EmployeeSalaryId' and value is not None:
                 setattr(db_salary, key, value)
+        EmployeeSalaryService._apply_period(db_salary)
+        
+        # Manual edits invalidate the publish content hash
+        db_salary.RowHash = None
         
         db.commit()
         db.refresh(db_salary)
+        PayrollRollupService.refresh_after_write(db, [previous_period, db_salary.SalaryPeriod])
+        TaxStatementService.invalidate_cache(
+            year for year in (previous_financial_year, db_salary.FinancialYear) if year is not None
+        )
         return db_salary
\ No newline at end of file
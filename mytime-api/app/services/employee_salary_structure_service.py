@@ -6,11 +6,17 @@ from decimal import Decimal
 
 from app.models.employee_salary_structure import EmployeeSalaryStructure
 from app.models.employee import Employee
+from app.models.designation import Designation
+from app.core.config import settings
+from app.services.cache_service import CacheService
 from app.schemas.employee_salary_structure_schemas import (
     EmployeeSalaryStructureCreate, 
     EmployeeSalaryStructureUpdate
 )
 
+SALARY_STRUCTURE_CACHE_VERSION_KEY = "salary_structure:version"
+
+
 class EmployeeSalaryStructureService:
     """Service for EmployeeSalaryStructure operations"""
     
@@ -208,6 +214,7 @@ class EmployeeSalaryStructureService:
             db_salary.GROSSDEDUCTIONS = totals["GROSSDEDUCTIONS"]
             
             db.commit()
+            EmployeeSalaryStructureService.invalidate_cache()
             db.refresh(db_salary)
             return {
                 "success": True, 
@@ -233,6 +240,7 @@ class EmployeeSalaryStructureService:
             db_salary = EmployeeSalaryStructure(**salary_data)
             db.add(db_salary)
             db.commit()
+            EmployeeSalaryStructureService.invalidate_cache()
             db.refresh(db_salary)
             return {
                 "success": True, 
@@ -253,6 +261,7 @@ class EmployeeSalaryStructureService:
         
         db.delete(db_salary)
         db.commit()
+        EmployeeSalaryStructureService.invalidate_cache()
         return {"success": True, "message": "Employee salary structure deleted successfully"}
     
     @staticmethod
@@ -274,6 +283,7 @@ class EmployeeSalaryStructureService:
         db_salary.ModifiedOn = datetime.utcnow()
         
         db.commit()
+        EmployeeSalaryStructureService.invalidate_cache()
         db.refresh(db_salary)
         return {
             "success": True, 
@@ -302,6 +312,7 @@ class EmployeeSalaryStructureService:
         db_salary = EmployeeSalaryStructure(**salary_data)
         db.add(db_salary)
         db.commit()
+        EmployeeSalaryStructureService.invalidate_cache()
         db.refresh(db_salary)
         return db_salary
     
@@ -332,6 +343,7 @@ class EmployeeSalaryStructureService:
             db_salary.GROSSDEDUCTIONS = totals["GROSSDEDUCTIONS"]
             
             db.commit()
+            EmployeeSalaryStructureService.invalidate_cache()
             db.refresh(db_salary)
         
         return db_salary
@@ -408,45 +420,53 @@ class EmployeeSalaryStructureService:
             }
         }
     
+    @staticmethod
+    def _gross_earnings_expr():
+        """SQL counterpart of calculate_salary_totals' gross earnings"""
+        return (
+            func.coalesce(EmployeeSalaryStructure.BASIC, 0)
+            + func.coalesce(EmployeeSalaryStructure.HRA, 0)
+            + func.coalesce(EmployeeSalaryStructure.CONVEYANCE, 0)
+            + func.coalesce(EmployeeSalaryStructure.MEDICALALLOWANCE, 0)
+            + func.coalesce(EmployeeSalaryStructure.SPECIALALLOWANCE, 0)
+            + func.coalesce(EmployeeSalaryStructure.SPECIALBONUS, 0)
+            + func.coalesce(EmployeeSalaryStructure.STATUTORYBONUS, 0)
+            + func.coalesce(EmployeeSalaryStructure.OTHERS, 0)
+        )
+    
+    @staticmethod
+    def _gross_deductions_expr():
+        """SQL counterpart of calculate_salary_totals' gross deductions"""
+        return (
+            func.coalesce(EmployeeSalaryStructure.PF, 0)
+            + func.coalesce(EmployeeSalaryStructure.ESIC, 0)
+            + func.coalesce(EmployeeSalaryStructure.PROFESSIONALTAX, 0)
+            + func.coalesce(EmployeeSalaryStructure.GroupHealthInsurance, 0)
+        )
+    
+    @staticmethod
+    def _cache_key(name: str, *parts: Any) -> str:
+        """Cache key tied to the current salary structure version"""
+        version = CacheService.get(SALARY_STRUCTURE_CACHE_VERSION_KEY) or 0
+        return ":".join(["salary_structure", str(version), name] + [str(part) for part in parts])
+    
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop cached statistics/reports - call after any salary structure change"""
+        version = CacheService.get(SALARY_STRUCTURE_CACHE_VERSION_KEY) or 0
+        CacheService.set(SALARY_STRUCTURE_CACHE_VERSION_KEY, version + 1)
+    
     @staticmethod
     def get_salary_statistics(db: Session) -> Dict[str, Any]:
-        """Get salary statistics"""
-        # Basic statistics
-        total_employees = db.query(func.count(EmployeeSalaryStructure.EmployeeSalaryStructureId)).filter(
-            EmployeeSalaryStructure.IsActive == True
-        ).scalar()
-        
-        # Average values
-        avg_basic = db.query(func.avg(EmployeeSalaryStructure.BASIC)).filter(
-            EmployeeSalaryStructure.IsActive == True
-        ).scalar() or 0
-        
-        avg_gross_earnings = db.query(func.avg(EmployeeSalaryStructure.GROSSEARNINGS)).filter(
-            EmployeeSalaryStructure.IsActive == True
-        ).scalar() or 0
-        
-        # Calculate average net take-home
-        avg_net_query = db.query(
-            func.avg(
-                EmployeeSalaryStructure.GROSSEARNINGS - EmployeeSalaryStructure.GROSSDEDUCTIONS
-            )
-        ).filter(
-            EmployeeSalaryStructure.IsActive == True
-        ).scalar() or 0
-        
-        # Highest and lowest salaries
-        highest_salary = db.query(
-            func.max(EmployeeSalaryStructure.GROSSEARNINGS)
-        ).filter(
-            EmployeeSalaryStructure.IsActive == True
-        ).scalar() or 0
-        
-        lowest_salary = db.query(
-            func.min(EmployeeSalaryStructure.GROSSEARNINGS)
-        ).filter(
-            EmployeeSalaryStructure.IsActive == True,
-            EmployeeSalaryStructure.GROSSEARNINGS > 0
-        ).scalar() or 0
+        """Get salary statistics (one aggregate query, reused while structures are unchanged)"""
+        return CacheService.remember(
+            db, EmployeeSalaryStructureService._cache_key("statistics"),
+            lambda: EmployeeSalaryStructureService._query_salary_statistics(db), ttl=settings.CACHE_TTL
+        )
+    
+    @staticmethod
+    def _query_salary_statistics(db: Session) -> Dict[str, Any]:
+        gross = EmployeeSalaryStructure.GROSSEARNINGS
         
         # Salary distribution
         salary_ranges = [
@@ -457,80 +477,134 @@ class EmployeeSalaryStructureService:
             (120000, 200000, "1.2L - 2L"),
             (200000, 999999999, "Above 2L")
         ]
+        band_columns = [
+            func.sum(case((and_(gross >= min_val, gross < max_val), 1), else_=0)).label(f"band_{i}")
+            for i, (min_val, max_val, _) in enumerate(salary_ranges)
+        ]
         
-        distribution = {}
-        for min_val, max_val, label in salary_ranges:
-            count = db.query(func.count(EmployeeSalaryStructure.EmployeeSalaryStructureId)).filter(
-                EmployeeSalaryStructure.IsActive == True,
-                EmployeeSalaryStructure.GROSSEARNINGS >= min_val,
-                EmployeeSalaryStructure.GROSSEARNINGS < max_val
-            ).scalar()
-            distribution[label] = count
+        row = db.query(
+            func.count(EmployeeSalaryStructure.EmployeeSalaryStructureId).label("total_employees"),
+            func.avg(EmployeeSalaryStructure.BASIC).label("avg_basic"),
+            func.avg(gross).label("avg_gross_earnings"),
+            func.avg(gross - EmployeeSalaryStructure.GROSSDEDUCTIONS).label("avg_net"),
+            func.max(gross).label("highest_salary"),
+            func.min(case((gross > 0, gross), else_=None)).label("lowest_salary"),
+            *band_columns
+        ).filter(
+            EmployeeSalaryStructure.IsActive == True
+        ).one()
+        
+        distribution = {
+            label: int(getattr(row, f"band_{i}") or 0)
+            for i, (_, _, label) in enumerate(salary_ranges)
+        }
         
         return {
-            "total_employees": total_employees,
-            "average_basic": Decimal(str(avg_basic)),
-            "average_gross_earnings": Decimal(str(avg_gross_earnings)),
-            "average_net_takehome": Decimal(str(avg_net_query)),
-            "highest_salary": Decimal(str(highest_salary)),
-            "lowest_salary": Decimal(str(lowest_salary)),
+            "total_employees": row.total_employees or 0,
+            "average_basic": Decimal(str(row.avg_basic or 0)),
+            "average_gross_earnings": Decimal(str(row.avg_gross_earnings or 0)),
+            "average_net_takehome": Decimal(str(row.avg_net or 0)),
+            "highest_salary": Decimal(str(row.highest_salary or 0)),
+            "lowest_salary": Decimal(str(row.lowest_salary or 0)),
             "salary_distribution": distribution
         }
     
     @staticmethod
-    def get_salary_comparison_report(db: Session, department_id: Optional[int] = None) -> Dict[str, Any]:
-        """Get salary comparison report"""
-        query = db.query(
-            EmployeeSalaryStructure,
-            Employee
-        ).join(
-            Employee, EmployeeSalaryStructure.EmployeeId == Employee.EmployeeId
-        ).filter(
-            EmployeeSalaryStructure.IsActive == True
-        )
-        
-        if department_id:
-            query = query.filter(Employee.DepartmentId == department_id)
+    def get_salary_comparison_report(
+        db: Session,
+        department_id: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Get salary comparison report.
+        Per-designation totals come from one GROUP BY query (reused while
+        structures are unchanged, see CacheService.remember); the
+        per-employee detail is paginated.
+        """
+        gross_expr = EmployeeSalaryStructureService._gross_earnings_expr()
+        net_expr = gross_expr - EmployeeSalaryStructureService._gross_deductions_expr()
+        
+        def base_query(*columns):
+            query = db.query(*columns).join(
+                Employee, EmployeeSalaryStructure.EmployeeId == Employee.EmployeeId
+            ).outerjoin(
+                Designation, Designation.DesignationId == Employee.DesignationId
+            ).filter(
+                EmployeeSalaryStructure.IsActive == True
+            )
+            if department_id:
+                query = query.filter(Employee.DepartmentId == department_id)
+            return query
+        
+        def build_summary() -> Dict[str, Any]:
+            # Grouped on the id with names looked up afterwards, not on a
+            # COALESCE of the name: SQL Server binds the "Unknown" literal
+            # separately in SELECT and GROUP BY and rejects the statement (8120)
+            rows = base_query(
+                Designation.DesignationId,
+                func.count(EmployeeSalaryStructure.EmployeeSalaryStructureId).label("count"),
+                func.sum(func.coalesce(EmployeeSalaryStructure.BASIC, 0)).label("total_basic"),
+                func.sum(gross_expr).label("total_gross")
+            ).group_by(Designation.DesignationId).all()
+            designation_ids = [row.DesignationId for row in rows if row.DesignationId is not None]
+            names = dict(db.query(Designation.DesignationId, Designation.Name).filter(
+                Designation.DesignationId.in_(designation_ids)
+            ).all()) if designation_ids else {}
+            
+            by_designation = {}
+            for row in rows:
+                # Designations sharing a name are reported together, as before
+                data = by_designation.setdefault(names.get(row.DesignationId) or "Unknown", {
+                    "count": 0, "total_basic": Decimal("0"), "total_gross": Decimal("0"),
+                })
+                data["count"] += row.count
+                data["total_basic"] += Decimal(str(row.total_basic or 0))
+                data["total_gross"] += Decimal(str(row.total_gross or 0))
+            for data in by_designation.values():
+                data["avg_basic"] = data["total_basic"] / data["count"] if data["count"] else Decimal("0")
+                data["avg_gross"] = data["total_gross"] / data["count"] if data["count"] else Decimal("0")
+            return {
+                "total_employees": sum(data["count"] for data in by_designation.values()),
+                "by_designation": by_designation
+            }
         
-        results = query.all()
+        summary = CacheService.remember(
+            db, EmployeeSalaryStructureService._cache_key("comparison", department_id),
+            build_summary, ttl=settings.CACHE_TTL
+        )
         
-        # Group by designation
-        by_designation = {}
-        for salary, employee in results:
-            designation = "Unknown"
-            if hasattr(employee, 'Designation') and employee.Designation:
-                designation = employee.Designation
-            elif hasattr(employee, 'designation') and employee.designation:
-                designation = employee.designation
-            
-            if designation not in by_designation:
-                by_designation[designation] = {
-                    "count": 0,
-                    "total_basic": Decimal('0'),
-                    "total_gross": Decimal('0'),
-                    "salaries": []
-                }
-            
-            totals = EmployeeSalaryStructureService.calculate_salary_totals(salary)
-            by_designation[designation]["count"] += 1
-            by_designation[designation]["total_basic"] += (salary.BASIC or 0)
-            by_designation[designation]["total_gross"] += totals["GROSSEARNINGS"]
-            by_designation[designation]["salaries"].append({
-                "employee_id": employee.EmployeeId,
-                "employee_name": f"{employee.FirstName} {employee.LastName}".strip(),
-                "basic": salary.BASIC or 0,
-                "gross": totals["GROSSEARNINGS"],
-                "net": totals["NETTAKEHOME"]
-            })
-        
-        # Calculate averages
-        for designation in by_designation:
-            data = by_designation[designation]
-            if data["count"] > 0:
-                data["avg_basic"] = data["total_basic"] / data["count"]
-                data["avg_gross"] = data["total_gross"] / data["count"]
+        page = max(1, page)
+        page_size = max(1, page_size)
+        detail_rows = base_query(
+            Designation.Name.label("designation"),
+            Employee.EmployeeId,
+            Employee.FirstName,
+            Employee.LastName,
+            EmployeeSalaryStructure.BASIC,
+            gross_expr.label("gross"),
+            net_expr.label("net")
+        ).order_by(
+            Designation.Name, Employee.EmployeeId
+        ).offset((page - 1) * page_size).limit(page_size).all()
         
         return {
-            "total_employees": len(results),
-            "by_designation": by_designation
-        }
\ No newline at end of file
+            "total_employees": summary["total_employees"],
+            "by_designation": summary["by_designation"],
+            "employees": {
+                "items": [
+                    {
+                        "designation": row.designation or "Unknown",
+                        "employee_id": row.EmployeeId,
+                        "employee_name": f"{row.FirstName or ''} {row.LastName or ''}".strip(),
+                        "basic": Decimal(str(row.BASIC or 0)),
+                        "gross": Decimal(str(row.gross or 0)),
+                        "net": Decimal(str(row.net or 0)),
+                    }
+                    for row in detail_rows
+                ],
+                "total": summary["total_employees"],
+                "page": page,
+                "page_size": page_size,
+            }
+        }
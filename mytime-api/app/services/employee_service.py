@@ -2,10 +2,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, asc, desc, func
 from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime
-from decimal import Decimal
 
 from app.models.employee import Employee
-from app.schemas.employee_schemas import EmployeeCreate, EmployeeUpdate
+from app.schemas.employee_schemas import EmployeeCreate, EmployeeUpdate, EmployeeUpsert
+from app.schemas.input_types import provided_values
+from app.services.payroll_forecast_service import PayrollForecastService
+from app.services.reporting_hierarchy_service import ReportingHierarchyService
+from app.services.statistics_service import StatisticsService
+
+EMPLOYEE_STATISTICS = "employee"
+
 
 class EmployeeService:
     """Service for Employee operations"""
@@ -111,72 +117,13 @@ class EmployeeService:
         return items, total
     
     @staticmethod
-    def insert_or_update_employee(db: Session, employee_data: dict) -> Dict[str, Any]:
+    def insert_or_update_employee(db: Session, employee: EmployeeUpsert) -> Dict[str, Any]:
         """Insert or update employee"""
         try:
-            employee_id = employee_data.get('EmployeeId')
-            
-            # Handle the typo in the incoming data
-            # The database column is named 'OfferRelesedOn' (with typo), but incoming JSON might have different keys
-            # We'll accept both spellings and standardize to the correct DB column name
-            if 'OfferReleasedOn' in employee_data:
-                # If using correct spelling, rename to match DB column
-                employee_data['OfferRelesedOn'] = employee_data.pop('OfferReleasedOn')
-            
-            # Ensure date fields are proper datetime objects
-            date_fields = [
-                'DateOfBirth', 'StartedOn', 'EndedOn', 'ResignedOn',
-                'LastWorkingDay', 'OfferRelesedOn', 'OfferAcceptedOn',
-                'CreatedOn', 'ModifiedOn'
-            ]
-            
-            for field in date_fields:
-                if field in employee_data and employee_data[field] is not None:
-                    try:
-                        if isinstance(employee_data[field], str):
-                            date_str = employee_data[field]
-                            # Handle ISO format with Z
-                            if 'Z' in date_str:
-                                date_str = date_str.replace('Z', '+00:00')
-                            employee_data[field] = datetime.fromisoformat(date_str)
-                        elif isinstance(employee_data[field], datetime):
-                            # Already a datetime object
-                            continue
-                        else:
-                            # Unsupported type
-                            employee_data[field] = None
-                    except (ValueError, AttributeError) as e:
-                        print(f"WARNING: Failed to parse date field {field}: {str(e)}")
-                        employee_data[field] = None
-            
-            # Handle integer conversion for ID fields
-            int_fields = ['CreatedBy', 'ModifiedBy', 'UserId', 'RoleId', 
-                         'DepartmentId', 'DesignationId']
-            for field in int_fields:
-                if field in employee_data and employee_data[field] is not None:
-                    try:
-                        if isinstance(employee_data[field], str):
-                            employee_data[field] = int(employee_data[field])
-                        elif not isinstance(employee_data[field], int):
-                            employee_data[field] = None
-                    except (ValueError, TypeError):
-                        employee_data[field] = None
-            
-            # Handle numeric fields - convert to Decimal for SQLAlchemy
-            numeric_fields = ['OfferPrice', 'CurrentPrice', 'JoiningBonus']
-            for field in numeric_fields:
-                if field in employee_data and employee_data[field] is not None:
-                    try:
-                        if isinstance(employee_data[field], (int, float)):
-                            employee_data[field] = Decimal(str(employee_data[field]))
-                        elif isinstance(employee_data[field], str):
-                            employee_data[field] = Decimal(employee_data[field])
-                    except (ValueError, TypeError, InvalidOperation):
-                        employee_data[field] = None
-            
-            # Handle boolean fields
-            if 'IsActive' in employee_data and isinstance(employee_data['IsActive'], str):
-                employee_data['IsActive'] = employee_data['IsActive'].lower() in ['true', '1', 'yes']
+            employee_id = employee.EmployeeId
+            # Dates, ids, amounts and IsActive are already coerced by the
+            # request model (OfferReleasedOn arrives as OfferRelesedOn)
+            employee_data = provided_values(employee)
             
             if employee_id:
                 # Update existing employee
@@ -195,6 +142,10 @@ class EmployeeService:
                 
                 db.commit()
                 db.refresh(db_employee)
+                # Names and designations are part of the cached org chart
+                ReportingHierarchyService.invalidate_cache()
+                PayrollForecastService.invalidate_cache()
+                StatisticsService.invalidate(EMPLOYEE_STATISTICS)
                 return {
                     "success": True, 
                     "message": "Employee updated successfully",
@@ -232,6 +183,8 @@ class EmployeeService:
                 db.add(db_employee)
                 db.commit()
                 db.refresh(db_employee)
+                PayrollForecastService.invalidate_cache()
+                StatisticsService.invalidate(EMPLOYEE_STATISTICS)
                 return {
                     "success": True, 
                     "message": "Employee created successfully",
@@ -253,6 +206,9 @@ class EmployeeService:
         
         db.delete(db_employee)
         db.commit()
+        ReportingHierarchyService.invalidate_cache()
+        PayrollForecastService.invalidate_cache()
+        StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return {"success": True, "message": "Employee deleted successfully"}
     
     @staticmethod
@@ -268,6 +224,8 @@ class EmployeeService:
         
         db.commit()
         db.refresh(db_employee)
+        PayrollForecastService.invalidate_cache()
+        StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return {
             "success": True, 
             "message": "Employee deactivated successfully",
@@ -298,6 +256,8 @@ class EmployeeService:
         db.add(db_employee)
         db.commit()
         db.refresh(db_employee)
+        PayrollForecastService.invalidate_cache()
+        StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return db_employee
     
     @staticmethod
@@ -319,6 +279,9 @@ class EmployeeService:
             
             db.commit()
             db.refresh(db_employee)
+            ReportingHierarchyService.invalidate_cache()
+            PayrollForecastService.invalidate_cache()
+            StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return db_employee
     
     @staticmethod
@@ -370,6 +333,8 @@ class EmployeeService:
             db_employee.ModifiedOn = datetime.utcnow()
             db.commit()
             db.refresh(db_employee)
+            PayrollForecastService.invalidate_cache()
+            StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return db_employee
     
     @staticmethod
@@ -394,31 +359,27 @@ class EmployeeService:
             synchronize_session=False
         )
         db.commit()
+        PayrollForecastService.invalidate_cache()
+        StatisticsService.invalidate(EMPLOYEE_STATISTICS)
         return result
     
     @staticmethod
     def get_employee_statistics(db: Session) -> Dict[str, Any]:
-        """Get employee statistics"""
-        total_employees = db.query(func.count(Employee.EmployeeId)).scalar()
-        active_employees = db.query(func.count(Employee.EmployeeId)).filter(Employee.IsActive == True).scalar()
-        inactive_employees = total_employees - active_employees if total_employees else 0
-        
-        # Count by department
-        dept_stats = db.query(
-            Employee.DepartmentId,
-            func.count(Employee.EmployeeId).label('count')
-        ).filter(
-            Employee.IsActive == True
-        ).group_by(
-            Employee.DepartmentId
-        ).all()
-        
-        return {
-            "total_employees": total_employees or 0,
-            "active_employees": active_employees or 0,
-            "inactive_employees": inactive_employees,
-            "department_statistics": [
-                {"department_id": dept_id, "employee_count": count} 
-                for dept_id, count in dept_stats
-            ]
-        }
\ No newline at end of file
+        """Get employee statistics (one grouped query, cached briefly)"""
+        def build() -> Dict[str, Any]:
+            totals, groups = StatisticsService.grouped(db, Employee.DepartmentId, {
+                "total_employees": func.count(Employee.EmployeeId),
+                "active_employees": StatisticsService.count_if(Employee.IsActive == True),
+            })
+            return {
+                "total_employees": totals["total_employees"],
+                "active_employees": totals["active_employees"],
+                "inactive_employees": totals["total_employees"] - totals["active_employees"],
+                "department_statistics": [
+                    {"department_id": dept_id, "employee_count": measures["active_employees"]}
+                    for dept_id, measures in groups
+                    if measures["active_employees"]
+                ]
+            }
+
+        return StatisticsService.cached(EMPLOYEE_STATISTICS, {}, build)
\ No newline at end of file
@@ -5,6 +5,8 @@ from datetime import date, datetime
 
 from app.models.holiday_callender import HolidayCallender
 from app.schemas.holiday_calendar_schemas import HolidayCalendarCreate, HolidayCalendarUpdate
+from app.services.business_calendar_service import BusinessCalendarService
+from app.services.team_calendar_service import TeamCalendarService
 
 
 class HolidayCalendarService:
@@ -44,6 +46,8 @@ class HolidayCalendarService:
             
             db.commit()
             db.refresh(db_holiday)
+            TeamCalendarService.invalidate_cache()
+            BusinessCalendarService.invalidate_cache()
             return {
                 "success": True, 
                 "message": "Holiday updated successfully",
@@ -56,6 +60,8 @@ class HolidayCalendarService:
             db.add(db_holiday)
             db.commit()
             db.refresh(db_holiday)
+            TeamCalendarService.invalidate_cache()
+            BusinessCalendarService.invalidate_cache()
             return {
                 "success": True, 
                 "message": "Holiday created successfully",
@@ -71,4 +77,6 @@ class HolidayCalendarService:
         
         db.delete(db_holiday)
         db.commit()
+        TeamCalendarService.invalidate_cache()
+        BusinessCalendarService.invalidate_cache()
         return {"success": True, "message": "Holiday deleted successfully"}
\ No newline at end of file
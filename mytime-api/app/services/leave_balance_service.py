@@ -1,9 +1,46 @@
 
+from sqlalchemy import (
+    BigInteger, Boolean, Integer, DateTime, bindparam, case, cast, exists, func, insert, literal, select,
+    true, update
+)
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from typing import Any, Dict, Iterable, Optional, Tuple
 from app.models.leave_balance_model import LeaveBalance
 from app.models.leavetype import LeaveType
+from app.models.user import User
 from datetime import datetime
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# INSERT INTO LeaveBalance (...) SELECT ... FROM LeaveType WHERE Id = :leave_type_id
+# AND NOT EXISTS (active balance of that user, type and year)
+# (a Core statement on the table, so a parameter list runs as a plain executemany)
+_INSERT_MISSING_BALANCE = insert(LeaveBalance.__table__).from_select(
+    ["UserId", "LeaveTypeId", "Year", "TotalLeaves", "UsedLeaves", "RemainingLeaves", "CreatedOn", "IsActive"],
+    select(
+        cast(bindparam("user_id"), BigInteger),
+        LeaveType.Id,
+        cast(bindparam("year"), Integer),
+        func.coalesce(LeaveType.MaxDaysPerYear, 0),
+        literal(0, Integer),
+        func.coalesce(LeaveType.MaxDaysPerYear, 0),
+        cast(bindparam("now"), DateTime),
+        literal(True, Boolean)
+    ).where(
+        LeaveType.Id == bindparam("leave_type_id"),
+        ~exists(
+            select(LeaveBalance.Id).where(
+                LeaveBalance.UserId == bindparam("user_id"),
+                LeaveBalance.LeaveTypeId == bindparam("leave_type_id"),
+                LeaveBalance.Year == bindparam("year"),
+                LeaveBalance.IsActive == True
+            ).with_hint(LeaveBalance, "WITH (UPDLOCK, HOLDLOCK)", "mssql")
+        )
+    )
+)
 
 
 class LeaveBalanceService:
@@ -61,71 +98,82 @@ class LeaveBalanceService:
             )
 
     @staticmethod
-    def update_balance(db: Session, user_id: int, leave_type_id: int, days: int):
-        try:
-            current_year = datetime.now().year
+    def ensure_balances(db: Session, keys: Iterable[Tuple[int, int]], year: int) -> None:
+        """
+        Create the missing (user, leave type) balances of a year from
+        LeaveType.MaxDaysPerYear: one guarded INSERT ... SELECT per key, sent
+        as a single executemany. UPDLOCK/HOLDLOCK on the existence check
+        (SQL Server) stops concurrent callers from creating the same balance
+        twice. Does not commit.
+        """
+        params = [{"user_id": user_id, "leave_type_id": leave_type_id, "year": year, "now": datetime.utcnow()}
+                  for user_id, leave_type_id in dict.fromkeys(keys)]
+        if params:
+            db.execute(_INSERT_MISSING_BALANCE, params)
+
+    @staticmethod
+    def consume(db: Session, user_id: int, leave_type_id: int, days: int, year: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Deduct days from a balance with one conditional UPDATE (the row is
+        only changed while RemainingLeaves >= days), creating the balance
+        first when it does not exist. Nothing is read beforehand, so
+        concurrent approvals can neither oversubscribe a balance nor wait on
+        each other's reads. Does not commit.
+        """
+        year = year or datetime.now().year
+        LeaveBalanceService.ensure_balances(db, [(user_id, leave_type_id)], year)
+
+        row = db.execute(
+            update(LeaveBalance).where(
+                LeaveBalance.UserId == user_id,
+                LeaveBalance.LeaveTypeId == leave_type_id,
+                LeaveBalance.Year == year,
+                LeaveBalance.IsActive == True,
+                LeaveBalance.RemainingLeaves >= days
+            ).values(
+                UsedLeaves=func.coalesce(LeaveBalance.UsedLeaves, 0) + days,
+                RemainingLeaves=LeaveBalance.RemainingLeaves - days,
+                ModifiedOn=datetime.utcnow()
+            ).returning(
+                LeaveBalance.UsedLeaves, LeaveBalance.RemainingLeaves
+            ).execution_options(synchronize_session=False)
+        ).first()
 
-            balance = db.query(LeaveBalance).filter(
+        if row is None:
+            # Only the failure path reads: no balance means no such leave type
+            found = db.query(LeaveBalance.Id).filter(
                 LeaveBalance.UserId == user_id,
                 LeaveBalance.LeaveTypeId == leave_type_id,
-                LeaveBalance.Year == current_year,
+                LeaveBalance.Year == year,
                 LeaveBalance.IsActive == True
             ).first()
-
-            if not balance:
-                leave_type = db.query(LeaveType).filter(
-                    LeaveType.Id == leave_type_id
-                ).first()
-
-                if not leave_type:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="Leave type not found"
-                    )
-
-                max_leaves = leave_type.MaxDaysPerYear
-
-                balance = LeaveBalance(
-                    UserId=user_id,
-                    LeaveTypeId=leave_type_id,
-                    Year=current_year,
-                    TotalLeaves=max_leaves,
-                    UsedLeaves=0,
-                    RemainingLeaves=max_leaves,
-                    CreatedOn=datetime.utcnow(),
-                    IsActive=True
-                )
-
-                db.add(balance)
-                db.flush()  
-
-            if balance.RemainingLeaves is None:
-                balance.RemainingLeaves = 0
-
-            if balance.UsedLeaves is None:
-                balance.UsedLeaves = 0
-
-            if days > balance.RemainingLeaves:
+            if found is None:
                 raise HTTPException(
-                    status_code=400,
-                    detail="Leave balance exceeded"
+                    status_code=404,
+                    detail="Leave type not found"
                 )
+            raise HTTPException(
+                status_code=400,
+                detail="Leave balance exceeded"
+            )
 
-            balance.UsedLeaves += days
-            balance.RemainingLeaves -= days
-            balance.ModifiedOn = datetime.utcnow()
+        return {
+            "UserId": user_id,
+            "LeaveTypeId": leave_type_id,
+            "UsedLeaves": row.UsedLeaves,
+            "RemainingLeaves": row.RemainingLeaves
+        }
 
+    @staticmethod
+    def update_balance(db: Session, user_id: int, leave_type_id: int, days: int):
+        try:
+            data = LeaveBalanceService.consume(db, user_id, leave_type_id, days)
             db.commit()
 
             return {
                 "success": True,
                 "message": "Leave balance updated successfully",
-                "data": {
-                    "UserId": balance.UserId,
-                    "LeaveTypeId": balance.LeaveTypeId,
-                    "UsedLeaves": balance.UsedLeaves,
-                    "RemainingLeaves": balance.RemainingLeaves
-                }
+                "data": data
             }
 
         except HTTPException:
@@ -137,4 +185,109 @@ class LeaveBalanceService:
             raise HTTPException(
                 status_code=500,
                 detail=f"Error updating leave balance: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def rollover(db: Session, year: int) -> Dict[str, Any]:
+        """
+        Create every balance of year + 1 with three set-based statements:
+
+        1. balances of year + 1 created before the rollover (by an early
+           approval) get their carry-forward added
+        2. each active balance of `year` becomes a year + 1 balance of
+           MaxDaysPerYear plus the carry-forward
+        3. every other active user x active leave type starts at MaxDaysPerYear
+
+        The carry-forward is the unused days, capped at the leave type's
+        CarryForwardDays (NULL or 0 resets the balance). CarriedForwardLeaves
+        records what was carried, so running the rollover again changes
+        nothing.
+        """
+        next_year = year + 1
+        balance = LeaveBalance.__table__
+        previous = balance.alias("previous")
+        following = balance.alias("following")
+        leave_type = LeaveType.__table__
+        user = User.__table__
+
+        unused = func.coalesce(previous.c.RemainingLeaves, 0)
+        cap = func.coalesce(leave_type.c.CarryForwardDays, 0)
+        carry = case((unused <= 0, 0), (unused > cap, cap), else_=unused)
+        allowance = func.coalesce(leave_type.c.MaxDaysPerYear, 0)
+        now = datetime.utcnow()
+        columns = [
+            "UserId", "LeaveTypeId", "Year", "TotalLeaves", "UsedLeaves", "RemainingLeaves",
+            "CarriedForwardLeaves", "CreatedOn", "IsActive"
+        ]
+
+        def no_balance_yet(user_id, leave_type_id):
+            return ~exists(select(following.c.Id).where(
+                following.c.UserId == user_id,
+                following.c.LeaveTypeId == leave_type_id,
+                following.c.Year == next_year,
+                following.c.IsActive == True
+            ))
+
+        started = time.perf_counter()
+        try:
+            topped_up = db.execute(
+                update(balance).where(
+                    balance.c.Year == next_year,
+                    balance.c.IsActive == True,
+                    balance.c.CarriedForwardLeaves.is_(None),
+                    previous.c.UserId == balance.c.UserId,
+                    previous.c.LeaveTypeId == balance.c.LeaveTypeId,
+                    previous.c.Year == year,
+                    previous.c.IsActive == True,
+                    leave_type.c.Id == balance.c.LeaveTypeId,
+                    leave_type.c.IsActive == True
+                ).values(
+                    TotalLeaves=balance.c.TotalLeaves + carry,
+                    RemainingLeaves=balance.c.RemainingLeaves + carry,
+                    CarriedForwardLeaves=carry,
+                    ModifiedOn=now
+                )
+            ).rowcount
+
+            carried = db.execute(insert(balance).from_select(columns, select(
+                previous.c.UserId, previous.c.LeaveTypeId, literal(next_year, Integer),
+                allowance + carry, literal(0, Integer), allowance + carry, carry,
+                literal(now, DateTime), literal(True, Boolean)
+            ).select_from(
+                previous.join(leave_type, leave_type.c.Id == previous.c.LeaveTypeId)
+                .join(user, user.c.Id == previous.c.UserId)
+            ).where(
+                previous.c.Year == year,
+                previous.c.IsActive == True,
+                leave_type.c.IsActive == True,
+                user.c.IsActive == True,
+                no_balance_yet(previous.c.UserId, previous.c.LeaveTypeId)
+            ))).rowcount
+
+            started_fresh = db.execute(insert(balance).from_select(columns, select(
+                user.c.Id, leave_type.c.Id, literal(next_year, Integer),
+                allowance, literal(0, Integer), allowance, literal(0, Integer),
+                literal(now, DateTime), literal(True, Boolean)
+            ).select_from(
+                user.join(leave_type, true())
+            ).where(
+                user.c.IsActive == True,
+                leave_type.c.IsActive == True,
+                no_balance_yet(user.c.Id, leave_type.c.Id)
+            ))).rowcount
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        result = {
+            "from_year": year,
+            "to_year": next_year,
+            "topped_up": topped_up,
+            "carried_forward": carried,
+            "created": started_fresh,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Leave rollover {year} -> {next_year}: {result}")
+        return result
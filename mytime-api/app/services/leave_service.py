@@ -1,4 +1,4 @@
-from sqlalchemy import case
+from sqlalchemy import case, exists, func, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import datetime
@@ -7,6 +7,13 @@ from app.models.leave_request import LeaveRequest
 from app.models.leavetype import LeaveType
 from app.models.leave_balance_model import LeaveBalance  
 from app.schemas.leave_schema import LeaveApply, LeaveApprove, LeaveReject, LeaveCancel
+from app.schemas.batch_review_schemas import BatchReviewRequest
+from app.services.business_calendar_service import BusinessCalendarService
+from app.services.statistics_service import StatisticsService
+from app.services.team_calendar_service import TeamCalendarService
+from app.utils.batch_review import REVIEW_STATUSES, lock_rows, item_result, review_response
+
+LEAVE_STATISTICS = "leave"
 
 
 class LeaveService:
@@ -27,49 +34,60 @@ class LeaveService:
                     detail="From date cannot be greater than to date"
                 )
 
-            total_days = (data.toDate - data.fromDate).days + 1
+            # Only working days are charged: weekly offs and holidays are skipped
+            total_days = BusinessCalendarService.working_days(db, data.fromDate, data.toDate)
+            if total_days == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The selected period has no working days"
+                )
+
+            current_year = datetime.now().year
 
-            leave_type = db.query(LeaveType).filter(
+            # Leave type, remaining balance and overlapping requests in one query
+            remaining = select(LeaveBalance.RemainingLeaves).where(
+                LeaveBalance.UserId == data.userId,
+                LeaveBalance.LeaveTypeId == data.leaveTypeId,
+                LeaveBalance.Year == current_year,
+                LeaveBalance.IsActive == True
+            ).order_by(LeaveBalance.Id).limit(1).scalar_subquery()
+            overlapping = exists().where(
+                LeaveRequest.UserId == data.userId,
+                LeaveRequest.IsActive == True,
+                LeaveRequest.Status.in_(["Pending", "Approved"]),
+                LeaveRequest.FromDate <= data.toDate,
+                LeaveRequest.ToDate >= data.fromDate
+            )
+            checks = db.query(
+                LeaveType.Id,
+                remaining.label("remaining"),
+                # SQL Server does not allow EXISTS as a select-list value
+                case((overlapping, 1), else_=0).label("overlapping")
+            ).filter(
                 LeaveType.Id == data.leaveTypeId,
                 LeaveType.IsActive == True
             ).first()
 
-            if not leave_type:
+            if not checks:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Leave type not found or inactive"
                 )
 
-            
-            current_year = datetime.now().year
-
-            balance = db.query(LeaveBalance).filter(
-                LeaveBalance.UserId == data.userId,
-                LeaveBalance.LeaveTypeId == data.leaveTypeId,
-                LeaveBalance.Year == current_year
-            ).first()
-            
-            if balance:
-                if balance.RemainingLeaves <= 0:
+            if checks.remaining is not None:
+                if checks.remaining <= 0:
                     raise HTTPException(
                         status_code=400,
                         detail="No leave balance available"
                     )
 
-                if total_days > balance.RemainingLeaves:
+                if total_days > checks.remaining:
                     raise HTTPException(
                         status_code=400,
                         detail="Requested days exceed remaining leave balance"
                     )
-            overlapping = db.query(LeaveRequest).filter(
-                LeaveRequest.UserId == data.userId,
-                LeaveRequest.IsActive == True,
-                LeaveRequest.Status.in_(["Pending", "Approved"]),
-                LeaveRequest.FromDate <= data.toDate,
-                LeaveRequest.ToDate >= data.fromDate
-            ).first()
 
-            if overlapping:
+            if checks.overlapping:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="You already have a leave request for this period"
@@ -92,6 +110,8 @@ class LeaveService:
             db.add(leave)
             db.commit()
             db.refresh(leave)
+            TeamCalendarService.invalidate_dates(leave.FromDate, leave.ToDate)
+            StatisticsService.invalidate(LEAVE_STATISTICS)
 
             return {
                 "success": True,
@@ -180,25 +200,35 @@ class LeaveService:
 
             from app.services.leave_balance_service import LeaveBalanceService
 
-            result = LeaveBalanceService.update_balance(
-                db,
-                leave.UserId,
-                leave.LeaveTypeId,
-                leave.TotalDays
+            # Claim the request and deduct the balance with two conditional
+            # UPDATEs in one transaction: a concurrent approval of the same
+            # request finds it no longer Pending, and the balance is only
+            # changed while it covers the days
+            claimed = db.query(LeaveRequest).filter(
+                LeaveRequest.Id == leave_id,
+                LeaveRequest.IsActive == True,
+                LeaveRequest.Status == "Pending"
+            ).update(
+                {"Status": "Approved", "AdminComment": data.adminComment, "ModifiedOn": datetime.utcnow()},
+                synchronize_session=False
             )
+            if not claimed:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Leave request was reviewed by someone else"
+                )
 
-            if not result["success"]:
-                return {
-                    "success": False,
-                    "message": result["message"]
-                }
-
-            leave.Status = "Approved"
-            leave.AdminComment = data.adminComment
-            leave.ModifiedOn = datetime.utcnow()
+            try:
+                LeaveBalanceService.consume(db, leave.UserId, leave.LeaveTypeId, leave.TotalDays or 0)
+            except HTTPException:
+                db.rollback()
+                raise
 
             db.commit()
             db.refresh(leave)
+            TeamCalendarService.invalidate_dates(leave.FromDate, leave.ToDate)
+            StatisticsService.invalidate(LEAVE_STATISTICS)
 
             return {
                 "success": True,
@@ -243,6 +273,8 @@ class LeaveService:
 
             db.commit()
             db.refresh(leave)
+            TeamCalendarService.invalidate_dates(leave.FromDate, leave.ToDate)
+            StatisticsService.invalidate(LEAVE_STATISTICS)
 
             return {
                 "success": True,
@@ -286,6 +318,8 @@ class LeaveService:
 
             db.commit()
             db.refresh(leave)
+            TeamCalendarService.invalidate_dates(leave.FromDate, leave.ToDate)
+            StatisticsService.invalidate(LEAVE_STATISTICS)
 
             return {
                 "success": True,
@@ -303,27 +337,135 @@ class LeaveService:
             )
 
     @staticmethod
-    def get_leave_statistics(user_id: Optional[int] = None, db: Session = None) -> Dict[str, Any]:
-        """Get leave statistics for user or overall"""
+    def batch_review(data: BatchReviewRequest, db: Session) -> Dict[str, Any]:
+        """
+        Approve or reject many pending leave requests. The requests and the
+        affected balances are read (and locked) with one query each, and each
+        user x leave type balance is updated once with the summed days.
+        """
+        target = REVIEW_STATUSES[data.action]
+        ids = list(dict.fromkeys(data.ids))
+        now = datetime.utcnow()
+
         try:
-            query = db.query(LeaveRequest).filter(LeaveRequest.IsActive == True)
-            
-            if user_id:
-                query = query.filter(LeaveRequest.UserId == user_id)
-            
-            total = query.count()
-            pending = query.filter(LeaveRequest.Status == "Pending").count()
-            approved = query.filter(LeaveRequest.Status == "Approved").count()
-            rejected = query.filter(LeaveRequest.Status == "Rejected").count()
-            cancelled = query.filter(LeaveRequest.Status == "Cancelled").count()
-            
-            return {
-                "total": total,
-                "pending": pending,
-                "approved": approved,
-                "rejected": rejected,
-                "cancelled": cancelled
+            leaves = {
+                leave.Id: leave for leave in lock_rows(db.query(
+                    LeaveRequest.Id, LeaveRequest.UserId, LeaveRequest.LeaveTypeId, LeaveRequest.TotalDays,
+                    LeaveRequest.Status, LeaveRequest.FromDate, LeaveRequest.ToDate
+                ).filter(
+                    LeaveRequest.Id.in_(ids),
+                    LeaveRequest.IsActive == True
+                ), LeaveRequest).all()
             }
+
+            results: Dict[int, Dict[str, Any]] = {}
+            candidates = []
+            for leave_id in ids:
+                leave = leaves.get(leave_id)
+                if leave is None:
+                    results[leave_id] = item_result(leave_id, False, message="Leave request not found")
+                elif leave.Status != "Pending":
+                    results[leave_id] = item_result(leave_id, False, leave.Status, f"Leave request is already {leave.Status}")
+                else:
+                    candidates.append(leave)
+
+            balance_updates: List[Dict[str, Any]] = []
+            if data.action == "approve" and candidates:
+                from app.services.leave_balance_service import LeaveBalanceService
+
+                year = datetime.now().year
+                user_ids = {leave.UserId for leave in candidates}
+                type_ids = {leave.LeaveTypeId for leave in candidates}
+                # Same upsert as single approvals, so both paths create balances
+                # one way and the rows below are all there is to lock
+                LeaveBalanceService.ensure_balances(
+                    db, ((leave.UserId, leave.LeaveTypeId) for leave in candidates), year
+                )
+                balances = {
+                    (balance.UserId, balance.LeaveTypeId): balance
+                    for balance in lock_rows(db.query(
+                        LeaveBalance.Id, LeaveBalance.UserId, LeaveBalance.LeaveTypeId,
+                        LeaveBalance.UsedLeaves, LeaveBalance.RemainingLeaves
+                    ).filter(
+                        LeaveBalance.UserId.in_(user_ids),
+                        LeaveBalance.LeaveTypeId.in_(type_ids),
+                        LeaveBalance.Year == year,
+                        LeaveBalance.IsActive == True
+                    ), LeaveBalance).all()
+                }
+
+                # Running (used, remaining) per user x type - requests are granted
+                # in the order given until the balance runs out
+                running: Dict[tuple, List[int]] = {}
+                approved = []
+                for leave in candidates:
+                    key = (leave.UserId, leave.LeaveTypeId)
+                    if key not in running:
+                        balance = balances.get(key)
+                        if balance is not None:
+                            running[key] = [balance.UsedLeaves or 0, balance.RemainingLeaves or 0]
+                        else:
+                            results[leave.Id] = item_result(leave.Id, False, leave.Status, "Leave type not found")
+                            continue
+                    days = leave.TotalDays or 0
+                    if days > running[key][1]:
+                        results[leave.Id] = item_result(leave.Id, False, leave.Status, "Leave balance exceeded")
+                        continue
+                    running[key][0] += days
+                    running[key][1] -= days
+                    approved.append(leave)
+
+                for key, (used, remaining) in running.items():
+                    balance = balances[key]
+                    if used != (balance.UsedLeaves or 0):
+                        balance_updates.append({
+                            "Id": balance.Id, "UsedLeaves": used, "RemainingLeaves": remaining, "ModifiedOn": now
+                        })
+                candidates = approved
+
+            if candidates:
+                db.query(LeaveRequest).filter(
+                    LeaveRequest.Id.in_([leave.Id for leave in candidates])
+                ).update(
+                    {"Status": target, "AdminComment": data.comment, "ModifiedOn": now, "ModifiedBy": data.user_id},
+                    synchronize_session=False
+                )
+                if balance_updates:
+                    db.bulk_update_mappings(LeaveBalance, balance_updates)
+                for leave in candidates:
+                    results[leave.Id] = item_result(leave.Id, True, target)
+            db.commit()
+
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error reviewing leaves: {str(e)}"
+            )
+
+        for leave in candidates:
+            TeamCalendarService.invalidate_dates(leave.FromDate, leave.ToDate)
+        StatisticsService.invalidate(LEAVE_STATISTICS)
+        return review_response(data.action, ids, results)
+
+    @staticmethod
+    def get_leave_statistics(user_id: Optional[int] = None, db: Session = None) -> Dict[str, Any]:
+        """Get leave statistics for user or overall (one query, cached briefly per user)"""
+        try:
+            def build() -> Dict[str, Any]:
+                filters = [LeaveRequest.IsActive == True]
+                if user_id:
+                    filters.append(LeaveRequest.UserId == user_id)
+                count_if = StatisticsService.count_if
+                return StatisticsService.totals(db, {
+                    "total": func.count(LeaveRequest.Id),
+                    "pending": count_if(LeaveRequest.Status == "Pending"),
+                    "approved": count_if(LeaveRequest.Status == "Approved"),
+                    "rejected": count_if(LeaveRequest.Status == "Rejected"),
+                    "cancelled": count_if(LeaveRequest.Status == "Cancelled"),
+                }, filters)
+
+            return StatisticsService.cached(LEAVE_STATISTICS, {"user_id": user_id or None}, build)
             
         except Exception as e:
             raise HTTPException(
@@ -14,11 +14,39 @@ from app.schemas.monthly_salary_schemas import (
     MonthlySalaryUpdate
 )
 from app.utils.month_converter import MonthToYearConverter
+from app.utils.period import Period
 from app.utils.indian_salary_converter import IndianSalaryConverter
+from app.utils.content_hash import ContentHash
+from app.services.payroll_attendance_service import PayrollAttendanceService
+from app.services.payroll_rollup_service import PayrollRollupService
+from app.services.tax_statement_service import TaxStatementService
 import math
 
 logger = logging.getLogger(__name__)
 
+# EmployeeSalary columns covered by RowHash (audit columns are excluded so a
+# republish that changes nothing does not count as a change)
+EMPLOYEE_SALARY_CONTENT_FIELDS = (
+    'EmployeeId', 'MonthlySalaryId', 'Title', 'SalaryMonth', 'SalaryYear',
+    'SalaryPeriod', 'FinancialYear',
+    'LOCATION', 'STDDAYS', 'WRKDAYS', 'LOPDAYS',
+    'Earning_Monthly_Basic', 'Earning_YTD_Basic',
+    'Earning_Montly_HRA', 'Earning_YTD_HRA',
+    'Earning_Montly_CONVEYANCE', 'Earning_YTD_CONVEYANCE',
+    'Earning_Montly_MEDICALALLOWANCE', 'Earning_YTD_MEDICALALLOWANCE',
+    'Earning_Montly_SPECIALALLOWANCE', 'Earning_YTD_SPECIALALLOWANCE',
+    'Earning_Montly_SPECIALBONUS', 'Earning_YTD_SPECIALBONUS',
+    'Earning_Montly_STATUTORYBONUS', 'Earning_YTD_STATUTORYBONUS',
+    'Earning_Montly_GROSSEARNINGS', 'Earning_YTD_GROSSEARNINGS',
+    'Earning_Montly_OTHERS', 'Earning_YTD_OTHERS',
+    'Deduction_Montly_PROFESSIONALTAX', 'Deduction_YTD_PROFESSIONALTAX',
+    'Deduction_Montly_ProvidentFund', 'Deduction_YTD_ProvidentFund',
+    'Deduction_Montly_GroupHealthInsurance', 'Deduction_YTD_GroupHealthInsurance',
+    'Deduction_Montly_OTHERS', 'Deduction_YTD_OTHERS',
+    'Deduction_Montly_GROSSSDeduction', 'Deduction_YTD_GROSSSDeduction',
+    'NETPAY', 'NETTRANSFER', 'INWords', 'IsActive',
+)
+
 class MonthlySalaryService:
     @staticmethod
     def fetch_monthly_salary(db: Session, salary_id: int) -> Optional[MonthlySalary]:
@@ -73,6 +101,7 @@ class MonthlySalaryService:
         """Insert new monthly salary record"""
         salary_dict = salary_data.model_dump(exclude_unset=True)
         salary = MonthlySalary(**salary_dict)
+        MonthlySalaryService._apply_period(salary)
         db.add(salary)
         db.commit()
         db.refresh(salary)
@@ -89,6 +118,7 @@ class MonthlySalaryService:
         update_data = salary_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(salary, field, value)
+        MonthlySalaryService._apply_period(salary)
         
         db.commit()
         db.refresh(salary)
@@ -124,6 +154,17 @@ class MonthlySalaryService:
         logger.info(f"Deleted monthly salary with ID: {salary_id}")
         return True
     
+    @staticmethod
+    def _apply_period(salary: MonthlySalary) -> None:
+        """Keep SalaryPeriod / FinancialYear in step with SalaryMonth / SalaryYear"""
+        if not salary.SalaryMonth or not salary.SalaryYear:
+            salary.SalaryPeriod = None
+            salary.FinancialYear = None
+            return
+        period = Period.from_month_name(salary.SalaryMonth, salary.SalaryYear)
+        salary.SalaryPeriod = period.key
+        salary.FinancialYear = period.financial_year
+    
     @staticmethod
     def is_april_month(month: str) -> bool:
         """Check if given month is April"""
@@ -138,17 +179,8 @@ class MonthlySalaryService:
                 May 2024 -> (2024, 2025)
                 March 2024 -> (2023, 2024)
         """
-        month_order = {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-            'September': 9, 'October': 10, 'November': 11, 'December': 12
-        }
-        month_num = month_order.get(month, 0)
-        
-        if month_num >= 4:  # April to December
-            return (year, year + 1)
-        else:  # January to March
-            return (year - 1, year)
+        fy_start = Period.from_month_name(month, year).financial_year
+        return (fy_start, fy_start + 1)
     
     @staticmethod
     def get_previous_salaries_in_current_financial_year(
@@ -162,79 +194,43 @@ class MonthlySalaryService:
         Get all previous salaries for an employee in the current financial year
         (from April to current month)
         """
-        current_year_int = int(current_year)
-        month_order = {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-            'September': 9, 'October': 10, 'November': 11, 'December': 12
-        }
-        current_month_num = month_order.get(current_month, 0)
+        current = Period.from_month_name(current_month, current_year)
+        fy_start = current.financial_year
         
-        # Get financial year for current month
-        fy_start, fy_end = MonthlySalaryService.get_financial_year(current_month, current_year_int)
+        logger.info(f"Finding previous salaries for employee {employee_id} in financial year {fy_start}-{fy_start + 1}")
         
-        logger.info(f"Finding previous salaries for employee {employee_id} in financial year {fy_start}-{fy_end}")
-        
-        # Get all salaries for this employee (excluding current one)
-        all_employee_salaries = db.query(EmployeeSalary).filter(
+        # Same financial year and strictly before the current month, oldest first
+        previous_salaries = db.query(EmployeeSalary).filter(
             EmployeeSalary.EmployeeId == employee_id,
             EmployeeSalary.MonthlySalaryId != current_monthly_salary_id,
+            EmployeeSalary.FinancialYear == fy_start,
+            EmployeeSalary.SalaryPeriod < current.key,
             EmployeeSalary.IsActive == True
-        ).all()
-        
-        # Filter to only those in the current financial year
-        previous_salaries = []
-        
-        for sal in all_employee_salaries:
-            sal_year = int(sal.SalaryYear)
-            sal_month_num = month_order.get(sal.SalaryMonth, 0)
-            
-            # Check if this salary is in the current financial year
-            if sal_month_num >= 4:  # April to December
-                in_fy = (sal_year == fy_start)
-            else:  # January to March
-                in_fy = (sal_year == fy_end)
-            
-            if in_fy:
-                # Also ensure it's before current month
-                sal_is_before = False
-                if sal_year < current_year_int:
-                    sal_is_before = True
-                elif sal_year == current_year_int and sal_month_num < current_month_num:
-                    sal_is_before = True
-                elif sal_year < current_year_int and sal_month_num >= 4:
-                    # Special case: previous year's April-December is before current year's Jan-March
-                    if current_month_num < 4:
-                        sal_is_before = True
-                
-                if sal_is_before:
-                    previous_salaries.append(sal)
-                    logger.info(f"Found previous salary: {sal.SalaryMonth} {sal.SalaryYear}")
-        
-        # Sort by date (oldest first)
-        previous_salaries.sort(key=lambda x: (
-            int(x.SalaryYear),
-            month_order.get(x.SalaryMonth, 0)
-        ))
+        ).order_by(EmployeeSalary.SalaryPeriod).all()
         
         return previous_salaries
     
     @staticmethod
-    def publish_monthly_salary(db: Session, monthly_salary: MonthlySalary) -> Tuple[bool, int]:
+    def _plan_monthly_salary_publish(
+        db: Session,
+        monthly_salary: MonthlySalary
+    ) -> Optional[Dict[str, Any]]:
         """
-        Publish monthly salary for all active employees
-        Returns: (success, number_of_employees_processed)
+        Compute the target EmployeeSalary state for all active employees.
+        Nothing is written - returns new rows to add, update mappings for rows
+        whose content changed and the ids of unchanged rows.
+        Returns None when there is nothing to publish.
         """
-        logger.info(f"Starting publish for monthly salary ID: {monthly_salary.MonthlySalaryId}, Month: {monthly_salary.SalaryMonth} {monthly_salary.SalaryYear}")
-        
         # Check if monthly salary already has employee salaries
         existing_employee_salaries = db.query(EmployeeSalary).filter(
             EmployeeSalary.MonthlySalaryId == monthly_salary.MonthlySalaryId
         ).all()
+        existing_map: Dict[int, EmployeeSalary] = {
+            es.EmployeeId: es for es in existing_employee_salaries
+        }
         
-        is_update = len(existing_employee_salaries) > 0
-        if is_update:
-            logger.info(f"Monthly salary {monthly_salary.MonthlySalaryId} is being updated with {len(existing_employee_salaries)} existing employee records")
+        if existing_employee_salaries:
+            logger.info(f"Monthly salary {monthly_salary.MonthlySalaryId} has {len(existing_employee_salaries)} existing employee records")
         
         # Get active employees
         active_employees = db.query(Employee.EmployeeId).filter(
@@ -244,7 +240,7 @@ class MonthlySalaryService:
         
         if not active_employee_ids:
             logger.warning(f"No active employees found for monthly salary {monthly_salary.MonthlySalaryId}")
-            return False, 0
+            return None
         
         # Get salary structures for active employees
         salary_structures = db.query(EmployeeSalaryStructure).filter(
@@ -254,7 +250,7 @@ class MonthlySalaryService:
         
         if not salary_structures:
             logger.warning(f"No salary structures found for active employees")
-            return False, 0
+            return None
         
         # Calculate standard days
         standard_days = MonthToYearConverter.get_days_in_month(
@@ -262,7 +258,11 @@ class MonthlySalaryService:
             int(monthly_salary.SalaryYear)
         )
         
-        lop_days = 0
+        # LOP per employee for the month, computed set-based for all of them
+        period = Period.from_month_name(monthly_salary.SalaryMonth, monthly_salary.SalaryYear)
+        lop_by_employee = PayrollAttendanceService.lop_days_by_employee(
+            db, period, [structure.EmployeeId for structure in salary_structures]
+        )
         
         # Check if this is April (new financial year)
         is_april = MonthlySalaryService.is_april_month(monthly_salary.SalaryMonth)
@@ -276,36 +276,49 @@ class MonthlySalaryService:
         
         # Process each employee
         employee_salaries_to_add = []
-        employee_salaries_to_update = []
+        update_mappings = []
+        changes = []
+        unchanged_employee_ids = []
+        hash_mappings = []
         
         for structure in salary_structures:
-            # Check if employee salary already exists for this monthly salary
-            existing_employee_salary = next(
-                (es for es in existing_employee_salaries if es.EmployeeId == structure.EmployeeId),
-                None
+            header_values = MonthlySalaryService._employee_header_values(
+                monthly_salary.Title,
+                monthly_salary.SalaryMonth,
+                monthly_salary.SalaryYear,
+                monthly_salary.Location,
+                standard_days,
+                lop_by_employee.get(structure.EmployeeId, 0)
             )
             
-            if existing_employee_salary and is_update:
-                # Update existing record
-                employee_salary = existing_employee_salary
-                MonthlySalaryService._update_employee_salary_from_monthly(
-                    employee_salary, monthly_salary, standard_days, lop_days
+            # Check if employee salary already exists for this monthly salary
+            existing_employee_salary = existing_map.get(structure.EmployeeId)
+            
+            if existing_employee_salary:
+                mapping, changed_fields = MonthlySalaryService._diff_employee_salary(
+                    existing_employee_salary,
+                    header_values,
+                    monthly_salary.ModifiedOn,
+                    monthly_salary.ModifiedBy
                 )
-                employee_salaries_to_update.append(employee_salary)
-                logger.info(f"Updating existing salary for employee {structure.EmployeeId}")
+                if mapping:
+                    update_mappings.append(mapping)
+                    changes.append({
+                        "employee_id": structure.EmployeeId,
+                        "employee_salary_id": existing_employee_salary.EmployeeSalaryId,
+                        "changed_fields": changed_fields
+                    })
+                else:
+                    unchanged_employee_ids.append(structure.EmployeeId)
+                    backfill = MonthlySalaryService._row_hash_backfill(existing_employee_salary)
+                    if backfill:
+                        hash_mappings.append(backfill)
             else:
                 # Create new record
                 logger.info(f"Creating new salary for employee {structure.EmployeeId}")
-                employee_salary = EmployeeSalary()
+                employee_salary = EmployeeSalary(**header_values)
                 employee_salary.MonthlySalaryId = monthly_salary.MonthlySalaryId
                 employee_salary.EmployeeId = structure.EmployeeId
-                employee_salary.Title = monthly_salary.Title
-                employee_salary.SalaryMonth = monthly_salary.SalaryMonth
-                employee_salary.SalaryYear = monthly_salary.SalaryYear
-                employee_salary.LOCATION = monthly_salary.Location
-                employee_salary.STDDAYS = standard_days
-                employee_salary.LOPDAYS = lop_days
-                employee_salary.WRKDAYS = standard_days
                 
                 # Check if this is April - RESET YTD
                 if is_april:
@@ -341,26 +354,96 @@ class MonthlySalaryService:
                 employee_salary.CreatedOn = monthly_salary.CreatedOn
                 employee_salary.ModifiedOn = monthly_salary.ModifiedOn
                 employee_salary.IsActive = True
+                employee_salary.RowHash = ContentHash.of_row(employee_salary, EMPLOYEE_SALARY_CONTENT_FIELDS)
                 
                 employee_salaries_to_add.append(employee_salary)
                 
                 # Log the values being set
                 logger.info(f"Employee {structure.EmployeeId} - Monthly Basic: {employee_salary.Earning_Monthly_Basic}, YTD Basic: {employee_salary.Earning_YTD_Basic}")
         
+        return {
+            "to_add": employee_salaries_to_add,
+            "update_mappings": update_mappings,
+            "changes": changes,
+            "unchanged_employee_ids": unchanged_employee_ids,
+            "hash_mappings": hash_mappings,
+        }
+    
+    @staticmethod
+    def publish_monthly_salary_diff(
+        db: Session,
+        monthly_salary: MonthlySalary,
+        dry_run: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Diff the stored EmployeeSalary rows of a monthly salary against the
+        target state and, unless dry_run, write only the rows that differ.
+        Returns a summary of the changes.
+        """
+        logger.info(f"Starting {'dry-run ' if dry_run else ''}publish for monthly salary ID: {monthly_salary.MonthlySalaryId}, Month: {monthly_salary.SalaryMonth} {monthly_salary.SalaryYear}")
+        
+        plan = MonthlySalaryService._plan_monthly_salary_publish(db, monthly_salary)
+        
+        if plan is None:
+            return {
+                "success": False,
+                "dry_run": dry_run,
+                "monthly_salary_id": monthly_salary.MonthlySalaryId,
+                "created": 0,
+                "updated": 0,
+                "unchanged": 0,
+                "created_employee_ids": [],
+                "changes": []
+            }
+        
+        summary = {
+            "success": True,
+            "dry_run": dry_run,
+            "monthly_salary_id": monthly_salary.MonthlySalaryId,
+            "created": len(plan["to_add"]),
+            "updated": len(plan["update_mappings"]),
+            "unchanged": len(plan["unchanged_employee_ids"]),
+            "created_employee_ids": [es.EmployeeId for es in plan["to_add"]],
+            "changes": plan["changes"]
+        }
+        
+        if dry_run:
+            return summary
+        
         # Bulk operations
-        if employee_salaries_to_add:
-            db.add_all(employee_salaries_to_add)
-            logger.info(f"Added {len(employee_salaries_to_add)} new employee salaries")
+        if plan["to_add"]:
+            db.add_all(plan["to_add"])
+            logger.info(f"Added {len(plan['to_add'])} new employee salaries")
+        
+        if plan["update_mappings"]:
+            db.bulk_update_mappings(EmployeeSalary, plan["update_mappings"])
+            logger.info(f"Updated {len(plan['update_mappings'])} changed employee salaries")
+        
+        if plan["hash_mappings"]:
+            db.bulk_update_mappings(EmployeeSalary, plan["hash_mappings"])
+            logger.info(f"Stored RowHash on {len(plan['hash_mappings'])} unchanged employee salaries")
         
-        if employee_salaries_to_update:
-            logger.info(f"Updated {len(employee_salaries_to_update)} existing employee salaries")
+        logger.info(f"Skipped {summary['unchanged']} unchanged employee salaries")
         
         db.commit()
         
-        total_processed = len(employee_salaries_to_add) + len(employee_salaries_to_update)
-        logger.info(f"Successfully published monthly salary {monthly_salary.MonthlySalaryId} for {total_processed} employees")
+        period = Period.from_month_name(monthly_salary.SalaryMonth, monthly_salary.SalaryYear)
+        PayrollRollupService.refresh_after_write(db, [period.key])
+        TaxStatementService.invalidate_cache([period.financial_year])
         
-        return True, total_processed
+        logger.info(f"Successfully published monthly salary {monthly_salary.MonthlySalaryId}: {summary['created']} created, {summary['updated']} updated, {summary['unchanged']} unchanged")
+        
+        return summary
+    
+    @staticmethod
+    def publish_monthly_salary(db: Session, monthly_salary: MonthlySalary) -> Tuple[bool, int]:
+        """
+        Publish monthly salary for all active employees
+        Returns: (success, number_of_employees_processed)
+        """
+        summary = MonthlySalaryService.publish_monthly_salary_diff(db, monthly_salary, dry_run=False)
+        total_processed = summary["created"] + summary["updated"] + summary["unchanged"]
+        return summary["success"], total_processed
     
 
     @staticmethod
@@ -403,34 +486,43 @@ class MonthlySalaryService:
             logger.warning("None of the provided employee IDs are active.")
             return False, 0
 
-        # ── 3. Load salary structures for those employees ─────────────────
-        salary_structures = db.query(EmployeeSalaryStructure).filter(
-            EmployeeSalaryStructure.EmployeeId.in_(active_employee_ids),
-            EmployeeSalaryStructure.IsActive == True
-        ).all()
-
-        structure_map: Dict[int, EmployeeSalaryStructure] = {
-            s.EmployeeId: s for s in salary_structures
+        # ── 3. Keep employees that have a salary structure ────────────────
+        #       (the structures themselves are loaded per shard)
+        structured_ids = {
+            row.EmployeeId for row in db.query(EmployeeSalaryStructure.EmployeeId).filter(
+                EmployeeSalaryStructure.EmployeeId.in_(active_employee_ids),
+                EmployeeSalaryStructure.IsActive == True
+            ).all()
         }
 
-        if not structure_map:
+        if not structured_ids:
             logger.warning("No active salary structures found for provided employees.")
             return False, 0
 
+        for emp_id in active_employee_ids:
+            if emp_id not in structured_ids:
+                logger.warning(f"No salary structure for employee {emp_id}, skipping.")
+        active_employee_ids = [emp_id for emp_id in active_employee_ids if emp_id in structured_ids]
+
         now = datetime.utcnow()
-        total_processed = 0
 
-        # ── 4. Iterate over each month ────────────────────────────────────
+        # Months must run in calendar order so YTD can chain forward
+        salary_months = sorted(salary_months, key=lambda m: Period.from_month_name(m, salary_year))
+
+        # ── 4. Check/create the MonthlySalary header record per month ─────
+        months_context: List[Dict[str, Any]] = []
         for salary_month in salary_months:
 
             # 4a. Build dynamic title
             title = f"Pay Slip for the month of {salary_month} {salary_year}"
 
-            # 4b. Calculate std/wrk days for this month (lop is always 0 here)
+            # 4b. Calculate std days and per-employee LOP for this month
             standard_days = MonthToYearConverter.get_days_in_month(
                 salary_month, int(salary_year)
             )
-            lop_days = 0
+            lop_by_employee = PayrollAttendanceService.lop_days_by_employee(
+                db, Period.from_month_name(salary_month, salary_year), active_employee_ids
+            )
 
             # 4c. Check/create the MonthlySalary header record for this month
             monthly_salary = db.query(MonthlySalary).filter(
@@ -439,9 +531,7 @@ class MonthlySalaryService:
                 MonthlySalary.Location == payload.Location,
             ).first()
 
-            is_new_monthly_salary = monthly_salary is None
-
-            if is_new_monthly_salary:
+            if monthly_salary is None:
                 monthly_salary = MonthlySalary()
                 monthly_salary.Title       = title
                 monthly_salary.SalaryMonth = salary_month
@@ -449,12 +539,13 @@ class MonthlySalaryService:
                 monthly_salary.Location    = payload.Location
                 monthly_salary.StdDays     = standard_days
                 monthly_salary.WrkDays     = standard_days
-                monthly_salary.LopDays     = lop_days
+                monthly_salary.LopDays     = 0  # LOP is per employee
                 monthly_salary.IsActive    = True
                 monthly_salary.CreatedBy   = payload.CreatedBy
                 monthly_salary.ModifiedBy  = payload.CreatedBy
                 monthly_salary.CreatedOn   = now
                 monthly_salary.ModifiedOn  = now
+                MonthlySalaryService._apply_period(monthly_salary)
                 db.add(monthly_salary)
                 db.flush()  # get MonthlySalaryId before using it below
                 logger.info(
@@ -467,138 +558,50 @@ class MonthlySalaryService:
                     f"(ID={monthly_salary.MonthlySalaryId})"
                 )
 
-            # 4d. Load any existing EmployeeSalary rows for this month
-            existing_employee_salaries = db.query(EmployeeSalary).filter(
-                EmployeeSalary.MonthlySalaryId == monthly_salary.MonthlySalaryId,
-                EmployeeSalary.EmployeeId.in_(active_employee_ids)
-            ).all()
-
-            existing_map: Dict[int, EmployeeSalary] = {
-                es.EmployeeId: es for es in existing_employee_salaries
-            }
-
-            is_april = MonthlySalaryService.is_april_month(salary_month)
-            if is_april:
-                logger.info(f"Processing April salary — starting new financial year")
-
-            employee_salaries_to_add    = []
-            employee_salaries_to_update = []
-
-            # 4e. Process each employee for this month
-            for emp_id in active_employee_ids:
-
-                structure = structure_map.get(emp_id)
-                if not structure:
-                    logger.warning(
-                        f"No salary structure for employee {emp_id}, skipping."
-                    )
-                    continue
-
-                existing_es = existing_map.get(emp_id)
-
-                if existing_es:
-                    # ── UPDATE path ──────────────────────────────────────
-                    MonthlySalaryService._update_employee_salary_from_monthly(
-                        existing_es, monthly_salary, standard_days, lop_days
-                    )
-                    employee_salaries_to_update.append(existing_es)
-                    logger.info(
-                        f"[{salary_month} {salary_year}] "
-                        f"Updating existing salary for employee {emp_id}"
-                    )
-
-                else:
-                    # ── CREATE path ──────────────────────────────────────
-                    employee_salary = EmployeeSalary()
-                    employee_salary.MonthlySalaryId = monthly_salary.MonthlySalaryId
-                    employee_salary.EmployeeId      = emp_id
-                    employee_salary.Title           = title
-                    employee_salary.SalaryMonth     = salary_month
-                    employee_salary.SalaryYear      = salary_year
-                    employee_salary.LOCATION        = payload.Location
-                    employee_salary.STDDAYS         = standard_days
-                    employee_salary.LOPDAYS         = lop_days
-                    employee_salary.WRKDAYS         = standard_days
-                    employee_salary.CreatedBy       = payload.CreatedBy
-                    employee_salary.ModifiedBy      = payload.CreatedBy
-                    employee_salary.CreatedOn       = now
-                    employee_salary.ModifiedOn      = now
-                    employee_salary.IsActive        = True
-
-                    if is_april:
-                        logger.info(
-                            f"[{salary_month} {salary_year}] "
-                            f"April reset YTD for employee {emp_id}"
-                        )
-                        MonthlySalaryService._set_first_month_of_financial_year(
-                            employee_salary, structure
-                        )
-                    else:
-                        previous_salaries = (
-                            MonthlySalaryService
-                            .get_previous_salaries_in_current_financial_year(
-                                db,
-                                emp_id,
-                                salary_month,
-                                salary_year,
-                                monthly_salary.MonthlySalaryId,
-                            )
-                        )
-
-                        if not previous_salaries:
-                            logger.info(
-                                f"[{salary_month} {salary_year}] "
-                                f"First salary in FY for employee {emp_id} — starting fresh"
-                            )
-                            MonthlySalaryService._set_first_month_of_financial_year(
-                                employee_salary, structure
-                            )
-                        else:
-                            latest_previous = previous_salaries[-1]
-                            logger.info(
-                                f"[{salary_month} {salary_year}] "
-                                f"Found {len(previous_salaries)} prior salaries for "
-                                f"employee {emp_id}. Latest: "
-                                f"{latest_previous.SalaryMonth} {latest_previous.SalaryYear}"
-                            )
-                            MonthlySalaryService._set_subsequent_salaries(
-                                employee_salary, structure, latest_previous
-                            )
-
-                    net_salary = (
-                        (structure.GROSSEARNINGS or 0) -
-                        (structure.GROSSDEDUCTIONS or 0)
-                    )
-                    employee_salary.INWords = IndianSalaryConverter.convert_to_words(
-                        net_salary
-                    )
+            months_context.append({
+                "MonthlySalaryId": monthly_salary.MonthlySalaryId,
+                "SalaryMonth": salary_month,
+                "Title": monthly_salary.Title,
+                "StdDays": standard_days,
+                "LopDaysByEmployee": lop_by_employee,
+                "ModifiedOn": monthly_salary.ModifiedOn,
+                "ModifiedBy": monthly_salary.ModifiedBy,
+            })
+
+        # ── 5. Compute every employee's month chain, partitioned by shard ─
+        from app.services.payroll_partition_service import PayrollPartitionService
+
+        result = PayrollPartitionService.execute(
+            db,
+            active_employee_ids,
+            {
+                "months": months_context,
+                "salary_year": salary_year,
+                "location": payload.Location,
+                "created_by": payload.CreatedBy,
+                "now": now,
+            },
+        )
 
-                    employee_salaries_to_add.append(employee_salary)
-                    logger.info(
-                        f"[{salary_month} {salary_year}] Employee {emp_id} — "
-                        f"Monthly Basic: {employee_salary.Earning_Monthly_Basic}, "
-                        f"YTD Basic: {employee_salary.Earning_YTD_Basic}"
-                    )
+        # ── 6. Merge all shards into one bulk write and a single commit ───
+        if result["to_add"]:
+            db.bulk_insert_mappings(EmployeeSalary, result["to_add"])
+            logger.info(f"Added {len(result['to_add'])} new employee salary records")
 
-            # 4f. Bulk persist for this month
-            if employee_salaries_to_add:
-                db.add_all(employee_salaries_to_add)
-                logger.info(
-                    f"[{salary_month} {salary_year}] "
-                    f"Added {len(employee_salaries_to_add)} new employee salary records"
-                )
+        if result["to_update"]:
+            db.bulk_update_mappings(EmployeeSalary, result["to_update"])
+            logger.info(
+                f"Updated {len(result['to_update'])} employee salary records, "
+                f"{result['unchanged']} unchanged"
+            )
 
-            if employee_salaries_to_update:
-                logger.info(
-                    f"[{salary_month} {salary_year}] "
-                    f"Updated {len(employee_salaries_to_update)} employee salary records"
-                )
+        db.commit()
 
-            month_count = len(employee_salaries_to_add) + len(employee_salaries_to_update)
-            total_processed += month_count
+        periods = [Period.from_month_name(m, salary_year) for m in salary_months]
+        PayrollRollupService.refresh_after_write(db, [p.key for p in periods])
+        TaxStatementService.invalidate_cache([p.financial_year for p in periods])
 
-        # ── 5. Single commit for everything ──────────────────────────────
-        db.commit()
+        total_processed = len(result["to_add"]) + len(result["to_update"]) + result["unchanged"]
         logger.info(
             f"Successfully published salaries for "
             f"{len(salary_months)} month(s), {total_processed} total records."
@@ -607,22 +610,76 @@ class MonthlySalaryService:
         return True, total_processed
         
     @staticmethod
-    def _update_employee_salary_from_monthly(
-        employee_salary: EmployeeSalary,
-        monthly_salary: MonthlySalary,
+    def _employee_header_values(
+        title: Optional[str],
+        salary_month: str,
+        salary_year: str,
+        location: Optional[str],
         standard_days: int,
         lop_days: int
-    ) -> None:
-        """Update employee salary with monthly salary changes"""
-        employee_salary.Title = monthly_salary.Title
-        employee_salary.SalaryMonth = monthly_salary.SalaryMonth
-        employee_salary.SalaryYear = monthly_salary.SalaryYear
-        employee_salary.LOCATION = monthly_salary.Location
-        employee_salary.STDDAYS = standard_days
-        employee_salary.LOPDAYS = lop_days
-        employee_salary.WRKDAYS = standard_days
-        employee_salary.ModifiedOn = monthly_salary.ModifiedOn
-        employee_salary.ModifiedBy = monthly_salary.ModifiedBy
+    ) -> Dict[str, Any]:
+        """EmployeeSalary columns that are copied from the monthly salary header"""
+        period = Period.from_month_name(salary_month, salary_year)
+        return {
+            "Title": title,
+            "SalaryMonth": salary_month,
+            "SalaryYear": salary_year,
+            "SalaryPeriod": period.key,
+            "FinancialYear": period.financial_year,
+            "LOCATION": location,
+            "STDDAYS": standard_days,
+            "LOPDAYS": lop_days,
+            "WRKDAYS": standard_days - lop_days,
+        }
+    
+    @staticmethod
+    def _diff_employee_salary(
+        employee_salary: EmployeeSalary,
+        header_values: Dict[str, Any],
+        modified_on: Optional[datetime],
+        modified_by: Optional[int]
+    ) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        Compare a stored employee salary with its target header values.
+        Returns (bulk update mapping, changed fields), or (None, []) if the
+        row is already up to date.
+        """
+        stored_hash = employee_salary.RowHash or ContentHash.of_row(
+            employee_salary, EMPLOYEE_SALARY_CONTENT_FIELDS
+        )
+        
+        target = {field: getattr(employee_salary, field) for field in EMPLOYEE_SALARY_CONTENT_FIELDS}
+        target.update(header_values)
+        target_hash = ContentHash.of_values(target, EMPLOYEE_SALARY_CONTENT_FIELDS)
+        
+        if target_hash == stored_hash:
+            return None, []
+        
+        changed_fields = [
+            field for field, value in header_values.items()
+            if ContentHash.normalize(getattr(employee_salary, field)) != ContentHash.normalize(value)
+        ]
+        
+        mapping = {"EmployeeSalaryId": employee_salary.EmployeeSalaryId}
+        mapping.update(header_values)
+        mapping["ModifiedOn"] = modified_on
+        mapping["ModifiedBy"] = modified_by
+        mapping["RowHash"] = target_hash
+        return mapping, changed_fields
+    
+    @staticmethod
+    def _row_hash_backfill(employee_salary: EmployeeSalary) -> Optional[Dict[str, Any]]:
+        """
+        Bulk update mapping that stores the content hash of an unchanged row
+        saved without one (before RowHash existed, or after a manual edit),
+        or None if the row already has it.
+        """
+        if employee_salary.RowHash:
+            return None
+        return {
+            "EmployeeSalaryId": employee_salary.EmployeeSalaryId,
+            "RowHash": ContentHash.of_row(employee_salary, EMPLOYEE_SALARY_CONTENT_FIELDS),
+        }
     
     @staticmethod
     def check_if_reprocessing_needed(
@@ -757,29 +814,7 @@ class MonthlySalaryService:
         target_year: str
     ) -> bool:
         """Check if a salary belongs to the same financial year as target"""
-        month_order = {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-            'September': 9, 'October': 10, 'November': 11, 'December': 12
-        }
-        salary_month_num = month_order.get(salary_month, 0)
-        target_month_num = month_order.get(target_month, 0)
-        salary_year_int = int(salary_year)
-        target_year_int = int(target_year)
-        
-        # For target months April to December
-        if target_month_num >= 4:
-            # Salary months April to December must be in same year
-            if salary_month_num >= 4:
-                return salary_year_int == target_year_int
-            # Salary months January to March belong to next year's financial year
-            else:
-                return salary_year_int == target_year_int + 1
-        # For target months January to March
-        else:
-            # Salary months April to December belong to previous year's financial year
-            if salary_month_num >= 4:
-                return salary_year_int == target_year_int - 1
-            # Salary months January to March must be in same year
-            else:
-                return salary_year_int == target_year_int
\ No newline at end of file
+        return (
+            Period.from_month_name(salary_month, salary_year).financial_year
+            == Period.from_month_name(target_month, target_year).financial_year
+        )
@@ -0,0 +1,195 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, distinct
+from typing import List, Dict, Any, Set, Optional
+from datetime import date, timedelta
+import logging
+
+from app.core.config import settings
+from app.models.attendence import Attendence
+from app.models.employee import Employee
+from app.models.leave_request import LeaveRequest
+from app.models.leavetype import LeaveType
+from app.services.business_calendar_service import BusinessCalendarService
+from app.utils.period import Period
+from app.utils.helpers import batches, csv_set
+
+logger = logging.getLogger(__name__)
+
+
+class PayrollAttendanceService:
+    """
+    Working, present and loss-of-pay days for a whole payroll month.
+    Everything is derived from set-based queries (holidays, attendance
+    aggregated per employee, recorded absences, approved leaves overlapping
+    the month) so the cost does not grow with one query per employee.
+    """
+
+    @staticmethod
+    def _weekend_days() -> Set[int]:
+        """Weekday numbers (Monday = 0) that are never working days"""
+        return BusinessCalendarService.weekend_days()
+
+    @staticmethod
+    def _month_dates(period: Period) -> List[date]:
+        first = date(period.year, period.month, 1)
+        return [first + timedelta(days=offset) for offset in range(period.days)]
+
+    @staticmethod
+    def fetch_holiday_dates(db: Session, period: Period) -> Set[date]:
+        """Active holidays falling in the month"""
+        return BusinessCalendarService.holidays(
+            db, date(period.year, period.month, 1), date(period.year, period.month, period.days)
+        )
+
+    @staticmethod
+    def calculate_month(
+        db: Session,
+        period: Period,
+        employee_ids: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate the month for the given employees (all active employees when
+        None). Per-employee values are returned as parallel arrays aligned
+        with `employee_ids`.
+        """
+        if employee_ids is None:
+            employee_ids = [
+                row.EmployeeId for row in db.query(Employee.EmployeeId).filter(
+                    Employee.IsActive == True
+                ).all()
+            ]
+        employee_ids = list(employee_ids)
+
+        holiday_dates = PayrollAttendanceService.fetch_holiday_dates(db, period)
+        month_dates = PayrollAttendanceService._month_dates(period)
+        working_dates = set(BusinessCalendarService.working_dates(db, month_dates[0], month_dates[-1]))
+        non_working_dates = [d for d in month_dates if d not in working_dates]
+        first, last = month_dates[0], month_dates[-1]
+
+        result: Dict[str, Any] = {
+            "period": period.key,
+            "standard_days": period.days,
+            "working_days": len(working_dates),
+            "holidays": sorted(d.isoformat() for d in holiday_dates),
+            "employee_ids": employee_ids,
+            "present_days": [0] * len(employee_ids),
+            "paid_leave_days": [0] * len(employee_ids),
+            "unpaid_leave_days": [0] * len(employee_ids),
+            "absent_days": [0] * len(employee_ids),
+            "lop_days": [0] * len(employee_ids),
+        }
+        if not employee_ids:
+            return result
+
+        index = {emp_id: i for i, emp_id in enumerate(employee_ids)}
+        # Absent and leave statuses are not attendance (as in the monthly summary)
+        not_present_statuses = (
+            csv_set(settings.PAYROLL_ABSENT_ATTENDANCE_STATUSES) | csv_set(settings.ATTENDANCE_LEAVE_STATUSES)
+        )
+        absent_statuses = csv_set(settings.PAYROLL_ABSENT_ATTENDANCE_STATUSES)
+        day_status = func.lower(func.ltrim(func.rtrim(func.coalesce(Attendence.Status, ""))))
+        unpaid_types = csv_set(settings.PAYROLL_UNPAID_LEAVE_TYPES)
+        leave_rows = []
+        absent_rows = []
+
+        # Both queries run per batch of employee ids to stay under the driver's parameter limit
+        for batch in batches(employee_ids):
+            # 1. Days attended on working days, one aggregate row per employee
+            attendance_query = db.query(
+                Attendence.EmployeeId,
+                func.count(distinct(Attendence.AttendenceDate)).label("present_days")
+            ).filter(
+                Attendence.EmployeeId.in_(batch),
+                Attendence.AttendenceDate >= first,
+                Attendence.AttendenceDate <= last,
+                func.coalesce(Attendence.ApprovalStatus, "") != "Rejected",
+                day_status.notin_(not_present_statuses)
+            )
+            if non_working_dates:
+                attendance_query = attendance_query.filter(Attendence.AttendenceDate.notin_(non_working_dates))
+            for row in attendance_query.group_by(Attendence.EmployeeId).all():
+                result["present_days"][index[row.EmployeeId]] = int(row.present_days or 0)
+
+            # Working days recorded as absent - loss of pay unless covered by leave
+            if absent_statuses:
+                absent_query = db.query(Attendence.EmployeeId, Attendence.AttendenceDate).filter(
+                    Attendence.EmployeeId.in_(batch),
+                    Attendence.AttendenceDate >= first,
+                    Attendence.AttendenceDate <= last,
+                    func.coalesce(Attendence.ApprovalStatus, "") != "Rejected",
+                    day_status.in_(absent_statuses)
+                )
+                if non_working_dates:
+                    absent_query = absent_query.filter(Attendence.AttendenceDate.notin_(non_working_dates))
+                absent_rows.extend(absent_query.distinct().all())
+
+            # 2. Approved leaves overlapping the month (LeaveRequest is keyed by UserId)
+            leave_rows.extend(db.query(
+                Employee.EmployeeId,
+                LeaveRequest.FromDate,
+                LeaveRequest.ToDate,
+                LeaveType.Name
+            ).join(
+                Employee, Employee.UserId == LeaveRequest.UserId
+            ).outerjoin(
+                LeaveType, LeaveType.Id == LeaveRequest.LeaveTypeId
+            ).filter(
+                Employee.EmployeeId.in_(batch),
+                LeaveRequest.Status == "Approved",
+                LeaveRequest.IsActive == True,
+                LeaveRequest.FromDate <= last,
+                LeaveRequest.ToDate >= first
+            ).all())
+
+        # An employee may have overlapping requests - count each working day once,
+        # unpaid taking precedence over paid
+        leave_dates: Dict[int, Dict[date, bool]] = {}
+        for row in leave_rows:
+            is_unpaid = (row.Name or "").strip().lower() in unpaid_types
+            days = leave_dates.setdefault(row.EmployeeId, {})
+            current = max(row.FromDate, first)
+            end = min(row.ToDate, last)
+            while current <= end:
+                if current in working_dates:
+                    days[current] = days.get(current, False) or is_unpaid
+                current += timedelta(days=1)
+
+        for emp_id, days in leave_dates.items():
+            i = index[emp_id]
+            unpaid = sum(1 for is_unpaid in days.values() if is_unpaid)
+            result["unpaid_leave_days"][i] = unpaid
+            result["paid_leave_days"][i] = len(days) - unpaid
+
+        recorded_absent = [0] * len(employee_ids)
+        for row in absent_rows:
+            if row.AttendenceDate not in leave_dates.get(row.EmployeeId, {}):
+                recorded_absent[index[row.EmployeeId]] += 1
+
+        # 3. Combine - working days neither attended nor on leave are absences.
+        # Recorded absences are always LOP; days with nothing recorded only
+        # when PAYROLL_LOP_FOR_UNMARKED_DAYS is set
+        for i in range(len(employee_ids)):
+            accounted = result["present_days"][i] + result["paid_leave_days"][i] + result["unpaid_leave_days"][i]
+            absent = max(0, result["working_days"] - accounted)
+            result["absent_days"][i] = absent
+            lop = result["unpaid_leave_days"][i] + min(recorded_absent[i], absent)
+            if settings.PAYROLL_LOP_FOR_UNMARKED_DAYS:
+                lop += absent - min(recorded_absent[i], absent)
+            result["lop_days"][i] = min(lop, period.days)
+
+        logger.info(
+            f"Attendance summary for {period.month_name} {period.year}: "
+            f"{len(employee_ids)} employees, {result['working_days']} working days, "
+            f"{sum(result['lop_days'])} LOP days in total"
+        )
+        return result
+
+    @staticmethod
+    def lop_days_by_employee(
+        db: Session,
+        period: Period,
+        employee_ids: Optional[List[int]] = None
+    ) -> Dict[int, int]:
+        """EmployeeId -> LOP days for the payroll run"""
+        summary = PayrollAttendanceService.calculate_month(db, period, employee_ids)
+        return dict(zip(summary["employee_ids"], summary["lop_days"]))
@@ -0,0 +1,240 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional, List, Dict, Any, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from datetime import date
+import logging
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.employee_salary_structure import EmployeeSalaryStructure
+from app.services.cache_service import CacheService
+from app.services.employee_salary_structure_service import EmployeeSalaryStructureService
+from app.utils.period import Period
+
+logger = logging.getLogger(__name__)
+
+FORECAST_EMPLOYEE_CACHE_VERSION_KEY = "payroll_forecast:employee_version"
+
+
+class PayrollForecastService:
+    """
+    Projects payroll cost over the coming months under what-if scenarios.
+    Active salary structures are loaded once into parallel arrays (per
+    request, or shared while structures and employees are unchanged when
+    ENABLE_CACHE is on). Each scenario collapses employees into
+    department x designation groups using difference arrays over the
+    forecast months, so the per-month work scales with the number of groups
+    rather than the number of employees.
+    """
+
+    @staticmethod
+    def _period_key(value) -> Optional[int]:
+        return value.year * 100 + value.month if value else None
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop the cached base - call after employee department, designation, exit or status changes"""
+        version = CacheService.get(FORECAST_EMPLOYEE_CACHE_VERSION_KEY) or 0
+        CacheService.set(FORECAST_EMPLOYEE_CACHE_VERSION_KEY, version + 1)
+
+    @staticmethod
+    def load_base(db: Session) -> Dict[str, List[Any]]:
+        """Current monthly components of every active employee as parallel arrays"""
+        # Tied to both versions: the base holds structure and Employee columns
+        cache_key = EmployeeSalaryStructureService._cache_key(
+            "forecast_base", CacheService.get(FORECAST_EMPLOYEE_CACHE_VERSION_KEY) or 0
+        )
+        return CacheService.remember(
+            db, cache_key, lambda: PayrollForecastService._query_base(db), ttl=settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def _query_base(db: Session) -> Dict[str, List[Any]]:
+        gross = func.coalesce(
+            EmployeeSalaryStructure.GROSSEARNINGS,
+            EmployeeSalaryStructureService._gross_earnings_expr()
+        )
+        deductions = func.coalesce(
+            EmployeeSalaryStructure.GROSSDEDUCTIONS,
+            EmployeeSalaryStructureService._gross_deductions_expr()
+        )
+        rows = db.query(
+            EmployeeSalaryStructure.EmployeeId,
+            gross.label("gross"),
+            deductions.label("deductions"),
+            func.coalesce(EmployeeSalaryStructure.PF, 0).label("pf"),
+            Employee.DepartmentId,
+            Employee.DesignationId,
+            Employee.StartedOn,
+            Employee.EndedOn,
+            Employee.LastWorkingDay
+        ).join(
+            Employee, Employee.EmployeeId == EmployeeSalaryStructure.EmployeeId
+        ).filter(
+            EmployeeSalaryStructure.IsActive == True,
+            Employee.IsActive == True
+        ).order_by(
+            EmployeeSalaryStructure.EmployeeSalaryStructureId
+        ).all()
+
+        # Latest active structure wins when an employee has more than one
+        latest = {row.EmployeeId: row for row in rows}
+        period_key = PayrollForecastService._period_key
+
+        base: Dict[str, List[Any]] = {
+            "employee_ids": [], "department_ids": [], "designation_ids": [],
+            "gross": [], "pf": [], "other_deductions": [],
+            "start_keys": [], "exit_keys": [],
+        }
+        for emp_id, row in latest.items():
+            gross_value = float(row.gross or 0)
+            pf_value = float(row.pf or 0)
+            base["employee_ids"].append(emp_id)
+            base["department_ids"].append(row.DepartmentId)
+            base["designation_ids"].append(row.DesignationId)
+            base["gross"].append(gross_value)
+            base["pf"].append(pf_value)
+            base["other_deductions"].append(float(row.deductions or 0) - pf_value)
+            base["start_keys"].append(period_key(row.StartedOn))
+            # A resignation alone is not an exit: people serving notice are still paid
+            base["exit_keys"].append(period_key(row.LastWorkingDay or row.EndedOn))
+
+        return base
+
+    @staticmethod
+    def _employee_ratios(base: Dict[str, List[Any]], employee_hikes: List[Any]) -> Dict[int, float]:
+        """EmployeeId -> salary multiplier from individual SalaryHikeModel entries"""
+        current = dict(zip(base["employee_ids"], base["gross"]))
+        ratios: Dict[int, float] = {}
+        for hike in employee_hikes:
+            if hike.latest_salary is None:
+                continue
+            original = float(hike.original_salary) if hike.original_salary else current.get(hike.employee_id)
+            if original:
+                ratios[hike.employee_id] = float(hike.latest_salary) / original
+        return ratios
+
+    @staticmethod
+    def _project_scenario(
+        base: Dict[str, List[Any]],
+        keys: List[int],
+        scenario: Any
+    ) -> Dict[str, Any]:
+        months = len(keys)
+        first_key, last_key = keys[0], keys[-1]
+        ratios = PayrollForecastService._employee_ratios(base, scenario.employee_hikes)
+
+        # 1. Difference arrays per department x designation group: +value in the
+        #    first month an employee is paid, -value after the last one
+        groups: Dict[Tuple[Any, Any], List[List[float]]] = {}
+        for i, emp_id in enumerate(base["employee_ids"]):
+            start_key = base["start_keys"][i]
+            exit_key = base["exit_keys"][i] if scenario.include_known_exits else None
+            if exit_key is not None and exit_key < first_key:
+                continue
+            if start_key is not None and start_key > last_key:
+                continue
+            first = bisect_left(keys, start_key) if start_key else 0
+            end = bisect_right(keys, exit_key) if exit_key else months
+
+            ratio = ratios.get(emp_id, 1.0)
+            values = (1.0, base["gross"][i] * ratio, base["pf"][i] * ratio, base["other_deductions"][i])
+            diffs = groups.setdefault(
+                (base["department_ids"][i], base["designation_ids"][i]),
+                [[0.0] * (months + 1) for _ in values]
+            )
+            for diff, value in zip(diffs, values):
+                diff[first] += value
+                diff[end] -= value
+
+        # Planned joiners enter their department x designation group at the
+        # salary given in the scenario, so group hikes and attrition apply to
+        # them too. Attrition counts from the joining month: scaling by
+        # 1 / survival[first] cancels the months before it
+        survival = [(1 - scenario.monthly_attrition_rate) ** i for i in range(months)]
+        for joiners in scenario.joiners:
+            first = bisect_left(keys, joiners.start_period) if joiners.start_period else 0
+            if first >= months:
+                continue
+            scale = joiners.count / survival[first]
+            values = (1.0, float(joiners.monthly_gross), 0.0, float(joiners.monthly_deductions))
+            diffs = groups.setdefault(
+                (joiners.department_id, joiners.designation_id),
+                [[0.0] * (months + 1) for _ in values]
+            )
+            for diff, value in zip(diffs, values):
+                diff[first] += value * scale
+
+        # 2. Group hike multipliers compound from each hike's effective month
+        headcount = [0.0] * months
+        gross = [0.0] * months
+        deductions = [0.0] * months
+        for (department_id, designation_id), diffs in groups.items():
+            multiplier = [1.0] * months
+            for hike in scenario.hikes:
+                if hike.department_id is not None and hike.department_id != department_id:
+                    continue
+                if hike.designation_id is not None and hike.designation_id != designation_id:
+                    continue
+                effective = bisect_left(keys, hike.effective_period) if hike.effective_period else 0
+                factor = 1 + hike.percentage / 100
+                for m in range(effective, months):
+                    multiplier[m] *= factor
+
+            heads, group_gross, group_pf, group_other = (list(accumulate(diff[:months])) for diff in diffs)
+            for m in range(months):
+                headcount[m] += heads[m] * survival[m]
+                gross[m] += group_gross[m] * multiplier[m] * survival[m]
+                deductions[m] += (group_pf[m] * multiplier[m] + group_other[m]) * survival[m]
+
+        periods = [
+            {
+                "period": keys[m],
+                "headcount": round(headcount[m], 2),
+                "gross_earnings": round(gross[m], 2),
+                "gross_deductions": round(deductions[m], 2),
+                "net_pay": round(gross[m] - deductions[m], 2),
+            }
+            for m in range(months)
+        ]
+        return {
+            "name": scenario.name,
+            "periods": periods,
+            "total_gross_earnings": round(sum(gross), 2),
+            "total_gross_deductions": round(sum(deductions), 2),
+            "total_net_pay": round(sum(gross) - sum(deductions), 2),
+        }
+
+    @staticmethod
+    def forecast(
+        db: Session,
+        scenarios: List[Any],
+        months: int = 12,
+        start_period: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Project monthly payroll cost for each scenario over `months` months"""
+        if start_period:
+            start = Period.from_key(start_period)
+        else:
+            today = date.today()
+            start = Period(today.year, today.month).shift(1)
+        keys = [start.shift(m).key for m in range(months)]
+
+        base = PayrollForecastService.load_base(db)
+        results = [
+            PayrollForecastService._project_scenario(base, keys, scenario)
+            for scenario in scenarios
+        ]
+
+        logger.info(
+            f"Payroll forecast from {start.key}: {months} months, "
+            f"{len(scenarios)} scenarios, {len(base['employee_ids'])} employees"
+        )
+        return {
+            "start_period": start.key,
+            "months": months,
+            "employees": len(base["employee_ids"]),
+            "scenarios": results,
+        }
@@ -0,0 +1,214 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+import logging
+import os
+
+from app.core import database
+from app.core.config import settings
+from app.models.employee_salary import EmployeeSalary
+from app.models.employee_salary_structure import EmployeeSalaryStructure
+from app.utils.period import Period
+from app.utils.indian_salary_converter import IndianSalaryConverter
+from app.utils.content_hash import ContentHash
+from app.services.monthly_salary_service import (
+    MonthlySalaryService,
+    EMPLOYEE_SALARY_CONTENT_FIELDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session factory of a worker process, created once by _init_worker
+_worker_session_factory = None
+
+
+def _init_worker() -> None:
+    """Give each worker process its own engine (connections are not fork-safe)"""
+    global _worker_session_factory
+    # A forked worker inherits the parent's pooled connections: drop them
+    # from this process's pool without closing them under the parent
+    if database.engine is not None:
+        database.engine.dispose(close=False)
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool, pool_pre_ping=True)
+    _worker_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _run_shard(employee_ids: List[int], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Process pool entry point - computes one shard on the worker's own connection"""
+    db = _worker_session_factory()
+    try:
+        return PayrollPartitionService.compute_shard(db, employee_ids, context)
+    finally:
+        db.close()
+
+
+class PayrollPartitionService:
+    """
+    Partitioned executor for multi-month payroll runs.
+    Employees are independent, so they are split into shards and each shard's
+    month chain (which must run in order for YTD) is computed in a worker
+    process. Workers only read; the caller merges their rows into one bulk write.
+    """
+
+    @staticmethod
+    def _latest_previous(
+        candidates: List[Tuple[Period, Any]],
+        period: Period
+    ) -> Optional[Any]:
+        """Latest salary before `period` in the same financial year"""
+        previous = [
+            (candidate, row) for candidate, row in candidates
+            if candidate.financial_year == period.financial_year and candidate < period
+        ]
+        if not previous:
+            return None
+        return max(previous, key=lambda item: item[0])[1]
+
+    @staticmethod
+    def compute_shard(
+        db: Session,
+        employee_ids: List[int],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Compute the month chain for a shard of employees.
+        Returns insert mappings, update mappings and the unchanged row count.
+        """
+        months: List[Dict[str, Any]] = context["months"]
+        salary_year: str = context["salary_year"]
+        run_salary_ids = [m["MonthlySalaryId"] for m in months]
+        run_financial_years = {
+            Period.from_month_name(m["SalaryMonth"], salary_year).financial_year for m in months
+        }
+
+        structures = db.query(EmployeeSalaryStructure).filter(
+            EmployeeSalaryStructure.EmployeeId.in_(employee_ids),
+            EmployeeSalaryStructure.IsActive == True
+        ).all()
+        structure_map = {s.EmployeeId: s for s in structures}
+
+        # Rows already published for the months of this run
+        existing_rows = db.query(EmployeeSalary).filter(
+            EmployeeSalary.EmployeeId.in_(employee_ids),
+            EmployeeSalary.MonthlySalaryId.in_(run_salary_ids)
+        ).all()
+        existing_map = {(es.MonthlySalaryId, es.EmployeeId): es for es in existing_rows}
+
+        # Earlier salaries that can seed YTD (one query for the whole shard)
+        history_rows = db.query(EmployeeSalary).filter(
+            EmployeeSalary.EmployeeId.in_(employee_ids),
+            EmployeeSalary.MonthlySalaryId.notin_(run_salary_ids),
+            EmployeeSalary.FinancialYear.in_(run_financial_years),
+            EmployeeSalary.IsActive == True
+        ).all()
+        history: Dict[int, List[Tuple[Period, EmployeeSalary]]] = {}
+        for row in history_rows:
+            history.setdefault(row.EmployeeId, []).append((Period.from_key(row.SalaryPeriod), row))
+
+        columns = [c for c in EmployeeSalary.__table__.columns.keys() if c != "EmployeeSalaryId"]
+        to_add: List[Dict[str, Any]] = []
+        to_update: List[Dict[str, Any]] = []
+        unchanged = 0
+
+        for emp_id in employee_ids:
+            structure = structure_map.get(emp_id)
+            if not structure:
+                logger.warning(f"No salary structure for employee {emp_id}, skipping.")
+                continue
+
+            chain = list(history.get(emp_id, []))
+
+            for month in months:
+                salary_month = month["SalaryMonth"]
+                period = Period.from_month_name(salary_month, salary_year)
+                header_values = MonthlySalaryService._employee_header_values(
+                    month["Title"],
+                    salary_month,
+                    salary_year,
+                    context["location"],
+                    month["StdDays"],
+                    month["LopDaysByEmployee"].get(emp_id, 0)
+                )
+
+                existing_es = existing_map.get((month["MonthlySalaryId"], emp_id))
+                if existing_es:
+                    mapping, _ = MonthlySalaryService._diff_employee_salary(
+                        existing_es,
+                        header_values,
+                        month["ModifiedOn"],
+                        month["ModifiedBy"]
+                    )
+                    if mapping:
+                        to_update.append(mapping)
+                    else:
+                        unchanged += 1
+                        backfill = MonthlySalaryService._row_hash_backfill(existing_es)
+                        if backfill:
+                            to_update.append(backfill)
+                    chain.append((period, existing_es))
+                    continue
+
+                employee_salary = EmployeeSalary(**header_values)
+                employee_salary.MonthlySalaryId = month["MonthlySalaryId"]
+                employee_salary.EmployeeId = emp_id
+                employee_salary.CreatedBy = context["created_by"]
+                employee_salary.ModifiedBy = context["created_by"]
+                employee_salary.CreatedOn = context["now"]
+                employee_salary.ModifiedOn = context["now"]
+                employee_salary.IsActive = True
+
+                latest_previous = None
+                if not MonthlySalaryService.is_april_month(salary_month):
+                    latest_previous = PayrollPartitionService._latest_previous(chain, period)
+
+                if latest_previous is None:
+                    MonthlySalaryService._set_first_month_of_financial_year(employee_salary, structure)
+                else:
+                    MonthlySalaryService._set_subsequent_salaries(employee_salary, structure, latest_previous)
+
+                net_salary = (structure.GROSSEARNINGS or 0) - (structure.GROSSDEDUCTIONS or 0)
+                employee_salary.INWords = IndianSalaryConverter.convert_to_words(net_salary)
+                employee_salary.RowHash = ContentHash.of_row(employee_salary, EMPLOYEE_SALARY_CONTENT_FIELDS)
+
+                to_add.append({c: getattr(employee_salary, c) for c in columns})
+                chain.append((period, employee_salary))
+
+        return {"to_add": to_add, "to_update": to_update, "unchanged": unchanged}
+
+    @staticmethod
+    def _shard(employee_ids: List[int], shard_size: int) -> List[List[int]]:
+        return [employee_ids[i:i + shard_size] for i in range(0, len(employee_ids), shard_size)]
+
+    @staticmethod
+    def execute(
+        db: Session,
+        employee_ids: List[int],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Run all shards and merge their results.
+        Falls back to in-process execution on `db` for a single shard or when
+        no DATABASE_URL is configured for the workers to connect with.
+        """
+        shard_size = max(1, settings.PAYROLL_SHARD_SIZE)
+        shards = PayrollPartitionService._shard(employee_ids, shard_size)
+        max_workers = settings.PAYROLL_MAX_WORKERS or os.cpu_count() or 1
+
+        merged = {"to_add": [], "to_update": [], "unchanged": 0}
+
+        if len(shards) <= 1 or max_workers <= 1 or not settings.DATABASE_URL:
+            results = [PayrollPartitionService.compute_shard(db, shard, context) for shard in shards]
+        else:
+            workers = min(max_workers, len(shards))
+            logger.info(f"Computing {len(employee_ids)} employees in {len(shards)} shards on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                results = list(executor.map(_run_shard, shards, [context] * len(shards)))
+
+        for result in results:
+            merged["to_add"].extend(result["to_add"])
+            merged["to_update"].extend(result["to_update"])
+            merged["unchanged"] += result["unchanged"]
+
+        return merged
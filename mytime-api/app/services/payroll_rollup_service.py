@@ -0,0 +1,190 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, distinct, literal, DateTime
+from typing import Optional, List, Dict, Any, Iterable
+from datetime import datetime
+from decimal import Decimal
+import logging
+
+from app.models.department import Department
+from app.models.designation import Designation
+from app.models.employee import Employee
+from app.models.employee_salary import EmployeeSalary
+from app.models.payroll_rollup import PayrollRollup
+
+logger = logging.getLogger(__name__)
+
+# group_by name -> rollup column
+ROLLUP_DIMENSIONS = {
+    "period": PayrollRollup.SalaryPeriod,
+    "financial_year": PayrollRollup.FinancialYear,
+    "department": PayrollRollup.DepartmentId,
+    "designation": PayrollRollup.DesignationId,
+}
+
+
+class PayrollRollupService:
+    """
+    Payroll totals per salary period x department x designation.
+    The PayrollRollup table is rebuilt one period at a time from
+    EmployeeSalary when a publish completes or an EmployeeSalary row is
+    written through EmployeeSalaryService, so analytics queries only ever
+    read the small rollup table regardless of how much history exists.
+    MonthlySalary header edits do not feed the rollup; employee department
+    or designation changes and direct database edits need /rollup/rebuild.
+    """
+
+    @staticmethod
+    def refresh_periods(db: Session, periods: Iterable[int]) -> int:
+        """Recompute the rollup rows of the given YYYYMM periods, returns rows written"""
+        periods = sorted({int(p) for p in periods if p})
+        if not periods:
+            return 0
+
+        db.query(PayrollRollup).filter(
+            PayrollRollup.SalaryPeriod.in_(periods)
+        ).delete(synchronize_session=False)
+
+        source = select(
+            EmployeeSalary.SalaryPeriod,
+            func.max(EmployeeSalary.FinancialYear),
+            Employee.DepartmentId,
+            Employee.DesignationId,
+            func.count(distinct(EmployeeSalary.EmployeeId)),
+            func.sum(func.coalesce(EmployeeSalary.Earning_Montly_GROSSEARNINGS, 0)),
+            func.sum(func.coalesce(EmployeeSalary.Deduction_Montly_GROSSSDeduction, 0)),
+            func.sum(func.coalesce(EmployeeSalary.NETPAY, 0)),
+            func.sum(func.coalesce(EmployeeSalary.LOPDAYS, 0)),
+            literal(datetime.utcnow(), DateTime),
+        ).select_from(EmployeeSalary).outerjoin(
+            Employee, Employee.EmployeeId == EmployeeSalary.EmployeeId
+        ).where(
+            EmployeeSalary.SalaryPeriod.in_(periods),
+            EmployeeSalary.IsActive == True
+        ).group_by(
+            EmployeeSalary.SalaryPeriod, Employee.DepartmentId, Employee.DesignationId
+        )
+
+        result = db.execute(
+            insert(PayrollRollup).from_select(
+                [
+                    "SalaryPeriod", "FinancialYear", "DepartmentId", "DesignationId",
+                    "Headcount", "GrossEarnings", "GrossDeductions", "NetPay", "LopDays",
+                    "RefreshedOn",
+                ],
+                source,
+            )
+        )
+        db.commit()
+        logger.info(f"Refreshed payroll rollup for periods {periods}: {result.rowcount} rows")
+        return result.rowcount
+
+    @staticmethod
+    def refresh_after_write(db: Session, periods: Iterable[int]) -> None:
+        """Refresh hook for payroll publishes and salary edits - the write itself is already committed"""
+        periods = list(periods)
+        try:
+            PayrollRollupService.refresh_periods(db, periods)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Payroll rollup refresh failed for periods {list(periods)}: {str(e)}")
+
+    @staticmethod
+    def rebuild(db: Session, from_period: Optional[int] = None, to_period: Optional[int] = None) -> int:
+        """Recompute every period that has salaries (optionally within a range)"""
+        query = db.query(EmployeeSalary.SalaryPeriod).filter(
+            EmployeeSalary.SalaryPeriod.isnot(None)
+        ).distinct()
+        if from_period:
+            query = query.filter(EmployeeSalary.SalaryPeriod >= from_period)
+        if to_period:
+            query = query.filter(EmployeeSalary.SalaryPeriod <= to_period)
+        periods = [row[0] for row in query.all()]
+        return PayrollRollupService.refresh_periods(db, periods)
+
+    @staticmethod
+    def query(
+        db: Session,
+        group_by: List[str],
+        from_period: Optional[int] = None,
+        to_period: Optional[int] = None,
+        financial_year: Optional[int] = None,
+        department_id: Optional[int] = None,
+        designation_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Slice the rollup by any of period / financial_year / department /
+        designation. Drill down by adding a dimension to group_by and filtering
+        on the value picked at the previous level.
+        """
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Unknown group_by dimension(s): {', '.join(unknown)}. "
+                f"Allowed: {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        group_by = list(dict.fromkeys(group_by))
+
+        dimension_columns = [ROLLUP_DIMENSIONS[name].label(name) for name in group_by]
+
+        query = db.query(
+            *dimension_columns,
+            func.sum(PayrollRollup.Headcount).label("employee_months"),
+            func.count(distinct(PayrollRollup.SalaryPeriod)).label("periods"),
+            func.sum(PayrollRollup.GrossEarnings).label("gross_earnings"),
+            func.sum(PayrollRollup.GrossDeductions).label("gross_deductions"),
+            func.sum(PayrollRollup.NetPay).label("net_pay"),
+            func.sum(PayrollRollup.LopDays).label("lop_days"),
+        )
+
+        if from_period:
+            query = query.filter(PayrollRollup.SalaryPeriod >= from_period)
+        if to_period:
+            query = query.filter(PayrollRollup.SalaryPeriod <= to_period)
+        if financial_year:
+            query = query.filter(PayrollRollup.FinancialYear == financial_year)
+        if department_id:
+            query = query.filter(PayrollRollup.DepartmentId == department_id)
+        if designation_id:
+            query = query.filter(PayrollRollup.DesignationId == designation_id)
+
+        if group_by:
+            query = query.group_by(*[ROLLUP_DIMENSIONS[name] for name in group_by])
+            query = query.order_by(*[ROLLUP_DIMENSIONS[name] for name in group_by])
+
+        results = query.all()
+
+        # Org unit names from the (small) master tables
+        department_names: Dict[int, str] = {}
+        designation_names: Dict[int, str] = {}
+        if "department" in group_by:
+            ids = {row.department for row in results if row.department is not None}
+            if ids:
+                department_names = dict(db.query(Department.DepartmentId, Department.Name).filter(
+                    Department.DepartmentId.in_(ids)
+                ).all())
+        if "designation" in group_by:
+            ids = {row.designation for row in results if row.designation is not None}
+            if ids:
+                designation_names = dict(db.query(Designation.DesignationId, Designation.Name).filter(
+                    Designation.DesignationId.in_(ids)
+                ).all())
+
+        rows = []
+        for row in results:
+            item = {name: getattr(row, name) for name in group_by}
+            if "department" in group_by:
+                item["department_name"] = department_names.get(row.department)
+            if "designation" in group_by:
+                item["designation_name"] = designation_names.get(row.designation)
+            periods = row.periods or 0
+            item.update({
+                "employee_months": int(row.employee_months or 0),
+                "average_headcount": round((row.employee_months or 0) / periods, 2) if periods else 0,
+                "gross_earnings": Decimal(str(row.gross_earnings or 0)),
+                "gross_deductions": Decimal(str(row.gross_deductions or 0)),
+                "net_pay": Decimal(str(row.net_pay or 0)),
+                "lop_days": int(row.lop_days or 0),
+            })
+            rows.append(item)
+
+        return {"group_by": group_by, "rows": rows}
@@ -0,0 +1,319 @@
+from sqlalchemy.orm import Session
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Callable
+from decimal import Decimal
+import logging
+import os
+import zipfile
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.employee_salary import EmployeeSalary
+from app.models.monthly_salary import MonthlySalary
+from app.models.department import Department
+from app.models.designation import Designation
+from app.services.b2_storage_service import b2_storage
+from app.utils.content_hash import ContentHash
+from app.utils.indian_salary_converter import IndianSalaryConverter
+from app.utils.pdf_writer import SimplePdfDocument, PAGE_WIDTH
+from app.utils.zip_stream import ZipChunkBuffer
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so every cached payslip is re-rendered
+PAYSLIP_TEMPLATE_VERSION = "1"
+
+# Below this many payslips a process pool costs more than it saves
+PAYSLIP_POOL_THRESHOLD = 200
+
+PAYSLIP_EARNINGS = (
+    ("Basic", "Earning_Monthly_Basic", "Earning_YTD_Basic"),
+    ("HRA", "Earning_Montly_HRA", "Earning_YTD_HRA"),
+    ("Conveyance", "Earning_Montly_CONVEYANCE", "Earning_YTD_CONVEYANCE"),
+    ("Medical Allowance", "Earning_Montly_MEDICALALLOWANCE", "Earning_YTD_MEDICALALLOWANCE"),
+    ("Special Allowance", "Earning_Montly_SPECIALALLOWANCE", "Earning_YTD_SPECIALALLOWANCE"),
+    ("Special Bonus", "Earning_Montly_SPECIALBONUS", "Earning_YTD_SPECIALBONUS"),
+    ("Statutory Bonus", "Earning_Montly_STATUTORYBONUS", "Earning_YTD_STATUTORYBONUS"),
+    ("Others", "Earning_Montly_OTHERS", "Earning_YTD_OTHERS"),
+)
+
+PAYSLIP_DEDUCTIONS = (
+    ("Professional Tax", "Deduction_Montly_PROFESSIONALTAX", "Deduction_YTD_PROFESSIONALTAX"),
+    ("Provident Fund", "Deduction_Montly_ProvidentFund", "Deduction_YTD_ProvidentFund"),
+    ("Group Health Insurance", "Deduction_Montly_GroupHealthInsurance", "Deduction_YTD_GroupHealthInsurance"),
+    ("Others", "Deduction_Montly_OTHERS", "Deduction_YTD_OTHERS"),
+)
+
+PAYSLIP_FIELDS = (
+    "EmployeeSalaryId", "EmployeeId", "EmployeeCode", "EmployeeName", "Designation", "Department",
+    "Title", "SalaryMonth", "SalaryYear", "SalaryPeriod", "LOCATION", "STDDAYS", "WRKDAYS", "LOPDAYS",
+    "Earning_Montly_GROSSEARNINGS", "Earning_YTD_GROSSEARNINGS",
+    "Deduction_Montly_GROSSSDeduction", "Deduction_YTD_GROSSSDeduction",
+    "NETPAY", "NETTRANSFER", "CompanyName", "TemplateVersion",
+) + tuple(field for _, monthly, ytd in PAYSLIP_EARNINGS + PAYSLIP_DEDUCTIONS for field in (monthly, ytd))
+
+
+def _amount(value: Any) -> str:
+    return f"{Decimal(str(value or 0)):,.2f}"
+
+
+def render_payslip(payload: Dict[str, Any]) -> bytes:
+    """Render one payslip PDF (module level so it can run in a worker process)"""
+    pdf = SimplePdfDocument()
+    left, right = 40, PAGE_WIDTH - 40
+
+    pdf.text(left, 60, payload.get("CompanyName") or "", size=16, bold=True)
+    pdf.text(left, 82, payload.get("Title") or f"Pay Slip for the month of {payload.get('SalaryMonth')} {payload.get('SalaryYear')}", size=11)
+    pdf.line(left, 92, right, 92, width=1)
+
+    details = (
+        ("Employee Name", payload.get("EmployeeName")), ("Employee Code", payload.get("EmployeeCode")),
+        ("Designation", payload.get("Designation")), ("Department", payload.get("Department")),
+        ("Location", payload.get("LOCATION")), ("Standard Days", payload.get("STDDAYS")),
+        ("Working Days", payload.get("WRKDAYS")), ("LOP Days", payload.get("LOPDAYS")),
+    )
+    y = 112
+    for i, (label, value) in enumerate(details):
+        x = left if i % 2 == 0 else PAGE_WIDTH / 2
+        pdf.text(x, y, f"{label}:", bold=True)
+        pdf.text(x + 95, y, "" if value is None else value)
+        if i % 2 == 1:
+            y += 16
+
+    # Earnings on the left half, deductions on the right half
+    top = y + 10
+    middle = PAGE_WIDTH / 2
+    pdf.rect(left, top, right - left, 22 + 16 * (len(PAYSLIP_EARNINGS) + 1))
+    pdf.line(middle, top, middle, top + 22 + 16 * (len(PAYSLIP_EARNINGS) + 1))
+    for x0, x1, heading in ((left, middle, "Earnings"), (middle, right, "Deductions")):
+        pdf.text(x0 + 6, top + 15, heading, bold=True)
+        pdf.text_right(x1 - 86, top + 15, "Monthly", bold=True)
+        pdf.text_right(x1 - 6, top + 15, "YTD", bold=True)
+    pdf.line(left, top + 22, right, top + 22)
+
+    def rows(x0, x1, items, total_label, total_monthly, total_ytd):
+        row_y = top + 36
+        for label, monthly, ytd in items:
+            pdf.text(x0 + 6, row_y, label)
+            pdf.text_right(x1 - 86, row_y, _amount(payload.get(monthly)))
+            pdf.text_right(x1 - 6, row_y, _amount(payload.get(ytd)))
+            row_y += 16
+        row_y = top + 36 + 16 * len(PAYSLIP_EARNINGS)
+        pdf.text(x0 + 6, row_y, total_label, bold=True)
+        pdf.text_right(x1 - 86, row_y, _amount(payload.get(total_monthly)), bold=True)
+        pdf.text_right(x1 - 6, row_y, _amount(payload.get(total_ytd)), bold=True)
+
+    rows(left, middle, PAYSLIP_EARNINGS, "Gross Earnings", "Earning_Montly_GROSSEARNINGS", "Earning_YTD_GROSSEARNINGS")
+    rows(middle, right, PAYSLIP_DEDUCTIONS, "Gross Deductions", "Deduction_Montly_GROSSSDeduction", "Deduction_YTD_GROSSSDeduction")
+
+    y = top + 22 + 16 * (len(PAYSLIP_EARNINGS) + 1) + 24
+    net_pay = Decimal(str(payload.get("NETPAY") or 0))
+    pdf.text(left, y, "Net Pay:", size=11, bold=True)
+    pdf.text(left + 95, y, f"Rs. {_amount(net_pay)}", size=11, bold=True)
+    pdf.text(left, y + 18, "In Words:", bold=True)
+    pdf.text(left + 95, y + 18, IndianSalaryConverter.convert_to_words(net_pay))
+    pdf.text(left, y + 54, "This is a system generated payslip and does not require a signature.", size=8)
+    return pdf.render()
+
+
+def _render_entry(payload: Dict[str, Any]) -> Tuple[int, bytes]:
+    return payload["EmployeeSalaryId"], render_payslip(payload)
+
+
+class PayslipService:
+    """
+    Batch PDF payslips for a monthly salary run.
+    Each payslip is keyed by a content hash of everything printed on it; the
+    hash is stored on the EmployeeSalary row, so only payslips whose content
+    changed are rendered (across a process pool) and uploaded to B2 again.
+    """
+
+    @staticmethod
+    def build_payloads(
+        db: Session,
+        monthly_salary_id: int,
+        employee_salary_ids: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Everything printed on each payslip of the run, loaded in one query"""
+        query = db.query(
+            EmployeeSalary,
+            Employee.EmployeeCode,
+            Employee.FirstName,
+            Employee.LastName,
+            Designation.Name.label("DesignationName"),
+            Department.Name.label("DepartmentName")
+        ).outerjoin(
+            Employee, Employee.EmployeeId == EmployeeSalary.EmployeeId
+        ).outerjoin(
+            Designation, Designation.DesignationId == Employee.DesignationId
+        ).outerjoin(
+            Department, Department.DepartmentId == Employee.DepartmentId
+        ).filter(
+            EmployeeSalary.MonthlySalaryId == monthly_salary_id,
+            EmployeeSalary.IsActive == True
+        )
+        if employee_salary_ids is not None:
+            query = query.filter(EmployeeSalary.EmployeeSalaryId.in_(employee_salary_ids))
+
+        payloads = []
+        for es, code, first_name, last_name, designation, department in query.order_by(EmployeeSalary.EmployeeId).all():
+            payload = {field: getattr(es, field, None) for field in PAYSLIP_FIELDS if hasattr(EmployeeSalary, field)}
+            payload.update({
+                "EmployeeCode": code,
+                "EmployeeName": " ".join(part for part in (first_name, last_name) if part),
+                "Designation": designation,
+                "Department": department,
+                "CompanyName": settings.PAYSLIP_COMPANY_NAME,
+                "TemplateVersion": PAYSLIP_TEMPLATE_VERSION,
+            })
+            # Plain values only - payloads are pickled to worker processes
+            payload = {key: ContentHash.normalize(value) if isinstance(value, Decimal) else value for key, value in payload.items()}
+            payload["ContentHash"] = ContentHash.of_values(payload, PAYSLIP_FIELDS)
+            payload["StoredHash"] = es.PayslipHash
+            payload["StoredFileId"] = es.PayslipFileId
+            payloads.append(payload)
+        return payloads
+
+    @staticmethod
+    def _storage_key(payload: Dict[str, Any]) -> str:
+        code = "".join(c for c in str(payload.get("EmployeeCode") or payload["EmployeeId"]) if c.isalnum() or c in "._-")
+        return f"{settings.PAYSLIP_STORAGE_PREFIX}/{payload.get('SalaryPeriod')}/{code}_{payload['ContentHash'][:16]}.pdf"
+
+    @staticmethod
+    def _file_name(payload: Dict[str, Any]) -> str:
+        code = "".join(c for c in str(payload.get("EmployeeCode") or payload["EmployeeId"]) if c.isalnum() or c in "._-")
+        return f"Payslip_{code}_{payload.get('SalaryMonth')}_{payload.get('SalaryYear')}.pdf"
+
+    @staticmethod
+    def render_many(
+        payloads: List[Dict[str, Any]],
+        render_entry: Callable[[Dict[str, Any]], Tuple[int, bytes]] = _render_entry
+    ) -> Iterator[Tuple[int, bytes]]:
+        """
+        Render documents in order, across all cores for large batches.
+        `render_entry` must be a module-level function returning (id, pdf) so
+        it can run in a worker process; payslips by default.
+        """
+        if len(payloads) < PAYSLIP_POOL_THRESHOLD:
+            for payload in payloads:
+                yield render_entry(payload)
+            return
+
+        workers = settings.PAYROLL_MAX_WORKERS or os.cpu_count() or 1
+        chunksize = max(1, len(payloads) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(render_entry, payloads, chunksize=chunksize)
+
+    @staticmethod
+    def render_monthly_salary(
+        db: Session,
+        monthly_salary_id: int,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """Render and store every payslip of the run whose content changed"""
+        if b2_storage is None:
+            raise RuntimeError("Storage service is unavailable. Check B2 configuration.")
+
+        monthly_salary = db.query(MonthlySalary).filter(MonthlySalary.MonthlySalaryId == monthly_salary_id).first()
+        if not monthly_salary:
+            raise ValueError(f"Monthly salary with ID {monthly_salary_id} not found")
+
+        payloads = PayslipService.build_payloads(db, monthly_salary_id)
+        stale = [
+            p for p in payloads
+            if force or p["StoredHash"] != p["ContentHash"] or not p["StoredFileId"]
+        ]
+        logger.info(f"Payslips for monthly salary {monthly_salary_id}: {len(stale)} to render, {len(payloads) - len(stale)} cached")
+
+        by_id = {p["EmployeeSalaryId"]: p for p in stale}
+        mappings = []
+
+        def upload(entry: Tuple[int, bytes]) -> Dict[str, Any]:
+            employee_salary_id, content = entry
+            payload = by_id[employee_salary_id]
+            key = b2_storage.put_object(PayslipService._storage_key(payload), content, "application/pdf")
+            return {
+                "EmployeeSalaryId": employee_salary_id,
+                "PayslipHash": payload["ContentHash"],
+                "PayslipFileId": key,
+            }
+
+        failed: List[Exception] = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, settings.PAYSLIP_UPLOAD_THREADS)) as uploader:
+                futures = []
+                try:
+                    for entry in PayslipService.render_many(stale):
+                        futures.append(uploader.submit(upload, entry))
+                finally:
+                    # Collect every upload that finished, even when rendering or
+                    # another upload failed
+                    for future in as_completed(futures):
+                        try:
+                            mappings.append(future.result())
+                        except Exception as e:
+                            failed.append(e)
+        finally:
+            # Record what is already stored, so a rerun skips it instead of
+            # uploading it again and orphaning the first copy
+            if mappings:
+                db.bulk_update_mappings(EmployeeSalary, mappings)
+                db.commit()
+
+        if failed:
+            logger.error(
+                f"Payslips for monthly salary {monthly_salary_id}: {len(failed)} uploads failed, "
+                f"{len(mappings)} stored"
+            )
+            raise failed[0]
+
+        return {
+            "success": True,
+            "monthly_salary_id": monthly_salary_id,
+            "total": len(payloads),
+            "rendered": len(mappings),
+            "cached": len(payloads) - len(mappings),
+        }
+
+    @staticmethod
+    def get_payslip(db: Session, employee_salary_id: int) -> Tuple[str, bytes]:
+        """(file name, PDF) of one payslip, from the cache when it is current"""
+        es = db.query(EmployeeSalary).filter(EmployeeSalary.EmployeeSalaryId == employee_salary_id).first()
+        if not es:
+            raise ValueError(f"Employee salary with ID {employee_salary_id} not found")
+
+        payloads = PayslipService.build_payloads(db, es.MonthlySalaryId, [employee_salary_id])
+        if not payloads:
+            raise ValueError(f"Employee salary with ID {employee_salary_id} is not active")
+        payload = payloads[0]
+
+        if b2_storage is not None and payload["StoredFileId"] and payload["StoredHash"] == payload["ContentHash"]:
+            return PayslipService._file_name(payload), b2_storage.get_object_content(payload["StoredFileId"])
+        return PayslipService._file_name(payload), render_payslip(payload)
+
+    @staticmethod
+    def stream_monthly_zip(db: Session, monthly_salary_id: int) -> Iterator[bytes]:
+        """
+        ZIP of all payslips of the run, produced chunk by chunk.
+        Cached payslips are read back from B2; the rest are rendered.
+        """
+        payloads = PayslipService.build_payloads(db, monthly_salary_id)
+        cached = []
+        stale = []
+        for payload in payloads:
+            if b2_storage is not None and payload["StoredFileId"] and payload["StoredHash"] == payload["ContentHash"]:
+                cached.append(payload)
+            else:
+                stale.append(payload)
+
+        buffer = ZipChunkBuffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for payload in cached:
+                archive.writestr(PayslipService._file_name(payload), b2_storage.get_object_content(payload["StoredFileId"]))
+                yield buffer.drain()
+
+            by_id = {p["EmployeeSalaryId"]: p for p in stale}
+            for employee_salary_id, content in PayslipService.render_many(stale):
+                archive.writestr(PayslipService._file_name(by_id[employee_salary_id]), content)
+                yield buffer.drain()
+        yield buffer.drain()
@@ -0,0 +1,220 @@
+from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+import json
+import logging
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.repoting_manager import RepotingManager
+from app.services.cache_service import CacheService
+from app.utils.reporting_tree import ReportingTree
+from app.utils.helpers import batches
+
+logger = logging.getLogger(__name__)
+
+REPORTING_HIERARCHY_CACHE_VERSION_KEY = "reporting_hierarchy:version"
+
+
+class ReportingHierarchyService:
+    """
+    Reporting lines (RepotingManager: EmployeeId -> ManagerId) and the
+    "who is in my org" questions built on them. The whole hierarchy is
+    loaded with one query into a ReportingTree and kept for the request
+    (CacheService.remember), so repeated is_manager_of and descendants
+    calls do not touch the database. With ENABLE_CACHE on the tree is shared
+    for up to CACHE_TTL, and a reporting change only invalidates it in the
+    worker that made it.
+    """
+
+    @staticmethod
+    def _cache_key(name: str, *parts: Any) -> str:
+        """Cache key tied to the current hierarchy version"""
+        version = CacheService.get(REPORTING_HIERARCHY_CACHE_VERSION_KEY) or 0
+        return ":".join(["reporting_hierarchy", str(version), name, *map(str, parts)])
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop the cached tree and org charts - call after reporting lines or employee names change"""
+        version = CacheService.get(REPORTING_HIERARCHY_CACHE_VERSION_KEY) or 0
+        CacheService.set(REPORTING_HIERARCHY_CACHE_VERSION_KEY, version + 1)
+
+    @staticmethod
+    def tree(db: Session) -> ReportingTree:
+        """The active reporting lines as a ReportingTree (one query per request)"""
+        return CacheService.remember(
+            db, ReportingHierarchyService._cache_key("tree"),
+            lambda: ReportingHierarchyService._load_tree(db), ttl=settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def _load_tree(db: Session) -> ReportingTree:
+        # Oldest first: when an employee has several active lines the latest wins
+        rows = db.query(RepotingManager.EmployeeId, RepotingManager.ManagerId).filter(
+            RepotingManager.IsActive == True,
+            RepotingManager.EmployeeId.isnot(None),
+            RepotingManager.ManagerId.isnot(None)
+        ).order_by(RepotingManager.RepotingManagerId).all()
+        tree = ReportingTree((row.EmployeeId, row.ManagerId) for row in rows)
+        for employee_id, manager_id in tree.broken_edges:
+            logger.warning(f"Reporting cycle: ignoring line employee {employee_id} -> manager {manager_id}")
+        return tree
+
+    @staticmethod
+    def is_manager_of(db: Session, manager_id: int, employee_id: int) -> bool:
+        """True when employee_id reports to manager_id, directly or indirectly"""
+        return ReportingHierarchyService.tree(db).is_manager_of(manager_id, employee_id)
+
+    @staticmethod
+    def descendants(db: Session, manager_id: int, depth: Optional[int] = None) -> List[int]:
+        """Employee ids below manager_id (depth=1 for direct reports only)"""
+        if depth is not None and depth < 1:
+            raise ValueError("depth must be at least 1")
+        return ReportingHierarchyService.tree(db).descendants(manager_id, depth)
+
+    @staticmethod
+    def ancestors(db: Session, employee_id: int) -> List[int]:
+        """Managers of employee_id, nearest first"""
+        return ReportingHierarchyService.tree(db).ancestors(employee_id)
+
+    @staticmethod
+    def _employee_details(db: Session, employee_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        details = {}
+        for batch in batches(sorted(employee_ids)):
+            for row in db.query(
+                Employee.EmployeeId, Employee.EmployeeCode, Employee.FirstName, Employee.LastName,
+                Employee.DesignationId, Employee.DepartmentId
+            ).filter(Employee.EmployeeId.in_(batch)).all():
+                details[row.EmployeeId] = {
+                    "employee_code": row.EmployeeCode,
+                    "name": " ".join(part for part in (row.FirstName, row.LastName) if part) or None,
+                    "designation_id": row.DesignationId,
+                    "department_id": row.DepartmentId,
+                }
+        return details
+
+    @staticmethod
+    def org_chart(db: Session, root_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        The hierarchy as nested nodes (the whole organisation, or the
+        subtree under root_id), with one employee lookup per 1000 people.
+        """
+        tree = ReportingHierarchyService.tree(db)
+        if root_id is not None and root_id not in tree:
+            raise ValueError(f"Employee {root_id} has no reporting lines")
+        roots = tree.roots if root_id is None else [root_id]
+        root_set = set(roots)
+        members = [
+            employee_id for root in roots for employee_id in [root] + tree.descendants(root)
+        ]
+        details = ReportingHierarchyService._employee_details(db, members)
+
+        # Depth-first order puts every manager before their reports, so one
+        # pass builds the nesting without recursion
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for employee_id in members:
+            node = {
+                "employee_id": employee_id,
+                **details.get(employee_id, {"employee_code": None, "name": None,
+                                            "designation_id": None, "department_id": None}),
+                "depth": tree.depth[employee_id],
+                "reports": [],
+            }
+            nodes[employee_id] = node
+            if employee_id not in root_set:
+                nodes[tree.manager_of[employee_id]]["reports"].append(node)
+
+        return {
+            "root_id": root_id,
+            "total": len(members),
+            "roots": [nodes[root] for root in roots],
+        }
+
+    @staticmethod
+    def org_chart_json(db: Session, root_id: Optional[int] = None) -> bytes:
+        """org_chart serialised once; with ENABLE_CACHE on, repeated requests skip building and encoding"""
+        return CacheService.remember(
+            db, ReportingHierarchyService._cache_key("org_chart", root_id),
+            lambda: json.dumps(
+                ReportingHierarchyService.org_chart(db, root_id), separators=(",", ":")
+            ).encode(),
+            ttl=settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def fetch_reporting_lines(db: Session, employee_id: Optional[int] = None,
+                              manager_id: Optional[int] = None) -> List[RepotingManager]:
+        """Active reporting lines, optionally of one employee or one manager's direct reports"""
+        query = db.query(RepotingManager).filter(RepotingManager.IsActive == True)
+        if employee_id is not None:
+            query = query.filter(RepotingManager.EmployeeId == employee_id)
+        if manager_id is not None:
+            query = query.filter(RepotingManager.ManagerId == manager_id)
+        return query.order_by(RepotingManager.RepotingManagerId).all()
+
+    @staticmethod
+    def _locked_ancestors(db: Session, employee_id: int) -> List[int]:
+        """
+        Managers of employee_id read from the table (not the tree, which may
+        be shared and stale when ENABLE_CACHE is on), locking each line read until
+        the transaction ends so a concurrent reassignment cannot close a cycle.
+        """
+        ancestors: List[int] = []
+        current = employee_id
+        while True:
+            row = db.query(RepotingManager.ManagerId).filter(
+                RepotingManager.EmployeeId == current,
+                RepotingManager.IsActive == True,
+                RepotingManager.ManagerId.isnot(None)
+            ).order_by(RepotingManager.RepotingManagerId.desc()).with_hint(RepotingManager, "WITH (UPDLOCK, HOLDLOCK)", "mssql").first()
+            if row is None or row.ManagerId in ancestors or row.ManagerId == employee_id:
+                return ancestors
+            ancestors.append(row.ManagerId)
+            current = row.ManagerId
+
+    @staticmethod
+    def assign_manager(db: Session, employee_id: int, manager_id: int,
+                       user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Make manager_id the (only) active manager of employee_id"""
+        if employee_id == manager_id:
+            return {"success": False, "message": "An employee cannot report to themselves"}
+        found = {row.EmployeeId for row in db.query(Employee.EmployeeId).filter(
+            Employee.EmployeeId.in_([employee_id, manager_id])
+        ).all()}
+        if len(found) < 2:
+            missing = employee_id if employee_id not in found else manager_id
+            return {"success": False, "message": f"Employee {missing} not found"}
+
+        now = datetime.now()
+        try:
+            db.query(RepotingManager).filter(
+                RepotingManager.EmployeeId == employee_id,
+                RepotingManager.IsActive == True
+            ).update({"IsActive": False, "ModifiedBy": user_id, "ModifiedOn": now}, synchronize_session=False)
+            if employee_id in ReportingHierarchyService._locked_ancestors(db, manager_id):
+                db.rollback()
+                return {"success": False, "message": f"Employee {manager_id} already reports to employee {employee_id}"}
+            line = RepotingManager(
+                EmployeeId=employee_id, ManagerId=manager_id, IsActive=True, CreatedBy=user_id, CreatedOn=now
+            )
+            db.add(line)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(line)
+        ReportingHierarchyService.invalidate_cache()
+        return {"success": True, "message": "Reporting manager assigned successfully", "reporting_line": line}
+
+    @staticmethod
+    def remove_manager(db: Session, employee_id: int, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Deactivate the reporting lines of employee_id"""
+        removed = db.query(RepotingManager).filter(
+            RepotingManager.EmployeeId == employee_id,
+            RepotingManager.IsActive == True
+        ).update({"IsActive": False, "ModifiedBy": user_id, "ModifiedOn": datetime.now()}, synchronize_session=False)
+        if not removed:
+            return {"success": False, "message": f"Employee {employee_id} has no reporting manager"}
+        db.commit()
+        ReportingHierarchyService.invalidate_cache()
+        return {"success": True, "message": "Reporting manager removed successfully"}
@@ -0,0 +1,265 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+import logging
+import uuid
+
+from app.models.employee import Employee
+from app.models.employee_salary_structure import EmployeeSalaryStructure
+from app.models.salary_hike import SalaryHike
+from app.schemas.employee_salary_structure_schemas import SalaryRevisionRequest
+from app.services.employee_salary_structure_service import EmployeeSalaryStructureService
+from app.utils.helpers import batches
+
+logger = logging.getLogger(__name__)
+
+EARNING_COMPONENTS = (
+    "BASIC", "HRA", "CONVEYANCE", "MEDICALALLOWANCE", "SPECIALALLOWANCE",
+    "SPECIALBONUS", "STATUTORYBONUS", "OTHERS",
+)
+
+# Columns that are not copied onto the new structure version
+_VERSION_EXCLUDED_COLUMNS = {
+    "EmployeeSalaryStructureId", "CreatedBy", "CreatedOn", "ModifiedBy", "ModifiedOn", "IsActive",
+}
+
+CENT = Decimal("0.01")
+
+
+class SalaryRevisionService:
+    """
+    Bulk salary revision (e.g. an annual hike cycle).
+    Rules are evaluated in memory against all active structures loaded in a
+    single query. Applying a revision deactivates the current structures,
+    inserts the new versions and records the salary history in a handful of
+    batched statements inside one transaction.
+    """
+
+    @staticmethod
+    def _rule_matches(rule, department_id, designation_id, gross: Decimal) -> bool:
+        if rule.department_id is not None and rule.department_id != department_id:
+            return False
+        if rule.designation_id is not None and rule.designation_id != designation_id:
+            return False
+        if rule.min_gross is not None and gross < rule.min_gross:
+            return False
+        if rule.max_gross is not None and gross > rule.max_gross:
+            return False
+        return True
+
+    @staticmethod
+    def _apply_rule(rule, values: Dict[str, Decimal]) -> None:
+        components = [rule.component] if rule.component else EARNING_COMPONENTS
+        for component in components:
+            current = values.get(component) or Decimal("0")
+            if rule.percentage is not None:
+                revised = current * (1 + rule.percentage / 100)
+            else:
+                revised = current + rule.flat_amount
+            values[component] = max(Decimal("0"), revised).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def plan(db: Session, request: SalaryRevisionRequest) -> Dict[str, Any]:
+        """Evaluate the rules against every active structure, nothing is written"""
+        rows = db.query(
+            EmployeeSalaryStructure,
+            Employee.DepartmentId,
+            Employee.DesignationId
+        ).outerjoin(
+            Employee, Employee.EmployeeId == EmployeeSalaryStructure.EmployeeId
+        ).filter(
+            EmployeeSalaryStructure.IsActive == True
+        ).order_by(
+            EmployeeSalaryStructure.EmployeeSalaryStructureId
+        ).all()
+
+        # Latest active structure per employee
+        latest = {row[0].EmployeeId: row for row in rows if row[0].EmployeeId is not None}
+        if request.employee_ids is not None:
+            wanted = set(request.employee_ids)
+            latest = {emp_id: row for emp_id, row in latest.items() if emp_id in wanted}
+
+        calculate_totals = EmployeeSalaryStructureService.calculate_salary_totals
+        revisions: List[Dict[str, Any]] = []
+        matched = 0
+        current_total = Decimal("0")
+        revised_total = Decimal("0")
+
+        for structure, department_id, designation_id in latest.values():
+            before = calculate_totals(structure)
+            current_total += before["GROSSEARNINGS"]
+
+            rules = [
+                rule for rule in request.rules
+                if SalaryRevisionService._rule_matches(rule, department_id, designation_id, before["GROSSEARNINGS"])
+            ]
+            if not rules:
+                revised_total += before["GROSSEARNINGS"]
+                continue
+            matched += 1
+
+            values = {
+                column.name: getattr(structure, column.name)
+                for column in EmployeeSalaryStructure.__table__.columns
+                if column.name not in _VERSION_EXCLUDED_COLUMNS
+            }
+            for rule in rules:
+                SalaryRevisionService._apply_rule(rule, values)
+
+            after = calculate_totals(EmployeeSalaryStructure(**values))
+            revised_total += after["GROSSEARNINGS"]
+            changes = {
+                name: values[name]
+                for name in EARNING_COMPONENTS + ("PF", "ESIC", "PROFESSIONALTAX", "GroupHealthInsurance")
+                if (values.get(name) or 0) != (getattr(structure, name) or 0)
+            }
+            if not changes:
+                continue
+
+            values["GROSSEARNINGS"] = after["GROSSEARNINGS"]
+            values["GROSSDEDUCTIONS"] = after["GROSSDEDUCTIONS"]
+            revisions.append({
+                "structure_id": structure.EmployeeSalaryStructureId,
+                "employee_id": structure.EmployeeId,
+                "before": before,
+                "after": after,
+                "changes": changes,
+                "values": values,
+            })
+
+        return {
+            "matched": matched,
+            "current_total": current_total,
+            "revised_total": revised_total,
+            "revisions": revisions,
+        }
+
+    @staticmethod
+    def _summary(plan: Dict[str, Any], preview_limit: int, applied: bool, revision_id: Optional[str]) -> Dict[str, Any]:
+        delta = plan["revised_total"] - plan["current_total"]
+        return {
+            "applied": applied,
+            "revision_id": revision_id,
+            "employees_matched": plan["matched"],
+            "employees_revised": len(plan["revisions"]),
+            "current_monthly_gross": plan["current_total"],
+            "revised_monthly_gross": plan["revised_total"],
+            "monthly_cost_delta": delta,
+            "annual_cost_delta": delta * 12,
+            "employees": [
+                {
+                    "employee_id": revision["employee_id"],
+                    "employee_salary_structure_id": revision["structure_id"],
+                    "original_salary": revision["before"]["GROSSEARNINGS"],
+                    "latest_salary": revision["after"]["GROSSEARNINGS"],
+                    "original_deductions": revision["before"]["GROSSDEDUCTIONS"],
+                    "latest_deductions": revision["after"]["GROSSDEDUCTIONS"],
+                    "changes": revision["changes"],
+                }
+                for revision in plan["revisions"][:preview_limit]
+            ],
+        }
+
+    @staticmethod
+    def preview(db: Session, request: SalaryRevisionRequest) -> Dict[str, Any]:
+        """Resulting structures and cost delta of a revision without saving it"""
+        plan = SalaryRevisionService.plan(db, request)
+        return SalaryRevisionService._summary(plan, request.preview_limit, applied=False, revision_id=None)
+
+    @staticmethod
+    def apply(db: Session, request: SalaryRevisionRequest) -> Dict[str, Any]:
+        """Save the revision as new structure versions plus SalaryHike history, in one transaction"""
+        plan = SalaryRevisionService.plan(db, request)
+        revisions = plan["revisions"]
+        if not revisions:
+            return SalaryRevisionService._summary(plan, request.preview_limit, applied=False, revision_id=None)
+
+        revision_id = str(uuid.uuid4())
+        now = datetime.utcnow()
+        previous_ids = [revision["structure_id"] for revision in revisions]
+        employee_ids = [revision["employee_id"] for revision in revisions]
+
+        try:
+            # 1. Retire the current versions. The plan was read without locks:
+            # if a concurrent apply or edit already retired any of them, the
+            # plan is stale and would add a second active version
+            retired = 0
+            for batch in batches(previous_ids):
+                retired += db.query(EmployeeSalaryStructure).filter(
+                    EmployeeSalaryStructure.EmployeeSalaryStructureId.in_(batch),
+                    EmployeeSalaryStructure.IsActive == True
+                ).update(
+                    {"IsActive": False, "ModifiedOn": now, "ModifiedBy": request.modified_by},
+                    synchronize_session=False
+                )
+            if retired != len(previous_ids):
+                raise ValueError(
+                    f"{len(previous_ids) - retired} of {len(previous_ids)} salary structures changed "
+                    f"since the revision was planned. Preview and apply again."
+                )
+
+            # 2. New versions in one batched INSERT
+            db.execute(
+                insert(EmployeeSalaryStructure),
+                [
+                    {**revision["values"], "CreatedOn": now, "CreatedBy": request.modified_by, "IsActive": True}
+                    for revision in revisions
+                ]
+            )
+
+            # 3. Ids of the new versions - the only active structures left for these employees
+            new_ids: Dict[int, int] = {}
+            for batch in batches(employee_ids):
+                new_ids.update(db.query(
+                    EmployeeSalaryStructure.EmployeeId,
+                    func.max(EmployeeSalaryStructure.EmployeeSalaryStructureId)
+                ).filter(
+                    EmployeeSalaryStructure.EmployeeId.in_(batch),
+                    EmployeeSalaryStructure.IsActive == True
+                ).group_by(EmployeeSalaryStructure.EmployeeId).all())
+
+            # 4. Salary history
+            db.execute(
+                insert(SalaryHike),
+                [
+                    {
+                        "EmployeeId": revision["employee_id"],
+                        "RevisionId": revision_id,
+                        "PreviousStructureId": revision["structure_id"],
+                        "NewStructureId": new_ids.get(revision["employee_id"]),
+                        "OriginalSalary": revision["before"]["GROSSEARNINGS"],
+                        "LatestSalary": revision["after"]["GROSSEARNINGS"],
+                        "EffectiveFrom": request.effective_from,
+                        "ModifiedBy": request.modified_by,
+                        "ModifiedOn": now,
+                    }
+                    for revision in revisions
+                ]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        EmployeeSalaryStructureService.invalidate_cache()
+        logger.info(f"Salary revision {revision_id} applied to {len(revisions)} employees")
+        return SalaryRevisionService._summary(plan, request.preview_limit, applied=True, revision_id=revision_id)
+
+    @staticmethod
+    def fetch_salary_hikes(db: Session, employee_id: int) -> List[Dict[str, Any]]:
+        """Revision history of an employee in SalaryHikeModel shape, latest first"""
+        hikes = db.query(SalaryHike).filter(
+            SalaryHike.EmployeeId == employee_id
+        ).order_by(SalaryHike.ModifiedOn.desc(), SalaryHike.SalaryHikeId.desc()).all()
+        return [
+            {
+                "employee_id": hike.EmployeeId,
+                "original_salary": hike.OriginalSalary,
+                "latest_salary": hike.LatestSalary,
+                "modified_by": hike.ModifiedBy,
+                "modified_on": hike.ModifiedOn,
+            }
+            for hike in hikes
+        ]
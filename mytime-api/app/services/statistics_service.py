@@ -0,0 +1,100 @@
+from sqlalchemy import case, distinct, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+
+from app.core.config import settings
+from app.services.cache_service import CacheService
+
+# Dialects with GROUP BY ROLLUP(...) and GROUPING(); others (including
+# MySQL/MariaDB, which only have GROUP BY ... WITH ROLLUP) get the same
+# totals from a UNION ALL branch of the same statement
+_ROLLUP_DIALECTS = {"mssql", "postgresql", "oracle"}
+
+
+class StatisticsService:
+    """
+    Building blocks for dashboard statistics: every dashboard is one
+    statement (conditional aggregation, optionally grouped with a ROLLUP
+    total row) and its result is cached per filter set for
+    STATISTICS_CACHE_TTL seconds, so polling dashboards hit the database
+    at most once per TTL. Each dashboard's write paths call invalidate
+    after they commit, which only reaches the worker that made the write:
+    other workers may serve the previous result for up to
+    STATISTICS_CACHE_TTL seconds.
+    """
+
+    @staticmethod
+    def count_if(condition) -> Any:
+        """COUNT of the rows matching condition"""
+        return func.sum(case((condition, 1), else_=0))
+
+    @staticmethod
+    def count_distinct_if(column, condition) -> Any:
+        """COUNT(DISTINCT column) over the rows matching condition"""
+        return func.count(distinct(case((condition, column), else_=null())))
+
+    @staticmethod
+    def totals(db: Session, measures: Dict[str, Any], filters: Iterable[Any] = ()) -> Dict[str, int]:
+        """One row of measures over the filtered rows"""
+        row = db.execute(
+            select(*[measure.label(name) for name, measure in measures.items()]).where(*filters)
+        ).one()
+        return {name: int(row._mapping[name] or 0) for name in measures}
+
+    @staticmethod
+    def grouped(
+        db: Session,
+        group_by: Any,
+        measures: Dict[str, Any],
+        filters: Iterable[Any] = ()
+    ) -> Tuple[Dict[str, int], List[Tuple[Any, Dict[str, int]]]]:
+        """
+        Measures per value of group_by plus the grand total, from one
+        statement. Distinct counts in the total are exact (not the sum of
+        the groups). Returns (totals, [(group value, measures), ...]).
+        """
+        filters = list(filters)
+        columns = [measure.label(name) for name, measure in measures.items()]
+        if db.get_bind().dialect.name in _ROLLUP_DIALECTS:
+            statement = select(
+                group_by.label("group_key"), func.grouping(group_by).label("is_total"), *columns
+            ).where(*filters).group_by(func.rollup(group_by))
+        else:
+            statement = union_all(
+                select(group_by.label("group_key"), literal(0).label("is_total"), *columns)
+                .where(*filters).group_by(group_by),
+                select(null().label("group_key"), literal(1).label("is_total"), *columns).where(*filters)
+            )
+
+        totals = {name: 0 for name in measures}
+        groups = []
+        for row in db.execute(statement).all():
+            values = {name: int(row._mapping[name] or 0) for name in measures}
+            if row.is_total:
+                totals = values
+            else:
+                groups.append((row.group_key, values))
+        return totals, groups
+
+    @staticmethod
+    def _cache_key(name: str, params: Dict[str, Any]) -> str:
+        version = CacheService.get(f"statistics:version:{name}") or 0
+        return f"statistics:{name}:{version}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    @staticmethod
+    def cached(name: str, params: Dict[str, Any], build: Callable[[], Dict[str, Any]],
+               ttl: Optional[int] = None) -> Dict[str, Any]:
+        """build() for this dashboard and filter set, reused for the TTL"""
+        cache_key = StatisticsService._cache_key(name, params)
+        result = CacheService.get(cache_key)
+        if result is None:
+            result = build()
+            CacheService.set(cache_key, result, ttl=ttl or settings.STATISTICS_CACHE_TTL)
+        return result
+
+    @staticmethod
+    def invalidate(name: str) -> None:
+        """Drop every cached filter set of a dashboard in this worker - call after writes it should show"""
+        version_key = f"statistics:version:{name}"
+        CacheService.set(version_key, (CacheService.get(version_key) or 0) + 1)
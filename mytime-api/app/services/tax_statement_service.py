@@ -0,0 +1,209 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, distinct
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+from decimal import Decimal
+import logging
+import zipfile
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.employee_salary import EmployeeSalary
+from app.models.employee_salary_structure import EmployeeSalaryStructure
+from app.services.cache_service import CacheService
+from app.services.payslip_service import PayslipService, PAYSLIP_EARNINGS, PAYSLIP_DEDUCTIONS
+from app.utils.indian_salary_converter import IndianSalaryConverter
+from app.utils.pdf_writer import SimplePdfDocument, PAGE_WIDTH
+from app.utils.zip_stream import ZipChunkBuffer
+
+logger = logging.getLogger(__name__)
+
+# Annual totals are the sums of the monthly columns
+STATEMENT_EARNINGS = tuple((label, monthly) for label, monthly, _ in PAYSLIP_EARNINGS)
+STATEMENT_DEDUCTIONS = tuple((label, monthly) for label, monthly, _ in PAYSLIP_DEDUCTIONS)
+STATEMENT_TOTALS = (
+    ("GrossEarnings", "Earning_Montly_GROSSEARNINGS"),
+    ("GrossDeductions", "Deduction_Montly_GROSSSDeduction"),
+    ("NetPay", "NETPAY"),
+)
+
+
+def _amount(value: Any) -> str:
+    return f"{Decimal(str(value or 0)):,.2f}"
+
+
+def render_tax_statement(statement: Dict[str, Any]) -> bytes:
+    """Render one annual statement PDF (module level so it can run in a worker process)"""
+    pdf = SimplePdfDocument()
+    left, right = 40, PAGE_WIDTH - 40
+
+    pdf.text(left, 60, settings.PAYSLIP_COMPANY_NAME, size=16, bold=True)
+    pdf.text(left, 82, f"Annual Salary Statement - Financial Year {statement['FinancialYearLabel']}", size=11)
+    pdf.line(left, 92, right, 92, width=1)
+
+    details = (
+        ("Employee Name", statement.get("EmployeeName")), ("Employee Code", statement.get("EmployeeCode")),
+        ("PAN", statement.get("PAN")), ("Months Paid", statement.get("MonthsPaid")),
+        ("Period", f"{statement['FromPeriod']} - {statement['ToPeriod']}"), ("LOP Days", statement.get("LopDays")),
+    )
+    y = 112
+    for i, (label, value) in enumerate(details):
+        x = left if i % 2 == 0 else PAGE_WIDTH / 2
+        pdf.text(x, y, f"{label}:", bold=True)
+        pdf.text(x + 95, y, "" if value is None else value)
+        if i % 2 == 1:
+            y += 16
+
+    y += 14
+    for heading, items, total_label, total_key in (
+        ("Earnings", STATEMENT_EARNINGS, "Gross Earnings", "GrossEarnings"),
+        ("Deductions", STATEMENT_DEDUCTIONS, "Gross Deductions", "GrossDeductions"),
+    ):
+        height = 22 + 16 * (len(items) + 1)
+        pdf.rect(left, y, right - left, height)
+        pdf.text(left + 6, y + 15, heading, bold=True)
+        pdf.text_right(right - 6, y + 15, "Annual Total", bold=True)
+        pdf.line(left, y + 22, right, y + 22)
+        row_y = y + 36
+        for label, column in items:
+            pdf.text(left + 6, row_y, label)
+            pdf.text_right(right - 6, row_y, _amount(statement["Components"].get(column)))
+            row_y += 16
+        pdf.text(left + 6, row_y, total_label, bold=True)
+        pdf.text_right(right - 6, row_y, _amount(statement[total_key]), bold=True)
+        y += height + 14
+
+    net_pay = Decimal(str(statement.get("NetPay") or 0))
+    pdf.text(left, y + 10, "Net Pay:", size=11, bold=True)
+    pdf.text(left + 95, y + 10, f"Rs. {_amount(net_pay)}", size=11, bold=True)
+    pdf.text(left, y + 28, "In Words:", bold=True)
+    pdf.text(left + 95, y + 28, IndianSalaryConverter.convert_to_words(net_pay))
+    pdf.text(left, y + 64, "This is a system generated statement and does not require a signature.", size=8)
+    return pdf.render()
+
+
+def _render_statement_entry(statement: Dict[str, Any]) -> Tuple[int, bytes]:
+    return statement["EmployeeId"], render_tax_statement(statement)
+
+
+class TaxStatementService:
+    """
+    Annual (April - March) earnings and deduction totals per employee.
+    One grouped query over EmployeeSalary produces the statements of the
+    whole organisation; the result is kept per financial year for the
+    request, or with ENABLE_CACHE on shared until a payroll publish or an
+    EmployeeSalary write in the same worker touches that year.
+    """
+
+    @staticmethod
+    def _cache_key(financial_year: int) -> str:
+        version = CacheService.get(f"tax_statement:version:{financial_year}") or 0
+        return f"tax_statement:{financial_year}:{version}"
+
+    @staticmethod
+    def invalidate_cache(financial_years: Iterable[int]) -> None:
+        """Drop cached statements - call after salaries of these years change"""
+        for financial_year in set(financial_years):
+            version_key = f"tax_statement:version:{financial_year}"
+            CacheService.set(version_key, (CacheService.get(version_key) or 0) + 1)
+
+    @staticmethod
+    def compute_statements(
+        db: Session,
+        financial_year: int,
+        employee_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Statements of every employee paid in the financial year (one query for the whole org)"""
+        statements = CacheService.remember(
+            db, TaxStatementService._cache_key(financial_year),
+            lambda: TaxStatementService._query_statements(db, financial_year), ttl=settings.CACHE_TTL
+        )
+
+        if employee_id is not None:
+            return [statement for statement in statements if statement["EmployeeId"] == employee_id]
+        return statements
+
+    @staticmethod
+    def _query_statements(db: Session, financial_year: int) -> List[Dict[str, Any]]:
+        sum_columns = [column for _, column in STATEMENT_EARNINGS + STATEMENT_DEDUCTIONS + STATEMENT_TOTALS]
+        rows = db.query(
+            EmployeeSalary.EmployeeId,
+            Employee.EmployeeCode,
+            Employee.FirstName,
+            Employee.LastName,
+            func.count(distinct(EmployeeSalary.SalaryPeriod)).label("months_paid"),
+            func.min(EmployeeSalary.SalaryPeriod).label("from_period"),
+            func.max(EmployeeSalary.SalaryPeriod).label("to_period"),
+            func.sum(func.coalesce(EmployeeSalary.LOPDAYS, 0)).label("lop_days"),
+            *[func.sum(func.coalesce(getattr(EmployeeSalary, column), 0)).label(column) for column in sum_columns]
+        ).outerjoin(
+            Employee, Employee.EmployeeId == EmployeeSalary.EmployeeId
+        ).filter(
+            EmployeeSalary.FinancialYear == financial_year,
+            EmployeeSalary.IsActive == True
+        ).group_by(
+            EmployeeSalary.EmployeeId,
+            Employee.EmployeeCode,
+            Employee.FirstName,
+            Employee.LastName
+        ).order_by(EmployeeSalary.EmployeeId).all()
+
+        # PAN from the active structures (Text columns cannot be grouped on SQL Server)
+        pans: Dict[int, str] = {}
+        for emp_id, pan in db.query(
+            EmployeeSalaryStructure.EmployeeId, EmployeeSalaryStructure.PAN
+        ).filter(
+            EmployeeSalaryStructure.IsActive == True
+        ).order_by(EmployeeSalaryStructure.EmployeeSalaryStructureId).all():
+            if pan:
+                pans[emp_id] = pan
+
+        label = f"{financial_year}-{str(financial_year + 1)[-2:]}"
+        statements = []
+        for row in rows:
+            mapping = row._mapping
+            statements.append({
+                "EmployeeId": row.EmployeeId,
+                "EmployeeCode": row.EmployeeCode,
+                "EmployeeName": " ".join(part for part in (row.FirstName, row.LastName) if part),
+                "PAN": pans.get(row.EmployeeId),
+                "FinancialYear": financial_year,
+                "FinancialYearLabel": label,
+                "MonthsPaid": int(row.months_paid or 0),
+                "FromPeriod": row.from_period,
+                "ToPeriod": row.to_period,
+                "LopDays": int(row.lop_days or 0),
+                "Components": {
+                    column: Decimal(str(mapping[column] or 0))
+                    for _, column in STATEMENT_EARNINGS + STATEMENT_DEDUCTIONS
+                },
+                **{key: Decimal(str(mapping[column] or 0)) for key, column in STATEMENT_TOTALS},
+            })
+
+        logger.info(f"Computed {len(statements)} tax statements for FY {label}")
+        return statements
+
+    @staticmethod
+    def _file_name(statement: Dict[str, Any]) -> str:
+        code = "".join(c for c in str(statement.get("EmployeeCode") or statement["EmployeeId"]) if c.isalnum() or c in "._-")
+        return f"SalaryStatement_{code}_FY{statement['FinancialYearLabel']}.pdf"
+
+    @staticmethod
+    def get_statement_pdf(db: Session, financial_year: int, employee_id: int) -> Optional[Tuple[str, bytes]]:
+        """(file name, PDF) of one employee's statement, None when not paid in the year"""
+        statements = TaxStatementService.compute_statements(db, financial_year, employee_id=employee_id)
+        if not statements:
+            return None
+        return TaxStatementService._file_name(statements[0]), render_tax_statement(statements[0])
+
+    @staticmethod
+    def stream_statements_zip(db: Session, financial_year: int) -> Iterator[bytes]:
+        """ZIP of every employee's statement, rendered through the batch PDF pipeline"""
+        statements = TaxStatementService.compute_statements(db, financial_year)
+        by_id = {statement["EmployeeId"]: statement for statement in statements}
+
+        buffer = ZipChunkBuffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for employee_id, content in PayslipService.render_many(statements, render_entry=_render_statement_entry):
+                archive.writestr(TaxStatementService._file_name(by_id[employee_id]), content)
+                yield buffer.drain()
+        yield buffer.drain()
@@ -0,0 +1,243 @@
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Iterable
+from datetime import date, timedelta
+import hashlib
+import logging
+
+from app.core.config import settings
+from app.models.attendence import Attendence
+from app.models.employee import Employee
+from app.models.leave_request import LeaveRequest
+from app.services.business_calendar_service import BusinessCalendarService
+from app.services.cache_service import CacheService
+from app.utils.period import Period
+from app.utils.helpers import batches, csv_set
+
+logger = logging.getLogger(__name__)
+
+# One character (one byte) per day
+DAY_CODES = {
+    "P": "Present",
+    "W": "Work from home",
+    "A": "Absent",
+    "L": "On leave (approved leave or leave attendence)",
+    "R": "Leave requested, pending approval",
+    "H": "Holiday",
+    "O": "Weekly off",
+    "-": "Working day, nothing recorded",
+}
+
+MAX_CALENDAR_DAYS = 366
+
+
+class TeamCalendarService:
+    """
+    Month grid of a team: one status code per employee per day.
+    Attendence and leave requests are read with two set-based queries
+    covering every month not yet cached (holidays come from the
+    business-day calendar). With ENABLE_CACHE on, each team-month is cached
+    separately, so overlapping views reuse each other's months; attendence
+    and leave writes invalidate only the months they touch, and only in the
+    worker that made them.
+    """
+
+    @staticmethod
+    def _months(first: date, last: date) -> List[Period]:
+        period, end = Period(first.year, first.month), Period(last.year, last.month)
+        periods = []
+        while not end < period:
+            periods.append(period)
+            period = period.shift(1)
+        return periods
+
+    @staticmethod
+    def _month_version(period: int) -> int:
+        return CacheService.get(f"team_calendar:version:{period}") or 0
+
+    @staticmethod
+    def _cache_key(team_key: str, period: int) -> str:
+        global_version = CacheService.get("team_calendar:version") or 0
+        return f"team_calendar:{global_version}:{TeamCalendarService._month_version(period)}:{team_key}:{period}"
+
+    @staticmethod
+    def invalidate_months(periods: Iterable[int]) -> None:
+        """Drop cached grids of these YYYYMM months - call after attendence or leave changes"""
+        for period in set(periods):
+            CacheService.set(f"team_calendar:version:{period}", TeamCalendarService._month_version(period) + 1)
+
+    @staticmethod
+    def invalidate_days(days: Iterable[date]) -> None:
+        """Drop cached grids of the months these days fall in - call after the write commits"""
+        TeamCalendarService.invalidate_months(day.year * 100 + day.month for day in days if day)
+
+    @staticmethod
+    def invalidate_dates(first: date, last: date) -> None:
+        """Drop cached grids of every month between two dates"""
+        if not first or not last:
+            return
+        TeamCalendarService.invalidate_months(period.key for period in TeamCalendarService._months(first, last))
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop every cached grid - call after holiday changes"""
+        CacheService.set("team_calendar:version", (CacheService.get("team_calendar:version") or 0) + 1)
+
+    @staticmethod
+    def _build(db: Session, employee_ids: List[int], periods: List[Period]) -> Dict[int, Dict[str, Any]]:
+        """{YYYYMM: {"holidays", "codes": {EmployeeId: codes}}} for consecutive months, from two queries"""
+        first = date(periods[0].year, periods[0].month, 1)
+        last = date(periods[-1].year, periods[-1].month, periods[-1].days)
+        total_days = (last - first).days + 1
+
+        weekend_days = BusinessCalendarService.weekend_days()
+        absent_statuses = csv_set(settings.PAYROLL_ABSENT_ATTENDANCE_STATUSES)
+        leave_statuses = csv_set(settings.ATTENDANCE_LEAVE_STATUSES)
+        wfh_types = csv_set(settings.ATTENDANCE_WFH_WORK_TYPES)
+
+        holiday_dates = BusinessCalendarService.holidays(db, first, last)
+
+        # Base row shared by every employee: weekly offs and holidays
+        base = bytearray(b"-" * total_days)
+        for offset in range(total_days):
+            day = first + timedelta(days=offset)
+            if day in holiday_dates:
+                base[offset] = ord("H")
+            elif day.weekday() in weekend_days:
+                base[offset] = ord("O")
+        grid = {employee_id: bytearray(base) for employee_id in employee_ids}
+
+        for batch in batches(employee_ids):
+            # Leaves first (pending, then approved on top), attendence last - a
+            # recorded day always shows what actually happened
+            leaves = db.query(
+                Employee.EmployeeId,
+                LeaveRequest.FromDate,
+                LeaveRequest.ToDate,
+                LeaveRequest.Status
+            ).join(
+                Employee, Employee.UserId == LeaveRequest.UserId
+            ).filter(
+                Employee.EmployeeId.in_(batch),
+                LeaveRequest.Status.in_(["Pending", "Approved"]),
+                LeaveRequest.IsActive == True,
+                LeaveRequest.FromDate <= last,
+                LeaveRequest.ToDate >= first
+            ).all()
+            for row in sorted(leaves, key=lambda row: row.Status == "Approved"):
+                code = ord("L") if row.Status == "Approved" else ord("R")
+                codes = grid[row.EmployeeId]
+                start = max((row.FromDate - first).days, 0)
+                end = min((row.ToDate - first).days, total_days - 1)
+                for offset in range(start, end + 1):
+                    if codes[offset] not in (ord("H"), ord("O")):
+                        codes[offset] = code
+
+            attendence = db.query(
+                Attendence.EmployeeId,
+                Attendence.AttendenceDate,
+                Attendence.Status,
+                Attendence.WorkType
+            ).filter(
+                Attendence.EmployeeId.in_(batch),
+                Attendence.AttendenceDate >= first,
+                Attendence.AttendenceDate <= last,
+                Attendence.ApprovalStatus.is_(None) | (Attendence.ApprovalStatus != "Rejected")
+            ).all()
+            for row in attendence:
+                day_status = (row.Status or "").strip().lower()
+                if day_status in absent_statuses:
+                    code = "A"
+                elif day_status in leave_statuses:
+                    code = "L"
+                elif (row.WorkType or "").strip().lower() in wfh_types:
+                    code = "W"
+                else:
+                    code = "P"
+                grid[row.EmployeeId][(row.AttendenceDate - first).days] = ord(code)
+
+        # Split into months
+        months: Dict[int, Dict[str, Any]] = {}
+        offset = 0
+        for period in periods:
+            months[period.key] = {
+                "holidays": sorted(day for day in holiday_dates if (day.year, day.month) == (period.year, period.month)),
+                "codes": {
+                    employee_id: codes[offset:offset + period.days].decode("ascii")
+                    for employee_id, codes in grid.items()
+                },
+            }
+            offset += period.days
+        return months
+
+    @staticmethod
+    def _runs(periods: List[Period]) -> Iterable[List[Period]]:
+        """Group months into runs of consecutive months"""
+        run: List[Period] = []
+        for period in periods:
+            if run and run[-1].shift(1) != period:
+                yield run
+                run = []
+            run.append(period)
+        if run:
+            yield run
+
+    @staticmethod
+    def get_calendar(db: Session, employee_ids: List[int], from_date: date, to_date: date) -> Dict[str, Any]:
+        """Per-employee day codes between two dates (inclusive)"""
+        if from_date > to_date:
+            raise ValueError("from_date cannot be after to_date")
+        total_days = (to_date - from_date).days + 1
+        if total_days > MAX_CALENDAR_DAYS:
+            raise ValueError(f"Date range cannot exceed {MAX_CALENDAR_DAYS} days")
+        employee_ids = sorted({int(employee_id) for employee_id in employee_ids})
+        if not employee_ids:
+            raise ValueError("At least one employee id is required")
+
+        team_key = hashlib.sha1(",".join(map(str, employee_ids)).encode()).hexdigest()[:16]
+        periods = TeamCalendarService._months(from_date, to_date)
+
+        # Keys are fixed before building: a write that commits and bumps a
+        # month's version mid-build must not get the old grid stored under
+        # the new version
+        cache_keys = {
+            period.key: TeamCalendarService._cache_key(team_key, period.key) for period in periods
+        } if settings.ENABLE_CACHE else {}
+
+        months: Dict[int, Dict[str, Any]] = {}
+        missing: List[Period] = []
+        for period in periods:
+            cached = CacheService.get(cache_keys[period.key]) if cache_keys else None
+            if cached is None:
+                missing.append(period)
+            else:
+                months[period.key] = cached
+        for run in TeamCalendarService._runs(missing):
+            built = TeamCalendarService._build(db, employee_ids, run)
+            if cache_keys:
+                for key, month in built.items():
+                    CacheService.set(cache_keys[key], month, ttl=settings.CACHE_TTL)
+            months.update(built)
+
+        # Trim the first and last month to the requested dates
+        head = from_date.day - 1
+        tail = head + total_days
+        employees = [
+            {
+                "employee_id": employee_id,
+                "codes": "".join(months[period.key]["codes"][employee_id] for period in periods)[head:tail],
+            }
+            for employee_id in employee_ids
+        ]
+        holidays = [
+            day for period in periods for day in months[period.key]["holidays"]
+            if from_date <= day <= to_date
+        ]
+
+        return {
+            "from_date": from_date,
+            "to_date": to_date,
+            "days": total_days,
+            "legend": DAY_CODES,
+            "holidays": holidays,
+            "employees": employees,
+        }
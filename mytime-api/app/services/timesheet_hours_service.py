@@ -0,0 +1,394 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, or_, text
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Set
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+import logging
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.project import Project
+from app.models.task_code import TaskCode
+from app.models.task_Item import TaskItem
+from app.models.time_sheet import Timesheet
+from app.models.timesheet_hours_summary import TimesheetHoursSummary
+from app.models.timesheet_task import TimesheetTask
+from app.utils.helpers import ID_BATCH_SIZE, batches, csv_set
+
+logger = logging.getLogger(__name__)
+
+_DAY_COLUMNS = (
+    "MondayHours", "TuesdayHours", "WednesdayHours", "ThursdayHours",
+    "FridayHours", "SaturdayHours", "SundayHours",
+)
+
+# group_by dimension -> summary column
+UTILIZATION_DIMENSIONS = {
+    "week": "WeekStart",
+    "employee": "EmployeeId",
+    "project": "ProjectId",
+    "task_item": "TaskItemId",
+    "task_code": "TaskCodeId",
+}
+
+_HUNDREDTH = Decimal("0.01")
+
+# Summary columns that identify a row (the unique UX_TimesheetWeeklyHours_Key)
+_SUMMARY_KEY = ("EmployeeId", "WeekStart", "ProjectId", "TaskItemId", "TaskCodeId")
+
+# Summary rows are written with keyed upserts rather than DELETE + INSERT,
+# so concurrent writers of the same employee-week cannot both insert a key.
+# INTERSECT compares the nullable key columns with NULL = NULL
+_UPSERT_SUMMARY = text("""
+MERGE dbo.TimesheetWeeklyHours WITH (HOLDLOCK) AS t
+USING (SELECT CAST(:EmployeeId AS BIGINT) AS EmployeeId, CAST(:WeekStart AS DATE) AS WeekStart,
+              CAST(:ProjectId AS BIGINT) AS ProjectId, CAST(:TaskItemId AS BIGINT) AS TaskItemId,
+              CAST(:TaskCodeId AS BIGINT) AS TaskCodeId) AS s
+    ON t.EmployeeId = s.EmployeeId AND t.WeekStart = s.WeekStart
+   AND EXISTS (SELECT t.ProjectId, t.TaskItemId, t.TaskCodeId
+               INTERSECT SELECT s.ProjectId, s.TaskItemId, s.TaskCodeId)
+WHEN MATCHED THEN UPDATE SET
+    Hours = :Hours,
+    ApprovedHours = :ApprovedHours,
+    RefreshedOn = :RefreshedOn
+WHEN NOT MATCHED THEN INSERT
+    (EmployeeId, WeekStart, ProjectId, TaskItemId, TaskCodeId, Hours, ApprovedHours, RefreshedOn)
+    VALUES (s.EmployeeId, s.WeekStart, s.ProjectId, s.TaskItemId, s.TaskCodeId, :Hours, :ApprovedHours,
+            :RefreshedOn);
+""")
+
+
+class TimesheetHoursService:
+    """
+    Timesheet hours per employee, week, project, task item and task code
+    (TimesheetWeeklyHours). Every timesheet write recomputes only the
+    employee-weeks it touched and upserts them by key in the same
+    transaction, so utilization and project burn are grouped sums over the
+    small summary table instead of scans over every task line.
+    """
+
+    @staticmethod
+    def week_start(value: Any) -> Optional[date]:
+        """Monday of the week a timesheet date falls in"""
+        if value is None:
+            return None
+        day = value.date() if isinstance(value, datetime) else value
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def _line_hours(row: Any) -> Decimal:
+        """Hours of one task line - its day columns, or TotalHrs when none is filled"""
+        days = [getattr(row, column) for column in _DAY_COLUMNS]
+        if all(value is None for value in days):
+            return Decimal(str(row.TotalHrs or 0))
+        return Decimal(sum(value or 0 for value in days))
+
+    @staticmethod
+    def _employee_id():
+        # Timesheets saved with only a UserId are attributed through Employee.UserId
+        return func.coalesce(Timesheet.EmployeeId, Employee.EmployeeId)
+
+    @staticmethod
+    def _source_query(db: Session):
+        return db.query(
+            TimesheetHoursService._employee_id().label("EmployeeId"),
+            Timesheet.FromDate,
+            Timesheet.Status,
+            TaskItem.ProjectId,
+            TimesheetTask.TaskItemId,
+            TimesheetTask.TaskCodeId,
+            TimesheetTask.TotalHrs,
+            *[getattr(TimesheetTask, column) for column in _DAY_COLUMNS]
+        ).join(
+            Timesheet, Timesheet.Id == TimesheetTask.TimesheetId
+        ).outerjoin(
+            Employee, and_(Timesheet.EmployeeId.is_(None), Employee.UserId == Timesheet.UserId)
+        ).outerjoin(
+            TaskItem, TaskItem.TaskItemId == TimesheetTask.TaskItemId
+        ).filter(
+            Timesheet.FromDate.isnot(None),
+            or_(Timesheet.IsActive == True, Timesheet.IsActive.is_(None)),
+            or_(TimesheetTask.IsActive == True, TimesheetTask.IsActive.is_(None))
+        )
+
+    @staticmethod
+    def _aggregate(rows: Iterable[Any], now: datetime) -> Dict[Tuple, Dict[str, Any]]:
+        """Summary rows keyed by (EmployeeId, WeekStart, ProjectId, TaskItemId, TaskCodeId)"""
+        # Status is a TEXT column, so it is checked here rather than in SQL
+        excluded = csv_set(settings.TIMESHEET_EXCLUDED_STATUSES)
+        summaries: Dict[Tuple, Dict[str, Any]] = {}
+        for row in rows:
+            status_name = (row.Status or "").strip().lower()
+            if row.EmployeeId is None or status_name in excluded:
+                continue
+            hours = TimesheetHoursService._line_hours(row)
+            if not hours:
+                continue
+            key = (
+                row.EmployeeId, TimesheetHoursService.week_start(row.FromDate),
+                row.ProjectId, row.TaskItemId, row.TaskCodeId,
+            )
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = {
+                    "EmployeeId": key[0], "WeekStart": key[1], "ProjectId": key[2],
+                    "TaskItemId": key[3], "TaskCodeId": key[4],
+                    "Hours": Decimal(0), "ApprovedHours": Decimal(0), "RefreshedOn": now,
+                }
+            summary["Hours"] += hours
+            if status_name == "approved":
+                summary["ApprovedHours"] += hours
+        return summaries
+
+    @staticmethod
+    def keys_for(db: Session, timesheet_ids: Iterable[int]) -> Set[Tuple[int, date]]:
+        """(EmployeeId, WeekStart) pairs of the given timesheets, for refresh()"""
+        ids = sorted({int(timesheet_id) for timesheet_id in timesheet_ids if timesheet_id})
+        keys: Set[Tuple[int, date]] = set()
+        for batch in batches(ids):
+            for employee_id, from_date in db.query(
+                TimesheetHoursService._employee_id(), Timesheet.FromDate
+            ).outerjoin(
+                Employee, and_(Timesheet.EmployeeId.is_(None), Employee.UserId == Timesheet.UserId)
+            ).filter(Timesheet.Id.in_(batch)).all():
+                if employee_id is not None and from_date is not None:
+                    keys.add((employee_id, TimesheetHoursService.week_start(from_date)))
+        return keys
+
+    @staticmethod
+    def refresh(db: Session, keys: Iterable[Tuple[int, date]]) -> int:
+        """
+        Recompute the summaries of the given (EmployeeId, WeekStart) pairs.
+        Does not commit - call it before the timesheet write commits so both
+        land together. Returns summary rows written.
+        """
+        employee_ids: Set[int] = set()
+        weeks: Set[date] = set()
+        for employee_id, week in keys:
+            if employee_id is None or week is None:
+                continue
+            employee_ids.add(int(employee_id))
+            weeks.add(TimesheetHoursService.week_start(week))
+        if not employee_ids:
+            return 0
+
+        first = datetime.combine(min(weeks), datetime.min.time())
+        end = datetime.combine(max(weeks), datetime.min.time()) + timedelta(days=7)
+
+        now = datetime.now()
+        written = 0
+        for batch in batches(sorted(employee_ids)):
+            rows = TimesheetHoursService._source_query(db).filter(
+                or_(
+                    Timesheet.EmployeeId.in_(batch),
+                    and_(Timesheet.EmployeeId.is_(None), Employee.EmployeeId.in_(batch))
+                ),
+                Timesheet.FromDate >= first,
+                Timesheet.FromDate < end
+            ).all()
+            summaries = [
+                summary for key, summary in TimesheetHoursService._aggregate(rows, now).items()
+                if key[1] in weeks
+            ]
+
+            TimesheetHoursService._upsert(db, batch, weeks, summaries)
+            written += len(summaries)
+
+        return written
+
+    @staticmethod
+    def _upsert(db: Session, employee_ids: List[int], weeks: Set[date], summaries: List[Dict[str, Any]]) -> None:
+        """
+        Write the recomputed summaries of these employees and weeks by key;
+        their rows whose key no longer has hours are deleted.
+        """
+        existing = {
+            tuple(getattr(row, column) for column in _SUMMARY_KEY): row.TimesheetHoursId
+            for row in db.query(
+                TimesheetHoursSummary.TimesheetHoursId,
+                *[getattr(TimesheetHoursSummary, column) for column in _SUMMARY_KEY]
+            ).filter(
+                TimesheetHoursSummary.EmployeeId.in_(employee_ids),
+                TimesheetHoursSummary.WeekStart.in_(weeks)
+            ).all()
+        }
+        keyed = {tuple(summary[column] for column in _SUMMARY_KEY): summary for summary in summaries}
+
+        if db.bind.dialect.name == "mssql":
+            if summaries:
+                db.execute(_UPSERT_SUMMARY, summaries)
+        else:
+            to_update = [
+                {**summary, "TimesheetHoursId": existing[key]}
+                for key, summary in keyed.items() if key in existing
+            ]
+            to_insert = [summary for key, summary in keyed.items() if key not in existing]
+            if to_update:
+                db.bulk_update_mappings(TimesheetHoursSummary, to_update)
+            if to_insert:
+                db.execute(insert(TimesheetHoursSummary).execution_options(render_nulls=True), to_insert)
+
+        emptied = [summary_id for key, summary_id in existing.items() if key not in keyed]
+        for batch in batches(emptied):
+            db.query(TimesheetHoursSummary).filter(
+                TimesheetHoursSummary.TimesheetHoursId.in_(batch)
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def rebuild(db: Session, from_date: Optional[date] = None, to_date: Optional[date] = None) -> int:
+        """Recompute every summary (optionally for the weeks starting in a date range) from the timesheets"""
+        delete_query = db.query(TimesheetHoursSummary)
+        source = TimesheetHoursService._source_query(db)
+        if from_date:
+            first = TimesheetHoursService.week_start(from_date)
+            delete_query = delete_query.filter(TimesheetHoursSummary.WeekStart >= first)
+            source = source.filter(Timesheet.FromDate >= datetime.combine(first, datetime.min.time()))
+        if to_date:
+            last = TimesheetHoursService.week_start(to_date)
+            delete_query = delete_query.filter(TimesheetHoursSummary.WeekStart <= last)
+            source = source.filter(Timesheet.FromDate < datetime.combine(last, datetime.min.time()) + timedelta(days=7))
+
+        now = datetime.now()
+        written = 0
+        try:
+            delete_query.delete(synchronize_session=False)
+            summaries = list(TimesheetHoursService._aggregate(
+                source.execution_options(stream_results=True, yield_per=5000), now
+            ).values())
+            for batch in batches(summaries):
+                db.execute(insert(TimesheetHoursSummary).execution_options(render_nulls=True), batch)
+                written += len(batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Rebuilt timesheet weekly hours: {written} rows")
+        return written
+
+    @staticmethod
+    def _names(db: Session, dimension: str, ids: Set[int]) -> Dict[int, str]:
+        """Display names of the ids of one dimension (Text columns cannot be grouped on SQL Server)"""
+        if not ids:
+            return {}
+        if dimension == "employee":
+            columns = (Employee.EmployeeId, Employee.FirstName, Employee.LastName)
+        elif dimension == "project":
+            columns = (Project.ProjectId, Project.Name)
+        elif dimension == "task_item":
+            columns = (TaskItem.TaskItemId, TaskItem.Name)
+        else:
+            columns = (TaskCode.TaskCodeId, TaskCode.Name)
+        names: Dict[int, str] = {}
+        for batch in batches(sorted(ids)):
+            for row in db.query(*columns).filter(columns[0].in_(batch)).all():
+                names[row[0]] = " ".join(part for part in row[1:] if part)
+        return names
+
+    @staticmethod
+    def utilization(
+        db: Session,
+        from_date: date,
+        to_date: date,
+        group_by: List[str],
+        department_id: Optional[int] = None,
+        employee_ids: Optional[List[int]] = None,
+        project_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Hours, approved hours and utilization between two dates, grouped by
+        any of week / employee / project / task_item / task_code. Weeks are
+        counted whole: a week is included when any of its days lies in the
+        range. Utilization is hours over the capacity of the active employees
+        in scope (TIMESHEET_WEEKLY_CAPACITY_HOURS per employee per week), so
+        employees who logged nothing still count; an employee row is measured
+        against that one employee's capacity.
+        """
+        if from_date > to_date:
+            raise ValueError("from_date cannot be after to_date")
+        group_by = list(dict.fromkeys(group_by))
+        unknown = [dimension for dimension in group_by if dimension not in UTILIZATION_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Unknown group_by {', '.join(unknown)}; use {', '.join(UTILIZATION_DIMENSIONS)}"
+            )
+
+        first_week = TimesheetHoursService.week_start(from_date)
+        last_week = TimesheetHoursService.week_start(to_date)
+        week_count = max(((last_week - first_week).days // 7) + 1, 0)
+
+        group_columns = [getattr(TimesheetHoursSummary, UTILIZATION_DIMENSIONS[d]) for d in group_by]
+        query = db.query(
+            *group_columns,
+            func.sum(TimesheetHoursSummary.Hours).label("hours"),
+            func.sum(TimesheetHoursSummary.ApprovedHours).label("approved_hours"),
+            func.count(func.distinct(TimesheetHoursSummary.EmployeeId)).label("employee_count")
+        ).filter(
+            TimesheetHoursSummary.WeekStart >= first_week,
+            TimesheetHoursSummary.WeekStart <= last_week
+        )
+        active_employees = db.query(func.count(Employee.EmployeeId)).filter(Employee.IsActive == True)
+        if department_id is not None:
+            query = query.filter(TimesheetHoursSummary.EmployeeId.in_(
+                db.query(Employee.EmployeeId).filter(Employee.DepartmentId == department_id)
+            ))
+            active_employees = active_employees.filter(Employee.DepartmentId == department_id)
+        if employee_ids:
+            employee_ids = sorted(set(employee_ids))
+            if len(employee_ids) > ID_BATCH_SIZE:
+                raise ValueError(f"At most {ID_BATCH_SIZE} employee ids; use department_id for larger groups")
+            query = query.filter(TimesheetHoursSummary.EmployeeId.in_(employee_ids))
+            active_employees = active_employees.filter(Employee.EmployeeId.in_(employee_ids))
+        if project_id is not None:
+            query = query.filter(TimesheetHoursSummary.ProjectId == project_id)
+        if group_columns:
+            query = query.group_by(*group_columns).order_by(*group_columns)
+        rows = query.all()
+        active_count = active_employees.scalar() or 0
+
+        names = {
+            dimension: TimesheetHoursService._names(
+                db, dimension, {row[index] for row in rows if row[index] is not None}
+            )
+            for index, dimension in enumerate(group_by) if dimension != "week"
+        }
+
+        weekly_capacity = Decimal(str(settings.TIMESHEET_WEEKLY_CAPACITY_HOURS))
+        items = []
+        total_hours = Decimal(0)
+        total_approved = Decimal(0)
+        for row in rows:
+            hours = Decimal(str(row.hours or 0))
+            approved = Decimal(str(row.approved_hours or 0))
+            weeks = 1 if "week" in group_by else week_count
+            capacity_employees = 1 if "employee" in group_by else active_count
+            capacity = weekly_capacity * capacity_employees * weeks
+            item = {
+                "hours": hours.quantize(_HUNDREDTH),
+                "approved_hours": approved.quantize(_HUNDREDTH),
+                "employee_count": row.employee_count or 0,
+                "capacity_hours": capacity.quantize(_HUNDREDTH),
+                "utilization_pct": (hours * 100 / capacity).quantize(_HUNDREDTH) if capacity else None,
+            }
+            for index, dimension in enumerate(group_by):
+                if dimension == "week":
+                    item["week_start"] = row[index]
+                else:
+                    item[f"{dimension}_id"] = row[index]
+                    item[f"{dimension}_name"] = names[dimension].get(row[index])
+            items.append(item)
+            total_hours += hours
+            total_approved += approved
+
+        return {
+            "from_date": from_date,
+            "to_date": to_date,
+            "first_week": first_week,
+            "last_week": last_week,
+            "group_by": group_by,
+            "weekly_capacity_hours": weekly_capacity,
+            "active_employee_count": active_count,
+            "total_hours": total_hours.quantize(_HUNDREDTH),
+            "total_approved_hours": total_approved.quantize(_HUNDREDTH),
+            "items": items,
+        }
@@ -1,11 +1,24 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, asc, desc, func
-from typing import Optional, List, Tuple, Dict, Any
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, asc, desc, func, case, insert, select
+from typing import Optional, List, Tuple, Dict, Any, Iterable
 from datetime import datetime
 
 from app.models.time_sheet import Timesheet
 from app.models.timesheet_task import TimesheetTask
-from app.schemas.timesheet_schemas import TimesheetCreate, TimesheetUpdate
+from app.schemas.timesheet_schemas import TimesheetCreate, TimesheetUpdate, TimesheetUpsert, TimesheetTaskInput
+from app.schemas.input_types import provided_values
+from app.services.timesheet_hours_service import TimesheetHoursService
+from app.utils.batch_review import REVIEW_STATUSES, lock_rows, item_result, review_response
+from app.utils.helpers import batches
+
+# Timesheets in these states can no longer be approved or rejected
+CLOSED_TIMESHEET_STATUSES = ("Approved", "Rejected", "Cancelled")
+
+TASK_DAY_COLUMNS = (
+    "MondayHours", "TuesdayHours", "WednesdayHours", "ThursdayHours",
+    "FridayHours", "SaturdayHours", "SundayHours",
+)
+
 
 class TimesheetService:
     @staticmethod
@@ -14,7 +27,9 @@ class TimesheetService:
 
     @staticmethod
     def fetch_timesheet_with_tasks(db: Session, timesheet_id: int) -> Optional[Timesheet]:
-        return db.query(Timesheet).filter(Timesheet.Id == timesheet_id).first()
+        return db.query(Timesheet).options(
+            selectinload(Timesheet.timesheet_tasks)
+        ).filter(Timesheet.Id == timesheet_id).first()
 
     @staticmethod
     def fetch_all_timesheets(db: Session) -> List[Timesheet]:
@@ -22,11 +37,15 @@ class TimesheetService:
 
     @staticmethod
     def fetch_all_timesheets_with_tasks(db: Session) -> List[Timesheet]:
-        return db.query(Timesheet).order_by(Timesheet.CreatedOn.desc()).all()
+        return db.query(Timesheet).options(
+            selectinload(Timesheet.timesheet_tasks)
+        ).order_by(Timesheet.CreatedOn.desc()).all()
 
     @staticmethod
     def get_timesheets_by_employee(db: Session, employee_id: int) -> List[Timesheet]:
-        return db.query(Timesheet).filter(Timesheet.EmployeeId == employee_id).order_by(Timesheet.CreatedOn.desc()).all()
+        return db.query(Timesheet).options(
+            selectinload(Timesheet.timesheet_tasks)
+        ).filter(Timesheet.EmployeeId == employee_id).order_by(Timesheet.CreatedOn.desc()).all()
 
     @staticmethod
     def get_timesheets_with_pagination(
@@ -80,90 +99,187 @@ class TimesheetService:
         else:
             query = query.order_by(desc(sort_column))
 
-        items = query.offset(skip).limit(limit).all()
+        items = query.options(selectinload(Timesheet.timesheet_tasks)).offset(skip).limit(limit).all()
 
         return items, total
 
     @staticmethod
-    def insert_or_update_timesheet(db: Session, timesheet_data: dict) -> Dict[str, Any]:
-        """Insert or update timesheet with proper field filtering"""
-        
-        # Define valid fields for Timesheet model
-        valid_timesheet_fields = {
-            'Id', 'FromDate', 'ToDate', 'Description', 'EmployeeId', 
-            'UserId', 'Status', 'AssignedOn', 'AssignedTo', 'ApprovedOn', 
-            'ApprovedBy', 'ApprovedComments', 'CancelledOn', 'CancelledBy', 
-            'CancelledComments', 'RejectedOn', 'RejectedBy', 'RejectedComments',
-            'CreatedBy', 'CreatedOn', 'ModifiedBy', 'ModifiedOn', 'IsActive', 'TotalHrs'
-        }
-        
-        # Extract tasks data before filtering
-        tasks_data = timesheet_data.pop('tasks', [])
-        timesheet_id = timesheet_data.get('Id')
-        
-        # Filter timesheet_data to only include valid fields
-        filtered_data = {k: v for k, v in timesheet_data.items() if k in valid_timesheet_fields}
-        
-        # Handle empty string values - convert to None for proper database handling
-        for key, value in filtered_data.items():
-            if value == "":
-                filtered_data[key] = None
-        
-        if timesheet_id:
-            # Update existing timesheet
-            db_timesheet = db.query(Timesheet).filter(Timesheet.Id == timesheet_id).first()
-            if not db_timesheet:
-                return {"success": False, "message": "Timesheet not found", "timesheet": None}
-
-            # Update only the fields that are present
-            for key, value in filtered_data.items():
-                if key != 'Id' and value is not None:
-                    setattr(db_timesheet, key, value)
-
-            # Handle tasks if provided
-            if tasks_data:
-                for task_data in tasks_data:
-                    task_id = task_data.get('Id')
-                    if task_id:
-                        db_task = db.query(TimesheetTask).filter(TimesheetTask.Id == task_id).first()
-                        if db_task and db_task.TimesheetId == timesheet_id:
-                            for key, value in task_data.items():
-                                if key != 'Id' and value is not None and value != "":
-                                    setattr(db_task, key, value)
-                    else:
-                        # Clean task data before creating
-                        task_data.pop('Id', None)
-                        clean_task_data = {k: v for k, v in task_data.items() if v is not None and v != ""}
-                        new_task = TimesheetTask(**clean_task_data, TimesheetId=timesheet_id)
-                        db.add(new_task)
+    def _insert_tasks(db: Session, timesheet_id: int, tasks_data: List[Dict[str, Any]]) -> None:
+        """All new task lines of a timesheet as one executemany INSERT"""
+        if not tasks_data:
+            return
+        # Same columns on every row, NULLs rendered, so the ORM does not split
+        # the rows into one statement per distinct set of keys
+        columns = {key for task_data in tasks_data for key in task_data} - {'Id', 'TimesheetId'}
+        db.execute(insert(TimesheetTask).execution_options(render_nulls=True), [
+            {**{column: task_data.get(column) for column in columns}, "TimesheetId": timesheet_id}
+            for task_data in tasks_data
+        ])
 
-            db.commit()
-            db.refresh(db_timesheet)
-            return {"success": True, "message": "Timesheet updated successfully", "timesheet": db_timesheet}
-        else:
-            # Create new timesheet
-            filtered_data.pop('Id', None)
-            
-            # Set default values if needed
-            if 'CreatedOn' not in filtered_data or filtered_data['CreatedOn'] is None:
-                filtered_data['CreatedOn'] = datetime.utcnow()
-            if 'IsActive' not in filtered_data:
-                filtered_data['IsActive'] = True
-            
-            db_timesheet = Timesheet(**filtered_data)
-            db.add(db_timesheet)
+    @staticmethod
+    def _recompute_totals(db: Session, timesheet_id: int) -> None:
+        """
+        TotalHrs of every task line from its day columns, then of the
+        timesheet from its active lines - two UPDATEs, whatever the number
+        of lines. Lines without any day hours keep the TotalHrs they were
+        sent with, as does a timesheet without lines.
+        """
+        day_columns = [getattr(TimesheetTask, column) for column in TASK_DAY_COLUMNS]
+        db.query(TimesheetTask).filter(
+            TimesheetTask.TimesheetId == timesheet_id
+        ).update(
+            {TimesheetTask.TotalHrs: case(
+                (func.coalesce(*day_columns).is_(None), TimesheetTask.TotalHrs),
+                else_=sum(func.coalesce(column, 0) for column in day_columns)
+            )},
+            synchronize_session=False
+        )
+        task_total = select(func.sum(TimesheetTask.TotalHrs)).where(
+            TimesheetTask.TimesheetId == timesheet_id,
+            or_(TimesheetTask.IsActive == True, TimesheetTask.IsActive.is_(None))
+        ).scalar_subquery()
+        db.query(Timesheet).filter(
+            Timesheet.Id == timesheet_id
+        ).update(
+            {Timesheet.TotalHrs: func.coalesce(task_total, Timesheet.TotalHrs)},
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def _refresh_hours(db: Session, timesheet_ids: List[int], previous_keys: Iterable = ()) -> None:
+        """Weekly hours summaries of these timesheets' weeks (and of the weeks they were in before)"""
+        TimesheetHoursService.refresh(db, set(previous_keys) | TimesheetHoursService.keys_for(db, timesheet_ids))
+
+    @staticmethod
+    def insert_or_update_timesheet(db: Session, timesheet: TimesheetUpsert) -> Dict[str, Any]:
+        """
+        Insert or update a timesheet and its task lines. Existing lines are
+        checked with one IN query and every insert, update and delete goes
+        out as a single statement, so a week with 20 lines costs the same
+        handful of round trips as a week with one.
+        """
+        timesheet_id = timesheet.Id
+        # Fields already coerced by the request model; empty ones are not written
+        filtered_data = provided_values(timesheet, exclude=('tasks', 'deleted_task_ids'))
+        tasks_data = [provided_values(task) for task in timesheet.tasks or []]
+        deleted_ids = list(dict.fromkeys(timesheet.deleted_task_ids or []))
+        previous_keys = TimesheetHoursService.keys_for(db, [timesheet_id]) if timesheet_id else set()
+
+        try:
+            if timesheet_id:
+                # Update existing timesheet
+                db_timesheet = db.query(Timesheet).filter(Timesheet.Id == timesheet_id).first()
+                if not db_timesheet:
+                    return {"success": False, "message": "Timesheet not found", "timesheet": None}
+
+                # Update only the fields that are present
+                for key, value in filtered_data.items():
+                    if key != 'Id':
+                        setattr(db_timesheet, key, value)
+                message = "Timesheet updated successfully"
+            else:
+                # Create new timesheet
+                filtered_data.pop('Id', None)
+
+                # Set default values if needed
+                if 'CreatedOn' not in filtered_data or filtered_data['CreatedOn'] is None:
+                    filtered_data['CreatedOn'] = datetime.utcnow()
+                if 'IsActive' not in filtered_data:
+                    filtered_data['IsActive'] = True
+
+                db_timesheet = Timesheet(**filtered_data)
+                db.add(db_timesheet)
+                message = "Timesheet created successfully"
             db.flush()
+            timesheet_id = db_timesheet.Id
+
+            # Lines with an Id are updated when they belong to this timesheet
+            # (others are ignored, as before); lines without one are inserted
+            submitted_ids = [task_data['Id'] for task_data in tasks_data if task_data.get('Id')]
+            owned_ids = set()
+            for batch in batches(submitted_ids):
+                owned_ids.update(task_id for task_id, in db.query(TimesheetTask.Id).filter(
+                    TimesheetTask.Id.in_(batch),
+                    TimesheetTask.TimesheetId == timesheet_id
+                ).all())
+
+            updates = [
+                task_data for task_data in tasks_data
+                if task_data.get('Id') in owned_ids and len(task_data) > 1
+            ]
+            inserts = [task_data for task_data in tasks_data if not task_data.get('Id')]
+            if updates:
+                db.bulk_update_mappings(TimesheetTask, updates)
+            TimesheetService._insert_tasks(db, timesheet_id, inserts)
+            for batch in batches(deleted_ids):
+                db.query(TimesheetTask).filter(
+                    TimesheetTask.Id.in_(batch),
+                    TimesheetTask.TimesheetId == timesheet_id
+                ).delete(synchronize_session=False)
+
+            TimesheetService._recompute_totals(db, timesheet_id)
+            TimesheetService._refresh_hours(db, [timesheet_id], previous_keys)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        db.refresh(db_timesheet)
+        return {"success": True, "message": message, "timesheet": db_timesheet}
 
-            # Handle tasks for new timesheet
-            for task_data in tasks_data:
-                task_data.pop('Id', None)
-                clean_task_data = {k: v for k, v in task_data.items() if v is not None and v != ""}
-                new_task = TimesheetTask(**clean_task_data, TimesheetId=db_timesheet.Id)
-                db.add(new_task)
+    @staticmethod
+    def batch_review(
+        db: Session,
+        ids: List[int],
+        action: str,
+        user_id: Optional[int] = None,
+        comment: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Approve or reject many open timesheets with one locked read and one UPDATE"""
+        if action not in REVIEW_STATUSES:
+            raise ValueError(f"action must be one of {', '.join(REVIEW_STATUSES)}")
+        target = REVIEW_STATUSES[action]
+        ids = list(dict.fromkeys(ids))
+        now = datetime.utcnow()
 
+        try:
+            # Status is a TEXT column, so it is checked here rather than in SQL
+            found = dict(lock_rows(db.query(Timesheet.Id, Timesheet.Status).filter(
+                Timesheet.Id.in_(ids),
+                or_(Timesheet.IsActive == True, Timesheet.IsActive.is_(None))
+            ), Timesheet).all())
+
+            results: Dict[int, Dict[str, Any]] = {}
+            to_update: List[int] = []
+            for timesheet_id in ids:
+                if timesheet_id not in found:
+                    results[timesheet_id] = item_result(timesheet_id, False, message="Timesheet not found")
+                elif found[timesheet_id] in CLOSED_TIMESHEET_STATUSES:
+                    results[timesheet_id] = item_result(
+                        timesheet_id, False, found[timesheet_id], f"Timesheet is already {found[timesheet_id]}"
+                    )
+                else:
+                    to_update.append(timesheet_id)
+                    results[timesheet_id] = item_result(timesheet_id, True, target)
+
+            if to_update:
+                if action == "approve":
+                    values = {"ApprovedOn": now, "ApprovedBy": user_id, "ApprovedComments": comment}
+                else:
+                    values = {"RejectedOn": now, "RejectedBy": user_id, "RejectedComments": comment}
+                db.query(Timesheet).filter(
+                    Timesheet.Id.in_(to_update)
+                ).update(
+                    {**values, "Status": target, "ModifiedOn": now, "ModifiedBy": user_id},
+                    synchronize_session=False
+                )
+                TimesheetService._refresh_hours(db, to_update)
             db.commit()
-            db.refresh(db_timesheet)
-            return {"success": True, "message": "Timesheet created successfully", "timesheet": db_timesheet}
+        except Exception:
+            db.rollback()
+            raise
+
+        return review_response(action, ids, results)
 
     @staticmethod
     def delete_timesheet(db: Session, timesheet_id: int) -> Dict[str, Any]:
@@ -171,7 +287,10 @@ class TimesheetService:
         if not db_timesheet:
             return {"success": False, "message": "Timesheet not found"}
 
+        previous_keys = TimesheetHoursService.keys_for(db, [timesheet_id])
         db.delete(db_timesheet)
+        db.flush()
+        TimesheetHoursService.refresh(db, previous_keys)
         db.commit()
         return {"success": True, "message": "Timesheet deleted successfully"}
 
@@ -181,7 +300,12 @@ class TimesheetService:
         if not db_task:
             return {"success": False, "message": "Task not found"}
 
+        timesheet_id = db_task.TimesheetId
         db.delete(db_task)
+        db.flush()
+        if timesheet_id:
+            TimesheetService._recompute_totals(db, timesheet_id)
+            TimesheetService._refresh_hours(db, [timesheet_id])
         db.commit()
         return {"success": True, "message": "Task deleted successfully"}
 
@@ -195,6 +319,8 @@ class TimesheetService:
             db_task = TimesheetTask(**task.model_dump(exclude_none=True), TimesheetId=db_timesheet.Id)
             db.add(db_task)
 
+        db.flush()
+        TimesheetService._refresh_hours(db, [db_timesheet.Id])
         db.commit()
         db.refresh(db_timesheet)
         return db_timesheet
@@ -203,33 +329,41 @@ class TimesheetService:
     def update_timesheet(db: Session, timesheet_id: int, timesheet: TimesheetUpdate) -> Optional[Timesheet]:
         db_timesheet = db.query(Timesheet).filter(Timesheet.Id == timesheet_id).first()
         if db_timesheet:
+            previous_keys = TimesheetHoursService.keys_for(db, [timesheet_id])
             update_data = timesheet.model_dump(exclude_none=True)
             for key, value in update_data.items():
                 setattr(db_timesheet, key, value)
+            db.flush()
+            TimesheetService._refresh_hours(db, [timesheet_id], previous_keys)
             db.commit()
             db.refresh(db_timesheet)
         return db_timesheet
 
     @staticmethod
-    def update_timesheet_task(db: Session, task_id: int, task_data: dict) -> Optional[TimesheetTask]:
+    def update_timesheet_task(db: Session, task_id: int, task_data: TimesheetTaskInput) -> Optional[TimesheetTask]:
         db_task = db.query(TimesheetTask).filter(TimesheetTask.Id == task_id).first()
         if db_task:
-            for key, value in task_data.items():
-                if value is not None and value != "":
-                    setattr(db_task, key, value)
+            for key, value in provided_values(task_data, exclude=('Id',)).items():
+                setattr(db_task, key, value)
+            db.flush()
+            if db_task.TimesheetId:
+                TimesheetService._recompute_totals(db, db_task.TimesheetId)
+                TimesheetService._refresh_hours(db, [db_task.TimesheetId])
             db.commit()
             db.refresh(db_task)
         return db_task
 
     @staticmethod
-    def add_timesheet_task(db: Session, timesheet_id: int, task_data: dict) -> Optional[TimesheetTask]:
+    def add_timesheet_task(db: Session, timesheet_id: int, task_data: TimesheetTaskInput) -> Optional[TimesheetTask]:
         db_timesheet = db.query(Timesheet).filter(Timesheet.Id == timesheet_id).first()
         if not db_timesheet:
             return None
 
-        clean_task_data = {k: v for k, v in task_data.items() if v is not None and v != ""}
-        new_task = TimesheetTask(**clean_task_data, TimesheetId=timesheet_id)
+        new_task = TimesheetTask(**provided_values(task_data, exclude=('Id',)), TimesheetId=timesheet_id)
         db.add(new_task)
+        db.flush()
+        TimesheetService._recompute_totals(db, timesheet_id)
+        TimesheetService._refresh_hours(db, [timesheet_id])
         db.commit()
         db.refresh(new_task)
         return new_task
\ No newline at end of file
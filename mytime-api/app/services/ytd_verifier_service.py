@@ -0,0 +1,135 @@
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+from itertools import accumulate, groupby
+from decimal import Decimal
+import logging
+
+from app.models.employee_salary import EmployeeSalary
+
+logger = logging.getLogger(__name__)
+
+# Monthly column -> the YTD column that must equal its running total in the financial year
+YTD_COLUMN_PAIRS = [
+    ("Earning_Monthly_Basic", "Earning_YTD_Basic"),
+    ("Earning_Montly_HRA", "Earning_YTD_HRA"),
+    ("Earning_Montly_CONVEYANCE", "Earning_YTD_CONVEYANCE"),
+    ("Earning_Montly_MEDICALALLOWANCE", "Earning_YTD_MEDICALALLOWANCE"),
+    ("Earning_Montly_SPECIALALLOWANCE", "Earning_YTD_SPECIALALLOWANCE"),
+    ("Earning_Montly_SPECIALBONUS", "Earning_YTD_SPECIALBONUS"),
+    ("Earning_Montly_STATUTORYBONUS", "Earning_YTD_STATUTORYBONUS"),
+    ("Earning_Montly_GROSSEARNINGS", "Earning_YTD_GROSSEARNINGS"),
+    ("Earning_Montly_OTHERS", "Earning_YTD_OTHERS"),
+    ("Deduction_Montly_PROFESSIONALTAX", "Deduction_YTD_PROFESSIONALTAX"),
+    ("Deduction_Montly_ProvidentFund", "Deduction_YTD_ProvidentFund"),
+    ("Deduction_Montly_GroupHealthInsurance", "Deduction_YTD_GroupHealthInsurance"),
+    ("Deduction_Montly_OTHERS", "Deduction_YTD_OTHERS"),
+    ("Deduction_Montly_GROSSSDeduction", "Deduction_YTD_GROSSSDeduction"),
+]
+
+CENT = Decimal("0.01")
+
+
+class YtdVerifierService:
+    """
+    Recomputes the YTD columns of a financial year from the monthly columns.
+    YTD values are copied forward month to month when salaries are published,
+    so a single out-of-order publish or manual edit corrupts every later
+    month. The verifier loads the whole organisation's year in one query and
+    rebuilds each employee's YTD as a running sum of the monthly values.
+    """
+
+    @staticmethod
+    def _amount(value) -> Decimal:
+        return Decimal(str(value or 0)).quantize(CENT)
+
+    @staticmethod
+    def verify_financial_year(
+        db: Session,
+        financial_year: int,
+        repair: bool = False,
+        mismatch_limit: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Compare stored YTD values with the cumulative monthly sums for every
+        active salary row of the financial year. With repair=True the
+        mismatching rows are corrected in one bulk update.
+        """
+        monthly_columns = [getattr(EmployeeSalary, monthly) for monthly, _ in YTD_COLUMN_PAIRS]
+        ytd_columns = [getattr(EmployeeSalary, ytd) for _, ytd in YTD_COLUMN_PAIRS]
+
+        rows = db.query(
+            EmployeeSalary.EmployeeSalaryId,
+            EmployeeSalary.EmployeeId,
+            EmployeeSalary.SalaryPeriod,
+            *monthly_columns,
+            *ytd_columns
+        ).filter(
+            EmployeeSalary.FinancialYear == financial_year,
+            EmployeeSalary.SalaryPeriod.isnot(None),
+            EmployeeSalary.IsActive == True
+        ).order_by(
+            EmployeeSalary.EmployeeId,
+            EmployeeSalary.SalaryPeriod,
+            EmployeeSalary.EmployeeSalaryId
+        ).all()
+
+        column_count = len(YTD_COLUMN_PAIRS)
+        amount = YtdVerifierService._amount
+        mismatches: List[Dict[str, Any]] = []
+        repairs: Dict[int, Dict[str, Any]] = {}
+        employees_checked = 0
+        mismatch_count = 0
+
+        for employee_id, employee_rows in groupby(rows, key=lambda row: row.EmployeeId):
+            employee_rows = list(employee_rows)
+            employees_checked += 1
+
+            for i, (_, ytd_name) in enumerate(YTD_COLUMN_PAIRS):
+                # Column arrays for the employee's year, in period order
+                monthly = [amount(row[3 + i]) for row in employee_rows]
+                stored = [row[3 + column_count + i] for row in employee_rows]
+                expected = list(accumulate(monthly))
+
+                for row, stored_value, expected_value in zip(employee_rows, stored, expected):
+                    if stored_value is not None and amount(stored_value) == expected_value:
+                        continue
+                    if stored_value is None and expected_value == 0:
+                        continue
+                    mismatch_count += 1
+                    if len(mismatches) < mismatch_limit:
+                        mismatches.append({
+                            "employee_salary_id": row.EmployeeSalaryId,
+                            "employee_id": employee_id,
+                            "salary_period": row.SalaryPeriod,
+                            "column": ytd_name,
+                            "stored": stored_value,
+                            "expected": expected_value,
+                        })
+                    repairs.setdefault(row.EmployeeSalaryId, {
+                        "EmployeeSalaryId": row.EmployeeSalaryId,
+                        "RowHash": None,
+                        "PayslipHash": None,
+                    })[ytd_name] = expected_value
+
+        rows_repaired = 0
+        if repair and repairs:
+            db.bulk_update_mappings(EmployeeSalary, list(repairs.values()))
+            db.commit()
+            rows_repaired = len(repairs)
+            logger.info(f"Repaired YTD values on {rows_repaired} salary rows for FY {financial_year}")
+
+        logger.info(
+            f"YTD verification for FY {financial_year}: {employees_checked} employees, "
+            f"{len(rows)} rows, {mismatch_count} mismatched values on {len(repairs)} rows"
+        )
+
+        return {
+            "financial_year": financial_year,
+            "employees_checked": employees_checked,
+            "rows_checked": len(rows),
+            "rows_mismatched": len(repairs),
+            "mismatch_count": mismatch_count,
+            "mismatches": mismatches,
+            "repaired": bool(repair and repairs),
+            "rows_repaired": rows_repaired,
+        }
@@ -0,0 +1,28 @@
+from typing import List, Dict, Any, Optional
+
+REVIEW_STATUSES = {"approve": "Approved", "reject": "Rejected"}
+
+
+def lock_rows(query, entity):
+    """
+    Lock the selected rows until commit. SQL Server ignores FOR UPDATE, so
+    the equivalent table hint is added for that dialect.
+    """
+    return query.with_for_update().with_hint(entity, "WITH (UPDLOCK, ROWLOCK)", "mssql")
+
+
+def item_result(item_id: int, success: bool, status: Optional[str] = None, message: Optional[str] = None) -> Dict[str, Any]:
+    return {"id": item_id, "success": success, "status": status, "message": message}
+
+
+def review_response(action: str, ids: List[int], results: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """BatchReviewResponse shape with results in request order"""
+    ordered = [results[item_id] for item_id in ids]
+    succeeded = sum(1 for result in ordered if result["success"])
+    return {
+        "action": action,
+        "requested": len(ordered),
+        "succeeded": succeeded,
+        "failed": len(ordered) - succeeded,
+        "results": ordered,
+    }
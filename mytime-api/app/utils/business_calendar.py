@@ -0,0 +1,57 @@
+from array import array
+from datetime import date, timedelta
+from typing import Iterable, List, Set
+
+
+class BusinessCalendar:
+    """
+    Working days of one calendar year as prefix sums: _prefix[n] is the
+    number of working days among the first n days of the year, so the
+    working days of any range inside the year are one subtraction.
+    Weekly offs (weekday numbers, Monday = 0) and holidays are not working
+    days; a holiday on a weekly off is simply not counted twice.
+    """
+
+    __slots__ = ("year", "first", "holidays", "_prefix")
+
+    def __init__(self, year: int, weekend_days: Set[int], holidays: Iterable[date]):
+        self.year = year
+        self.first = date(year, 1, 1)
+        self.holidays = frozenset(day for day in holidays if day.year == year)
+        days = (date(year + 1, 1, 1) - self.first).days
+
+        self._prefix = array("H", bytes(2 * (days + 1)))
+        count = 0
+        for offset in range(days):
+            day = self.first + timedelta(days=offset)
+            if day.weekday() not in weekend_days and day not in self.holidays:
+                count += 1
+            self._prefix[offset + 1] = count
+
+    def _offset(self, day: date) -> int:
+        if day.year != self.year:
+            raise ValueError(f"{day} is not in {self.year}")
+        return (day - self.first).days
+
+    @property
+    def total_working_days(self) -> int:
+        return self._prefix[-1]
+
+    def is_working_day(self, day: date) -> bool:
+        offset = self._offset(day)
+        return self._prefix[offset + 1] != self._prefix[offset]
+
+    def working_days(self, first: date, last: date) -> int:
+        """Working days between two dates of this year (inclusive); 0 when first > last"""
+        if first > last:
+            return 0
+        return self._prefix[self._offset(last) + 1] - self._prefix[self._offset(first)]
+
+    def working_dates(self, first: date, last: date) -> List[date]:
+        """The working days between two dates of this year (inclusive)"""
+        start, end = self._offset(first), self._offset(last)
+        return [
+            self.first + timedelta(days=offset)
+            for offset in range(start, end + 1)
+            if self._prefix[offset + 1] != self._prefix[offset]
+        ]
@@ -0,0 +1,38 @@
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+
+
+class ContentHash:
+    """Utility class to build stable content hashes for database rows"""
+
+    @staticmethod
+    def normalize(value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float, Decimal)):
+            # Numeric(18, 2) columns come back as Decimal('100.00') while freshly
+            # computed values may be int/float - normalise both to 2 decimals
+            return str(Decimal(str(value)).quantize(Decimal("0.01")))
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def of_values(values: Dict[str, Any], fields: Iterable[str]) -> str:
+        """Hash the given fields of a dict (missing fields hash as None)"""
+        payload = [[field, ContentHash.normalize(values.get(field))] for field in fields]
+        encoded = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @staticmethod
+    def of_row(row: Any, fields: Iterable[str]) -> str:
+        """Hash the given attributes of an ORM row"""
+        fields = tuple(fields)
+        return ContentHash.of_values(
+            {field: getattr(row, field, None) for field in fields}, fields
+        )
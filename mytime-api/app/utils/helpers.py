@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Set
 import re
 
 def format_prompt(prompt: str) -> str:
@@ -33,4 +33,16 @@ def format_response(data: Any, message: str = "Success", status: str = "success"
         "status": status,
         "message": message,
         "data": data
-    }
\ No newline at end of file
+    }
+
+# Keeps IN lists well under SQL Server's 2100 parameter limit
+ID_BATCH_SIZE = 1000
+
+def batches(items: List[Any], size: int = ID_BATCH_SIZE) -> Iterator[List[Any]]:
+    """Split a list into consecutive chunks of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def csv_set(value: str) -> Set[str]:
+    """Comma-separated setting -> set of lower-cased, trimmed items"""
+    return {item.strip().lower() for item in (value or "").split(",") if item.strip()}
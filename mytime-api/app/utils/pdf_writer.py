@@ -0,0 +1,75 @@
+from typing import List
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+
+class SimplePdfDocument:
+    """
+    Minimal single-page PDF writer for text and ruled lines.
+    Uses the built-in Helvetica fonts, so no font embedding or third-party
+    library is needed and a page renders in well under a millisecond.
+    Text is limited to Latin-1.
+    """
+
+    def __init__(self):
+        self._ops: List[str] = []
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        text = str(text).encode("latin-1", "replace").decode("latin-1")
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    @staticmethod
+    def text_width(text: str, size: float) -> float:
+        """Approximate Helvetica width (average glyph is ~0.5 em)"""
+        return len(str(text)) * size * 0.5
+
+    def text(self, x: float, y: float, text: str, size: float = 9, bold: bool = False) -> None:
+        """Draw text with its baseline at (x, y), origin top-left"""
+        font = "F2" if bold else "F1"
+        self._ops.append(
+            f"BT /{font} {size} Tf {x:.2f} {PAGE_HEIGHT - y:.2f} Td ({self._escape(text)}) Tj ET"
+        )
+
+    def text_right(self, right: float, y: float, text: str, size: float = 9, bold: bool = False) -> None:
+        self.text(right - self.text_width(text, size), y, text, size, bold)
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.5) -> None:
+        self._ops.append(
+            f"{width} w {x1:.2f} {PAGE_HEIGHT - y1:.2f} m {x2:.2f} {PAGE_HEIGHT - y2:.2f} l S"
+        )
+
+    def rect(self, x: float, y: float, w: float, h: float, width: float = 0.5) -> None:
+        self._ops.append(f"{width} w {x:.2f} {PAGE_HEIGHT - y - h:.2f} {w:.2f} {h:.2f} re S")
+
+    def render(self) -> bytes:
+        content = "\n".join(self._ops).encode("latin-1")
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>"
+            ).encode("latin-1"),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            f"<< /Length {len(content)} >>\nstream\n".encode("latin-1") + content + b"\nendstream",
+        ]
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+
+        xref_offset = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode("latin-1")
+        out += (
+            f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        ).encode("latin-1")
+        return bytes(out)
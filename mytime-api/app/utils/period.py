@@ -0,0 +1,99 @@
+import calendar
+from functools import total_ordering
+from typing import Tuple
+
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+)
+
+_MONTH_NUMBERS = {name.lower(): number for number, name in enumerate(MONTH_NAMES, start=1)}
+
+# Financial year runs April to March
+FINANCIAL_YEAR_START_MONTH = 4
+
+
+@total_ordering
+class Period:
+    """
+    A salary month as a compact integer key (YYYYMM).
+    Replaces the 'April' / '2024' string pairs for ordering and financial
+    year arithmetic. The financial year is identified by its starting year,
+    e.g. April 2024 - March 2025 is financial year 2024.
+    """
+
+    __slots__ = ("year", "month")
+
+    def __init__(self, year: int, month: int):
+        if not 1 <= int(month) <= 12:
+            raise ValueError(f"Invalid month number: {month}")
+        self.year = int(year)
+        self.month = int(month)
+
+    @staticmethod
+    def month_number(month_name: str) -> int:
+        """'April' -> 4 (case-insensitive)"""
+        number = _MONTH_NUMBERS.get((month_name or "").strip().lower())
+        if number is None:
+            raise ValueError(f"Invalid month name: {month_name}")
+        return number
+
+    @classmethod
+    def from_month_name(cls, month_name: str, year) -> "Period":
+        return cls(int(year), cls.month_number(month_name))
+
+    @classmethod
+    def from_key(cls, key: int) -> "Period":
+        """202404 -> Period(2024, 4)"""
+        return cls(int(key) // 100, int(key) % 100)
+
+    @classmethod
+    def financial_year_bounds(cls, financial_year: int) -> Tuple["Period", "Period"]:
+        """First and last period (April, March) of a financial year"""
+        return cls(financial_year, FINANCIAL_YEAR_START_MONTH), cls(financial_year + 1, FINANCIAL_YEAR_START_MONTH - 1)
+
+    @property
+    def key(self) -> int:
+        return self.year * 100 + self.month
+
+    @property
+    def month_name(self) -> str:
+        return MONTH_NAMES[self.month - 1]
+
+    @property
+    def financial_year(self) -> int:
+        """Starting year of the financial year this period belongs to"""
+        return self.year if self.month >= FINANCIAL_YEAR_START_MONTH else self.year - 1
+
+    @property
+    def financial_year_position(self) -> int:
+        """April = 1 ... March = 12"""
+        return (self.month - FINANCIAL_YEAR_START_MONTH) % 12 + 1
+
+    @property
+    def is_financial_year_start(self) -> bool:
+        return self.month == FINANCIAL_YEAR_START_MONTH
+
+    @property
+    def days(self) -> int:
+        return calendar.monthrange(self.year, self.month)[1]
+
+    def shift(self, months: int) -> "Period":
+        index = self.year * 12 + (self.month - 1) + months
+        return Period(index // 12, index % 12 + 1)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Period):
+            return NotImplemented
+        return self.key == other.key
+
+    def __lt__(self, other) -> bool:
+        if not isinstance(other, Period):
+            return NotImplemented
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"<Period({self.month_name} {self.year}, key={self.key})>"
@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ReportingTree:
+    """
+    Immutable index of the reporting hierarchy (employee -> manager).
+    Employees are numbered in depth-first order, so the people reporting
+    (directly or not) to a manager are one contiguous slice of that order:
+    is_manager_of is two dictionary lookups and descendants is a slice,
+    without walking the tree. Rebuild it when the hierarchy changes.
+    """
+
+    __slots__ = ("manager_of", "children", "roots", "order", "depth", "_start", "_end", "broken_edges")
+
+    def __init__(self, edges: Iterable[Tuple[int, int]]):
+        # Later edges win, so callers pass rows oldest first
+        self.manager_of: Dict[int, int] = {}
+        for employee_id, manager_id in edges:
+            if employee_id != manager_id:
+                self.manager_of[employee_id] = manager_id
+
+        nodes = set(self.manager_of) | set(self.manager_of.values())
+        self.children: Dict[int, List[int]] = {}
+        for employee_id in sorted(self.manager_of):
+            self.children.setdefault(self.manager_of[employee_id], []).append(employee_id)
+
+        self.order: List[int] = []
+        self.depth: Dict[int, int] = {}
+        self._start: Dict[int, int] = {}
+        self._end: Dict[int, int] = {}
+        self.roots = sorted(node for node in nodes if node not in self.manager_of)
+        for root in self.roots:
+            self._number(root)
+
+        # Whatever is left sits on a cycle (bad data): drop one edge per cycle
+        self.broken_edges: List[Tuple[int, int]] = []
+        for node in sorted(nodes):
+            if node in self._start:
+                continue
+            seen = set()
+            while node not in seen:
+                seen.add(node)
+                node = self.manager_of[node]
+            self.broken_edges.append((node, self.manager_of.pop(node)))
+            self.children[self.broken_edges[-1][1]].remove(node)
+            self.roots.append(node)
+            self._number(node)
+
+    def _number(self, root: int) -> None:
+        """Depth-first numbering of one subtree, iterative so deep chains do not hit the recursion limit"""
+        stack = [(root, 0, False)]
+        while stack:
+            node, level, done = stack.pop()
+            if done:
+                self._end[node] = len(self.order)
+                continue
+            self._start[node] = len(self.order)
+            self.depth[node] = level
+            self.order.append(node)
+            stack.append((node, level, True))
+            for child in reversed(self.children.get(node, ())):
+                stack.append((child, level + 1, False))
+
+    def __contains__(self, employee_id: int) -> bool:
+        return employee_id in self._start
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def is_manager_of(self, manager_id: int, employee_id: int) -> bool:
+        """True when employee_id reports to manager_id directly or through other managers"""
+        start = self._start.get(manager_id)
+        position = self._start.get(employee_id)
+        if start is None or position is None:
+            return False
+        return start < position < self._end[manager_id]
+
+    def descendants(self, manager_id: int, depth: Optional[int] = None) -> List[int]:
+        """Everyone below manager_id in depth-first order, optionally only `depth` levels down"""
+        start = self._start.get(manager_id)
+        if start is None:
+            return []
+        members = self.order[start + 1:self._end[manager_id]]
+        if depth is None:
+            return members
+        limit = self.depth[manager_id] + depth
+        return [employee_id for employee_id in members if self.depth[employee_id] <= limit]
+
+    def ancestors(self, employee_id: int) -> List[int]:
+        """Managers of employee_id from the direct manager up to the top"""
+        chain = []
+        manager_id = self.manager_of.get(employee_id)
+        while manager_id is not None:
+            chain.append(manager_id)
+            manager_id = self.manager_of.get(manager_id)
+        return chain
@@ -0,0 +1,248 @@
+"""
+Micro-benchmark of request body parsing for the upsert endpoints.
+
+Compares the previous hand-written dict parsing (valid_fields filtering,
+strptime/fromisoformat loops, int/Decimal conversions - reproduced below
+as they were in the services, after FastAPI's own validation of a `dict`
+body) with model_validate on the typed upsert models plus provided_values,
+i.e. everything the endpoints now do. No database or running API is needed.
+
+    python loadtests/bench_input_models.py --number 20000
+
+Only the attendence body parses faster (its strptime loops are gone). The
+employee, education and timesheet bodies are slower: the old paths
+checked little or nothing (the timesheet one only filtered keys), and
+the models are already close to the cost of a bare pydantic model with
+the same fields. For those routes the models buy 422s on bad input, not
+speed; a speed-up below 1.0x there is expected, not a regression.
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, date, time
+from decimal import Decimal, InvalidOperation
+
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.attendence_schemas import AttendenceUpsert  # noqa: E402
+from app.schemas.employee_schemas import EmployeeUpsert  # noqa: E402
+from app.schemas.employee_education_schemas import EmployeeEducationUpsert  # noqa: E402
+from app.schemas.timesheet_schemas import TimesheetUpsert  # noqa: E402
+from app.schemas.input_types import provided_values  # noqa: E402
+
+ATTENDENCE_BODY = {
+    "AttendenceId": 0, "EmployeeId": 1042, "AttendenceDate": "2026-03-24T00:00:00.000Z",
+    "CheckInTime": "09:12", "CheckOutTime": "18:40", "WorkHours": "09:28", "Status": "Present",
+    "WorkType": "Office", "Description": "", "ApprovalStatus": "Pending",
+    "CreatedOn": "Thu Mar 26 2026", "CreatedBy": 7, "ModifiedOn": "", "ModifiedBy": None,
+}
+
+EMPLOYEE_BODY = {
+    "EmployeeId": 1042, "EmployeeCode": "EMP1042", "FirstName": "Asha", "LastName": "Rao",
+    "Gender": "Female", "DateOfBirth": "1994-07-02T00:00:00.000Z", "Email": "asha@example.com",
+    "Phone": "9800000000", "UserId": "88", "RoleId": "3", "DepartmentId": 4, "DesignationId": "12",
+    "StartedOn": "2021-01-04T00:00:00Z", "OfferReleasedOn": "2020-12-01T00:00:00Z",
+    "OfferAcceptedOn": "2020-12-03T00:00:00Z", "OfferPrice": "1200000.00", "CurrentPrice": 1450000,
+    "JoiningBonus": "50000", "ModifiedBy": "7", "IsActive": "true",
+}
+
+EDUCATION_BODY = {
+    "EmployeeEducationId": "0", "EmployeeId": "1042", "Degree": "B.Tech", "FeildOfStudy": "CSE",
+    "Institution": "NIT", "YearOfCompletion": "2016-05-31T00:00:00.000Z", "PercentageMarks": "8.4",
+    "Year": "2016", "CreatedBy": "7", "CreatedOn": "2026-03-26T10:30:00Z", "IsActive": "true",
+}
+
+TIMESHEET_BODY = {
+    "Id": 0, "FromDate": "2026-03-23T00:00:00", "ToDate": "2026-03-29T00:00:00", "Description": "",
+    "EmployeeId": 1042, "UserId": 88, "Status": "Submitted", "CreatedBy": 88, "IsActive": True,
+    "TotalHrs": 40, "timesheet_id_from_ui": "ignored",
+    "tasks": [
+        {"Id": None, "TaskItemId": 10 + i, "TaskCodeId": 2, "MondayHours": 2, "TuesdayHours": 2,
+         "WednesdayHours": 2, "ThursdayHours": 1, "FridayHours": 1, "SaturdayHours": "",
+         "SundayHours": "", "TotalHrs": 8, "IsActive": True}
+        for i in range(5)
+    ],
+}
+
+
+# --- previous parsing paths -------------------------------------------------
+
+def legacy_parse_datetime(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        for fmt in ('%a %b %d %Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ'):
+            try:
+                return datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+    return None
+
+
+def legacy_convert_time(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, time):
+        return value
+    try:
+        parts = value.split(':')
+        if len(parts) == 2:
+            return time(hour=int(parts[0]), minute=int(parts[1]))
+        elif len(parts) == 3:
+            return time(hour=int(parts[0]), minute=int(parts[1]), second=int(parts[2]))
+    except Exception:
+        pass
+    return None
+
+
+def legacy_convert_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value.split('T')[0] if 'T' in value else value)
+    except Exception:
+        return None
+
+
+def legacy_attendence(data):
+    valid_fields = {
+        'AttendenceId', 'EmployeeId', 'AttendenceDate', 'CheckInTime', 'CheckOutTime', 'Status',
+        'WorkHours', 'Description', 'ApprovalStatus', 'ApprovedBy', 'ApprovedOn', 'RejectedBy',
+        'RejectedOn', 'RejectionReason', 'CreatedOn', 'CreatedBy', 'ModifiedOn', 'ModifiedBy', 'WorkType'
+    }
+    processed = {}
+    for key, value in data.items():
+        if key in valid_fields and value is not None and value != "":
+            if key in ('CheckInTime', 'CheckOutTime', 'WorkHours'):
+                converted = legacy_convert_time(value)
+            elif key == 'AttendenceDate':
+                converted = legacy_convert_date(value)
+            elif key in ('CreatedOn', 'ModifiedOn', 'ApprovedOn', 'RejectedOn'):
+                converted = legacy_parse_datetime(value)
+            else:
+                converted = value
+            if converted:
+                processed[key] = converted
+    return processed
+
+
+def legacy_employee(data):
+    data = dict(data)
+    if 'OfferReleasedOn' in data:
+        data['OfferRelesedOn'] = data.pop('OfferReleasedOn')
+    for field in ('DateOfBirth', 'StartedOn', 'EndedOn', 'ResignedOn', 'LastWorkingDay',
+                  'OfferRelesedOn', 'OfferAcceptedOn', 'CreatedOn', 'ModifiedOn'):
+        if isinstance(data.get(field), str):
+            try:
+                data[field] = datetime.fromisoformat(data[field].replace('Z', '+00:00'))
+            except ValueError:
+                data[field] = None
+    for field in ('CreatedBy', 'ModifiedBy', 'UserId', 'RoleId', 'DepartmentId', 'DesignationId'):
+        if isinstance(data.get(field), str):
+            try:
+                data[field] = int(data[field])
+            except ValueError:
+                data[field] = None
+    for field in ('OfferPrice', 'CurrentPrice', 'JoiningBonus'):
+        if data.get(field) is not None:
+            try:
+                data[field] = Decimal(str(data[field]))
+            except InvalidOperation:
+                data[field] = None
+    if isinstance(data.get('IsActive'), str):
+        data['IsActive'] = data['IsActive'].lower() in ('true', '1', 'yes')
+    return data
+
+
+def legacy_education(data):
+    def parse_date(value):
+        if value is None or isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return datetime.utcnow()
+
+    def parse_id(value, default=0):
+        if value is None:
+            return default
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value.strip()) if value.strip() else default
+        except ValueError:
+            return default
+
+    data = dict(data)
+    data['EmployeeEducationId'] = parse_id(data.get('EmployeeEducationId'), 0)
+    data['EmployeeId'] = parse_id(data.get('EmployeeId'), None)
+    data['CreatedBy'] = parse_id(data.get('CreatedBy'), None)
+    data['ModifiedBy'] = parse_id(data.get('ModifiedBy'), None)
+    data['CreatedOn'] = parse_date(data.get('CreatedOn'))
+    data['ModifiedOn'] = parse_date(data.get('ModifiedOn'))
+    data['YearOfCompletion'] = parse_date(data.get('YearOfCompletion'))
+    if isinstance(data.get('IsActive'), str):
+        data['IsActive'] = data['IsActive'].lower() in ('true', '1', 'yes')
+    return data
+
+
+def legacy_timesheet(data):
+    valid_fields = {
+        'Id', 'FromDate', 'ToDate', 'Description', 'EmployeeId', 'UserId', 'Status', 'AssignedOn',
+        'AssignedTo', 'ApprovedOn', 'ApprovedBy', 'ApprovedComments', 'CancelledOn', 'CancelledBy',
+        'CancelledComments', 'RejectedOn', 'RejectedBy', 'RejectedComments', 'CreatedBy', 'CreatedOn',
+        'ModifiedBy', 'ModifiedOn', 'IsActive', 'TotalHrs'
+    }
+    data = dict(data)
+    tasks = data.pop('tasks', [])
+    filtered = {k: (None if v == "" else v) for k, v in data.items() if k in valid_fields}
+    clean_tasks = [{k: v for k, v in task.items() if v is not None and v != ""} for task in tasks]
+    return filtered, clean_tasks
+
+
+# --- typed request models -------------------------------------------------
+
+def typed_timesheet(data):
+    timesheet = TimesheetUpsert.model_validate(data)
+    return provided_values(timesheet, exclude=('tasks',)), [provided_values(task) for task in timesheet.tasks or []]
+
+
+# The previous endpoints declared `body: dict`, which FastAPI validated too
+_DICT_BODY = TypeAdapter(dict)
+
+CASES = (
+    ("attendence", ATTENDENCE_BODY, lambda body: legacy_attendence(_DICT_BODY.validate_python(body)),
+     lambda body: provided_values(AttendenceUpsert.model_validate(body))),
+    ("employee", EMPLOYEE_BODY, lambda body: legacy_employee(_DICT_BODY.validate_python(body)),
+     lambda body: provided_values(EmployeeUpsert.model_validate(body))),
+    ("education", EDUCATION_BODY, lambda body: legacy_education(_DICT_BODY.validate_python(body)),
+     lambda body: provided_values(EmployeeEducationUpsert.model_validate(body))),
+    ("timesheet+5 tasks", TIMESHEET_BODY, lambda body: legacy_timesheet(_DICT_BODY.validate_python(body)),
+     typed_timesheet),
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark upsert body parsing")
+    parser.add_argument("--number", type=int, default=20000, help="Parses per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per case (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'body':<20}{'legacy us':>12}{'model us':>12}{'speed-up':>10}")
+    for name, body, legacy, typed in CASES:
+        legacy_best = min(timeit.repeat(lambda: legacy(body), number=args.number, repeat=args.repeat))
+        typed_best = min(timeit.repeat(lambda: typed(body), number=args.number, repeat=args.repeat))
+        legacy_us = legacy_best / args.number * 1e6
+        typed_us = typed_best / args.number * 1e6
+        print(f"{name:<20}{legacy_us:>12.2f}{typed_us:>12.2f}{legacy_us / typed_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
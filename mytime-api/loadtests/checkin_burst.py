@@ -0,0 +1,84 @@
+"""
+Morning check-in burst against a running API.
+
+Every simulated employee checks in at (roughly) the same moment, checks in a
+second time (a double tap on the device) and finally checks out, so the
+upsert path is exercised under contention on the same (EmployeeId, date) keys.
+
+    python loadtests/checkin_burst.py --base-url http://localhost:8000 \
+        --token <JWT> --employees 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import List, Optional
+
+import httpx
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def call(client: httpx.AsyncClient, limiter: asyncio.Semaphore, url: str,
+               latencies: List[float], outcomes: Counter) -> None:
+    async with limiter:
+        started = time.perf_counter()
+        try:
+            response = await client.post(url)
+            outcomes[response.status_code] += 1
+        except httpx.HTTPError as e:
+            outcomes[type(e).__name__] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def phase(client: httpx.AsyncClient, name: str, urls: List[str], concurrency: int) -> None:
+    limiter = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(client, limiter, url, latencies, outcomes) for url in urls))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<10} {len(urls):>6} req  {len(urls) / elapsed:>8.1f} req/s  "
+        f"p50 {percentile(latencies, 50):>7.1f} ms  p95 {percentile(latencies, 95):>7.1f} ms  "
+        f"p99 {percentile(latencies, 99):>7.1f} ms  max {max(latencies, default=0):>7.1f} ms  "
+        f"mean {statistics.fmean(latencies) if latencies else 0:>7.1f} ms  {dict(outcomes)}"
+    )
+
+
+async def run(base_url: str, token: Optional[str], first_employee: int, employees: int, concurrency: int) -> None:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    prefix = f"{base_url.rstrip('/')}/api/v1/attendence"
+    employee_ids = range(first_employee, first_employee + employees)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+        await phase(client, "check_in", [f"{prefix}/check_in/{e}" for e in employee_ids], concurrency)
+        # Repeat taps hit rows that already exist and must keep the first time
+        await phase(client, "re_tap", [f"{prefix}/check_in/{e}" for e in employee_ids], concurrency)
+        await phase(client, "check_out", [f"{prefix}/check_out/{e}" for e in employee_ids], concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Morning check-in burst load test")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", help="Bearer token of a user allowed to mark attendence")
+    parser.add_argument("--first-employee", type=int, default=1, help="First EmployeeId of the range")
+    parser.add_argument("--employees", type=int, default=1000, help="Number of employees checking in")
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests in flight at once")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.token, args.first_employee, args.employees, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- Content hash per EmployeeSalary row so a republish can skip unchanged rows.
+-- Existing rows keep NULL until the first republish of their month, which
+-- stores it on every row it writes or finds unchanged.
+
+IF COL_LENGTH('dbo.EmployeeSalary', 'RowHash') IS NULL
+BEGIN
+    ALTER TABLE dbo.EmployeeSalary ADD RowHash VARCHAR(64) NULL;
+END
+GO
@@ -0,0 +1,58 @@
+-- Integer period key (YYYYMM) and financial year (April-March, by start year)
+-- for MonthlySalary and EmployeeSalary, backfilled from SalaryMonth/SalaryYear.
+
+IF COL_LENGTH('dbo.MonthlySalary', 'SalaryPeriod') IS NULL
+    ALTER TABLE dbo.MonthlySalary ADD SalaryPeriod INT NULL;
+IF COL_LENGTH('dbo.MonthlySalary', 'FinancialYear') IS NULL
+    ALTER TABLE dbo.MonthlySalary ADD FinancialYear INT NULL;
+IF COL_LENGTH('dbo.EmployeeSalary', 'SalaryPeriod') IS NULL
+    ALTER TABLE dbo.EmployeeSalary ADD SalaryPeriod INT NULL;
+IF COL_LENGTH('dbo.EmployeeSalary', 'FinancialYear') IS NULL
+    ALTER TABLE dbo.EmployeeSalary ADD FinancialYear INT NULL;
+GO
+
+;WITH src AS (
+    SELECT SalaryPeriod, FinancialYear,
+           TRY_CAST(SalaryYear AS INT) AS Yr,
+           CASE LOWER(LTRIM(RTRIM(SalaryMonth)))
+               WHEN 'january' THEN 1  WHEN 'february' THEN 2  WHEN 'march' THEN 3
+               WHEN 'april' THEN 4    WHEN 'may' THEN 5       WHEN 'june' THEN 6
+               WHEN 'july' THEN 7     WHEN 'august' THEN 8    WHEN 'september' THEN 9
+               WHEN 'october' THEN 10 WHEN 'november' THEN 11 WHEN 'december' THEN 12
+           END AS Mon
+    FROM dbo.MonthlySalary
+    WHERE SalaryPeriod IS NULL
+)
+UPDATE src
+SET SalaryPeriod  = Yr * 100 + Mon,
+    FinancialYear = CASE WHEN Mon >= 4 THEN Yr ELSE Yr - 1 END
+WHERE Yr IS NOT NULL AND Mon IS NOT NULL;
+GO
+
+;WITH src AS (
+    SELECT SalaryPeriod, FinancialYear,
+           TRY_CAST(SalaryYear AS INT) AS Yr,
+           CASE LOWER(LTRIM(RTRIM(SalaryMonth)))
+               WHEN 'january' THEN 1  WHEN 'february' THEN 2  WHEN 'march' THEN 3
+               WHEN 'april' THEN 4    WHEN 'may' THEN 5       WHEN 'june' THEN 6
+               WHEN 'july' THEN 7     WHEN 'august' THEN 8    WHEN 'september' THEN 9
+               WHEN 'october' THEN 10 WHEN 'november' THEN 11 WHEN 'december' THEN 12
+           END AS Mon
+    FROM dbo.EmployeeSalary
+    WHERE SalaryPeriod IS NULL
+)
+UPDATE src
+SET SalaryPeriod  = Yr * 100 + Mon,
+    FinancialYear = CASE WHEN Mon >= 4 THEN Yr ELSE Yr - 1 END
+WHERE Yr IS NOT NULL AND Mon IS NOT NULL;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_MonthlySalary_SalaryPeriod')
+    CREATE INDEX IX_MonthlySalary_SalaryPeriod ON dbo.MonthlySalary (SalaryPeriod);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_MonthlySalary_FinancialYear')
+    CREATE INDEX IX_MonthlySalary_FinancialYear ON dbo.MonthlySalary (FinancialYear, SalaryPeriod);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_EmployeeSalary_Employee_Period')
+    CREATE INDEX IX_EmployeeSalary_Employee_Period ON dbo.EmployeeSalary (EmployeeId, SalaryPeriod) INCLUDE (FinancialYear, IsActive);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_EmployeeSalary_FinancialYear')
+    CREATE INDEX IX_EmployeeSalary_FinancialYear ON dbo.EmployeeSalary (FinancialYear, EmployeeId, SalaryPeriod);
+GO
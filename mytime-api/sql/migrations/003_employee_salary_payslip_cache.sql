@@ -0,0 +1,14 @@
+-- Content hash and B2 key of the rendered PDF payslip per EmployeeSalary row.
+-- A payslip is only re-rendered when its content hash changes.
+
+IF COL_LENGTH('dbo.EmployeeSalary', 'PayslipHash') IS NULL
+BEGIN
+    ALTER TABLE dbo.EmployeeSalary ADD PayslipHash VARCHAR(64) NULL;
+END
+GO
+
+IF COL_LENGTH('dbo.EmployeeSalary', 'PayslipFileId') IS NULL
+BEGIN
+    ALTER TABLE dbo.EmployeeSalary ADD PayslipFileId VARCHAR(255) NULL;
+END
+GO
@@ -0,0 +1,45 @@
+-- Payroll totals per salary period x department x designation for the
+-- analytics endpoints. Refreshed per period after every payroll publish;
+-- the initial load below covers history.
+
+IF OBJECT_ID('dbo.PayrollRollup', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.PayrollRollup (
+        PayrollRollupId BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        SalaryPeriod    INT            NOT NULL,
+        FinancialYear   INT            NULL,
+        DepartmentId    BIGINT         NULL,
+        DesignationId   BIGINT         NULL,
+        Headcount       INT            NOT NULL DEFAULT 0,
+        GrossEarnings   DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        GrossDeductions DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        NetPay          DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        LopDays         INT            NOT NULL DEFAULT 0,
+        RefreshedOn     DATETIME       NULL
+    );
+    CREATE UNIQUE INDEX IX_PayrollRollup_Period_Org
+        ON dbo.PayrollRollup (SalaryPeriod, DepartmentId, DesignationId);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM dbo.PayrollRollup)
+BEGIN
+    INSERT INTO dbo.PayrollRollup
+        (SalaryPeriod, FinancialYear, DepartmentId, DesignationId,
+         Headcount, GrossEarnings, GrossDeductions, NetPay, LopDays, RefreshedOn)
+    SELECT es.SalaryPeriod,
+           MAX(es.FinancialYear),
+           e.DepartmentId,
+           e.DesignationId,
+           COUNT(DISTINCT es.EmployeeId),
+           SUM(COALESCE(es.Earning_Montly_GROSSEARNINGS, 0)),
+           SUM(COALESCE(es.Deduction_Montly_GROSSSDeduction, 0)),
+           SUM(COALESCE(es.NETPAY, 0)),
+           SUM(COALESCE(es.LOPDAYS, 0)),
+           GETUTCDATE()
+    FROM dbo.EmployeeSalary es
+    LEFT JOIN dbo.Employee e ON e.EmployeeId = es.EmployeeId
+    WHERE es.IsActive = 1 AND es.SalaryPeriod IS NOT NULL
+    GROUP BY es.SalaryPeriod, e.DepartmentId, e.DesignationId;
+END
+GO
@@ -0,0 +1,27 @@
+-- Salary revision history written by the bulk salary revision API.
+-- Each applied revision deactivates the employee's structure, inserts a
+-- new structure version and records the gross before/after here.
+
+IF OBJECT_ID('dbo.SalaryHike', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.SalaryHike (
+        SalaryHikeId        BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        EmployeeId          BIGINT         NOT NULL,
+        RevisionId          NVARCHAR(36)   NOT NULL,
+        PreviousStructureId BIGINT         NULL,
+        NewStructureId      BIGINT         NULL,
+        OriginalSalary      DECIMAL(18, 2) NULL,
+        LatestSalary        DECIMAL(18, 2) NULL,
+        EffectiveFrom       DATETIME       NULL,
+        ModifiedBy          BIGINT         NULL,
+        ModifiedOn          DATETIME       NULL
+    );
+    CREATE INDEX IX_SalaryHike_Employee ON dbo.SalaryHike (EmployeeId, ModifiedOn);
+    CREATE INDEX IX_SalaryHike_Revision ON dbo.SalaryHike (RevisionId);
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_EmployeeSalaryStructure_Employee_Active')
+    CREATE INDEX IX_EmployeeSalaryStructure_Employee_Active
+        ON dbo.EmployeeSalaryStructure (EmployeeId, IsActive);
+GO
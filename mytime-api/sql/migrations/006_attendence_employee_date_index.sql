@@ -0,0 +1,8 @@
+-- Lookup index for (EmployeeId, AttendenceDate), used by duplicate checks,
+-- bulk ingestion and the monthly attendance queries.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Attendence_Employee_Date')
+    CREATE INDEX IX_Attendence_Employee_Date
+        ON dbo.Attendence (EmployeeId, AttendenceDate)
+        INCLUDE (CheckInTime, CheckOutTime, Status, ApprovalStatus);
+GO
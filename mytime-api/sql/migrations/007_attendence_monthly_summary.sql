@@ -0,0 +1,34 @@
+-- Attendence counts and work hours per employee per month, kept current by
+-- every attendence write. Populate (or repair) it from history with:
+--     python -m app.cli rebuild-attendence-summary
+
+IF OBJECT_ID('dbo.AttendenceMonthlySummary', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.AttendenceMonthlySummary (
+        AttendenceSummaryId BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        EmployeeId     BIGINT        NOT NULL,
+        Period         INT           NOT NULL,
+        PresentDays    INT           NOT NULL DEFAULT 0,
+        AbsentDays     INT           NOT NULL DEFAULT 0,
+        WfhDays        INT           NOT NULL DEFAULT 0,
+        LeaveDays      INT           NOT NULL DEFAULT 0,
+        PendingDays    INT           NOT NULL DEFAULT 0,
+        WorkSeconds    INT           NOT NULL DEFAULT 0,
+        TotalWorkHours DECIMAL(9, 2) NOT NULL DEFAULT 0,
+        RefreshedOn    DATETIME      NULL
+    );
+    CREATE UNIQUE INDEX IX_AttendenceMonthlySummary_Employee_Period
+        ON dbo.AttendenceMonthlySummary (EmployeeId, Period);
+END
+GO
+
+-- Exact work seconds behind TotalWorkHours, so check-in/check-out can add
+-- their difference without accumulating rounding. Tables created before the
+-- column existed are seeded from the rounded hours; run the rebuild above
+-- to make them exact.
+IF COL_LENGTH('dbo.AttendenceMonthlySummary', 'WorkSeconds') IS NULL
+BEGIN
+    ALTER TABLE dbo.AttendenceMonthlySummary ADD WorkSeconds INT NOT NULL DEFAULT 0;
+    EXEC('UPDATE dbo.AttendenceMonthlySummary SET WorkSeconds = CAST(ROUND(TotalWorkHours * 3600, 0) AS INT)');
+END
+GO
@@ -0,0 +1,59 @@
+-- Timesheet hours per employee, week, project, task item and task code,
+-- kept current by every timesheet write. Populate (or repair) it from
+-- history with:
+--     python -m app.cli rebuild-timesheet-hours
+
+IF OBJECT_ID('dbo.TimesheetWeeklyHours', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.TimesheetWeeklyHours (
+        TimesheetHoursId BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        EmployeeId    BIGINT         NOT NULL,
+        WeekStart     DATE           NOT NULL,
+        ProjectId     BIGINT         NULL,
+        TaskItemId    BIGINT         NULL,
+        TaskCodeId    BIGINT         NULL,
+        Hours         DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        ApprovedHours DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        RefreshedOn   DATETIME       NULL
+    );
+END
+GO
+
+-- One row per key: the refresh upserts by it (MERGE ... WITH (HOLDLOCK)), so
+-- concurrent writes of an employee-week cannot insert the same key twice.
+-- Its leading (EmployeeId, WeekStart) columns also serve the refresh reads.
+IF EXISTS (SELECT 1 FROM dbo.TimesheetWeeklyHours
+           GROUP BY EmployeeId, WeekStart, ProjectId, TaskItemId, TaskCodeId HAVING COUNT(*) > 1)
+    PRINT 'TimesheetWeeklyHours has duplicate keys (run rebuild-timesheet-hours, then re-run) - UX_TimesheetWeeklyHours_Key not created'
+ELSE IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_TimesheetWeeklyHours_Key'
+                    AND object_id = OBJECT_ID('dbo.TimesheetWeeklyHours'))
+    CREATE UNIQUE INDEX UX_TimesheetWeeklyHours_Key
+        ON dbo.TimesheetWeeklyHours (EmployeeId, WeekStart, ProjectId, TaskItemId, TaskCodeId);
+GO
+
+-- Superseded by UX_TimesheetWeeklyHours_Key (created by earlier runs of this script)
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_TimesheetWeeklyHours_Key'
+           AND object_id = OBJECT_ID('dbo.TimesheetWeeklyHours'))
+   AND EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_TimesheetWeeklyHours_Employee_Week'
+               AND object_id = OBJECT_ID('dbo.TimesheetWeeklyHours'))
+    DROP INDEX IX_TimesheetWeeklyHours_Employee_Week ON dbo.TimesheetWeeklyHours;
+GO
+
+-- Org-wide range queries read only this index
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_TimesheetWeeklyHours_Week_Project'
+               AND object_id = OBJECT_ID('dbo.TimesheetWeeklyHours'))
+    CREATE INDEX IX_TimesheetWeeklyHours_Week_Project
+        ON dbo.TimesheetWeeklyHours (WeekStart, ProjectId)
+        INCLUDE (EmployeeId, TaskItemId, TaskCodeId, Hours, ApprovedHours);
+GO
+
+-- Source reads of the refresh: timesheets of an employee by week
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Timesheet_Employee_FromDate'
+               AND object_id = OBJECT_ID('dbo.Timesheet'))
+    CREATE INDEX IX_Timesheet_Employee_FromDate ON dbo.Timesheet (EmployeeId, FromDate);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_TimesheetTask_TimesheetId'
+               AND object_id = OBJECT_ID('dbo.TimesheetTask'))
+    CREATE INDEX IX_TimesheetTask_TimesheetId ON dbo.TimesheetTask (TimesheetId);
+GO
@@ -0,0 +1,26 @@
+-- One active balance per user, leave type and year. Balance deductions are
+-- conditional UPDATEs on this key and missing balances are created with a
+-- guarded INSERT ... SELECT, so the key must be unique (and indexed).
+-- Duplicates already present are reported instead of failing the script;
+-- deactivate the extra rows and re-run.
+
+IF EXISTS (
+    SELECT 1 FROM dbo.LeaveBalance
+    WHERE IsActive = 1
+    GROUP BY UserId, LeaveTypeId, [Year]
+    HAVING COUNT(*) > 1
+)
+    PRINT 'LeaveBalance has duplicate active (UserId, LeaveTypeId, Year) rows - UX_LeaveBalance_User_Type_Year not created';
+ELSE IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_LeaveBalance_User_Type_Year')
+    CREATE UNIQUE INDEX UX_LeaveBalance_User_Type_Year
+        ON dbo.LeaveBalance (UserId, LeaveTypeId, [Year])
+        INCLUDE (UsedLeaves, RemainingLeaves)
+        WHERE IsActive = 1;
+GO
+
+-- Overlap check of new leave requests
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_LeaveRequests_User_Dates')
+    CREATE INDEX IX_LeaveRequests_User_Dates
+        ON dbo.LeaveRequests (UserId, FromDate, ToDate)
+        INCLUDE (Status, IsActive);
+GO
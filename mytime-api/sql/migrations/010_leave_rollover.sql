@@ -0,0 +1,18 @@
+-- Year-end leave rollover: per leave type carry-forward cap, and the days
+-- carried into each balance (NULL until the rollover has run for it, which
+-- is what makes re-running the rollover a no-op).
+
+IF COL_LENGTH('dbo.LeaveType', 'CarryForwardDays') IS NULL
+    ALTER TABLE dbo.LeaveType ADD CarryForwardDays INT NULL;
+GO
+
+IF COL_LENGTH('dbo.LeaveBalance', 'CarriedForwardLeaves') IS NULL
+    ALTER TABLE dbo.LeaveBalance ADD CarriedForwardLeaves INT NULL;
+GO
+
+-- Rollover reads every active balance of one year
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_LeaveBalance_Year')
+    CREATE INDEX IX_LeaveBalance_Year
+        ON dbo.LeaveBalance ([Year], IsActive)
+        INCLUDE (UserId, LeaveTypeId, RemainingLeaves, CarriedForwardLeaves);
+GO